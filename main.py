@@ -5,6 +5,7 @@
 
 """Main execution for the action."""
 
+import contextlib
 import functools
 import json
 import logging
@@ -18,22 +19,144 @@ from pathlib import Path
 
 from gatekeeper import (
     GETTING_STARTED,
+    batch,
+    cassette,
+    deadline,
     exceptions,
+    logs,
+    metrics,
     pre_flight_checks,
+    profiling,
     run_migrate,
     run_reconcile,
     types_,
 )
-from gatekeeper.clients import get_clients
+from gatekeeper.clients import open_clients
 from gatekeeper.constants import DEFAULT_BRANCH
+from gatekeeper.snapshot import ServerSnapshot
 from gatekeeper.types_ import ActionResult, PullRequestAction
 
 GITHUB_HEAD_REF_ENV_NAME = "GITHUB_HEAD_REF"
 GITHUB_OUTPUT_ENV_NAME = "GITHUB_OUTPUT"
+METRICS_FILE_ENV_NAME = "INPUT_METRICS_FILE"
+PROFILE_DIR_ENV_NAME = "INPUT_PROFILE_DIR"
+LOG_MODE_ENV_NAME = "INPUT_LOG_MODE"
+LOG_PAYLOAD_FILE_ENV_NAME = "INPUT_LOG_PAYLOAD_FILE"
+TIME_BUDGET_ENV_NAME = "INPUT_TIME_BUDGET"
+RECORD_FILE_ENV_NAME = "INPUT_RECORD_FILE"
+REPLAY_FILE_ENV_NAME = "INPUT_REPLAY_FILE"
+REPLAY_LATENCY_SCALE_ENV_NAME = "INPUT_REPLAY_LATENCY_SCALE"
 
 T = typing.TypeVar("T")
 
 
+def _resolve_path_input(name: str) -> str:
+    """Get the absolute path of an input that is a path relative to the working directory.
+
+    Args:
+        name: The name of the environment variable of the input.
+
+    Returns:
+        The absolute path or an empty string if the input is empty.
+    """
+    return str(Path(value).resolve()) if (value := os.getenv(name)) else ""
+
+
+def _parse_batch_workers() -> int:
+    """Get the maximum number of charms of a batch reconciled at the same time.
+
+    Raises:
+        InputError: If the input is not a positive integer.
+
+    Returns:
+        The number of workers.
+    """
+    batch_workers = os.getenv("INPUT_BATCH_WORKERS", "4")
+    if not batch_workers.isdigit() or int(batch_workers) < 1:
+        raise exceptions.InputError(
+            f"Invalid 'batch_workers' input, it must be a positive integer, got {batch_workers=!r}"
+        )
+    return int(batch_workers)
+
+
+def _configure_deadline() -> None:
+    """Start the time budget of the run from the inputs.
+
+    Raises:
+        InputError: If the input is not empty or a positive integer.
+    """
+    time_budget = os.getenv(TIME_BUDGET_ENV_NAME, "")
+    if time_budget and (not time_budget.isdigit() or int(time_budget) < 1):
+        raise exceptions.InputError(
+            f"Invalid 'time_budget' input, it must be a positive integer, got {time_budget=!r}"
+        )
+    deadline.configure(budget=int(time_budget) if time_budget else None)
+
+
+def _configure_logs() -> None:
+    """Set the amount of detail logged for the actions from the inputs.
+
+    Raises:
+        InputError: If the log mode is not one of the modes.
+    """
+    log_mode = os.getenv(LOG_MODE_ENV_NAME) or logs.LogMode.FULL.value
+    modes = [mode.value for mode in logs.LogMode]
+    if log_mode not in modes:
+        raise exceptions.InputError(
+            f"Invalid 'log_mode' input, it must be one of {modes}, got {log_mode=!r}"
+        )
+    logs.configure(
+        mode=logs.LogMode(log_mode),
+        payload_file=(
+            Path(payload_file).resolve()
+            if (payload_file := os.getenv(LOG_PAYLOAD_FILE_ENV_NAME))
+            else None
+        ),
+    )
+
+
+def _cassette(user_inputs: types_.UserInputs) -> contextlib.AbstractContextManager[None]:
+    """Get the recording or the replay of the requests of the run from the inputs.
+
+    Args:
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+
+    Raises:
+        InputError: If both a recording and a replay are requested or the latency scale is not a
+            number that is zero or more.
+
+    Returns:
+        The context to run in.
+    """
+    # Resolved before the phases change the working directory
+    record_file = _resolve_path_input(RECORD_FILE_ENV_NAME)
+    replay_file = _resolve_path_input(REPLAY_FILE_ENV_NAME)
+    if record_file and replay_file:
+        raise exceptions.InputError(
+            "Invalid 'record_file' and 'replay_file' inputs, at most one of them can be set, got "
+            f"{record_file=!r} and {replay_file=!r}"
+        )
+    replay_latency_scale = os.getenv(REPLAY_LATENCY_SCALE_ENV_NAME) or "1"
+    try:
+        latency_scale = float(replay_latency_scale)
+    except ValueError:
+        latency_scale = -1
+    if not latency_scale >= 0:
+        raise exceptions.InputError(
+            "Invalid 'replay_latency_scale' input, it must be a number that is zero or more, got "
+            f"{replay_latency_scale=!r}"
+        )
+
+    secrets = (user_inputs.discourse.api_key, user_inputs.github_access_token or "")
+    if record_file:
+        return cassette.record(path=Path(record_file), secrets=secrets)
+    if replay_file:
+        return cassette.replay(
+            path=Path(replay_file), latency_scale=latency_scale, secrets=secrets
+        )
+    return contextlib.nullcontext()
+
+
 def _parse_env_vars() -> types_.UserInputs:
     """Instantiate user inputs from environment variables.
 
@@ -53,6 +176,14 @@ def _parse_env_vars() -> types_.UserInputs:
     base_branch = os.getenv("INPUT_BASE_BRANCH", DEFAULT_BRANCH)
     commit_sha = os.getenv("INPUT_COMMIT_SHA")
     charm_dir = os.getenv("INPUT_CHARM_DIR", "")
+    # Resolved before the phases change the working directory
+    export_plan = _resolve_path_input("INPUT_EXPORT_PLAN")
+    apply_plan = _resolve_path_input("INPUT_APPLY_PLAN")
+    charm_dirs = tuple(
+        charm_dir
+        for line in os.getenv("INPUT_CHARM_DIRS", "").splitlines()
+        if (charm_dir := line.strip())
+    )
 
     event_path = os.getenv("GITHUB_EVENT_PATH")
     if not event_path:
@@ -88,6 +219,12 @@ def _parse_env_vars() -> types_.UserInputs:
         commit_sha=commit_sha,
         base_branch=base_branch,
         charm_dir=charm_dir,
+        export_plan=export_plan,
+        apply_plan=apply_plan,
+        charm_dirs=charm_dirs,
+        batch_workers=_parse_batch_workers(),
+        journal_file=_resolve_path_input("INPUT_JOURNAL_FILE"),
+        cache_dir=_resolve_path_input("INPUT_CACHE_DIR"),
     )
 
 
@@ -108,13 +245,18 @@ def _serialize_for_github(
 
 
 def _write_github_output(
-    migrate: types_.MigrateOutputs | None, reconcile: types_.ReconcileOutputs | None
+    migrate: types_.MigrateOutputs | None,
+    reconcile: types_.ReconcileOutputs | None,
+    run_metrics: dict[str, typing.Any],
+    charm_outputs: typing.Sequence[batch.CharmOutputs] = (),
 ) -> None:
     """Writes results produced by the action to github_output.
 
     Args:
         migrate: outputs of the migrate process
         reconcile: outputs of the reconcile process
+        run_metrics: counts and timings of the calls made during the run
+        charm_outputs: outputs of each charm when running a batch
 
     Raises:
         InputError: if not running inside a github actions environment.
@@ -128,9 +270,13 @@ def _write_github_output(
         )
 
     output_dict = (
-        {"index_url": reconcile.index_url, "topics": reconcile.topics} if reconcile else {}
-    ) | (
-        {"pr_action": migrate.action.value, "pr_link": migrate.pull_request_url} if migrate else {}
+        batch.to_outputs(reconcile=reconcile, migrate=migrate)
+        | (
+            {"charms": {outputs.charm_dir: outputs.to_outputs() for outputs in charm_outputs}}
+            if charm_outputs
+            else {}
+        )
+        | {"metrics": run_metrics}
     )
 
     output: str = "\n".join(
@@ -184,33 +330,47 @@ def execute_in_tmpdir(func: typing.Callable[..., T]) -> typing.Callable[..., T]:
 
 
 @execute_in_tmpdir
-def main_migrate(path: Path, user_inputs: types_.UserInputs) -> types_.MigrateOutputs | None:
+def main_migrate(
+    path: Path,
+    user_inputs: types_.UserInputs,
+    snapshot: ServerSnapshot | None = None,
+    reconcile_outputs: types_.ReconcileOutputs | None = None,
+) -> types_.MigrateOutputs | None:
     """Main to migrate content from Discourse to Git repository.
 
     Args:
         path: path of the git repository
         user_inputs: Configurable inputs for running discourse-gatekeeper.
+        snapshot: The content of the topics read by the reconcile to read instead of the server.
+        reconcile_outputs: The outputs of the reconcile that ran before, if any.
 
     Returns:
         dictionary representing the output of the process
     """
-    clients = get_clients(user_inputs, path)
-    return run_migrate(clients=clients, user_inputs=user_inputs)
+    with open_clients(user_inputs=user_inputs, base_path=path) as clients:
+        clients.discourse.snapshot = snapshot
+        return run_migrate(
+            clients=clients, user_inputs=user_inputs, reconcile_outputs=reconcile_outputs
+        )
 
 
 @execute_in_tmpdir
-def main_reconcile(path: Path, user_inputs: types_.UserInputs) -> types_.ReconcileOutputs | None:
+def main_reconcile(
+    path: Path, user_inputs: types_.UserInputs, snapshot: ServerSnapshot | None = None
+) -> types_.ReconcileOutputs | None:
     """Main to reconcile content from Git repository to Discourse.
 
     Args:
         path: path of the git repository
         user_inputs: Configurable inputs for running discourse-gatekeeper.
+        snapshot: Records the content of the topics read from the server, if given.
 
     Returns:
         dictionary representing the output of the process
     """
-    clients = get_clients(user_inputs, path)
-    return run_reconcile(clients=clients, user_inputs=user_inputs)
+    with open_clients(user_inputs=user_inputs, base_path=path) as clients:
+        clients.discourse.snapshot = snapshot
+        return run_reconcile(clients=clients, user_inputs=user_inputs)
 
 
 @execute_in_tmpdir
@@ -228,36 +388,110 @@ def main_checks(path: Path, user_inputs: types_.UserInputs) -> bool:
     Returns:
         dictionary representing the output of the process
     """
-    clients = get_clients(user_inputs, path)
-    logging.info(
-        "Repository at %s (%s)",
-        clients.repository.current_branch,
-        clients.repository.current_commit,
-    )
-    return pre_flight_checks(clients=clients, user_inputs=user_inputs)
+    with open_clients(user_inputs=user_inputs, base_path=path) as clients:
+        logging.info(
+            "Repository at %s (%s)",
+            clients.repository.current_branch,
+            clients.repository.current_commit,
+        )
+        return pre_flight_checks(clients=clients, user_inputs=user_inputs)
+
+
+@execute_in_tmpdir
+def main_batch(path: Path, user_inputs: types_.UserInputs) -> tuple[batch.CharmOutputs, ...]:
+    """Main to check, reconcile and migrate the charms of a batch using one copy of the repository.
+
+    Args:
+        path: path of the git repository
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+
+    Returns:
+        the outputs of each charm
+    """
+    with open_clients(user_inputs=user_inputs, base_path=path) as clients:
+        return batch.run(clients=clients, user_inputs=user_inputs)
+
+
+def _run(
+    user_inputs: types_.UserInputs, profile_dir: Path | None
+) -> tuple[
+    tuple[batch.CharmOutputs, ...], types_.ReconcileOutputs | None, types_.MigrateOutputs | None
+]:
+    """Run the phases of the action.
+
+    Args:
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+        profile_dir: The directory to write the profiles of the phases to, if any.
+
+    Returns:
+        The outputs of each charm of a batch, the reconcile and the migration.
+    """
+    if user_inputs.charm_dirs:
+        with profiling.profile(name="batch", output_dir=profile_dir):
+            charm_outputs = main_batch(  # pylint: disable=no-value-for-parameter
+                user_inputs=user_inputs
+            )
+        return charm_outputs, None, None
+
+    with profiling.profile(name="checks", output_dir=profile_dir):
+        assert main_checks(user_inputs=user_inputs)  # pylint: disable=no-value-for-parameter
+
+    # Push data to Discourse, avoiding community conflicts
+    snapshot = ServerSnapshot()
+    with profiling.profile(name="reconcile", output_dir=profile_dir):
+        reconcile_urls_with_actions = main_reconcile(  # pylint: disable=no-value-for-parameter
+            user_inputs=user_inputs, snapshot=snapshot
+        )
+
+    # Open a PR with community contributions if necessary, reusing the topics read above
+    snapshot.freeze()
+    with profiling.profile(name="migrate", output_dir=profile_dir):
+        migrate_urls_with_actions = main_migrate(  # pylint: disable=no-value-for-parameter
+            user_inputs=user_inputs,
+            snapshot=snapshot,
+            reconcile_outputs=reconcile_urls_with_actions,
+        )
+    return (), reconcile_urls_with_actions, migrate_urls_with_actions
 
 
 def main() -> None:
-    """Execute the action."""
+    """Execute the action.
+
+    Raises:
+        BatchError: if processing one or more of the charms of a batch failed.
+    """
     logging.basicConfig(level=logging.INFO)
 
     # Read input
+    _configure_deadline()
+    _configure_logs()
     user_inputs = _parse_env_vars()
-
-    assert main_checks(user_inputs=user_inputs)  # pylint: disable=no-value-for-parameter
-
-    # Push data to Discourse, avoiding community conflicts
-    reconcile_urls_with_actions = main_reconcile(  # pylint: disable=no-value-for-parameter
-        user_inputs=user_inputs
+    # Resolved before the phases change the working directory
+    profile_dir = (
+        Path(profile_dir_input).resolve()
+        if (profile_dir_input := os.getenv(PROFILE_DIR_ENV_NAME))
+        else None
     )
 
-    # Open a PR with community contributions if necessary
-    migrate_urls_with_actions = main_migrate(  # pylint: disable=no-value-for-parameter
-        user_inputs=user_inputs
-    )
+    # The requests to Discourse and GitHub are recorded or replayed, if requested
+    with _cassette(user_inputs):
+        charm_outputs, reconcile_urls_with_actions, migrate_urls_with_actions = _run(
+            user_inputs=user_inputs, profile_dir=profile_dir
+        )
 
     # Write output
-    _write_github_output(migrate=migrate_urls_with_actions, reconcile=reconcile_urls_with_actions)
+    run_metrics = metrics.get_collector().snapshot()
+    if metrics_file := os.getenv(METRICS_FILE_ENV_NAME):
+        pathlib.Path(metrics_file).write_text(json.dumps(run_metrics, indent=2), encoding="utf-8")
+    _write_github_output(
+        migrate=migrate_urls_with_actions,
+        reconcile=reconcile_urls_with_actions,
+        run_metrics=run_metrics,
+        charm_outputs=charm_outputs,
+    )
+
+    if failed := [outputs.charm_dir for outputs in charm_outputs if outputs.error]:
+        raise exceptions.BatchError(f"Processing failed for the charms {failed}, see the outputs")
 
 
 if __name__ == "__main__":
@@ -2,25 +2,31 @@
 # See LICENSE file for licensing details.
 
 """Library for uploading docs to charmhub."""
+
 import logging
-from collections.abc import Iterable, Iterator
-from itertools import tee
+from collections.abc import Sequence
+from pathlib import Path
 
-from gatekeeper import action, check, docs_directory
+from gatekeeper import action, check, deadline, docs_directory
 from gatekeeper import index as index_module
-from gatekeeper import navigation_table, reconcile
+from gatekeeper import interning, metrics, navigation_table
+from gatekeeper import plan as plan_module
+from gatekeeper import reconcile
 from gatekeeper import sort as sort_module
 from gatekeeper.action import DRY_RUN_NAVLINK_LINK, FAIL_NAVLINK_LINK
 from gatekeeper.clients import Clients
 from gatekeeper.constants import DOCUMENTATION_TAG
 from gatekeeper.download import recreate_docs
-from gatekeeper.exceptions import InputError, TaggingNotAllowedError
-from gatekeeper.repository import DEFAULT_BRANCH_NAME
+from gatekeeper.exceptions import DiscourseError, InputError, TaggingNotAllowedError
+from gatekeeper.journal import Journal
+from gatekeeper.sync import SyncState
 from gatekeeper.types_ import (
     ActionResult,
     AnyAction,
     Index,
+    IndexContentsListItem,
     MigrateOutputs,
+    PathInfo,
     PullRequestAction,
     ReconcileOutputs,
     TableRow,
@@ -34,18 +40,18 @@ GETTING_STARTED = (
 )
 
 
-def _get_reconcile_actions(
-    index: Index, table_rows: Iterable[TableRow], clients: Clients
-) -> Iterator[AnyAction]:
-    """Get the actions to be executed for reconciliation.
+def _get_sorted_item_infos(
+    index: Index, clients: Clients, plan: plan_module.Plan | None = None
+) -> tuple[PathInfo | IndexContentsListItem, ...]:
+    """Get the local documentation files, directories and external references in table order.
 
     Args:
         index: Information about the index of the documentation.
-        table_rows: The rows of the navigation table.
         clients: The clients to interact with things like discourse and the repository.
+        plan: The plan to apply, the contents index items on it are not checked again.
 
     Returns:
-        The reconcile actions to execute.
+        The local items sorted by the contents index.
 
     Raises:
         InputError: if there are any problems with the contents index.
@@ -54,23 +60,142 @@ def _get_reconcile_actions(
     path_infos = docs_directory.read(docs_path=docs_path)
 
     index_contents = index_module.get_contents(index_file=index.local, docs_path=docs_path)
-    index_contents, check_index_contents = tee(index_contents, 2)
-    problems = tuple(check.external_refs(index_contents=check_index_contents))
+    problems = tuple(
+        check.external_refs(
+            index_contents=(
+                index_contents
+                if plan is None
+                else plan_module.unchecked_items(plan=plan, index_contents=index_contents)
+            )
+        )
+    )
     if problems:
         raise InputError(
             "One or more of the contents index entries are not valid, see the log for details"
         )
 
-    sorted_path_infos = sort_module.using_contents_index(
-        path_infos=path_infos, index_contents=index_contents, docs_path=docs_path
+    return tuple(
+        sort_module.using_contents_index(
+            path_infos=path_infos, index_contents=index_contents, docs_path=docs_path
+        )
     )
-    return reconcile.run(
-        sorted_path_infos=sorted_path_infos,
-        table_rows=table_rows,
-        clients=clients,
-        base_path=clients.repository.base_path,
+
+
+def _get_reconcile_actions(
+    index: Index, table_rows: Sequence[TableRow], clients: Clients, user_inputs: UserInputs
+) -> tuple[AnyAction, ...]:
+    """Get the actions to be executed for reconciliation.
+
+    Reuses the entries of the plan to apply that are still valid and writes the actions to the
+    plan to export, if requested.
+
+    Args:
+        index: Information about the index of the documentation.
+        table_rows: The rows of the navigation table.
+        clients: The clients to interact with things like discourse and the repository.
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+
+    Returns:
+        The reconcile actions to execute.
+    """
+    plan_to_apply = (
+        plan_module.load(
+            path=Path(user_inputs.apply_plan), clients=clients, commit_sha=user_inputs.commit_sha
+        )
+        if user_inputs.apply_plan
+        else None
+    )
+    sorted_item_infos = _get_sorted_item_infos(index=index, clients=clients, plan=plan_to_apply)
+
+    planned = (
+        plan_module.fresh_actions(
+            plan=plan_to_apply,
+            sorted_item_infos=sorted_item_infos,
+            table_rows=table_rows,
+            index=index,
+            clients=clients,
+        )
+        if plan_to_apply is not None
+        else None
+    )
+    actions = tuple(
+        reconcile.run(
+            sorted_path_infos=sorted_item_infos,
+            table_rows=table_rows,
+            clients=clients,
+            base_path=clients.repository.base_path,
+            planned=planned,
+        )
     )
 
+    if user_inputs.export_plan:
+        plan = plan_module.create(
+            sorted_item_infos=sorted_item_infos,
+            table_rows=table_rows,
+            actions=actions,
+            index=index,
+            clients=clients,
+            commit_sha=user_inputs.commit_sha,
+        )
+        plan_module.write(plan=plan, path=Path(user_inputs.export_plan))
+        logging.info(
+            "Plan with %s entries written to %s", len(plan.entries), user_inputs.export_plan
+        )
+
+    return actions
+
+
+def _use_sync_state(clients: Clients) -> None:
+    """Read the pages that have not changed since the documentation tag was moved from git.
+
+    Args:
+        clients: The clients to interact with things like discourse and the repository.
+    """
+    state = SyncState.from_message(clients.repository.tag_message(DOCUMENTATION_TAG))
+    if state is None or clients.discourse.sync.is_using(state):
+        return
+    try:
+        bumped = clients.discourse.bumped_topics(since=state.synced_at)
+    except DiscourseError as exc:
+        logging.warning(
+            "Reading all the pages from the server, listing the category failed: %s", exc
+        )
+        return
+    if bumped is None:
+        logging.info(
+            "Reading all the pages from the server, too many topics were bumped since %s",
+            state.synced_at,
+        )
+        return
+    clients.discourse.sync.use(state=state, bumped=bumped, base_path=clients.repository.base_path)
+
+
+def _start_sync(clients: Clients) -> None:
+    """Record the most recent bump of the category before the server is read.
+
+    Args:
+        clients: The clients to interact with things like discourse and the repository.
+    """
+    try:
+        synced_at = clients.discourse.latest_bump()
+    except DiscourseError as exc:
+        logging.warning("Not recording the sync state, listing the category failed: %s", exc)
+        synced_at = None
+    clients.discourse.sync.start(synced_at)
+
+
+def sync_message(clients: Clients) -> str | None:
+    """Get the annotation of the documentation tag once the server matches the repository.
+
+    Args:
+        clients: The clients to interact with things like discourse and the repository.
+
+    Returns:
+        The message recording the sync state, None if the server might not match.
+    """
+    state = clients.discourse.sync.state(base_path=clients.repository.base_path)
+    return None if state is None else state.to_message()
+
 
 def run_reconcile(clients: Clients, user_inputs: UserInputs) -> ReconcileOutputs | None:
     """Upload the documentation to charmhub.
@@ -103,31 +228,79 @@ def run_reconcile(clients: Clients, user_inputs: UserInputs) -> ReconcileOutputs
         )
         return None
 
-    index = index_module.get(
-        metadata=clients.repository.metadata,
-        docs_path=clients.repository.docs_path,
-        server_client=clients.discourse,
-    )
-    server_content = (
-        index.server.content if index.server is not None and index.server.content else ""
+    deadline.check("the reconcile")
+    if not user_inputs.dry_run:
+        _start_sync(clients)
+    _use_sync_state(clients)
+    # The actions keep the content they reference, the interner is only needed while they are
+    # computed
+    with interning.scope() as content_interner:
+        with metrics.timed(metrics.PHASE, metrics.PHASE_INDEX_FETCH):
+            index = index_module.get(
+                metadata=clients.repository.metadata,
+                docs_path=clients.repository.docs_path,
+                server_client=clients.discourse,
+            )
+        server_content = (
+            index.server.content if index.server is not None and index.server.content else ""
+        )
+        # The rows and actions are materialized so that the phases can be timed separately, they
+        # would otherwise be buffered by the consumers below
+        with metrics.timed(metrics.PHASE, metrics.PHASE_TABLE_PARSE):
+            table_rows = tuple(
+                navigation_table.from_page(page=server_content, discourse=clients.discourse)
+            )
+        journal = (
+            Journal(
+                path=Path(user_inputs.journal_file),
+                name=index.name,
+                discourse_host=clients.discourse.host,
+                base=clients.repository.tag_exists(DOCUMENTATION_TAG),
+            )
+            if user_inputs.journal_file and not user_inputs.dry_run
+            else None
+        )
+        # The pages deleted by an earlier run that stopped are still on the index
+        deleted_rows = (
+            tuple(
+                row
+                for row in table_rows
+                if row.navlink.link is not None and journal.is_deleted(row.navlink.link)
+            )
+            if journal is not None
+            else ()
+        )
+        if deleted_rows:
+            logging.info("%s pages were deleted by an earlier run", len(deleted_rows))
+            table_rows = tuple(row for row in table_rows if row not in deleted_rows)
+        with metrics.timed(metrics.PHASE, metrics.PHASE_RECONCILE):
+            actions = _get_reconcile_actions(
+                index=index, table_rows=table_rows, clients=clients, user_inputs=user_inputs
+            )
+    content_stats = content_interner.stats()
+    logging.info(
+        "Page content: %s unique of %s read, %s characters",
+        content_stats.unique,
+        content_stats.interned,
+        content_stats.size,
     )
-    table_rows = navigation_table.from_page(page=server_content, discourse=clients.discourse)
-    table_rows, action_table_rows = tee(table_rows, 2)
-    actions = _get_reconcile_actions(index=index, table_rows=action_table_rows, clients=clients)
-
-    # tee creates a copy of the iterator which is needed as check.conflicts consumes the iterator
-    # it is passed
-    actions, check_actions = tee(actions, 2)
-    if reconcile.is_same_content(index, check_actions):
+
+    # The index is updated to remove the pages deleted by an earlier run
+    if not deleted_rows and reconcile.is_same_content(index, actions):
         logging.info(
             "Reconcile not required to run as the content is the same on Discourse and Github."
         )
-        if clients.repository.is_commit_in_branch(user_inputs.commit_sha, user_inputs.base_branch):
+        tagged = clients.repository.is_commit_in_branch(
+            user_inputs.commit_sha, user_inputs.base_branch
+        )
+        if tagged:
             # This means we are running from the base_branch
             logging.info(
                 "Updating the tag %s on commit %s", DOCUMENTATION_TAG, user_inputs.commit_sha
             )
-            clients.repository.tag_commit(DOCUMENTATION_TAG, user_inputs.commit_sha)
+            clients.repository.tag_commit(
+                DOCUMENTATION_TAG, user_inputs.commit_sha, message=sync_message(clients)
+            )
 
         return ReconcileOutputs(
             index_url=index.server.url if index.server else "",
@@ -144,22 +317,28 @@ def run_reconcile(clients: Clients, user_inputs: UserInputs) -> ReconcileOutputs
                 else {}
             ),
             documentation_tag=clients.repository.tag_exists(DOCUMENTATION_TAG),
+            in_sync=tagged,
         )
 
-    actions, check_actions = tee(actions, 2)
-    problems = tuple(check.conflicts(actions=check_actions))
+    with metrics.timed(metrics.PHASE, metrics.PHASE_CONFLICTS):
+        problems = tuple(check.conflicts(actions=actions))
     if problems:
         raise InputError(
             "One or more of the required actions could not be executed, see the log for details"
         )
 
-    index_url, reports = action.run_all(
-        actions=actions,
-        index=index,
-        discourse=clients.discourse,
-        dry_run=user_inputs.dry_run,
-        delete_pages=user_inputs.delete_pages,
-    )
+    deadline.check("applying the changes of the reconcile")
+    with metrics.timed(metrics.PHASE, metrics.PHASE_APPLY):
+        index_url, reports = action.run_all(
+            actions=actions,
+            index=index,
+            discourse=clients.discourse,
+            dry_run=user_inputs.dry_run,
+            delete_pages=user_inputs.delete_pages,
+            journal=journal,
+        )
+    if any(report.result is ActionResult.FAIL for report in reports):
+        clients.discourse.sync.fail()
     urls_with_actions: dict[Url, ActionResult] = {
         str(report.location): report.result
         for report in reports
@@ -178,22 +357,38 @@ def run_reconcile(clients: Clients, user_inputs: UserInputs) -> ReconcileOutputs
             )
 
         clients.repository.tag_commit(
-            tag_name=DOCUMENTATION_TAG, commit_sha=user_inputs.commit_sha
+            tag_name=DOCUMENTATION_TAG,
+            commit_sha=user_inputs.commit_sha,
+            message=sync_message(clients),
         )
 
     return ReconcileOutputs(
         index_url=index_url,
         topics=urls_with_actions,
         documentation_tag=clients.repository.tag_exists(DOCUMENTATION_TAG),
+        # Nothing was skipped or failed and no change made on the server was merged, the server
+        # has the content of the commit the tag was moved to
+        in_sync=not user_inputs.dry_run
+        and all(report.result is ActionResult.SUCCESS for report in reports)
+        and reconcile.posts_local_content(actions),
     )
 
 
-def run_migrate(clients: Clients, user_inputs: UserInputs) -> MigrateOutputs | None:
+@metrics.timed(metrics.PHASE, metrics.PHASE_MIGRATE)
+def run_migrate(
+    clients: Clients,
+    user_inputs: UserInputs,
+    reconcile_outputs: ReconcileOutputs | None = None,
+) -> MigrateOutputs | None:
     """Migrate existing docs from charmhub to local repository.
 
+    The docs are not downloaded if the reconcile left the content on Discourse matching the
+    documentation tag, only a pull request that is still open is closed.
+
     Args:
         clients: The clients to interact with things like discourse and the repository.
         user_inputs: Configurable inputs for running discourse-gatekeeper.
+        reconcile_outputs: The outputs of the reconcile that ran before, if any.
 
     Returns:
         MigrateOutputs providing details on the action performed and a link to the
@@ -206,26 +401,35 @@ def run_migrate(clients: Clients, user_inputs: UserInputs) -> MigrateOutputs | N
         )
         return None
 
+    deadline.check("the migration")
     logging.info("Tag exists: %s", str(clients.repository.tag_exists(DOCUMENTATION_TAG)))
 
     if not clients.repository.tag_exists(DOCUMENTATION_TAG):
-        with clients.repository.with_branch(user_inputs.base_branch) as repo:
-            main_hash = repo.current_commit
-        clients.repository.tag_commit(DOCUMENTATION_TAG, main_hash)
+        clients.repository.tag_commit(
+            DOCUMENTATION_TAG, clients.repository.resolve_commit(user_inputs.base_branch)
+        )
 
-    pull_request = clients.repository.get_pull_request(DEFAULT_BRANCH_NAME)
+    pull_request = clients.repository.get_pull_request(clients.repository.migrate_branch)
 
-    # Check difference with main
-    changes = recreate_docs(clients, DOCUMENTATION_TAG)
-    # Check whether there are still changes after switching to the base branch
+    if reconcile_outputs is not None and reconcile_outputs.in_sync:
+        logging.info(
+            "Not downloading the docs, the reconcile left discourse inline with %s",
+            DOCUMENTATION_TAG,
+        )
+        changes = False
+    else:
+        _use_sync_state(clients)
+        # Check difference with main
+        changes = recreate_docs(clients, DOCUMENTATION_TAG)
+    # Check whether there are still changes when applied to the base branch
     if changes:
-        changes = clients.repository.is_dirty(user_inputs.base_branch)
+        changes = clients.repository.has_docs_changes(user_inputs.base_branch)
 
         # Move the tag if there are no changes
         if not changes:
-            with clients.repository.with_branch(user_inputs.base_branch) as repo:
-                main_hash = repo.current_commit
-            clients.repository.tag_commit(DOCUMENTATION_TAG, main_hash)
+            clients.repository.tag_commit(
+                DOCUMENTATION_TAG, clients.repository.resolve_commit(user_inputs.base_branch)
+            )
 
     if not changes:
         logging.info(
@@ -233,7 +437,8 @@ def run_migrate(clients: Clients, user_inputs: UserInputs) -> MigrateOutputs | N
         )
         # Given there are NO diffs compared to the base, if a PR is open, it should be closed
         if pull_request is not None:
-            pull_request.edit(state="closed")
+            with metrics.timed(metrics.GITHUB, "edit_pull"):
+                pull_request.edit(state="closed")
             return MigrateOutputs(
                 action=PullRequestAction.CLOSED, pull_request_url=pull_request.html_url
             )
@@ -247,11 +452,12 @@ def run_migrate(clients: Clients, user_inputs: UserInputs) -> MigrateOutputs | N
         )
 
     logging.info("discourse-gatekeeper pull request already open at %s", pull_request.html_url)
-    clients.repository.update_pull_request(DEFAULT_BRANCH_NAME)
+    clients.repository.update_pull_request(clients.repository.migrate_branch)
 
     return MigrateOutputs(action=PullRequestAction.UPDATED, pull_request_url=pull_request.html_url)
 
 
+@metrics.timed(metrics.PHASE, metrics.PHASE_CHECKS)
 def pre_flight_checks(clients: Clients, user_inputs: UserInputs) -> bool:
     """Perform checks to make sure the repository is in a consistent state.
 
@@ -262,6 +468,7 @@ def pre_flight_checks(clients: Clients, user_inputs: UserInputs) -> bool:
     Returns:
         Boolean representing whether the checks have all been passed.
     """
+    deadline.check("the checks")
     clients.repository.switch(user_inputs.base_branch)
 
     documentation_commit = clients.repository.tag_exists(DOCUMENTATION_TAG)
@@ -7,8 +7,9 @@ import logging
 import typing
 from enum import Enum
 
-from gatekeeper import content, exceptions, reconcile, types_
+from gatekeeper import content, deadline, exceptions, logs, reconcile, types_
 from gatekeeper.discourse import Discourse
+from gatekeeper.journal import Journal
 
 DRY_RUN_NAVLINK_LINK = "<not created due to dry run>"
 DRY_RUN_REASON = "dry run"
@@ -56,7 +57,7 @@ def _log_content_change(base: str, new: str) -> None:
     old = f"{base}\n" if not base.endswith("\n") else base
     new = f"{new}\n" if not new.endswith("\n") else new
     if new != old:
-        logging.info("content change:\n%s", content.diff(old, new))
+        logs.content_change(old, new)
 
 
 def _create(
@@ -76,7 +77,7 @@ def _create(
     Raises:
         NotImplementedError: if a requested action has not been implemented yet.
     """
-    logging.info("dry run: %s, action: %s", dry_run, action)
+    logging.info("dry run: %s, action: %s", dry_run, logs.payload(action))
 
     # Handle the directory/ group case, no server interactions are required
     if isinstance(action, types_.CreateGroupAction):
@@ -126,7 +127,7 @@ def _noop(action: types_.NoopAction, discourse: Discourse) -> types_.ActionRepor
     Returns:
         A report on the outcome of executing the action.
     """
-    logging.info("action: %s", action)
+    logging.info("action: %s", logs.payload(action))
 
     table_row = types_.TableRow(level=action.level, path=action.path, navlink=action.navlink)
     return types_.ActionReport(
@@ -182,6 +183,21 @@ def _get_update_case(action: types_.UpdateAction, dry_run: bool) -> UpdateCase:
     return UpdateCase.DEFAULT
 
 
+def _changed_since_check_message(url: str) -> str:
+    """Describe a page that was edited on the server after the conflict check.
+
+    Args:
+        url: The link to the page.
+
+    Returns:
+        The message for the error.
+    """
+    return (
+        f"The content being updated at {url} has changed since the conflict check was done. "
+        "Please resolve any conflicts and re-run the action."
+    )
+
+
 def _update(
     action: types_.UpdateAction, discourse: Discourse, dry_run: bool
 ) -> types_.ActionReport:
@@ -199,7 +215,7 @@ def _update(
     Returns:
         A report on the outcome of executing the action.
     """
-    logging.info("dry run: %s, action: %s", dry_run, action)
+    logging.info("dry run: %s, action: %s", dry_run, logs.payload(action))
     if isinstance(action, types_.UpdatePageAction):
         _log_content_change(
             base=action.content_change.base or action.content_change.server,
@@ -219,13 +235,12 @@ def _update(
                 topic_url = typing.cast(str, action.navlink_change.new.link)
                 content_change = typing.cast(types_.ContentChange, action.content_change)
 
-                # Check that content has not changed since the conflict check was performed
-                current_server_content = discourse.retrieve_topic(url=topic_url)
-                if current_server_content != content_change.server:
-                    raise exceptions.ActionError(
-                        f"The content being updated at {topic_url} has changed since the conflict "
-                        "check was done. Please resolve any conflicts and re-run the action."
-                    )
+                # Check that content has not changed since the conflict check was performed, if
+                # the revision is known the update checks it instead of retrieving the content
+                if action.server_revision is None:
+                    current_server_content = discourse.retrieve_topic(url=topic_url)
+                    if current_server_content != content_change.server:
+                        raise exceptions.ActionError(_changed_since_check_message(topic_url))
 
                 # Apply the change
                 merged_content = content.merge(
@@ -233,9 +248,15 @@ def _update(
                     theirs=content_change.server,
                     ours=content_change.local,
                 )
-                discourse.update_topic(url=topic_url, content=merged_content)
+                discourse.update_topic(
+                    url=topic_url,
+                    content=merged_content,
+                    expected_revision=action.server_revision,
+                )
                 result = types_.ActionResult.SUCCESS
                 reason = None
+            except exceptions.DiscourseTopicChangedError as exc:
+                raise exceptions.ActionError(_changed_since_check_message(topic_url)) from exc
             except (exceptions.DiscourseError, exceptions.ContentError) as exc:
                 result = types_.ActionResult.FAIL
                 reason = str(exc)
@@ -270,7 +291,9 @@ def _delete(
     Raises:
         ActionError: If the link for a page to delete is None.
     """
-    logging.info("dry run: %s, delete pages: %s, action: %s", dry_run, delete_pages, action)
+    logging.info(
+        "dry run: %s, delete pages: %s, action: %s", dry_run, delete_pages, logs.payload(action)
+    )
 
     # Handle group and external references
     if isinstance(action, (types_.DeleteGroupAction, types_.DeleteExternalRefAction)):
@@ -374,7 +397,7 @@ def _run_index(
     Raises:
         ActionError: if an action that is not handled is passed to the function.
     """
-    logging.info("dry run: %s, action: %s", dry_run, action)
+    logging.info("dry run: %s, action: %s", dry_run, logs.payload(action))
 
     if dry_run:
         report = types_.ActionReport(
@@ -441,12 +464,48 @@ def _run_index(
     return report
 
 
-def run_all(
+def _run_journaled(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    action: types_.AnyAction,
+    discourse: Discourse,
+    name: str,
+    dry_run: bool,
+    delete_pages: bool,
+    journal: Journal | None,
+) -> types_.ActionReport:
+    """Take an action unless an earlier run completed it and record it in the journal.
+
+    Args:
+        action: The details of the action to take.
+        discourse: A client to the documentation server.
+        name: The charm name to prefix to the created pages title.
+        dry_run: If enabled, only log the action that would be taken.
+        delete_pages: Whether to delete pages that are no longer needed.
+        journal: The completed actions, if any.
+
+    Returns:
+        A report on the outcome of executing the action.
+    """
+    if journal is not None and (report := journal.completed(action)) is not None:
+        logging.info("completed by an earlier run, action: %s", logs.payload(action))
+        logging.info("report: %s", report)
+        return report
+    # The actions completed so far are journaled, a rerun continues from the next one
+    deadline.check("the remaining actions of the reconcile")
+    report = _run_one(
+        action=action, discourse=discourse, name=name, dry_run=dry_run, delete_pages=delete_pages
+    )
+    if journal is not None:
+        journal.record(action=action, report=report)
+    return report
+
+
+def run_all(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     actions: typing.Iterable[types_.AnyAction],
     index: types_.Index,
     discourse: Discourse,
     dry_run: bool,
     delete_pages: bool,
+    journal: Journal | None = None,
 ) -> tuple[str, list[types_.ActionReport]]:
     """Take the actions against the server.
 
@@ -456,17 +515,21 @@ def run_all(
         discourse: A client to the documentation server.
         dry_run: If enabled, only log the action that would be taken.
         delete_pages: Whether to delete pages that are no longer needed.
+        journal: The actions completed by an earlier run that stopped, these are not taken again.
+            The actions are recorded in it as they complete and it is cleared once the index is
+            updated.
 
     Returns:
         A 2-element tuple with the index url and the reports of all the requested action.
     """
     action_reports = [
-        _run_one(
+        _run_journaled(
             action=action,
             discourse=discourse,
             name=index.name,
             dry_run=dry_run,
             delete_pages=delete_pages,
+            journal=journal,
         )
         for action in actions
     ]
@@ -474,4 +537,6 @@ def run_all(
     index_action = reconcile.index_page(index=index, table_rows=table_rows, discourse=discourse)
     index_action_report = _run_index(action=index_action, discourse=discourse, dry_run=dry_run)
     action_reports.append(index_action_report)
+    if journal is not None and index_action_report.result == types_.ActionResult.SUCCESS:
+        journal.clear()
     return str(index_action_report.location), action_reports
@@ -0,0 +1,237 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Reconcile and migrate the documentation of several charms in one repository."""
+
+import logging
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from gatekeeper import pre_flight_checks, run_migrate, run_reconcile, sync_message
+from gatekeeper.clients import Clients
+from gatekeeper.constants import DOCUMENTATION_TAG
+from gatekeeper.exceptions import BaseError, TaggingNotAllowedError
+from gatekeeper.snapshot import ServerSnapshot
+from gatekeeper.types_ import MigrateOutputs, ReconcileOutputs, UserInputs
+
+
+class CharmOutputs(typing.NamedTuple):
+    """The outputs for one of the charms of a batch.
+
+    Attrs:
+        charm_dir: The directory of the charm.
+        reconcile: The outputs of the reconcile, None if there was no reconcile.
+        migrate: The outputs of the migration, None if there was no migration.
+        error: Description of the problem that stopped the processing of the charm, if any.
+    """
+
+    charm_dir: str
+    reconcile: ReconcileOutputs | None
+    migrate: MigrateOutputs | None
+    error: str | None
+
+    def to_outputs(self) -> dict[str, typing.Any]:
+        """Convert into the outputs of the action for the charm.
+
+        Returns:
+            The outputs of the reconcile and migration and the error, if any.
+        """
+        return to_outputs(reconcile=self.reconcile, migrate=self.migrate) | (
+            {"error": self.error} if self.error else {}
+        )
+
+
+def to_outputs(
+    reconcile: ReconcileOutputs | None, migrate: MigrateOutputs | None
+) -> dict[str, typing.Any]:
+    """Convert the outputs of a reconcile and migration into the outputs of the action.
+
+    Args:
+        reconcile: The outputs of the reconcile, if any.
+        migrate: The outputs of the migration, if any.
+
+    Returns:
+        The index_url and topics for the reconcile and the pr_action and pr_link for the
+        migration.
+    """
+    return (
+        {"index_url": reconcile.index_url, "topics": reconcile.topics} if reconcile else {}
+    ) | (
+        {"pr_action": migrate.action.value, "pr_link": migrate.pull_request_url} if migrate else {}
+    )
+
+
+def _get_charm_clients(clients: Clients, charm_dir: str) -> Clients:
+    """Get the clients for a charm that share the connections of the batch.
+
+    The charms are reconciled in separate threads, each gets its own Discourse client.
+
+    Args:
+        clients: The clients of the batch.
+        charm_dir: The directory of the charm.
+
+    Returns:
+        The clients for the charm.
+    """
+    return Clients(
+        discourse=clients.discourse.for_thread(),
+        repository=clients.repository.for_charm_dir(charm_dir),
+    )
+
+
+def _reconcile_all(
+    clients: Clients, user_inputs: UserInputs
+) -> dict[str, ReconcileOutputs | BaseError | None]:
+    """Reconcile the charms concurrently.
+
+    The tags requested by the reconciles are created once all of them succeeded so that every
+    charm is reconciled against the same base content.
+
+    Args:
+        clients: The clients of the batch.
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+
+    Returns:
+        The outputs or the error by charm directory.
+    """
+    results: dict[str, ReconcileOutputs | BaseError | None] = {}
+    with clients.repository.defer_tagging() as deferred_tags:
+        with ThreadPoolExecutor(max_workers=user_inputs.batch_workers) as executor:
+            futures = {
+                charm_dir: executor.submit(
+                    run_reconcile,
+                    clients=_get_charm_clients(clients=clients, charm_dir=charm_dir),
+                    user_inputs=user_inputs,
+                )
+                for charm_dir in user_inputs.charm_dirs
+            }
+        for charm_dir, future in futures.items():
+            try:
+                results[charm_dir] = future.result()
+            except BaseError as exc:
+                logging.error("reconcile of charm %s failed: %s", charm_dir, exc)
+                results[charm_dir] = exc
+
+    if any(isinstance(result, BaseError) for result in results.values()):
+        logging.warning("not tagging as the reconcile of one or more of the charms failed")
+        # The tag is not moved so the server does not match it
+        return {
+            charm_dir: (
+                result._replace(in_sync=False) if isinstance(result, ReconcileOutputs) else result
+            )
+            for charm_dir, result in results.items()
+        }
+
+    for tag_name, commit_sha in deferred_tags.items():
+        try:
+            clients.repository.tag_commit(
+                tag_name=tag_name,
+                commit_sha=commit_sha,
+                # The Discourse client is shared, the state covers the pages of all the charms
+                message=sync_message(clients) if tag_name == DOCUMENTATION_TAG else None,
+            )
+        except BaseError as exc:
+            logging.error("tagging after the reconcile of the charms failed: %s", exc)
+            return {charm_dir: exc for charm_dir in results}
+    return results
+
+
+def run(clients: Clients, user_inputs: UserInputs) -> tuple[CharmOutputs, ...]:
+    """Reconcile and migrate the documentation of each of the charms of the user inputs.
+
+    The checks run once for the repository. The reconciles run concurrently, sharing the
+    connections to Discourse and the repository, using up to the batch workers threads. The
+    migrations change the working tree and run one after the other, reading the topics the
+    reconciles read from a snapshot. A failure for a charm is reported in its outputs and does
+    not stop the other charms.
+
+    Args:
+        clients: The clients for the repository, the charm directory is ignored.
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+
+    Returns:
+        The outputs for each charm in the order of the charm directories.
+
+    Raises:
+        TaggingNotAllowedError: if the checks of the repository failed.
+    """
+    initial_branch = clients.repository.current_branch
+    # The checks switch to the base branch whereas the charms are reconciled from the commit
+    with clients.repository.with_branch(initial_branch):
+        if not pre_flight_checks(clients=clients, user_inputs=user_inputs):
+            raise TaggingNotAllowedError(
+                "The checks of the repository failed, see the log for details"
+            )
+
+    # The migrations reuse the content of the topics read by the reconciles
+    clients.discourse.snapshot = (snapshot := ServerSnapshot())
+    try:
+        reconcile_results = _reconcile_all(clients=clients, user_inputs=user_inputs)
+        snapshot.freeze()
+        return _migrate_all(
+            clients=clients,
+            user_inputs=user_inputs,
+            reconcile_results=reconcile_results,
+            initial_branch=initial_branch,
+        )
+    finally:
+        # The client outlives the run, e.g. it is reused by the next run of a fleet
+        clients.discourse.snapshot = None
+
+
+def _migrate_all(
+    clients: Clients,
+    user_inputs: UserInputs,
+    reconcile_results: dict[str, ReconcileOutputs | BaseError | None],
+    initial_branch: str,
+) -> tuple[CharmOutputs, ...]:
+    """Migrate the documentation of each of the charms, one after the other.
+
+    Args:
+        clients: The clients for the repository, the charm directory is ignored.
+        user_inputs: Configurable inputs for running discourse-gatekeeper.
+        reconcile_results: The outputs or the error of the reconcile of each charm directory.
+        initial_branch: The branch to start the migration of each charm from.
+
+    Returns:
+        The outputs for each charm in the order of the reconcile results.
+    """
+    charm_outputs = []
+    for charm_dir, reconcile_result in reconcile_results.items():
+        if isinstance(reconcile_result, BaseError):
+            charm_outputs.append(
+                CharmOutputs(
+                    charm_dir=charm_dir, reconcile=None, migrate=None, error=str(reconcile_result)
+                )
+            )
+            continue
+
+        try:
+            migrate_outputs = run_migrate(
+                clients=_get_charm_clients(clients=clients, charm_dir=charm_dir),
+                user_inputs=user_inputs,
+                reconcile_outputs=reconcile_result,
+            )
+        except BaseError as exc:
+            logging.error("migration of charm %s failed: %s", charm_dir, exc)
+            charm_outputs.append(
+                CharmOutputs(
+                    charm_dir=charm_dir, reconcile=reconcile_result, migrate=None, error=str(exc)
+                )
+            )
+            continue
+        finally:
+            # Start the migration of the next charm from the commit being processed
+            clients.repository.discard_changes()
+            clients.repository.switch(initial_branch)
+
+        charm_outputs.append(
+            CharmOutputs(
+                charm_dir=charm_dir,
+                reconcile=reconcile_result,
+                migrate=migrate_outputs,
+                error=None,
+            )
+        )
+
+    return tuple(charm_outputs)
@@ -0,0 +1,488 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Opt-in recording of the requests of a run to Discourse and GitHub and their replay.
+
+The Discourse client, pydiscourse and PyGithub all send their requests through the transport
+adapter of requests, the recording and the replay take its place for the duration of the run. The
+git commands are not recorded, while replaying they still fetch from the remote repository whereas
+pushing to it fails so that a replay does not change the repository.
+"""
+
+# requests is imported where it is used since it is only needed when recording or replaying
+# pylint: disable=import-outside-toplevel
+
+import io
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from urllib import parse
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+CASSETTE_VERSION = 1
+REDACTED = "REDACTED"
+
+# The headers and query parameters that carry credentials, compared in lower case
+_SECRET_HEADERS = frozenset(
+    ("api-key", "authorization", "cookie", "proxy-authorization", "set-cookie")
+)
+_SECRET_QUERY_PARAMETERS = frozenset(("access_token", "api_key", "token"))
+# The response body is stored decoded, the headers describing how it was transferred do not apply
+_TRANSFER_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding"))
+
+# The remote git pushes to while replaying, it cannot exist since the null device is not a directory
+BLOCKED_PUSH_URL = f"{os.devnull}/replay-does-not-push"
+
+_Send = Callable[..., "requests.Response"]
+_Key = tuple[str, str, str | None]
+
+
+class Interaction(typing.NamedTuple):
+    """A request sent during a run and its outcome.
+
+    The bodies are decoded as UTF-8 with surrogate escapes so that any bytes are kept.
+
+    Attrs:
+        started: The seconds since the recording started when the request was sent.
+        elapsed: The seconds until the response was read or the request failed.
+        method: The HTTP method of the request.
+        url: The URL of the request.
+        request_headers: The headers of the request.
+        request_body: The body of the request, if any.
+        status: The status code of the response, None if the request failed.
+        reason: The reason of the status of the response, None if the request failed.
+        response_headers: The headers of the response.
+        response_body: The body of the response.
+        error: The name of the requests exception raised if the request failed.
+    """
+
+    started: float
+    elapsed: float
+    method: str
+    url: str
+    request_headers: dict[str, str]
+    request_body: str | None
+    status: int | None
+    reason: str | None
+    response_headers: dict[str, str]
+    response_body: str
+    error: str | None
+
+    @property
+    def key(self) -> _Key:
+        """Get what a request of the replay has to match to be served the outcome.
+
+        Returns:
+            The method, URL and body of the request.
+        """
+        return (self.method, self.url, self.request_body)
+
+
+def _decode(body: str | bytes | None) -> str | None:
+    """Convert a body into text that can be stored in JSON.
+
+    Args:
+        body: The body.
+
+    Returns:
+        The text, None if there is no body.
+    """
+    if body is None or isinstance(body, str):
+        return body
+    return body.decode("utf-8", errors="surrogateescape")
+
+
+def _scrub(value: str, secrets: Sequence[str]) -> str:
+    """Replace the secrets in a value.
+
+    Args:
+        value: The value to scrub.
+        secrets: The secrets, such as the API key and the access token of the run.
+
+    Returns:
+        The value without the secrets.
+    """
+    for secret in secrets:
+        value = value.replace(secret, REDACTED)
+    return value
+
+
+def _scrub_url(url: str, secrets: Sequence[str]) -> str:
+    """Replace the credentials in the query and the secrets in a URL.
+
+    Args:
+        url: The URL to scrub.
+        secrets: The secrets of the run.
+
+    Returns:
+        The URL without credentials.
+    """
+    parsed_url = parse.urlsplit(url)
+    query = parse.urlencode(
+        [
+            (name, REDACTED if name.lower() in _SECRET_QUERY_PARAMETERS else value)
+            for name, value in parse.parse_qsl(parsed_url.query, keep_blank_values=True)
+        ]
+    )
+    return _scrub(parsed_url._replace(query=query).geturl(), secrets)
+
+
+def _scrub_headers(
+    headers: typing.Mapping[str, str],
+    secrets: Sequence[str],
+    omitted: frozenset[str] = frozenset(),
+) -> dict[str, str]:
+    """Replace the credentials and the secrets in headers.
+
+    Args:
+        headers: The headers to scrub.
+        secrets: The secrets of the run.
+        omitted: The headers to leave out, in lower case.
+
+    Returns:
+        The headers without credentials.
+    """
+    return {
+        name: REDACTED if name.lower() in _SECRET_HEADERS else _scrub(value, secrets)
+        for name, value in headers.items()
+        if name.lower() not in omitted
+    }
+
+
+def _request_key(request: "requests.PreparedRequest", secrets: Sequence[str]) -> _Key:
+    """Get the method, URL and body of a request as they are recorded.
+
+    Args:
+        request: The request.
+        secrets: The secrets of the run.
+
+    Returns:
+        The key of the request.
+    """
+    body = _decode(request.body)
+    return (
+        str(request.method),
+        _scrub_url(str(request.url), secrets),
+        None if body is None else _scrub(body, secrets),
+    )
+
+
+@contextmanager
+def _transport(
+    send: Callable[
+        [_Send, "requests.PreparedRequest", dict[str, typing.Any]], "requests.Response"
+    ],
+) -> Iterator[None]:
+    """Send the requests of all the clients through a function.
+
+    Args:
+        send: Called with the send of the transport adapter, the request and the keyword
+            arguments of the send.
+    """
+    from requests.adapters import HTTPAdapter
+
+    original_send = HTTPAdapter.send
+
+    def adapter_send(
+        adapter: HTTPAdapter, request: "requests.PreparedRequest", **kwargs: typing.Any
+    ) -> "requests.Response":
+        """Send a request of a client.
+
+        Args:
+            adapter: The transport adapter of the client.
+            request: The request.
+            kwargs: The options of the request, such as the timeout.
+
+        Returns:
+            The response.
+        """
+        return send(
+            lambda *args, **send_kwargs: original_send(adapter, *args, **send_kwargs),
+            request,
+            kwargs,
+        )
+
+    # The adapter is replaced for all the threads of the run, e.g., the charms of a batch
+    HTTPAdapter.send = adapter_send  # type: ignore[method-assign,assignment]
+    try:
+        yield
+    finally:
+        HTTPAdapter.send = original_send  # type: ignore[method-assign,assignment]
+
+
+@contextmanager
+def _block_git_pushes() -> Iterator[None]:
+    """Make git push to a remote that does not exist instead of the remotes of the repository.
+
+    The push URL is set through the configuration in the environment of git, which takes
+    precedence over the configuration of the repository and is inherited by the git commands of
+    all the threads of the run.
+    """
+    count = int(os.environ.get("GIT_CONFIG_COUNT") or 0)
+    variables = {
+        "GIT_CONFIG_COUNT": str(count + 1),
+        f"GIT_CONFIG_KEY_{count}": f"url.{BLOCKED_PUSH_URL}.pushInsteadOf",
+        f"GIT_CONFIG_VALUE_{count}": "",
+    }
+    previous = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class _Recorder:  # pylint: disable=too-few-public-methods
+    """Appends the requests sent during a run to a cassette.
+
+    Attrs:
+        count: The number of requests recorded.
+    """
+
+    def __init__(self, path: Path, secrets: Sequence[str]) -> None:
+        """Construct, emptying the cassette.
+
+        Args:
+            path: The file of the cassette.
+            secrets: The secrets of the run, replaced wherever they appear.
+        """
+        self._path = path
+        self._secrets = tuple(secret for secret in secrets if secret)
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+
+    def send(
+        self,
+        original_send: _Send,
+        request: "requests.PreparedRequest",
+        kwargs: dict[str, typing.Any],
+    ) -> "requests.Response":
+        """Send a request and record it.
+
+        Args:
+            original_send: The send of the transport adapter.
+            request: The request.
+            kwargs: The options of the request.
+
+        Returns:
+            The response.
+        """
+        import requests
+
+        started = time.perf_counter()
+        method, url, request_body = _request_key(request, self._secrets)
+        request_headers = _scrub_headers(request.headers, self._secrets)
+        try:
+            response = original_send(request, **kwargs)
+            # The body is read here so that the time to download it is included
+            response_body = _decode(response.content) or ""
+        except requests.RequestException as exc:
+            self._write(
+                Interaction(
+                    started=started - self._start,
+                    elapsed=time.perf_counter() - started,
+                    method=method,
+                    url=url,
+                    request_headers=request_headers,
+                    request_body=request_body,
+                    status=None,
+                    reason=None,
+                    response_headers={},
+                    response_body="",
+                    error=type(exc).__name__,
+                )
+            )
+            raise
+        self._write(
+            Interaction(
+                started=started - self._start,
+                elapsed=time.perf_counter() - started,
+                method=method,
+                url=url,
+                request_headers=request_headers,
+                request_body=request_body,
+                status=response.status_code,
+                reason=response.reason,
+                response_headers=_scrub_headers(
+                    response.headers, self._secrets, omitted=_TRANSFER_HEADERS
+                ),
+                response_body=_scrub(response_body, self._secrets),
+                error=None,
+            )
+        )
+        return response
+
+    def _write(self, interaction: Interaction) -> None:
+        """Append an interaction to the cassette.
+
+        Args:
+            interaction: The request and its outcome.
+        """
+        line = json.dumps({"version": CASSETTE_VERSION, **interaction._asdict()})
+        with self._lock:
+            with self._path.open("a", encoding="utf-8") as cassette_file:
+                cassette_file.write(f"{line}\n")
+            self.count += 1
+
+
+def read(path: Path) -> list[Interaction]:
+    """Read the interactions of a cassette.
+
+    Lines that cannot be read, such as a line that was being written when the run was stopped,
+    are skipped.
+
+    Args:
+        path: The file of the cassette.
+
+    Returns:
+        The interactions in the order they completed.
+    """
+    interactions = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+            if entry.pop("version") != CASSETTE_VERSION:
+                continue
+            interactions.append(Interaction(**entry))
+        except (ValueError, TypeError, KeyError, AttributeError):
+            continue
+    return interactions
+
+
+class _Replayer:  # pylint: disable=too-few-public-methods
+    """Serves the outcome of the recorded requests instead of sending them."""
+
+    def __init__(
+        self, interactions: Sequence[Interaction], latency_scale: float, secrets: Sequence[str]
+    ) -> None:
+        """Construct.
+
+        Args:
+            interactions: The recorded requests.
+            latency_scale: The recorded time of each request is multiplied by it.
+            secrets: The secrets of the run, replaced before the requests are matched.
+        """
+        self._latency_scale = latency_scale
+        self._secrets = tuple(secret for secret in secrets if secret)
+        self._lock = threading.Lock()
+        # Requests that are the same are served in the order they were recorded
+        self._queues: dict[_Key, deque[Interaction]] = {}
+        for interaction in interactions:
+            self._queues.setdefault(interaction.key, deque()).append(interaction)
+
+    def send(
+        self,
+        original_send: _Send,  # pylint: disable=unused-argument
+        request: "requests.PreparedRequest",
+        kwargs: dict[str, typing.Any],  # pylint: disable=unused-argument
+    ) -> "requests.Response":
+        """Serve the outcome of a request.
+
+        Args:
+            original_send: The send of the transport adapter, not called.
+            request: The request.
+            kwargs: The options of the request.
+
+        Returns:
+            The recorded response.
+
+        Raises:
+            ConnectionError: if the request was not recorded or no longer has outcomes to serve.
+            RequestException: the error recorded for the request if it failed.
+        """
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        key = _request_key(request, self._secrets)
+        with self._lock:
+            queue = self._queues.get(key)
+            interaction = queue.popleft() if queue else None
+        if interaction is None:
+            raise requests.ConnectionError(
+                f"No recorded response left for {key[0]} {key[1]}", request=request
+            )
+
+        time.sleep(interaction.elapsed * self._latency_scale)
+        if interaction.error is not None:
+            error_type = getattr(requests.exceptions, interaction.error, None)
+            if not (
+                isinstance(error_type, type) and issubclass(error_type, requests.RequestException)
+            ):
+                error_type = requests.ConnectionError
+            raise error_type(
+                f"Recorded {interaction.error} for {key[0]} {key[1]}", request=request
+            )
+
+        response = requests.Response()
+        response.status_code = typing.cast(int, interaction.status)
+        response.reason = typing.cast(str, interaction.reason)
+        response.headers = CaseInsensitiveDict(interaction.response_headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(
+            interaction.response_body.encode("utf-8", errors="surrogateescape")
+        )
+        response.url = str(request.url)
+        response.request = request
+        return response
+
+
+@contextmanager
+def record(path: Path, secrets: Sequence[str] = ()) -> Iterator[None]:
+    """Record the requests sent to Discourse and GitHub to a cassette.
+
+    Each request is appended as a JSON line once its response is read, with the headers and
+    query parameters carrying credentials and any of the secrets replaced.
+
+    Args:
+        path: The file of the cassette, replaced if it exists.
+        secrets: The secrets of the run, such as the API key and the access token.
+    """
+    recorder = _Recorder(path=path, secrets=secrets)
+    try:
+        with _transport(recorder.send):
+            yield
+    finally:
+        logging.info("Recorded %s requests to %s", recorder.count, path)
+
+
+@contextmanager
+def replay(path: Path, latency_scale: float = 1.0, secrets: Sequence[str] = ()) -> Iterator[None]:
+    """Serve the requests from a cassette instead of sending them.
+
+    A request is matched on its method, URL and body. The same requests are served in the order
+    they were recorded, a request that was not recorded fails with a connection error. The git
+    pushes fail rather than change the remote repository.
+
+    Args:
+        path: The file of the cassette.
+        latency_scale: The recorded time of each request is multiplied by it, e.g., 1 to wait for
+            as long as the recorded request took and 0 not to wait.
+        secrets: The secrets of the run, replaced in the requests as they were when recorded.
+    """
+    interactions = read(path)
+    logging.info(
+        "Replaying %s requests from %s, latency scaled by %s",
+        len(interactions),
+        path,
+        latency_scale,
+    )
+    replayer = _Replayer(interactions=interactions, latency_scale=latency_scale, secrets=secrets)
+    with _transport(replayer.send), _block_git_pushes():
+        yield
@@ -8,9 +8,7 @@ from collections.abc import Iterable, Iterator
 from itertools import chain, tee
 from typing import NamedTuple, TypeGuard
 
-import requests
-
-from gatekeeper import content
+from gatekeeper import content, deadline, metrics
 from gatekeeper.constants import DOCUMENTATION_TAG
 from gatekeeper.types_ import (
     AnyAction,
@@ -219,8 +217,16 @@ def _external_ref_list_item_problem(list_item: IndexContentsListItem) -> Problem
     Returns:
         None if there is no problem or the problem if there is an issue with the list item.
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
-        response = requests.head(list_item.reference_value, timeout=60)
+        with metrics.timed(metrics.EXTERNAL_REF, "head"):
+            response = requests.head(
+                list_item.reference_value,
+                timeout=deadline.timeout(
+                    limit=60, operation="the checks of the external references"
+                ),
+            )
 
         if response.status_code // 100 == 2:
             return None
@@ -241,6 +247,14 @@ def _external_ref_list_item_problem(list_item: IndexContentsListItem) -> Problem
                 f"request was unable to connect, exception: \n{exc}"
             ),
         )
+    except requests.Timeout as exc:
+        problem = Problem(
+            path=list_item.reference_value,
+            description=(
+                "an item on the contents index points to an external reference where a HEAD "
+                f"request timed out, exception: \n{exc}"
+            ),
+        )
 
     logging.error(
         (
@@ -3,10 +3,15 @@
 
 """Module for Client class."""
 
+import logging
+import sqlite3
 import typing
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from gatekeeper.discourse import Discourse, create_discourse
+from gatekeeper.mirror import MIRROR_FILE, Mirror
 from gatekeeper.repository import Client as RepositoryClient
 from gatekeeper.repository import create_repository_client
 from gatekeeper.types_ import UserInputs
@@ -34,16 +39,45 @@ def get_clients(user_inputs: UserInputs, base_path: Path) -> Clients:
     Returns:
         Clients object embedding both Discourse API and Repository clients
     """
+    discourse = create_discourse(
+        hostname=user_inputs.discourse.hostname,
+        category_id=user_inputs.discourse.category_id,
+        api_username=user_inputs.discourse.api_username,
+        api_key=user_inputs.discourse.api_key,
+    )
+    if user_inputs.cache_dir:
+        try:
+            discourse.mirror = Mirror(
+                path=Path(user_inputs.cache_dir) / MIRROR_FILE,
+                host=discourse.host,
+                category_id=int(user_inputs.discourse.category_id),
+            )
+        except sqlite3.Error as exc:
+            logging.warning("Not using the mirror in %s: %s", user_inputs.cache_dir, exc)
     return Clients(
-        discourse=create_discourse(
-            hostname=user_inputs.discourse.hostname,
-            category_id=user_inputs.discourse.category_id,
-            api_username=user_inputs.discourse.api_username,
-            api_key=user_inputs.discourse.api_key,
-        ),
+        discourse=discourse,
         repository=create_repository_client(
             access_token=user_inputs.github_access_token,
             base_path=base_path,
             charm_dir=user_inputs.charm_dir,
         ),
     )
+
+
+@contextmanager
+def open_clients(user_inputs: UserInputs, base_path: Path) -> Iterator[Clients]:
+    """Get the clients and close the mirror of the Discourse client once they are no longer used.
+
+    Args:
+        user_inputs: inputs provided via environment
+        base_path: path where the git repository is stored
+
+    Yields:
+        Clients object embedding both Discourse API and Repository clients
+    """
+    clients = get_clients(user_inputs=user_inputs, base_path=base_path)
+    try:
+        yield clients
+    finally:
+        if clients.discourse.mirror is not None:
+            clients.discourse.mirror.close()
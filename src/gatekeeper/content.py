@@ -3,15 +3,26 @@
 
 """Module for checking conflicts using 3-way merge and create content based on a 3 way merge."""
 
-import difflib
+import hashlib
 import tempfile
+from collections.abc import Sequence
 from pathlib import Path
 
 from git.exc import GitCommandError
-from git.repo import Repo
 
+from gatekeeper import deadline, metrics
 from gatekeeper.exceptions import ContentError
 
+# The number of unchanged lines shown around each change of a diff
+DIFF_CONTEXT_LINES = 3
+# The number of lines of a diff after which the rest is left out
+DIFF_MAX_LINES = 200
+# Pages larger than this or with more changed lines are summarized by their hash
+DIFF_MAX_PAGE_LINES = 20_000
+DIFF_MAX_EDITS = 500
+# Follows the last line of a diff if the content does not end with a newline, like git diff
+DIFF_NO_NEWLINE_NOTE = "\\ No newline at end of file"
+
 _BASE_BRANCH = "base"
 _THEIR_BRANCH = "theirs"
 _OUR_BRANCH = "ours"
@@ -57,10 +68,10 @@ def merge(base: str, theirs: str, ours: str) -> str:
     if theirs == ours:
         return theirs
 
-    with tempfile.TemporaryDirectory() as tmp_dir:
+    with metrics.timed(metrics.MERGE, "merge"), tempfile.TemporaryDirectory() as tmp_dir:
         # Initialise repository
         tmp_path = Path(tmp_dir)
-        repo = Repo.init(tmp_path)
+        repo = metrics.MeteredRepo.init(tmp_path)
         writer = repo.config_writer()
         writer.set_value("user", "name", "temp_user")
         writer.set_value("user", "email", "temp_email")
@@ -87,8 +98,10 @@ def merge(base: str, theirs: str, ours: str) -> str:
         repo.git.commit("-m", "our change")
 
         try:
-            repo.git.merge(_THEIR_BRANCH)
+            repo.git.merge(_THEIR_BRANCH, kill_after_timeout=deadline.kill_after("the merge"))
         except GitCommandError as exc:
+            # A merge killed at the deadline is not a conflict
+            deadline.check("the merge")
             content_conflicts = content_path.read_text(encoding="utf-8")
             raise ContentError(
                 f"could not automatically merge, conflicts:\n{content_conflicts}"
@@ -97,16 +110,258 @@ def merge(base: str, theirs: str, ours: str) -> str:
         return content_path.read_text(encoding="utf-8")
 
 
-def diff(first: str, second: str) -> str:
-    """Show the difference between two strings.
+def _shortest_edit(
+    first: Sequence[int], second: Sequence[int], max_edits: int
+) -> list[tuple[str, int, int]] | None:
+    """Find the shortest edit script between two sequences using the Myers algorithm.
+
+    Args:
+        first: The sequence before the change.
+        second: The sequence after the change.
+        max_edits: The number of insertions and deletions after which the search gives up.
+
+    Returns:
+        The operations in order, each is the tag, "=" for a line in both, "-" for a removed line
+        and "+" for an added line, followed by the position in the first and in the second
+        sequence. None if more than max_edits edits are needed.
+    """
+    first_len, second_len = len(first), len(second)
+    # The furthest x reached on each diagonal k = x - y, a snapshot of the diagonals of the
+    # previous step is kept for each number of edits to trace back the path
+    furthest = {1: 0}
+    trace: list[list[int]] = []
+    for edits in range(min(first_len + second_len, max_edits) + 1):
+        for diagonal in range(-edits, edits + 1, 2):
+            if diagonal == -edits or (
+                diagonal != edits and furthest[diagonal - 1] < furthest[diagonal + 1]
+            ):
+                x = furthest[diagonal + 1]
+            else:
+                x = furthest[diagonal - 1] + 1
+            y = x - diagonal
+            while x < first_len and y < second_len and first[x] == second[y]:
+                x, y = x + 1, y + 1
+            furthest[diagonal] = x
+            if x >= first_len and y >= second_len:
+                return _trace_back(trace=trace, x=x, y=y, edits=edits)
+        trace.append([furthest[diagonal] for diagonal in range(-edits, edits + 1, 2)])
+    return None
+
+
+def _trace_back(trace: list[list[int]], x: int, y: int, edits: int) -> list[tuple[str, int, int]]:
+    """Follow the path found by _shortest_edit back to the start.
+
+    Args:
+        trace: The furthest x on each diagonal after each number of edits.
+        x: The end of the first sequence.
+        y: The end of the second sequence.
+        edits: The number of edits of the path.
+
+    Returns:
+        The operations in order.
+    """
+    operations: list[tuple[str, int, int]] = []
+    for step in range(edits, 0, -1):
+        previous = trace[step - 1]
+        diagonal = x - y
+        inserted = diagonal == -step or (
+            diagonal != step
+            and previous[(diagonal - 1 + step - 1) // 2] < previous[(diagonal + 1 + step - 1) // 2]
+        )
+        previous_diagonal = diagonal + 1 if inserted else diagonal - 1
+        previous_x = previous[(previous_diagonal + step - 1) // 2]
+        previous_y = previous_x - previous_diagonal
+        while x > previous_x and y > previous_y:
+            x, y = x - 1, y - 1
+            operations.append(("=", x, y))
+        operations.append(("+" if inserted else "-", previous_x, previous_y))
+        x, y = previous_x, previous_y
+    while x > 0 and y > 0:
+        x, y = x - 1, y - 1
+        operations.append(("=", x, y))
+    operations.reverse()
+    return operations
+
+
+def _format_range(start: int, length: int) -> str:
+    """Format the lines of a hunk in one of the sequences like the unified diff format.
+
+    Args:
+        start: The position of the first line of the hunk.
+        length: The number of lines of the hunk.
+
+    Returns:
+        The 1-based line number followed by the length if it is not 1.
+    """
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start + 1 if length else start},{length}"
+
+
+def short_sha256(text: str) -> str:
+    """Get the start of the sha256 of a content to identify it in a message.
+
+    Args:
+        text: The content.
+
+    Returns:
+        The first 12 characters of the hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _summary(first_lines: Sequence[str], second_lines: Sequence[str]) -> str:
+    """Describe a change that is too large to show line by line.
+
+    Args:
+        first_lines: The lines before the change with their line endings.
+        second_lines: The lines after the change with their line endings.
+
+    Returns:
+        The number of lines and the hash of the content before and after the change.
+    """
+    first_key = short_sha256("".join(first_lines))
+    second_key = short_sha256("".join(second_lines))
+    return (
+        f"@@ {len(first_lines)} lines (sha256 {first_key}) changed to {len(second_lines)} lines "
+        f"(sha256 {second_key}), too many differences to show @@\n"
+    )
+
+
+def _render_line(prefix: str, line: str) -> list[str]:
+    """Render a line of a hunk, showing its line ending unless it is a newline.
+
+    Args:
+        prefix: The marker of the line, a space, - or +.
+        line: The line with its line ending.
+
+    Returns:
+        The line, escaping a line ending other than a newline, followed by a note if the line has
+        no line ending.
+    """
+    text = line.splitlines()[0]
+    ending = line[len(text) :]
+    if not ending:
+        return [f"{prefix}{text}", DIFF_NO_NEWLINE_NOTE]
+    # A carriage return or another line break would not be visible
+    escaped_ending = ending.removesuffix("\n").encode("unicode_escape").decode("ascii")
+    return [f"{prefix}{text}{escaped_ending}"]
+
+
+def _hunks(
+    operations: Sequence[tuple[str, int, int]],
+    first_lines: Sequence[str],
+    second_lines: Sequence[str],
+    context: int,
+) -> list[str]:
+    """Render the operations of an edit script as unified diff hunks.
+
+    Args:
+        operations: The operations returned by _shortest_edit for all the lines.
+        first_lines: The lines before the change with their line endings.
+        second_lines: The lines after the change with their line endings.
+        context: The number of unchanged lines shown around each change.
+
+    Returns:
+        The lines of the hunks.
+    """
+    # Changes with at most twice the context between them are shown in the same hunk
+    changes = [index for index, (tag, _, _) in enumerate(operations) if tag != "="]
+    hunks: list[list[int]] = []
+    for index in changes:
+        if hunks and index - hunks[-1][1] <= 2 * context + 1:
+            hunks[-1][1] = index
+        else:
+            hunks.append([index, index])
+
+    lines: list[str] = []
+    for hunk_start, hunk_end in hunks:
+        hunk = operations[max(hunk_start - context, 0) : hunk_end + context + 1]
+        _, first_start, second_start = hunk[0]
+        first_length = sum(1 for tag, _, _ in hunk if tag != "+")
+        second_length = sum(1 for tag, _, _ in hunk if tag != "-")
+        lines.append(
+            f"@@ -{_format_range(first_start, first_length)} "
+            f"+{_format_range(second_start, second_length)} @@"
+        )
+        lines.extend(
+            rendered
+            for tag, x, y in hunk
+            for rendered in (
+                _render_line(prefix="+", line=second_lines[y])
+                if tag == "+"
+                else _render_line(prefix=" " if tag == "=" else "-", line=first_lines[x])
+            )
+        )
+
+    return lines
+
+
+def diff(
+    first: str,
+    second: str,
+    context: int = DIFF_CONTEXT_LINES,
+    max_lines: int = DIFF_MAX_LINES,
+) -> str:
+    """Show the difference between two strings as unified diff hunks.
+
+    Lines in both strings are prefixed with a space, removed lines with - and added lines with +.
+    Lines are compared with their line endings, a line ending other than a newline is shown
+    escaped and a last line without a newline is followed by DIFF_NO_NEWLINE_NOTE.
+    Pages with more than DIFF_MAX_PAGE_LINES lines or more than DIFF_MAX_EDITS changed lines are
+    summarized by their number of lines and hash instead.
 
     Args:
         first: One of the strings to compare.
         second: One of the strings to compare.
+        context: The number of unchanged lines shown around each change.
+        max_lines: The number of lines of the diff after which the rest is left out.
 
     Returns:
-        The diff between the two strings.
+        The diff between the two strings, empty if there are no differences.
     """
-    return "".join(
-        difflib.Differ().compare(first.splitlines(keepends=True), second.splitlines(keepends=True))
+    first_lines = first.splitlines(keepends=True)
+    second_lines = second.splitlines(keepends=True)
+    if max(len(first_lines), len(second_lines)) > DIFF_MAX_PAGE_LINES:
+        return _summary(first_lines, second_lines)
+
+    # Lines are compared by an identifier and the common start and end are skipped
+    line_ids: dict[str, int] = {}
+    first_ids = [line_ids.setdefault(line, len(line_ids)) for line in first_lines]
+    second_ids = [line_ids.setdefault(line, len(line_ids)) for line in second_lines]
+    prefix = 0
+    while (
+        prefix < min(len(first_ids), len(second_ids)) and first_ids[prefix] == second_ids[prefix]
+    ):
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < min(len(first_ids), len(second_ids)) - prefix
+        and first_ids[-suffix - 1] == second_ids[-suffix - 1]
+    ):
+        suffix += 1
+    middle = _shortest_edit(
+        first=first_ids[prefix : len(first_ids) - suffix],
+        second=second_ids[prefix : len(second_ids) - suffix],
+        max_edits=DIFF_MAX_EDITS,
+    )
+    if middle is None:
+        return _summary(first_lines, second_lines)
+    operations = (
+        [("=", index, index) for index in range(prefix)]
+        + [(tag, x + prefix, y + prefix) for tag, x, y in middle]
+        + [
+            ("=", len(first_ids) - suffix + index, len(second_ids) - suffix + index)
+            for index in range(suffix)
+        ]
+    )
+
+    lines = _hunks(
+        operations=operations,
+        first_lines=first_lines,
+        second_lines=second_lines,
+        context=context,
     )
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... {len(lines) - max_lines} more lines not shown"]
+    return "".join(f"{line}\n" for line in lines)
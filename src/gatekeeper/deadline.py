@@ -0,0 +1,175 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Limit the time a run takes, deriving the timeouts of the requests from the time left."""
+
+import contextvars
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from gatekeeper.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """The time by which the run has to finish.
+
+    The timeout of each request is the smaller of its own limit and the time left, so that a
+    request to a server that stopped responding cannot take the run past the deadline. A request
+    is only retried if the wait and the retry end before the deadline. Once the deadline has
+    passed, no further request or phase is started.
+
+    Attrs:
+        budget: The number of seconds the run may take, None if the run is not limited.
+    """
+
+    def __init__(self, budget: float | None = None) -> None:
+        """Construct, starting the budget.
+
+        Args:
+            budget: The number of seconds the run may take, None if the run is not limited.
+        """
+        self.budget = budget
+        self._start = time.monotonic()
+
+    def remaining(self) -> float | None:
+        """Get the time left before the deadline.
+
+        Returns:
+            The number of seconds left, not below 0, None if the run is not limited.
+        """
+        if self.budget is None:
+            return None
+        return max(self.budget - (time.monotonic() - self._start), 0.0)
+
+    def check(self, operation: str, duration: float = 0) -> None:
+        """Make sure there is time left to start an operation.
+
+        Args:
+            operation: Description of the operation about to start, e.g., the reconcile phase.
+            duration: The time the operation may take that has to be left as well.
+
+        Raises:
+            DeadlineExceededError: if the deadline has passed or the operation would not finish
+                before it.
+        """
+        remaining = self.remaining()
+        if remaining is not None and (remaining == 0 or remaining < duration):
+            raise DeadlineExceededError(
+                f"The time budget of {self.budget} seconds is used up, cancelled {operation}, "
+                f"increase the time_budget input or rerun to continue"
+            )
+
+    def timeout(self, limit: float, operation: str) -> float:
+        """Get the timeout of a request.
+
+        Args:
+            limit: The timeout of the request if the run is not limited.
+            operation: Description of the request.
+
+        Returns:
+            The smaller of the limit and the time left.
+        """
+        self.check(operation)
+        remaining = self.remaining()
+        return limit if remaining is None else min(limit, remaining)
+
+    def kill_after(self, operation: str) -> float | None:
+        """Get the time after which a subprocess is killed.
+
+        Args:
+            operation: Description of the subprocess.
+
+        Returns:
+            The time left, None if the run is not limited.
+        """
+        self.check(operation)
+        return self.remaining()
+
+
+_DEADLINE = Deadline()
+# The timeout of the request the thread is sending, a retry of the request takes as long
+_RETRY_TIMEOUT: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "retry_timeout", default=0.0
+)
+
+
+def configure(budget: float | None) -> None:
+    """Set the time budget of the process, starting from now.
+
+    Args:
+        budget: The number of seconds the run may take, None if the run is not limited.
+    """
+    global _DEADLINE  # pylint: disable=global-statement
+    _DEADLINE = Deadline(budget=budget)
+
+
+def get_deadline() -> Deadline:
+    """Get the deadline of the run.
+
+    Returns:
+        The deadline of the process.
+    """
+    return _DEADLINE
+
+
+def check(operation: str) -> None:
+    """Make sure there is time left in the run to start an operation.
+
+    Args:
+        operation: Description of the operation about to start, e.g., the reconcile phase.
+    """
+    _DEADLINE.check(operation)
+
+
+def timeout(limit: float, operation: str) -> float:
+    """Get the timeout of a request from the time left in the run.
+
+    Args:
+        limit: The timeout of the request if the run is not limited.
+        operation: Description of the request.
+
+    Returns:
+        The smaller of the limit and the time left.
+    """
+    return _DEADLINE.timeout(limit=limit, operation=operation)
+
+
+def kill_after(operation: str) -> float | None:
+    """Get the time after which a subprocess is killed from the time left in the run.
+
+    Args:
+        operation: Description of the subprocess.
+
+    Returns:
+        The time left, None if the run is not limited.
+    """
+    return _DEADLINE.kill_after(operation=operation)
+
+
+@contextmanager
+def retried_with(timeout: float) -> Iterator[None]:
+    """Set the timeout of the retries of the requests sent within the context.
+
+    Args:
+        timeout: The timeout of the request.
+
+    Yields:
+        Nothing, the requests are sent within the context.
+    """
+    token = _RETRY_TIMEOUT.set(timeout)
+    try:
+        yield
+    finally:
+        _RETRY_TIMEOUT.reset(token)
+
+
+def wait_before_retry(seconds: float, operation: str) -> None:
+    """Wait before retrying a request unless the run would be past the deadline by its end.
+
+    Args:
+        seconds: The time to wait before the retry.
+        operation: Description of the request.
+    """
+    _DEADLINE.check(operation, duration=seconds + _RETRY_TIMEOUT.get())
+    time.sleep(seconds)
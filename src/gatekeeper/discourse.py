@@ -3,19 +3,45 @@
 
 """Interface for Discourse interactions."""
 
+# pydiscourse and requests are imported where they are used since many runs finish without
+# calling the server
+# pylint: disable=too-many-lines,import-outside-toplevel
+
+import logging
+import sqlite3
+import types
 import typing
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from functools import cached_property, partial
 from urllib import parse
 
-import pydiscourse
-import pydiscourse.exceptions
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
+from gatekeeper import deadline, metrics, sync, types_
+from gatekeeper.exceptions import DiscourseError, DiscourseTopicChangedError, InputError
+from gatekeeper.mirror import ListedTopic, MirroredTopic
+from gatekeeper.snapshot import ServerSnapshot
+from gatekeeper.sync import SyncTracker
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import pydiscourse
+    import requests
 
-from gatekeeper.exceptions import DiscourseError, InputError
+    from gatekeeper.mirror import Mirror
 
 _URL_PATH_PREFIX = "/t/"
 _POST_SPLIT_LINE = "\n\n-------------------------\n\n"
+# The timeouts of the requests in seconds, they are shortened to the time left in the run
+_API_TIMEOUT = 10 * 60
+_RAW_TIMEOUT = 60
+# The most pages of the category listing read to refresh the mirror
+_MAX_LISTING_PAGES = 10
+# Replaces the time module of pydiscourse, which it only uses to wait for the rate limit of the
+# server before retrying a request
+_RATE_LIMIT_CLOCK = types.SimpleNamespace(
+    sleep=partial(
+        deadline.wait_before_retry, operation="retrying the rate limited Discourse request"
+    )
+)
 
 
 class _DiscourseTopicInfo(typing.NamedTuple):
@@ -65,11 +91,19 @@ _ValidationResult = _ValidationResultValid | _ValidationResultInvalid
 KeyT = typing.TypeVar("KeyT")
 
 
-class Discourse:
+class Discourse:  # pylint: disable=too-many-instance-attributes
     """Interact with a discourse server.
 
     Attrs:
         host: The host of the discourse server.
+        throttle: Called before each request to the server, e.g., to wait for a rate budget
+            shared with other clients.
+        mirror: Local copy of the topics the content of a topic is read from if the first post is
+            at the revision it was copied at, if any.
+        snapshot: The content of the topics read by the reconcile, the topics are read from it
+            once it is frozen, if any.
+        sync: The topics read from the server that can only change by being bumped and the
+            topics that have not changed since the server matched the documentation tag.
     """
 
     _tags = ("docs",)
@@ -84,13 +118,105 @@ class Discourse:
             category_id: The category identifier to put the topics into.
 
         """
-        self._client = pydiscourse.DiscourseClient(
-            host=host, api_username=api_username, api_key=api_key, timeout=10 * 60
-        )
         self._category_id = category_id
         self._host = host
         self._api_username = api_username
         self._api_key = api_key
+        self._requests_adapter: "requests.adapters.HTTPAdapter | None" = None
+        self._requests_session: "requests.Session | None" = None
+        self.throttle: typing.Callable[[], None] | None = None
+        self.mirror: "Mirror | None" = None
+        self.snapshot: ServerSnapshot | None = None
+
+    @cached_property
+    def _client(self) -> "pydiscourse.DiscourseClient":
+        """Return the client for the API of the server, created on first use.
+
+        Returns:
+            The pydiscourse client.
+        """
+        import pydiscourse
+        import pydiscourse.client
+
+        # The client waits for the rate limit of the server before retrying a request, the wait
+        # and the retry may not take the run past the deadline
+        pydiscourse.client.time = _RATE_LIMIT_CLOCK
+        return pydiscourse.DiscourseClient(
+            host=self._host,
+            api_username=self._api_username,
+            api_key=self._api_key,
+            timeout=_API_TIMEOUT,
+        )
+
+    def for_thread(self) -> "Discourse":
+        """Create a client for the same server to be used by another thread.
+
+        The API client, the requests session and the timeout set on them are not shared whereas
+        the pool of connections to the server, the throttle, the mirror, the snapshot and the sync
+        tracker are, they are safe to use from several threads.
+
+        Returns:
+            The client for the thread.
+        """
+        client = Discourse(
+            host=self._host,
+            api_username=self._api_username,
+            api_key=self._api_key,
+            category_id=self._category_id,
+        )
+        # The adapter is only shared between the clients of the server
+        adapter = self._get_requests_adapter()
+        client._requests_adapter = adapter  # pylint: disable=protected-access
+        client.throttle = self.throttle
+        client.mirror = self.mirror
+        client.snapshot = self.snapshot
+        client.sync = self.sync
+        return client
+
+    @cached_property
+    def sync(self) -> SyncTracker:
+        """Return the tracker of the topics that match the repository, created on first use.
+
+        Returns:
+            The tracker.
+        """
+        return SyncTracker()
+
+    @contextmanager
+    def _request(self, name: str, limit: float = _API_TIMEOUT) -> Iterator[float]:
+        """Record a request to the server, waiting for the throttle first, if any.
+
+        The timeout of the request is shortened to the time left in the run, its retries take as
+        long.
+
+        Args:
+            name: The name of the endpoint.
+            limit: The timeout of the request if the run is not limited.
+
+        Yields:
+            The timeout for the request.
+        """
+        if self.throttle is not None:
+            self.throttle()
+        timeout = deadline.timeout(limit=limit, operation=f"the Discourse request {name}")
+        with deadline.retried_with(timeout), metrics.timed(metrics.DISCOURSE, name):
+            yield timeout
+
+    @contextmanager
+    def _api_request(self, name: str) -> Iterator[None]:
+        """Record a request to the server sent by the API client.
+
+        The API client takes no timeout per request, the timeout of the request is set on it.
+
+        Args:
+            name: The name of the endpoint.
+
+        Yields:
+            Nothing, the request is sent within the context.
+        """
+        with self._request(name) as timeout:
+            self._client.timeout = timeout
+            yield
 
     @staticmethod
     def _topic_url_path_components_valid(
@@ -148,6 +274,8 @@ class Discourse:
         Returns:
             Whether the URL is a valid topic URL.
         """
+        import requests
+
         if not url.startswith((self._host, _URL_PATH_PREFIX)):
             return _ValidationResultInvalid(
                 "The base path is different to the expected base path, "
@@ -155,10 +283,12 @@ class Discourse:
             )
 
         try:
-            response = self._get_requests_session().head(
-                url if url.startswith(self._host) else f"{self._host}{url}",
-                allow_redirects=True,
-            )
+            with self._request("head_topic", limit=_RAW_TIMEOUT) as timeout:
+                response = self._get_requests_session().head(
+                    url if url.startswith(self._host) else f"{self._host}{url}",
+                    allow_redirects=True,
+                    timeout=timeout,
+                )
             response.raise_for_status()
             url = response.url
         except (
@@ -231,13 +361,16 @@ class Discourse:
             DiscourseError: if pydiscourse raises an error or if the topic has been deleted.
 
         """
+        import pydiscourse.exceptions
+
         topic_info = self._url_to_topic_info(url=url)
         try:
-            topic = self._client.topic(
-                slug=topic_info.slug,
-                topic_id=topic_info.id_,
-                override_request_kwargs={"allow_redirects": True},
-            )
+            with self._api_request("get_topic"):
+                topic = self._client.topic(
+                    slug=topic_info.slug,
+                    topic_id=topic_info.id_,
+                    override_request_kwargs={"allow_redirects": True},
+                )
         except pydiscourse.exceptions.DiscourseError as discourse_error:
             raise DiscourseError(
                 f"Error retrieving topic, {url=!r}, {discourse_error=}"
@@ -251,6 +384,11 @@ class Discourse:
             raise DiscourseError(
                 f"The documentation server returned unexpected data, {topic=!r}"
             ) from exc
+        self.sync.record_topic(
+            topic_info.id_,
+            eligible=topic.get("highest_post_number") == 1
+            and topic.get("category_id") == self._category_id,
+        )
 
         # Check for deleted topic
         user_deleted = self._get_post_value(
@@ -261,6 +399,34 @@ class Discourse:
 
         return first_post
 
+    def _retrieve_post(self, post_id: int, url: str) -> dict:
+        """Retrieve a post without retrieving its topic.
+
+        Args:
+            post_id: The identifier of the post.
+            url: The link to the topic of the post, used for messages.
+
+        Returns:
+            The post.
+
+        Raises:
+            DiscourseError: if pydiscourse raises an error or if the post has been deleted.
+        """
+        import pydiscourse.exceptions
+
+        try:
+            with self._api_request("get_post"):
+                post = self._client.post_by_id(post_id=post_id)
+        except pydiscourse.exceptions.DiscourseError as discourse_error:
+            raise DiscourseError(
+                f"Error retrieving the post, {url=!r}, {post_id=}, {discourse_error=}"
+            ) from discourse_error
+
+        if self._get_post_value(post=post, key="user_deleted", expected_type=bool):
+            raise DiscourseError(f"topic has been deleted, {url=}")
+
+        return post
+
     @staticmethod
     def _get_post_value(post: dict, key: str, expected_type: type[KeyT]) -> KeyT:
         """Get a value by key from the first post checking the value is the correct type.
@@ -330,25 +496,76 @@ class Discourse:
         self._retrieve_topic_first_post(url=url)
         return True
 
-    # Tested in integration tests
-    @staticmethod
-    def _get_requests_session() -> requests.Session:  # pragma: no cover
-        """Get a requests session.
+    def retrieve_post_revision(self, post_id: int, url: str) -> types_.TopicRevision:
+        """Retrieve the revision of the first post of a topic without retrieving the topic.
+
+        The version increases every time the post is edited which makes it a cheap way to check
+        whether the content has changed without retrieving it.
+
+        Args:
+            post_id: The identifier of the first post of the topic.
+            url: The URL to the topic, used for messages.
 
         Returns:
-            A session with retries enabled.
-        """
-        session = requests.Session()
-        adapter = HTTPAdapter(
-            max_retries=Retry(
-                total=5,
-                backoff_factor=1,
-                status_forcelist=[429, 500, 502, 503, 504],
-            )
+            The identifier and version of the post.
+        """
+        return self._first_post_revision(self._retrieve_post(post_id=post_id, url=url))
+
+    def _first_post_revision(self, first_post: dict) -> types_.TopicRevision:
+        """Get the revision of the first post of a topic.
+
+        Args:
+            first_post: The first post of the topic.
+
+        Returns:
+            The identifier and version of the post.
+        """
+        return types_.TopicRevision(
+            post_id=self._get_post_value(post=first_post, key="id", expected_type=int),
+            version=self._get_post_value(post=first_post, key="version", expected_type=int),
         )
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+
+    def _get_requests_adapter(self) -> "requests.adapters.HTTPAdapter":
+        """Get the adapter that pools the connections to the server, created on first use.
+
+        The adapter is shared with the clients created for other threads.
+
+        Returns:
+            An adapter with retries enabled while they end before the deadline of the run.
+        """
+        from requests.adapters import HTTPAdapter
+
+        from gatekeeper.retry import DeadlineRetry
+
+        if self._requests_adapter is None:
+            self._requests_adapter = HTTPAdapter(
+                max_retries=DeadlineRetry(
+                    total=5,
+                    backoff_factor=1,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                )
+            )
+        return self._requests_adapter
+
+    # Tested in integration tests
+    def _get_requests_session(self) -> "requests.Session":  # pragma: no cover
+        """Get the requests session of the client, created on first use.
+
+        The session is reused so that the connections to the server are pooled, also with the
+        clients created for other threads.
+
+        Returns:
+            A session using the adapter of the client.
+        """
+        import requests
+
+        if self._requests_session is None:
+            session = requests.Session()
+            adapter = self._get_requests_adapter()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._requests_session = session
+        return self._requests_session
 
     @staticmethod
     def _parse_raw_content(content: str) -> str:
@@ -384,15 +601,233 @@ class Discourse:
                 topic or if the topic is not found.
 
         """
+        if (
+            self.snapshot is not None
+            and (id_ := sync.topic_id(url)) is not None
+            and (content := self.snapshot.get(id_)) is not None
+        ):
+            return content
+        if self.mirror is not None:
+            return self.retrieve_topic_and_revision(url=url)[0]
+
         # Check for any read issues
         if not self.check_topic_read_permission(url=url):
             raise DiscourseError(f"Error retrieving the topic, could not read the topic, {url=!r}")
 
+        content = self._retrieve_raw_content(url=url)
+        self._record_snapshot(url=url, content=content)
+        return content
+
+    def retrieve_topic_and_revision(self, url: str) -> tuple[str, types_.TopicRevision]:
+        """Retrieve the topic content and the revision of its first post.
+
+        The revision is read before the content, if the topic is edited in between, the revision is
+        older than the content and a conditional update fails rather than overwrite the edit.
+
+        Args:
+            url: The URL to the topic. Assume it includes the slug and id of the topic as the last
+                2 elements of the url.
+
+        Returns:
+            The content of the first post in the topic and its revision.
+        """
+        first_post = self._retrieve_topic_first_post(url=url)
+        revision = self._first_post_revision(first_post)
+        if self.mirror is not None:
+            content = self._retrieve_mirrored_content(url=url, first_post=first_post)
+        else:
+            content = self._retrieve_raw_content(url=url)
+        self._record_snapshot(url=url, content=content)
+        return content, revision
+
+    def _record_snapshot(self, url: str, content: str) -> None:
+        """Record the content of a topic read from the server in the snapshot, if any.
+
+        The topic is identified by its link, without requesting it.
+
+        Args:
+            url: The URL to the topic.
+            content: The content of the first post in the topic.
+        """
+        if self.snapshot is not None and (id_ := sync.topic_id(url)) is not None:
+            self.snapshot.put(id_, content)
+
+    def _list_bumped_topics(self, since: str | None) -> Generator[ListedTopic, None, bool]:
+        """List the topics of the category bumped after a time, most recently bumped first.
+
+        Args:
+            since: When the topics were last listed, only the first page is read if None.
+
+        Yields:
+            The topics bumped after since, up to the maximum number of pages.
+
+        Returns:
+            Whether all the topics bumped after since were listed.
+
+        Raises:
+            DiscourseError: if the server refuses to list the category.
+        """
+        import pydiscourse.exceptions
+
+        for page in range(_MAX_LISTING_PAGES):
+            try:
+                with self._api_request("list_category"):
+                    listing = self._client.category_topics(
+                        category_id=self._category_id, page=page
+                    )
+                topics = listing["topic_list"]["topics"]
+            except pydiscourse.exceptions.DiscourseError as discourse_error:
+                raise DiscourseError(
+                    f"Error listing the category, {self._category_id=}, {discourse_error=}"
+                ) from discourse_error
+            except (TypeError, KeyError) as exc:
+                raise DiscourseError(
+                    f"The documentation server returned unexpected data, {listing=!r}"
+                ) from exc
+            if not topics:
+                return True
+            for topic in topics:
+                # Pinned topics are listed first regardless of when they were bumped
+                if since is not None and topic["bumped_at"] <= since and not topic.get("pinned"):
+                    return True
+                yield ListedTopic(
+                    topic_id=topic["id"], slug=topic["slug"], bumped_at=topic["bumped_at"]
+                )
+            if since is None:
+                return True
+        return False
+
+    def latest_bump(self) -> str | None:
+        """Get when the most recently bumped topic of the category was bumped.
+
+        Returns:
+            The time of the bump according to the clock of the server, None if the category has
+            no topics.
+        """
+        return max(
+            (topic.bumped_at for topic in self._list_bumped_topics(since=None)), default=None
+        )
+
+    def bumped_topics(self, since: str) -> frozenset[int] | None:
+        """Get the topics of the category bumped after a time.
+
+        Args:
+            since: The time according to the clock of the server.
+
+        Returns:
+            The identifiers of the topics, None if more topics were bumped than are listed.
+        """
+        listing = self._list_bumped_topics(since=since)
+        bumped: set[int] = set()
+        while True:
+            try:
+                bumped.add(next(listing).topic_id)
+            except StopIteration as stop:
+                return frozenset(bumped) if stop.value else None
+
+    def _refresh_mirror(self, mirror: "Mirror") -> None:
+        """Remove the content of the topics bumped since the last listing, once per mirror.
+
+        Args:
+            mirror: The mirror to refresh.
+        """
+        if not mirror.start_refresh():
+            return
+        try:
+            removed = mirror.refresh(self._list_bumped_topics(since=mirror.listed_until()))
+        except DiscourseError as exc:
+            logging.warning("Not refreshing the mirror, the category listing failed: %s", exc)
+            return
+        logging.info("Removed the content of %s bumped topics from the mirror", removed)
+
+    def _retrieve_mirrored_content(self, url: str, first_post: dict) -> str:
+        """Retrieve the content of the first post of a topic using the mirror.
+
+        The content is read from the mirror if it was copied at the revision of the first post,
+        otherwise it is retrieved from the server and copied to the mirror.
+
+        Args:
+            url: The URL to the topic.
+            first_post: The first post of the topic.
+
+        Returns:
+            The content of the first post in the topic.
+        """
+        mirror = typing.cast("Mirror", self.mirror)
+        topic_id = self._get_post_value(post=first_post, key="topic_id", expected_type=int)
+        revision = self._first_post_revision(first_post)
+        updated_at = self._get_post_value(post=first_post, key="updated_at", expected_type=str)
+        try:
+            self._refresh_mirror(mirror)
+            with metrics.timed(metrics.MIRROR, "get"):
+                mirrored = mirror.get(topic_id)
+            if mirrored is not None and mirrored.matches(
+                post_id=revision.post_id, version=revision.version, updated_at=updated_at
+            ):
+                return typing.cast(str, mirrored.content)
+        except sqlite3.Error as exc:
+            logging.warning("Not using the mirror, reading it failed: %s", exc)
+            self.mirror = None
+            return self._retrieve_raw_content(url=url)
+
+        content = self._retrieve_raw_content(url=url)
+        try:
+            mirror.put(
+                MirroredTopic(
+                    topic_id=topic_id,
+                    slug=self._get_post_value(
+                        post=first_post, key="topic_slug", expected_type=str
+                    ),
+                    post_id=revision.post_id,
+                    version=revision.version,
+                    updated_at=updated_at,
+                    bumped_at=None,
+                    can_edit=self._get_post_value(
+                        post=first_post, key="can_edit", expected_type=bool
+                    ),
+                    content=content,
+                )
+            )
+        except sqlite3.Error as exc:
+            logging.warning("Not using the mirror, writing it failed: %s", exc)
+            self.mirror = None
+        return content
+
+    def _discard_mirrored(self, topic_id: int) -> None:
+        """Remove a topic changed by the client from the mirror, if any.
+
+        Args:
+            topic_id: The identifier of the topic.
+        """
+        if self.mirror is None:
+            return
+        try:
+            self.mirror.discard(topic_id)
+        except sqlite3.Error as exc:
+            logging.warning("Not using the mirror, writing it failed: %s", exc)
+            self.mirror = None
+
+    def _retrieve_raw_content(self, url: str) -> str:
+        """Retrieve the raw content of the first post of a topic.
+
+        Args:
+            url: The URL to the topic.
+
+        Returns:
+            The content of the first post in the topic.
+
+        Raises:
+            DiscourseError: if the server refuses to return the requested topic or if the topic is
+                not found.
+        """
+        import requests
+
         topic_info = self._url_to_topic_info(url=url)
         headers = {"Api-Key": self._api_key, "Api-Username": self._api_username}
-        response = self._get_requests_session().get(
-            f"{self._host}/raw/{topic_info.id_}", headers=headers, timeout=60
-        )
+        with self._request("get_raw", limit=_RAW_TIMEOUT) as timeout:
+            response = self._get_requests_session().get(
+                f"{self._host}/raw/{topic_info.id_}", headers=headers, timeout=timeout
+            )
         try:
             response.raise_for_status()
         except (
@@ -420,13 +855,16 @@ class Discourse:
             DiscourseError: if anything goes wrong during topic creation.
 
         """
+        import pydiscourse.exceptions
+
         try:
-            post = self._client.create_post(
-                title=title,
-                category_id=self._category_id,
-                tags=self._tags,
-                content=content,
-            )
+            with self._api_request("create_post"):
+                post = self._client.create_post(
+                    title=title,
+                    category_id=self._category_id,
+                    tags=self._tags,
+                    content=content,
+                )
         except pydiscourse.exceptions.DiscourseError as discourse_error:
             raise DiscourseError(
                 f"Error creating the topic, {title=!r}, {content=!r}, {discourse_error=}"
@@ -450,17 +888,27 @@ class Discourse:
                 the topic is not found or if anything else has gone wrong.
 
         """
+        import pydiscourse.exceptions
+
         topic_info = self._url_to_topic_info(url=url)
         try:
-            self._client.delete_topic(topic_id=topic_info.id_)
+            with self._api_request("delete_topic"):
+                self._client.delete_topic(topic_id=topic_info.id_)
         except pydiscourse.exceptions.DiscourseError as discourse_error:
             raise DiscourseError(
                 f"Error deleting the topic, {url=!r}, {discourse_error=}"
             ) from discourse_error
+        self._discard_mirrored(topic_info.id_)
+        if self.snapshot is not None and (id_ := sync.topic_id(url)) is not None:
+            self.snapshot.discard(id_)
         return self._topic_info_to_absolute_url(topic_info)
 
     def update_topic(
-        self, url: str, content: str, edit_reason: str = "Charm documentation updated"
+        self,
+        url: str,
+        content: str,
+        edit_reason: str = "Charm documentation updated",
+        expected_revision: types_.TopicRevision | None = None,
     ) -> str:
         """Update the first post of a topic.
 
@@ -468,6 +916,7 @@ class Discourse:
             url: The URL to the topic.
             content: The content for the first post in the topic.
             edit_reason: The reason the edit was made.
+            expected_revision: Only update the topic if its first post is still at this revision.
 
         Returns:
             The link to the updated topic.
@@ -475,18 +924,44 @@ class Discourse:
         Raises:
             DiscourseError: if authentication fails, if the server refuses to update the first post
                 in the topic or if the topic is not found.
+            DiscourseTopicChangedError: if the first post is no longer at the expected revision.
 
         """
-        first_post = self._retrieve_topic_first_post(url=url)
-
-        post_id = self._get_post_value(post=first_post, key="id", expected_type=int)
+        import pydiscourse.exceptions
+
+        if expected_revision is None:
+            first_post = self._retrieve_topic_first_post(url=url)
+            post_id = self._get_post_value(post=first_post, key="id", expected_type=int)
+        else:
+            # The revision identifies the first post, only its version is read again
+            post_id = expected_revision.post_id
+            first_post = self._retrieve_post(post_id=post_id, url=url)
+            if (revision := self._first_post_revision(first_post)) != expected_revision:
+                raise DiscourseTopicChangedError(
+                    f"The topic has changed on the server, {url=!r}, {expected_revision=}, "
+                    f"{revision=}"
+                )
         try:
-            self._client.update_post(post_id=post_id, content=content, edit_reason=edit_reason)
+            with self._api_request("update_post"):
+                self._client.update_post(post_id=post_id, content=content, edit_reason=edit_reason)
         except pydiscourse.exceptions.DiscourseError as discourse_error:
             raise DiscourseError(
                 f"Error updating the topic, {url=!r}, {content=!r}, {discourse_error=}"
             ) from discourse_error
-
+        if isinstance(topic_id := first_post.get("topic_id"), int):
+            self._discard_mirrored(topic_id)
+        if self.snapshot is not None and (id_ := sync.topic_id(url)) is not None:
+            self.snapshot.discard(id_)
+
+        if expected_revision is not None:
+            return self._topic_info_to_absolute_url(
+                _DiscourseTopicInfo(
+                    slug=self._get_post_value(
+                        post=first_post, key="topic_slug", expected_type=str
+                    ),
+                    id_=self._get_post_value(post=first_post, key="topic_id", expected_type=int),
+                )
+            )
         return self.absolute_url(url=url)
 
     @property
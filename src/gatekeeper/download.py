@@ -3,7 +3,9 @@
 
 """Library for downloading docs folder from charmhub."""
 
-import shutil
+import logging
+from collections.abc import Mapping
+from pathlib import Path
 
 from gatekeeper.clients import Clients
 from gatekeeper.index import contents_from_page
@@ -12,11 +14,15 @@ from gatekeeper.migration import run as migrate_contents
 from gatekeeper.navigation_table import from_page as navigation_table_from_page
 
 
-def _download_from_discourse(clients: Clients) -> None:
+def _download_from_discourse(clients: Clients, known_blobs: Mapping[Path, str]) -> set[Path]:
     """Download docs folder locally from Discourse.
 
     Args:
         clients: Clients object
+        known_blobs: The SHA of the blob of the files in the docs folder by path.
+
+    Returns:
+        The paths of the downloaded files.
     """
     docs_path = clients.repository.docs_path
     metadata = clients.repository.metadata
@@ -27,17 +33,37 @@ def _download_from_discourse(clients: Clients) -> None:
     )
     index_content = contents_from_page(server_content)
     table_rows = navigation_table_from_page(page=server_content, discourse=clients.discourse)
-    migrate_contents(
+    return migrate_contents(
         table_rows=table_rows,
         index_content=index_content,
         discourse=clients.discourse,
         docs_path=docs_path,
+        known_blobs=known_blobs,
     )
 
 
+def _remove_files(paths: set[Path], docs_path: Path) -> None:
+    """Remove files and the directories left empty up to the docs folder.
+
+    Args:
+        paths: The files to remove.
+        docs_path: The docs folder.
+    """
+    for path in paths:
+        path.unlink(missing_ok=True)
+        parent = path.parent
+        while parent != docs_path and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+
 def recreate_docs(clients: Clients, base: str) -> bool:
     """Recreate the docs folder and checks whether the docs folder is aligned with base branch/tag.
 
+    The content from the server is compared with the files of the base in memory, only the files
+    with different content are written and only the files that are no longer on the server are
+    removed so that the working tree only changes where the server changed.
+
     Args:
         clients: Clients object containing Repository and Discourse API clients
         base: tag to be compared to
@@ -47,12 +73,11 @@ def recreate_docs(clients: Clients, base: str) -> bool:
     """
     clients.repository.switch(base)
 
-    # Remove docs folder and recreate content from discourse
     docs_path = clients.repository.docs_path
-
-    if docs_path.exists():
-        shutil.rmtree(docs_path)
-
-    _download_from_discourse(clients)
+    known_blobs = clients.repository.get_blob_shas(tree_ish=base, directory=docs_path)
+    downloaded_paths = _download_from_discourse(clients=clients, known_blobs=known_blobs)
+    removed_paths = known_blobs.keys() - downloaded_paths
+    logging.info("removing %s files that are no longer on the server", len(removed_paths))
+    _remove_files(paths=removed_paths, docs_path=docs_path)
 
     return clients.repository.is_dirty()
@@ -12,6 +12,10 @@ class InputError(BaseError):
     """A problem with the user input occurred."""
 
 
+class DeadlineExceededError(BaseError):
+    """The time budget of the run is used up."""
+
+
 class ServerError(BaseError):
     """A problem with the server storing the documentation occurred."""
 
@@ -24,6 +28,10 @@ class DiscourseError(BaseError):
     """Parent exception for all Discourse errors."""
 
 
+class DiscourseTopicChangedError(DiscourseError):
+    """The topic was edited on the server after its revision was recorded."""
+
+
 class NavigationTableParseError(BaseError):
     """A problem with the navigation table parsing occurred."""
 
@@ -58,3 +66,7 @@ class TaggingNotAllowedError(BaseError):
 
 class ContentError(BaseError):
     """A problem with the content occurred."""
+
+
+class BatchError(BaseError):
+    """Processing one or more of the charms of a batch failed."""
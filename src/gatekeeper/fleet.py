@@ -0,0 +1,675 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Reconcile and migrate the documentation of a fleet of repositories in parallel.
+
+Run using `python -m gatekeeper.fleet MANIFEST`, see `--help` for the options. The credentials are
+read from the DISCOURSE_API_USERNAME, DISCOURSE_API_KEY and GITHUB_TOKEN environment variables.
+The repositories can be split over several runners, see the shard module.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import sys
+import time
+import typing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib import parse
+
+import yaml
+from git.repo import Repo
+from github import Github
+from github.Auth import Token
+
+from gatekeeper import batch, metrics, pre_flight_checks, run_migrate, run_reconcile, shard
+from gatekeeper.clients import Clients
+from gatekeeper.discourse import Discourse, create_discourse
+from gatekeeper.exceptions import InputError, TaggingNotAllowedError
+from gatekeeper.repository import GITHUB_HOSTNAME, ORIGIN_NAME, create_repository_client
+from gatekeeper.sync import SyncTracker
+from gatekeeper.types_ import UserInputs, UserInputsDiscourse
+
+DEFAULT_WORKERS = 4
+# The default limit of Discourse for the requests of a user using an API key
+DEFAULT_DISCOURSE_REQUESTS_PER_MINUTE = 60
+DEFAULT_CACHE_DIR = ".gatekeeper-fleet"
+
+DISCOURSE_API_USERNAME_ENV_NAME = "DISCOURSE_API_USERNAME"
+DISCOURSE_API_KEY_ENV_NAME = "DISCOURSE_API_KEY"
+GITHUB_TOKEN_ENV_NAME = "GITHUB_TOKEN"
+
+# The clients and budgets of a worker process, reused for all the repositories it processes
+_RATE_BUDGETS: dict[str, "RateBudget"] = {}
+_DISCOURSE_CLIENTS: dict[tuple[str, str], Discourse] = {}
+_GITHUB_CLIENTS: dict[str, Github] = {}
+
+
+class RepositoryEntry(typing.NamedTuple):
+    """A repository of the manifest.
+
+    Attrs:
+        url: The URL to clone the repository from.
+        base_branch: The main branch of the repository.
+        charm_dir: Directory the charm is located in.
+        charm_dirs: Directories of the charms to process in one batch, if any.
+        discourse_host: The hostname of the Discourse server.
+        discourse_category_id: The category of the documentation topics.
+        dry_run: Whether to only log the changes rather than making them.
+        delete_topics: Whether to delete the topics that are no longer in the documentation.
+    """
+
+    url: str
+    base_branch: str
+    charm_dir: str
+    charm_dirs: tuple[str, ...]
+    discourse_host: str
+    discourse_category_id: str
+    dry_run: bool
+    delete_topics: bool
+
+
+class Credentials(typing.NamedTuple):
+    """The credentials shared by the repositories of the fleet.
+
+    Attrs:
+        discourse_api_username: The username to use for Discourse API requests.
+        discourse_api_key: The API key for Discourse API requests.
+        github_token: The token to clone, push to and open pull requests on the repositories.
+    """
+
+    discourse_api_username: str
+    discourse_api_key: str
+    github_token: str
+
+
+class RepositoryReport(typing.NamedTuple):
+    """The result of processing a repository.
+
+    Attrs:
+        url: The URL of the repository.
+        seconds: The time taken to process the repository.
+        error: Description of the problem that stopped the processing, if any.
+        outputs: The outputs of the action for the repository.
+        metrics: The counts and timings of the calls made for the repository.
+    """
+
+    url: str
+    seconds: float
+    error: str | None
+    outputs: dict[str, typing.Any]
+    metrics: dict[str, typing.Any]
+
+
+class RateBudget:  # pylint: disable=too-few-public-methods
+    """Token bucket limiting the rate of requests to a host across processes.
+
+    Allows bursts of up to the number of requests per minute, the budget is refilled continuously.
+    """
+
+    def __init__(self, requests_per_minute: int) -> None:
+        """Construct.
+
+        Args:
+            requests_per_minute: The number of requests allowed per minute.
+        """
+        self._capacity = float(requests_per_minute)
+        self._rate = requests_per_minute / 60
+        # The remaining tokens and the time they were last refilled
+        self._state = multiprocessing.Array("d", (self._capacity, time.monotonic()))
+
+    def acquire(self) -> None:
+        """Wait until a request is allowed and use it from the budget."""
+        while True:
+            with self._state.get_lock():
+                now = time.monotonic()
+                tokens = min(self._capacity, self._state[0] + (now - self._state[1]) * self._rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+                self._state[0] = tokens
+                wait = (1 - tokens) / self._rate
+            time.sleep(wait)
+
+
+def _get_str(values: dict[str, typing.Any], key: str, default: str) -> str:
+    """Get a string value of the manifest.
+
+    Args:
+        values: The values to get the value from.
+        key: The key of the value.
+        default: The value if the key is missing.
+
+    Returns:
+        The value.
+
+    Raises:
+        InputError: if the value is not a string or an integer.
+    """
+    value = values.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise InputError(f"Invalid manifest, {key} must be a string, got {value=!r}")
+    return str(value)
+
+
+def _get_bool(values: dict[str, typing.Any], key: str, default: bool) -> bool:
+    """Get a boolean value of the manifest.
+
+    Args:
+        values: The values to get the value from.
+        key: The key of the value.
+        default: The value if the key is missing.
+
+    Returns:
+        The value.
+
+    Raises:
+        InputError: if the value is not a boolean.
+    """
+    value = values.get(key, default)
+    if not isinstance(value, bool):
+        raise InputError(f"Invalid manifest, {key} must be a boolean, got {value=!r}")
+    return value
+
+
+def _parse_entry(values: typing.Any, defaults: dict[str, typing.Any]) -> RepositoryEntry:
+    """Parse a repository of the manifest.
+
+    Args:
+        values: The values for the repository.
+        defaults: The top level values of the manifest used for the missing values.
+
+    Returns:
+        The repository.
+
+    Raises:
+        InputError: if the values are not valid.
+    """
+    if not isinstance(values, dict) or not values.get("url"):
+        raise InputError(f"Invalid manifest, each repository must have a url, got {values=!r}")
+    values = defaults | values
+    charm_dirs = values.get("charm_dirs", [])
+    if not isinstance(charm_dirs, list) or not all(isinstance(item, str) for item in charm_dirs):
+        raise InputError(f"Invalid manifest, charm_dirs must be a list, got {charm_dirs=!r}")
+
+    return RepositoryEntry(
+        url=_get_str(values, "url", ""),
+        base_branch=_get_str(values, "base_branch", "main"),
+        charm_dir=_get_str(values, "charm_dir", ""),
+        charm_dirs=tuple(charm_dirs),
+        discourse_host=_get_str(values, "discourse_host", ""),
+        discourse_category_id=_get_str(values, "discourse_category_id", ""),
+        dry_run=_get_bool(values, "dry_run", False),
+        delete_topics=_get_bool(values, "delete_topics", True),
+    )
+
+
+def load_manifest(path: Path) -> tuple[RepositoryEntry, ...]:
+    """Read the repositories of the fleet.
+
+    The manifest is a YAML file with a repositories list, each with a url and optionally any of
+    base_branch, charm_dir, charm_dirs, discourse_host, discourse_category_id, dry_run and
+    delete_topics. The keys other than url and charm_dirs can also be set at the top level as the
+    default for all the repositories.
+
+    Args:
+        path: The manifest file.
+
+    Returns:
+        The repositories.
+
+    Raises:
+        InputError: if the manifest cannot be read or is not valid.
+    """
+    try:
+        manifest = yaml.safe_load(path.read_text(encoding="utf-8"))
+    except (OSError, yaml.YAMLError) as exc:
+        raise InputError(f"Invalid manifest, could not be read, {path=}") from exc
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("repositories"), list):
+        raise InputError(f"Invalid manifest, expected a repositories list, {path=}")
+    defaults = {
+        key: value
+        for key, value in manifest.items()
+        if key not in {"repositories", "url", "charm_dirs"}
+    }
+    return tuple(_parse_entry(values, defaults) for values in manifest["repositories"])
+
+
+def get_credentials() -> Credentials:
+    """Read the credentials from the environment.
+
+    Returns:
+        The credentials.
+
+    Raises:
+        InputError: if any of the credentials are missing.
+    """
+    credentials = Credentials(
+        discourse_api_username=os.getenv(DISCOURSE_API_USERNAME_ENV_NAME, ""),
+        discourse_api_key=os.getenv(DISCOURSE_API_KEY_ENV_NAME, ""),
+        github_token=os.getenv(GITHUB_TOKEN_ENV_NAME, ""),
+    )
+    if not all(credentials):
+        raise InputError(
+            f"The {DISCOURSE_API_USERNAME_ENV_NAME}, {DISCOURSE_API_KEY_ENV_NAME} and "
+            f"{GITHUB_TOKEN_ENV_NAME} environment variables must be set"
+        )
+    return credentials
+
+
+def _cache_name(url: str) -> str:
+    """Get the name of the directory a repository is cached in.
+
+    Args:
+        url: The URL of the repository.
+
+    Returns:
+        The name, derived from the host and path of the URL.
+    """
+    parts = parse.urlsplit(url)
+    name = f"{parts.hostname or ''}/{parts.path.removesuffix('.git')}"
+    return re.sub(r"[^\w.-]+", "_", name).strip("_.")
+
+
+def _configure_github_auth(repo: Repo, url: str, token: str) -> None:
+    """Configure the repository to authenticate to GitHub using the token.
+
+    Uses an HTTP header rather than the URL so that the token is not part of the git command lines
+    and the output of git.
+
+    Args:
+        repo: The repository.
+        url: The URL of the repository.
+        token: The GitHub token.
+    """
+    if not url.startswith(f"https://{GITHUB_HOSTNAME}/"):
+        return
+    basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    with repo.config_writer() as writer:
+        writer.set_value(
+            f'http "https://{GITHUB_HOSTNAME}/"', "extraheader", f"AUTHORIZATION: basic {basic}"
+        )
+
+
+def sync_repository(entry: RepositoryEntry, cache_dir: Path, github_token: str) -> Path:
+    """Clone or update a repository in the cache and check out the head of the base branch.
+
+    Args:
+        entry: The repository.
+        cache_dir: The directory the repositories are cached in.
+        github_token: The token to authenticate to GitHub with.
+
+    Returns:
+        The directory of the repository.
+    """
+    path = cache_dir / _cache_name(entry.url)
+    path.mkdir(parents=True, exist_ok=True)
+    repo = metrics.MeteredRepo.init(path)
+    _configure_github_auth(repo=repo, url=entry.url, token=github_token)
+    if any(remote.name == ORIGIN_NAME for remote in repo.remotes):
+        repo.git.remote("set-url", ORIGIN_NAME, entry.url)
+    else:
+        repo.create_remote(ORIGIN_NAME, entry.url)
+    repo.git.fetch(ORIGIN_NAME, "--tags", "--force", "--prune", "--prune-tags")
+    repo.git.checkout("--force", "-B", entry.base_branch, f"{ORIGIN_NAME}/{entry.base_branch}")
+    repo.git.clean("-fd")
+    return path
+
+
+def _init_worker(rate_budgets: dict[str, RateBudget]) -> None:
+    """Set up a worker process.
+
+    Args:
+        rate_budgets: The budgets for the requests to each Discourse host.
+    """
+    _RATE_BUDGETS.update(rate_budgets)
+
+
+def _get_discourse(entry: RepositoryEntry, credentials: Credentials) -> Discourse:
+    """Get the Discourse client of the process for the server and category of a repository.
+
+    Args:
+        entry: The repository.
+        credentials: The credentials of the fleet.
+
+    Returns:
+        The client, throttled using the budget of the host, if any.
+    """
+    key = (entry.discourse_host, entry.discourse_category_id)
+    if key not in _DISCOURSE_CLIENTS:
+        discourse = create_discourse(
+            hostname=entry.discourse_host,
+            category_id=entry.discourse_category_id,
+            api_username=credentials.discourse_api_username,
+            api_key=credentials.discourse_api_key,
+        )
+        if (rate_budget := _RATE_BUDGETS.get(entry.discourse_host.lower())) is not None:
+            discourse.throttle = rate_budget.acquire
+        _DISCOURSE_CLIENTS[key] = discourse
+    return _DISCOURSE_CLIENTS[key]
+
+
+def _get_github(token: str) -> Github:
+    """Get the GitHub client of the process.
+
+    Args:
+        token: The GitHub token.
+
+    Returns:
+        The client.
+    """
+    if token not in _GITHUB_CLIENTS:
+        _GITHUB_CLIENTS[token] = Github(auth=Token(token))
+    return _GITHUB_CLIENTS[token]
+
+
+def _run_repository(
+    entry: RepositoryEntry, cache_dir: Path, credentials: Credentials
+) -> dict[str, typing.Any]:
+    """Sync a repository and run the checks, reconcile and migration for it.
+
+    Args:
+        entry: The repository.
+        cache_dir: The directory the repositories are cached in.
+        credentials: The credentials of the fleet.
+
+    Returns:
+        The outputs of the action for the repository.
+
+    Raises:
+        TaggingNotAllowedError: if the checks of the repository failed.
+        InputError: if processing one or more of the charms of a batch failed.
+    """
+    path = sync_repository(entry=entry, cache_dir=cache_dir, github_token=credentials.github_token)
+    repository = create_repository_client(
+        access_token=credentials.github_token,
+        base_path=path,
+        charm_dir=entry.charm_dir,
+        github_client=_get_github(credentials.github_token),
+    )
+    discourse = _get_discourse(entry, credentials)
+    # The client is reused by the next repositories of the process, each tracks its own topics
+    discourse.sync = SyncTracker()
+    clients = Clients(discourse=discourse, repository=repository)
+    user_inputs = UserInputs(
+        discourse=UserInputsDiscourse(
+            hostname=entry.discourse_host,
+            category_id=entry.discourse_category_id,
+            api_username=credentials.discourse_api_username,
+            api_key=credentials.discourse_api_key,
+        ),
+        delete_pages=entry.delete_topics,
+        dry_run=entry.dry_run,
+        github_access_token=credentials.github_token,
+        commit_sha=repository.current_commit,
+        base_branch=entry.base_branch,
+        charm_dir=entry.charm_dir,
+        charm_dirs=entry.charm_dirs,
+    )
+
+    if entry.charm_dirs:
+        charm_outputs = batch.run(clients=clients, user_inputs=user_inputs)
+        outputs = {"charms": {charm.charm_dir: charm.to_outputs() for charm in charm_outputs}}
+        if failed := [charm.charm_dir for charm in charm_outputs if charm.error]:
+            raise InputError(f"Processing failed for the charms {failed}, outputs: {outputs}")
+        return outputs
+
+    if not pre_flight_checks(clients=clients, user_inputs=user_inputs):
+        raise TaggingNotAllowedError(
+            "The checks of the repository failed, see the log for details"
+        )
+    reconcile_outputs = run_reconcile(clients=clients, user_inputs=user_inputs)
+    migrate_outputs = run_migrate(clients=clients, user_inputs=user_inputs)
+    return batch.to_outputs(reconcile=reconcile_outputs, migrate=migrate_outputs)
+
+
+def _process_repository(
+    entry: RepositoryEntry, cache_dir: Path, credentials: Credentials
+) -> RepositoryReport:
+    """Process a repository in a worker process.
+
+    Args:
+        entry: The repository.
+        cache_dir: The directory the repositories are cached in.
+        credentials: The credentials of the fleet.
+
+    Returns:
+        The report for the repository, including any failure.
+    """
+    collector = metrics.get_collector()
+    collector.reset()
+    start = time.perf_counter()
+    outputs: dict[str, typing.Any] = {}
+    error = None
+    # A failure of one repository must not stop the other repositories of the fleet
+    try:
+        outputs = _run_repository(entry=entry, cache_dir=cache_dir, credentials=credentials)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        logging.exception("processing repository %s failed", entry.url)
+        error = f"{type(exc).__name__}: {exc}"
+    return RepositoryReport(
+        url=entry.url,
+        seconds=round(time.perf_counter() - start, 6),
+        error=error,
+        outputs=outputs,
+        metrics=collector.snapshot(),
+    )
+
+
+def _process_leased(
+    entry: RepositoryEntry,
+    cache_dir: Path,
+    credentials: Credentials,
+    leases: shard.LeaseDirectory,
+) -> RepositoryReport | None:
+    """Process a repository in a worker process unless another runner claimed it.
+
+    Args:
+        entry: The repository.
+        cache_dir: The directory the repositories are cached in.
+        credentials: The credentials of the fleet.
+        leases: The leases shared by the runners.
+
+    Returns:
+        The report for the repository, None if another runner claimed or processed it.
+    """
+    if not leases.acquire(entry.url):
+        logging.info("skipping repository %s claimed by another runner", entry.url)
+        return None
+    with leases.renewing(entry.url):
+        report = _process_repository(entry=entry, cache_dir=cache_dir, credentials=credentials)
+    leases.complete(entry.url, report._asdict())
+    return report
+
+
+def run(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    entries: Sequence[RepositoryEntry],
+    cache_dir: Path,
+    credentials: Credentials,
+    workers: int = DEFAULT_WORKERS,
+    discourse_requests_per_minute: int = DEFAULT_DISCOURSE_REQUESTS_PER_MINUTE,
+    runner_shard: shard.Shard | None = None,
+) -> tuple[RepositoryReport, ...]:
+    """Process the repositories using a pool of processes.
+
+    Each process reuses its Discourse and GitHub clients for the repositories it processes. The
+    requests to each Discourse host share one rate budget across all the processes of the runner.
+
+    Args:
+        entries: The repositories.
+        cache_dir: The directory the repositories are cached in.
+        credentials: The credentials of the fleet.
+        workers: The number of processes.
+        discourse_requests_per_minute: The rate budget for each Discourse host.
+        runner_shard: The part of the repositories to process when the fleet is split over
+            several runners, all the repositories if not given.
+
+    Returns:
+        The report for each repository processed by the runner.
+    """
+    if runner_shard is not None:
+        entry_lookup = {entry.url: entry for entry in entries}
+        entries = [
+            entry_lookup[url] for url in runner_shard.order([entry.url for entry in entries])
+        ]
+    rate_budgets = {
+        host: RateBudget(requests_per_minute=discourse_requests_per_minute)
+        for host in {entry.discourse_host.lower() for entry in entries}
+    }
+    leases = None if runner_shard is None else runner_shard.leases
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(rate_budgets,)
+    ) as executor:
+        futures = [
+            (
+                executor.submit(
+                    _process_repository,
+                    entry=entry,
+                    cache_dir=cache_dir.resolve(),
+                    credentials=credentials,
+                )
+                if leases is None
+                else executor.submit(
+                    _process_leased,
+                    entry=entry,
+                    cache_dir=cache_dir.resolve(),
+                    credentials=credentials,
+                    leases=leases,
+                )
+            )
+            for entry in entries
+        ]
+        reports = tuple(report for future in futures if (report := future.result()) is not None)
+
+    for report in reports:
+        logging.info(
+            "%s: %s in %.1fs",
+            report.url,
+            f"failed, {report.error}" if report.error else "done",
+            report.seconds,
+        )
+    return reports
+
+
+def write_report(reports: Sequence[RepositoryReport], path: Path) -> None:
+    """Write the consolidated report of the fleet.
+
+    Args:
+        reports: The reports of the repositories.
+        path: The file to write the report to.
+    """
+    report = {
+        "repositories": [repository_report._asdict() for repository_report in reports],
+        "failed": [
+            repository_report.url for repository_report in reports if repository_report.error
+        ],
+        "seconds": round(sum(repository_report.seconds for repository_report in reports), 6),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the fleet sync command.
+
+    Args:
+        argv: The command line arguments, the arguments of the process if not given.
+
+    Returns:
+        The exit code, 1 if any of the repositories failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m gatekeeper.fleet",
+        description="Reconcile and migrate the documentation of the repositories of a manifest.",
+    )
+    parser.add_argument("manifest", type=Path, help="YAML file listing the repositories")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(DEFAULT_CACHE_DIR),
+        help="directory to clone the repositories into and reuse them from",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of processes")
+    parser.add_argument(
+        "--discourse-requests-per-minute",
+        type=int,
+        default=DEFAULT_DISCOURSE_REQUESTS_PER_MINUTE,
+        help="requests per minute shared by all the processes for each Discourse host",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="JSON file to write the report to, for all the runners if there is a lease directory",
+    )
+    parser.add_argument(
+        "--shard-count", type=int, default=1, help="number of runners sharing the manifest"
+    )
+    parser.add_argument("--shard-index", type=int, default=0, help="shard of this runner")
+    parser.add_argument(
+        "--lease-dir",
+        type=Path,
+        help=(
+            "directory shared by the runners to claim repositories in, enables stealing from "
+            "other shards, use a new directory for each run"
+        ),
+    )
+    parser.add_argument(
+        "--runner-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="identifier of this runner, reuse it to resume the leases of a stopped runner",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=shard.DEFAULT_LEASE_SECONDS,
+        help="time after which the lease of a runner that stopped is resumed by another runner",
+    )
+    args = parser.parse_args(argv)
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be at least 0 and less than --shard-count")
+
+    logging.basicConfig(level=logging.INFO)
+    leases = (
+        None
+        if args.lease_dir is None
+        else shard.LeaseDirectory(
+            path=args.lease_dir, owner=args.runner_id, seconds=args.lease_seconds
+        )
+    )
+    reports = run(
+        entries=load_manifest(args.manifest),
+        cache_dir=args.cache_dir,
+        credentials=get_credentials(),
+        workers=args.workers,
+        discourse_requests_per_minute=args.discourse_requests_per_minute,
+        runner_shard=(
+            None
+            if args.shard_count == 1 and leases is None
+            else shard.Shard(
+                shard_index=args.shard_index, shard_count=args.shard_count, leases=leases
+            )
+        ),
+    )
+    if args.report:
+        write_report(
+            reports=(
+                reports
+                if leases is None
+                else tuple(RepositoryReport(**result) for result in leases.results())
+            ),
+            path=args.report,
+        )
+    return 1 if any(report.error for report in reports) else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
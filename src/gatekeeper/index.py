@@ -3,6 +3,7 @@
 
 """Execute the uploading of documentation."""
 
+import functools
 import itertools
 import re
 import typing
@@ -87,9 +88,13 @@ def get(metadata: Metadata, docs_path: Path, server_client: Discourse) -> Index:
     return Index(server=server, local=local, name=name_value)
 
 
+@functools.lru_cache(maxsize=32)
 def contents_from_page(page: str) -> str:
     """Get index file contents from server page.
 
+    The result is memoized on the page so that repeated comparisons against the same server page
+    do not split it again.
+
     Args:
         page: Page contents from server.
 
@@ -126,6 +131,9 @@ class _ParsedListItem(typing.NamedTuple):
 def _parse_item_from_line(line: str, rank: int) -> _ParsedListItem:
     """Parse an index list item from a contents line.
 
+    Only lines starting with an HTML comment are tried against the hidden item and comment
+    patterns, all other lines are only tried against the item pattern.
+
     Args:
         line: The contents line to parse.
         rank: The number of previous items.
@@ -138,13 +146,11 @@ def _parse_item_from_line(line: str, rank: int) -> _ParsedListItem:
             - When an item is malformed.
             - When the first item has leading whitespace.
     """
-    hidden = False
-    if not (match := _ITEM_PATTERN.match(line)):
-        match = _HIDDEN_ITEM_PATTERN.match(line)
-        hidden = True
+    hidden = line.lstrip(" ").startswith("<!--")
+    match = _HIDDEN_ITEM_PATTERN.match(line) if hidden else _ITEM_PATTERN.match(line)
 
     if match is None:
-        comment_match = _COMMENT_ITEM.match(line)
+        comment_match = _COMMENT_ITEM.match(line) if hidden else None
         if not comment_match:
             raise InputError(
                 f"An item in the contents of the index file at {DOCUMENTATION_INDEX_FILENAME} is "
@@ -184,39 +190,56 @@ def _parse_item_from_line(line: str, rank: int) -> _ParsedListItem:
     )
 
 
-class _IndexSection(Enum):
-    """The sections of the index file.
+class _ParsedIndexFile(typing.NamedTuple):
+    """The result of a single pass over the content of the index file.
 
     Attrs:
-        CONTENTS: The contents section.
-        EX_CONTENTS: Everything except the contents section.
+        server_content: The content of the index file that should be stored on the server.
+        items: The parsed items of the contents section up to the first invalid item.
+        error: The description of the first invalid item of the contents section, if any.
     """
 
-    CONTENTS = auto()
-    EX_CONTENTS = auto()
+    server_content: str
+    items: tuple[_ParsedListItem, ...]
+    error: str | None
 
 
-def _iter_index_lines(lines: typing.Iterable[str], section: _IndexSection) -> typing.Iterator[str]:
-    """Remove the contents section lines from the index contents.
+@functools.lru_cache(maxsize=32)
+def _parse_index_file(content: str) -> _ParsedIndexFile:
+    """Split the index file into the server content and the contents section items.
+
+    The lines are only iterated over once and the result is memoized on the content of the index
+    file so that the reconcile, sort and checks all reuse the same parsed items.
 
     Args:
-        lines: The lines of the index file.
-        section: The part of the index file to return lines for.
+        content: The content of the index file.
 
-    Yields:
-        All lines except the lines of the contents section.
+    Returns:
+        The parsed index file.
     """
+    server_lines: list[str] = []
+    items: list[_ParsedListItem] = []
+    error: str | None = None
     contents_encountered = False
-    drop_lines = section == _IndexSection.CONTENTS
-    for line in lines:
+    in_contents = False
+    for line in content.splitlines():
         if not contents_encountered and line.lower() == CONTENTS_HEADER:
-            contents_encountered = True
-            drop_lines = section == _IndexSection.EX_CONTENTS
-        elif line.startswith(CONTENTS_END_LINE_PREFIX):
-            drop_lines = section == _IndexSection.CONTENTS
-
-        if not drop_lines:
-            yield line
+            contents_encountered = in_contents = True
+            continue
+        if line.startswith(CONTENTS_END_LINE_PREFIX):
+            in_contents = False
+
+        if not in_contents:
+            server_lines.append(line)
+        elif line and error is None:
+            try:
+                items.append(_parse_item_from_line(line=line, rank=len(items)))
+            except InputError as exc:
+                error = str(exc)
+
+    return _ParsedIndexFile(
+        server_content="\n".join(server_lines), items=tuple(items), error=error
+    )
 
 
 def get_content_for_server(index_file: IndexFile) -> str:
@@ -231,9 +254,7 @@ def get_content_for_server(index_file: IndexFile) -> str:
     if index_file.content is None:
         return ""
 
-    return "\n".join(
-        _iter_index_lines(index_file.content.splitlines(), section=_IndexSection.EX_CONTENTS)
-    )
+    return _parse_index_file(index_file.content).server_content
 
 
 def _get_contents_parsed_items(index_file: IndexFile) -> typing.Iterator[_ParsedListItem]:
@@ -244,20 +265,17 @@ def _get_contents_parsed_items(index_file: IndexFile) -> typing.Iterator[_Parsed
 
     Yields:
         All the items on the contents list in the index file.
+
+    Raises:
+        InputError: if an item on the contents list is invalid.
     """
     if index_file.content is None:
         return
 
-    # Get the lines of the contents section
-    contents_lines = _iter_index_lines(
-        index_file.content.splitlines(), section=_IndexSection.CONTENTS
-    )
-    # Skip header
-    next(contents_lines, None)
-    yield from (
-        _parse_item_from_line(line=line, rank=rank)
-        for line, rank in zip(filter(None, contents_lines), itertools.count())
-    )
+    parsed_index_file = _parse_index_file(index_file.content)
+    yield from parsed_index_file.items
+    if parsed_index_file.error is not None:
+        raise InputError(parsed_index_file.error)
 
 
 class ItemReferenceType(Enum):
@@ -433,15 +451,20 @@ def _calculate_contents_hierarchy(
         item = next_item
 
 
-def get_contents(index_file: IndexFile, docs_path: Path) -> typing.Iterator[IndexContentsListItem]:
+def get_contents(index_file: IndexFile, docs_path: Path) -> tuple[IndexContentsListItem, ...]:
     """Get the contents list items from the index file.
 
+    The items are returned as a tuple so that the checks and the sort can both iterate over them
+    without parsing the index file again. Only the parsing is memoized, the hierarchy depends on
+    which references are files or directories in docs_path which changes when the branch is
+    switched, and it is only calculated once for each reconcile.
+
     Args:
         index_file: The index file to read the contents from.
         docs_path: The base directory of all items.
 
     Returns:
-        Iterator with all items from the contents list.
+        All items from the contents list.
     """
     parsed_items = _get_contents_parsed_items(index_file=index_file)
-    return _calculate_contents_hierarchy(parsed_items=parsed_items, docs_path=docs_path)
+    return tuple(_calculate_contents_hierarchy(parsed_items=parsed_items, docs_path=docs_path))
@@ -0,0 +1,103 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Interning of the content of the pages read during a run.
+
+The local, tag and server content of a page is often equal. Interning each content returns the
+copy interned first, so equal contents are held once and the actions referencing them share it.
+The content is not looked up by a key, the actions hold and compare the strings themselves.
+"""
+
+import contextvars
+import threading
+import typing
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class InternerStats(typing.NamedTuple):
+    """The content held by an interner.
+
+    Attrs:
+        unique: The number of unique contents.
+        size: The total number of characters of the unique contents.
+        interned: The number of contents interned, including duplicates.
+    """
+
+    unique: int
+    size: int
+    interned: int
+
+
+class ContentInterner:
+    """Keep the first copy of each content.
+
+    Contents are equal if they have the same characters, equal contents returned by the interner
+    are also the same object, which makes comparing them cheap. Interning is thread safe.
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self._lock = threading.Lock()
+        self._contents: dict[str, str] = {}
+        self._interned = 0
+
+    def intern(self, content: str) -> str:
+        """Get the copy of a content interned first.
+
+        Args:
+            content: The content to intern.
+
+        Returns:
+            The first copy of the content, the content itself if it was not interned before.
+        """
+        with self._lock:
+            self._interned += 1
+            return self._contents.setdefault(content, content)
+
+    def stats(self) -> InternerStats:
+        """Get the amount of content held by the interner.
+
+        Returns:
+            The number and size of the unique contents and the number of contents interned.
+        """
+        with self._lock:
+            return InternerStats(
+                unique=len(self._contents),
+                size=sum(len(content) for content in self._contents),
+                interned=self._interned,
+            )
+
+
+_INTERNER: contextvars.ContextVar[ContentInterner | None] = contextvars.ContextVar(
+    "interner", default=None
+)
+
+
+@contextmanager
+def scope() -> Iterator[ContentInterner]:
+    """Intern the content with a new interner until the context exits.
+
+    The interner is set for the current context only, the runs of other threads use their own.
+
+    Yields:
+        The interner of the scope.
+    """
+    token = _INTERNER.set(interner := ContentInterner())
+    try:
+        yield interner
+    finally:
+        _INTERNER.reset(token)
+
+
+def intern(content: str) -> str:
+    """Intern a content with the interner of the current scope.
+
+    Args:
+        content: The content to intern.
+
+    Returns:
+        The first copy of the content, the content itself outside of a scope.
+    """
+    interner = _INTERNER.get()
+    return content if interner is None else interner.intern(content)
@@ -0,0 +1,253 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Record the completed actions of a reconcile so that a run that stopped can resume."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import typing
+from pathlib import Path
+
+from gatekeeper import types_
+from gatekeeper.sync import topic_id
+
+JOURNAL_VERSION = 1
+
+# The actions that change the server, the others are cheap to take again
+_JOURNALED_ACTIONS = (types_.CreatePageAction, types_.UpdatePageAction, types_.DeletePageAction)
+# The charms of a batch share the file
+_LOCK = threading.Lock()
+
+
+def _fingerprint(action: types_.AnyAction) -> str:
+    """Hash what an action applies to the server.
+
+    The content on the server is not included since it changes once the action is taken.
+
+    Args:
+        action: The action to hash.
+
+    Returns:
+        The hex digest for the action.
+    """
+    applied = {
+        "type": type(action).__name__,
+        "path": list(action.path),
+        "navlink_title": getattr(action, "navlink_title", None),
+        "navlink_hidden": getattr(action, "navlink_hidden", None),
+        "navlink": getattr(action, "navlink", None),
+        "content": getattr(action, "content", None),
+    }
+    if isinstance(action, types_.UpdatePageAction):
+        applied["navlink"] = action.navlink_change.new
+        applied["content"] = action.content_change.local if action.content_change else None
+    return hashlib.sha256(json.dumps(applied).encode("utf-8")).hexdigest()
+
+
+def _encode_report(report: types_.ActionReport) -> dict[str, typing.Any]:
+    """Convert a report into a JSON serializable dictionary.
+
+    Args:
+        report: The report to convert.
+
+    Returns:
+        The fields of the report.
+    """
+    return {
+        "table_row": (
+            None
+            if report.table_row is None
+            else {
+                "level": report.table_row.level,
+                "path": list(report.table_row.path),
+                "navlink": report.table_row.navlink._asdict(),
+            }
+        ),
+        "location": None if report.location is None else str(report.location),
+        "result": report.result.value,
+        "reason": report.reason,
+    }
+
+
+def _decode_report(value: dict[str, typing.Any]) -> types_.ActionReport:
+    """Convert the output of _encode_report back into a report.
+
+    Args:
+        value: The fields of the report.
+
+    Returns:
+        The report.
+    """
+    table_row = value["table_row"]
+    return types_.ActionReport(
+        table_row=(
+            None
+            if table_row is None
+            else types_.TableRow(
+                level=table_row["level"],
+                path=tuple(table_row["path"]),
+                navlink=types_.Navlink(**table_row["navlink"]),
+            )
+        ),
+        location=value["location"],
+        result=types_.ActionResult(value["result"]),
+        reason=value["reason"],
+    )
+
+
+class Journal:
+    """The completed actions of the reconcile of a charm, stored in a file.
+
+    Each completed action is appended to the file as a JSON line and written to disk before the
+    next action is taken, so the file survives the runner being stopped and can be kept between
+    runs, e.g., using the actions cache. The charms of a batch can share the file, their entries
+    are kept apart by the name of the charm.
+
+    The entries record the commit of the documentation tag the actions were computed against.
+    Once a later run moved the tag, the server has been reconciled since and the entries of the
+    earlier run have expired.
+
+    Attrs:
+        path: The file the journal is stored in.
+        name: The name of the charm the journal is for.
+    """
+
+    def __init__(self, path: Path, name: str, discourse_host: str, base: str | None) -> None:
+        """Construct, reading the entries of the charm an earlier run left in the file.
+
+        Args:
+            path: The file the journal is stored in.
+            name: The name of the charm the journal is for.
+            discourse_host: The server the actions are taken against.
+            base: The commit of the documentation tag when the run started, None if there is no
+                tag.
+        """
+        self.path = path
+        self.name = name
+        self._discourse_host = discourse_host
+        self._base = base
+        self._completed: dict[str, types_.ActionReport] = {}
+        self._deleted: set[int] = set()
+        for entry in self._read_entries():
+            if not self._is_own(entry) or entry.get("base") != base:
+                continue
+            report = _decode_report(entry["report"])
+            self._completed[entry["fingerprint"]] = report
+            if entry.get("deleted") and (id_ := topic_id(str(report.location))) is not None:
+                self._deleted.add(id_)
+        if self._completed:
+            logging.info(
+                "Journal %s has %s actions completed by an earlier run", path, len(self._completed)
+            )
+
+    def _read_entries(self) -> list[dict[str, typing.Any]]:
+        """Read the entries in the file.
+
+        Lines that cannot be read, such as a line that was being written when the runner was
+        stopped, are skipped.
+
+        Returns:
+            The entries of all the charms.
+        """
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and entry.get("version") == JOURNAL_VERSION:
+                entries.append(entry)
+        return entries
+
+    def _is_own(self, entry: dict[str, typing.Any]) -> bool:
+        """Check whether an entry is for the charm and server of the journal.
+
+        Args:
+            entry: The entry to check.
+
+        Returns:
+            Whether the entry belongs to the journal.
+        """
+        return entry.get("name") == self.name and entry.get("discourse_host") == (
+            self._discourse_host
+        )
+
+    def completed(self, action: types_.AnyAction) -> types_.ActionReport | None:
+        """Get the report of an action completed by an earlier run.
+
+        Args:
+            action: The action to look up.
+
+        Returns:
+            The report of the earlier run, None if the action has not been completed.
+        """
+        if not isinstance(action, _JOURNALED_ACTIONS):
+            return None
+        return self._completed.get(_fingerprint(action))
+
+    def is_deleted(self, url: str) -> bool:
+        """Check whether an earlier run deleted a page.
+
+        The page stays on the navigation table of the index until the index is updated.
+
+        Args:
+            url: The link to the page.
+
+        Returns:
+            Whether the page was deleted by an earlier run.
+        """
+        return topic_id(url) in self._deleted
+
+    def record(self, action: types_.AnyAction, report: types_.ActionReport) -> None:
+        """Add a completed action to the journal.
+
+        Only successful actions that changed the server are recorded.
+
+        Args:
+            action: The action that was taken.
+            report: The report of the action.
+        """
+        if (
+            not isinstance(action, _JOURNALED_ACTIONS)
+            or report.result != types_.ActionResult.SUCCESS
+        ):
+            return
+        fingerprint = _fingerprint(action)
+        line = json.dumps(
+            {
+                "version": JOURNAL_VERSION,
+                "name": self.name,
+                "discourse_host": self._discourse_host,
+                "base": self._base,
+                "fingerprint": fingerprint,
+                "deleted": isinstance(action, types_.DeletePageAction),
+                "report": _encode_report(report),
+            }
+        )
+        with _LOCK:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as journal_file:
+                journal_file.write(f"{line}\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+        self._completed[fingerprint] = report
+
+    def clear(self) -> None:
+        """Remove the entries of the charm, including expired ones, once its reconcile completed."""
+        with _LOCK:
+            others = [entry for entry in self._read_entries() if not self._is_own(entry)]
+            if others:
+                self.path.write_text(
+                    "".join(f"{json.dumps(entry)}\n" for entry in others), encoding="utf-8"
+                )
+            else:
+                self.path.unlink(missing_ok=True)
+        self._completed.clear()
+        self._deleted.clear()
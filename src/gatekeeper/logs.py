@@ -0,0 +1,194 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Control how much of the actions and their content is written to the log."""
+
+import dataclasses
+import json
+import logging
+import threading
+import typing
+from enum import Enum
+from pathlib import Path
+
+from gatekeeper import content
+
+
+class LogMode(str, Enum):
+    """The amount of detail logged for the actions.
+
+    Attrs:
+        FULL: Log the actions including their content and the diff of each content change.
+        COMPACT: Log the type, path and content hash of the actions, the diffs are only logged at
+            the debug level and the full actions are written to the payload file, if any.
+    """
+
+    FULL = "full"
+    COMPACT = "compact"
+
+
+@dataclasses.dataclass
+class LogConfig:
+    """The logging configuration of the run.
+
+    Attrs:
+        mode: The amount of detail logged for the actions.
+        payload_file: The file the full actions are written to in compact mode, if any.
+    """
+
+    mode: LogMode = LogMode.FULL
+    payload_file: Path | None = None
+
+
+_CONFIG = LogConfig()
+_PAYLOAD_LOCK = threading.Lock()
+
+
+def configure(mode: LogMode = LogMode.FULL, payload_file: Path | None = None) -> None:
+    """Set the logging configuration of the process.
+
+    Args:
+        mode: The amount of detail logged for the actions.
+        payload_file: The file to write the full actions to in compact mode, it is emptied.
+    """
+    _CONFIG.mode = mode
+    _CONFIG.payload_file = payload_file
+    if payload_file is not None:
+        payload_file.write_text("", encoding="utf-8")
+
+
+def get_config() -> LogConfig:
+    """Get the logging configuration of the process.
+
+    Returns:
+        The configuration.
+    """
+    return _CONFIG
+
+
+def _content_hash(value: str | None) -> str:
+    """Get a short hash of a content to identify it in the log.
+
+    Args:
+        value: The content.
+
+    Returns:
+        The start of the sha256 of the content or none.
+    """
+    return "none" if value is None else content.short_sha256(value)
+
+
+def summarize(value: typing.Any) -> str:
+    """Describe an action by its type, location and the hash of its content.
+
+    Args:
+        value: The action or other value to describe.
+
+    Returns:
+        The description.
+    """
+    parts = []
+    if (path := getattr(value, "path", None)) is not None:
+        parts.append(f"path={path}")
+    elif (url := getattr(value, "url", None)) is not None:
+        parts.append(f"url={url}")
+    if isinstance(page_content := getattr(value, "content", None), str):
+        parts.append(f"content={_content_hash(page_content)}")
+    if isinstance(change := getattr(value, "content_change", None), tuple):
+        hashes = (
+            f"{name}:{_content_hash(field)}"
+            for name, field in change._asdict().items()  # type: ignore[attr-defined]
+        )
+        parts.append(f"content_change=({', '.join(hashes)})")
+    return f"{type(value).__name__}({', '.join(parts)})"
+
+
+class _Summary:  # pylint: disable=too-few-public-methods
+    """Describe a value with summarize when the log message is formatted."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: typing.Any) -> None:
+        """Construct.
+
+        Args:
+            value: The value to describe.
+        """
+        self._value = value
+
+    def __str__(self) -> str:
+        """Describe the value.
+
+        Returns:
+            The description.
+        """
+        return summarize(self._value)
+
+
+class _Diff:  # pylint: disable=too-few-public-methods
+    """Compute the diff of a content change when the log message is formatted."""
+
+    __slots__ = ("_first", "_second")
+
+    def __init__(self, first: str, second: str) -> None:
+        """Construct.
+
+        Args:
+            first: The content before the change.
+            second: The content after the change.
+        """
+        self._first = first
+        self._second = second
+
+    def __str__(self) -> str:
+        """Compute the diff.
+
+        Returns:
+            The diff of the content change.
+        """
+        return content.diff(self._first, self._second)
+
+
+def _write_payload(value: typing.Any) -> None:
+    """Append the full representation of a value to the payload file.
+
+    Args:
+        value: The value to write.
+    """
+    if _CONFIG.payload_file is None:
+        return
+    line = json.dumps({"summary": summarize(value), "payload": str(value)})
+    with _PAYLOAD_LOCK, _CONFIG.payload_file.open("a", encoding="utf-8") as payload_file:
+        payload_file.write(f"{line}\n")
+
+
+def payload(value: typing.Any) -> typing.Any:
+    """Get what to log for a value that includes content.
+
+    In compact mode the full value is written to the payload file, if any, instead of the log.
+
+    Args:
+        value: The action or other value including content.
+
+    Returns:
+        The value in full mode, otherwise a summary that is only computed if the message is logged.
+    """
+    if _CONFIG.mode == LogMode.FULL:
+        return value
+    _write_payload(value)
+    return _Summary(value)
+
+
+def content_change(first: str, second: str) -> None:
+    """Log the diff of a content change.
+
+    The diff is logged at the info level in full mode and at the debug level in compact mode. It
+    is only computed if the message is logged.
+
+    Args:
+        first: The content before the change.
+        second: The content after the change.
+    """
+    level = logging.INFO if _CONFIG.mode == LogMode.FULL else logging.DEBUG
+    if logging.getLogger().isEnabledFor(level):
+        logging.log(level, "content change:\n%s", _Diff(first, second))
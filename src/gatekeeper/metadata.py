@@ -3,9 +3,10 @@
 
 """Module for parsing metadata.yaml file."""
 
-from pathlib import Path
+# yaml is imported where the files are parsed since many runs finish without reading the metadata
+# pylint: disable=import-outside-toplevel
 
-import yaml
+from pathlib import Path
 
 from gatekeeper import types_
 from gatekeeper.exceptions import InputError
@@ -63,6 +64,8 @@ def _parse_metadata_yaml(metadata_yaml: Path) -> types_.Metadata:
     Raises:
         InputError: if the metadata file does not exist or are malformed.
     """
+    import yaml
+
     try:
         metadata = yaml.safe_load(metadata_yaml.read_text())
     except yaml.error.YAMLError as exc:
@@ -107,6 +110,8 @@ def _parse_charmcraft_yaml(charmcraft_yaml: Path) -> types_.Metadata:
     Raises:
         InputError: if the charmcraft file does not exist or are malformed.
     """
+    import yaml
+
     try:
         charmcraft = yaml.safe_load(charmcraft_yaml.read_text())
     except yaml.error.YAMLError as exc:
@@ -0,0 +1,179 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Collect counts and timings of the calls made during a run."""
+
+import threading
+import time
+import typing
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+
+from git.cmd import Git
+from git.repo import Repo
+
+METRICS_VERSION = 1
+
+PHASE = "phases"
+DISCOURSE = "discourse"
+GITHUB = "github"
+GIT = "git"
+MERGE = "merge"
+EXTERNAL_REF = "external_refs"
+MIRROR = "mirror"
+
+PHASE_CHECKS = "checks"
+PHASE_INDEX_FETCH = "index_fetch"
+PHASE_TABLE_PARSE = "table_parse"
+PHASE_RECONCILE = "reconcile"
+PHASE_CONFLICTS = "conflicts"
+PHASE_APPLY = "apply"
+PHASE_MIGRATE = "migrate"
+
+
+class Measurement(typing.NamedTuple):
+    """The accumulated measurements of one kind of call.
+
+    Attrs:
+        calls: The number of calls.
+        seconds: The total number of seconds spent in the calls.
+    """
+
+    calls: int
+    seconds: float
+
+
+class Collector:
+    """Accumulate the number of calls and the time spent in them.
+
+    Calls are grouped by a category, such as the Discourse endpoints, and a name within the
+    category. Recording is thread safe.
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self._lock = threading.Lock()
+        self._measurements: dict[str, dict[str, Measurement]] = {}
+
+    def record(self, category: str, name: str, seconds: float) -> None:
+        """Add a call to the measurements.
+
+        Args:
+            category: The kind of call, e.g., DISCOURSE.
+            name: The name of the call within the category.
+            seconds: The time the call took.
+        """
+        with self._lock:
+            measurements = self._measurements.setdefault(category, {})
+            calls, total_seconds = measurements.get(name, Measurement(calls=0, seconds=0.0))
+            measurements[name] = Measurement(calls=calls + 1, seconds=total_seconds + seconds)
+
+    @contextmanager
+    def timed(self, category: str, name: str) -> Iterator[None]:
+        """Record a call taking as long as the context, also when it raises.
+
+        Args:
+            category: The kind of call, e.g., DISCOURSE.
+            name: The name of the call within the category.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category=category, name=name, seconds=time.perf_counter() - start)
+
+    def snapshot(self) -> dict[str, typing.Any]:
+        """Get a JSON serializable copy of the measurements.
+
+        Returns:
+            The measurements by category and name.
+        """
+        with self._lock:
+            return {
+                "version": METRICS_VERSION,
+                **{
+                    category: {
+                        name: {"calls": calls, "seconds": round(seconds, 6)}
+                        for name, (calls, seconds) in sorted(measurements.items())
+                    }
+                    for category, measurements in sorted(self._measurements.items())
+                },
+            }
+
+    def reset(self) -> None:
+        """Remove all measurements."""
+        with self._lock:
+            self._measurements.clear()
+
+
+_COLLECTOR = Collector()
+
+
+def get_collector() -> Collector:
+    """Get the collector the calls of the run are recorded with.
+
+    Returns:
+        The collector for the process.
+    """
+    return _COLLECTOR
+
+
+@contextmanager
+def timed(category: str, name: str) -> Iterator[None]:
+    """Record a call with the collector of the process, can also be used as a decorator.
+
+    Args:
+        category: The kind of call, e.g., DISCOURSE.
+        name: The name of the call within the category.
+    """
+    with _COLLECTOR.timed(category=category, name=name):
+        yield
+
+
+def git_command_name(command: str | Sequence[str]) -> str:
+    """Get the git sub command from the command line of a git subprocess.
+
+    Args:
+        command: The command line as passed to git.cmd.Git.execute.
+
+    Returns:
+        The sub command, e.g., fetch, or git if there is no sub command.
+    """
+    arguments = iter(command.split() if isinstance(command, str) else command)
+    # Skip the git executable
+    next(arguments, None)
+    for argument in arguments:
+        if argument == "-c":
+            next(arguments, None)
+            continue
+        if not argument.startswith("-"):
+            return argument
+    return "git"
+
+
+class MeteredGit(Git):
+    """Git command wrapper that records every git subprocess."""
+
+    def execute(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        """Execute a git command and record it.
+
+        Args:
+            args: Positional arguments for git.cmd.Git.execute, the first is the command line.
+            kwargs: Keyword arguments for git.cmd.Git.execute.
+
+        Returns:
+            The output of git.cmd.Git.execute.
+        """
+        command = args[0] if args else kwargs.get("command", ())
+        with timed(GIT, git_command_name(command)):
+            return super().execute(*args, **kwargs)
+
+
+class MeteredRepo(Repo):
+    """Git repository that records every git subprocess run through its git attribute.
+
+    Attrs:
+        GitCommandWrapperType: The git command wrapper created for the repository.
+    """
+
+    GitCommandWrapperType = MeteredGit
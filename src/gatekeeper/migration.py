@@ -3,12 +3,14 @@
 
 """Module for migrating remote documentation into local git repository."""
 
+import hashlib
 import itertools
 import logging
 import typing
+from collections.abc import Mapping
 from pathlib import Path
 
-from gatekeeper import exceptions, types_
+from gatekeeper import exceptions, logs, types_
 from gatekeeper.discourse import Discourse
 
 EMPTY_DIR_REASON = "<created due to empty directory>"
@@ -232,12 +234,48 @@ def make_parent(docs_path: Path, document_meta: types_.MigrationFileMeta) -> Pat
     return path
 
 
-def _migrate_gitkeep(gitkeep_meta: types_.GitkeepMeta, docs_path: Path) -> types_.ActionReport:
+def blob_sha(content: bytes) -> str:
+    """Compute the name git gives to a file with the content, as git hash-object does.
+
+    Args:
+        content: The content of the file.
+
+    Returns:
+        The SHA of the blob.
+    """
+    return hashlib.sha1(  # nosec B324
+        b"blob %d\0" % len(content) + content, usedforsecurity=False
+    ).hexdigest()
+
+
+def _write_file(full_path: Path, content: str, known_blobs: Mapping[Path, str] | None) -> None:
+    """Write a file unless it already has the content.
+
+    Args:
+        full_path: The file to write.
+        content: The content of the file.
+        known_blobs: The SHA of the blob of the files in the working tree by path, if known.
+    """
+    if (
+        known_blobs is not None
+        and known_blobs.get(full_path) == blob_sha(content.encode("utf-8"))
+        and full_path.is_file()
+    ):
+        return
+    full_path.write_text(content, encoding="utf-8")
+
+
+def _migrate_gitkeep(
+    gitkeep_meta: types_.GitkeepMeta,
+    docs_path: Path,
+    known_blobs: Mapping[Path, str] | None = None,
+) -> types_.ActionReport:
     """Write gitkeep file to a path inside docs directory.
 
     Args:
         gitkeep_meta: Information about gitkeep file to be migrated.
         docs_path: Documentation folder path.
+        known_blobs: The SHA of the blob of the files in the working tree by path, if known.
 
     Returns:
         Migration report for gitkeep file creation.
@@ -245,7 +283,7 @@ def _migrate_gitkeep(gitkeep_meta: types_.GitkeepMeta, docs_path: Path) -> types
     logging.info("migrate meta: %s", gitkeep_meta)
 
     full_path = make_parent(docs_path=docs_path, document_meta=gitkeep_meta)
-    full_path.touch()
+    _write_file(full_path=full_path, content="", known_blobs=known_blobs)
     return types_.ActionReport(
         table_row=gitkeep_meta.table_row,
         result=types_.ActionResult.SUCCESS,
@@ -255,7 +293,10 @@ def _migrate_gitkeep(gitkeep_meta: types_.GitkeepMeta, docs_path: Path) -> types
 
 
 def _migrate_document(
-    document_meta: types_.DocumentMeta, discourse: Discourse, docs_path: Path
+    document_meta: types_.DocumentMeta,
+    discourse: Discourse,
+    docs_path: Path,
+    known_blobs: Mapping[Path, str] | None = None,
 ) -> types_.ActionReport:
     """Write document file with content to docs directory.
 
@@ -263,23 +304,26 @@ def _migrate_document(
         document_meta: Information about document file to be migrated.
         discourse: Client to the documentation server.
         docs_path: The path to the docs directory to migrate all the documentation.
+        known_blobs: The SHA of the blob of the files in the working tree by path, if known.
 
     Returns:
         Migration report for document file creation.
     """
     logging.info("migrate meta: %s", document_meta)
 
-    try:
-        content = discourse.retrieve_topic(url=document_meta.link)
-    except exceptions.DiscourseError as exc:
-        return types_.ActionReport(
-            table_row=document_meta.table_row,
-            result=types_.ActionResult.FAIL,
-            location=None,
-            reason=str(exc),
-        )
     full_path = make_parent(docs_path=docs_path, document_meta=document_meta)
-    full_path.write_text(content, encoding="utf-8")
+    # The file checked out from the tag already has the content of a page that has not changed
+    if discourse.sync.unchanged_path(document_meta.link) != full_path or not full_path.is_file():
+        try:
+            content = discourse.retrieve_topic(url=document_meta.link)
+        except exceptions.DiscourseError as exc:
+            return types_.ActionReport(
+                table_row=document_meta.table_row,
+                result=types_.ActionResult.FAIL,
+                location=None,
+                reason=str(exc),
+            )
+        _write_file(full_path=full_path, content=content, known_blobs=known_blobs)
     return types_.ActionReport(
         table_row=document_meta.table_row,
         result=types_.ActionResult.SUCCESS,
@@ -288,20 +332,25 @@ def _migrate_document(
     )
 
 
-def _migrate_index(index_meta: types_.IndexDocumentMeta, docs_path: Path) -> types_.ActionReport:
+def _migrate_index(
+    index_meta: types_.IndexDocumentMeta,
+    docs_path: Path,
+    known_blobs: Mapping[Path, str] | None = None,
+) -> types_.ActionReport:
     """Write index document to docs repository.
 
     Args:
         index_meta: Information about index file to be migrated.
         docs_path: The path to the docs directory to migrate all the documentation.
+        known_blobs: The SHA of the blob of the files in the working tree by path, if known.
 
     Returns:
         Migration report for index file creation.
     """
-    logging.info("migrate meta: %s", index_meta)
+    logging.info("migrate meta: %s", logs.payload(index_meta))
 
     full_path = make_parent(docs_path=docs_path, document_meta=index_meta)
-    full_path.write_text(index_meta.content, encoding="utf-8")
+    _write_file(full_path=full_path, content=index_meta.content, known_blobs=known_blobs)
     return types_.ActionReport(
         table_row=None,
         result=types_.ActionResult.SUCCESS,
@@ -311,7 +360,10 @@ def _migrate_index(index_meta: types_.IndexDocumentMeta, docs_path: Path) -> typ
 
 
 def _run_one(
-    file_meta: types_.MigrationFileMeta, discourse: Discourse, docs_path: Path
+    file_meta: types_.MigrationFileMeta,
+    discourse: Discourse,
+    docs_path: Path,
+    known_blobs: Mapping[Path, str] | None = None,
 ) -> types_.ActionReport:
     """Write document content inside the docs directory.
 
@@ -319,6 +371,7 @@ def _run_one(
         file_meta: Information about migration file corresponding to a row in index table.
         discourse: Client to the documentation server.
         docs_path: The path to the docs directory to migrate all the documentation.
+        known_blobs: The SHA of the blob of the files in the working tree by path, if known.
 
     Raises:
         MigrationError: if file_meta is of invalid metadata type.
@@ -329,15 +382,22 @@ def _run_one(
     match type(file_meta):
         case types_.GitkeepMeta:
             file_meta = typing.cast(types_.GitkeepMeta, file_meta)
-            report = _migrate_gitkeep(gitkeep_meta=file_meta, docs_path=docs_path)
+            report = _migrate_gitkeep(
+                gitkeep_meta=file_meta, docs_path=docs_path, known_blobs=known_blobs
+            )
         case types_.DocumentMeta:
             file_meta = typing.cast(types_.DocumentMeta, file_meta)
             report = _migrate_document(
-                document_meta=file_meta, discourse=discourse, docs_path=docs_path
+                document_meta=file_meta,
+                discourse=discourse,
+                docs_path=docs_path,
+                known_blobs=known_blobs,
             )
         case types_.IndexDocumentMeta:
             file_meta = typing.cast(types_.IndexDocumentMeta, file_meta)
-            report = _migrate_index(index_meta=file_meta, docs_path=docs_path)
+            report = _migrate_index(
+                index_meta=file_meta, docs_path=docs_path, known_blobs=known_blobs
+            )
         # Edge case that should not be possible.
         case _:  # pragma: no cover
             raise exceptions.MigrationError(
@@ -374,7 +434,8 @@ def run(
     index_content: str,
     discourse: Discourse,
     docs_path: Path,
-) -> None:
+    known_blobs: Mapping[Path, str] | None = None,
+) -> set[Path]:
     """Write table contents to the document directory.
 
     Args:
@@ -382,6 +443,12 @@ def run(
         index_content: Main content describing the charm.
         discourse: Client to the documentation server.
         docs_path: The path to the docs directory containing all the documentation.
+        known_blobs: The SHA of the blob of the files in the working tree by path, the files that
+            already have the migrated content are not written again. All files are written if not
+            given.
+
+    Returns:
+        The paths of the migrated files.
 
     Raises:
         MigrationError: if any migration report has failed.
@@ -390,12 +457,14 @@ def run(
     document_metadata = _get_docs_metadata(
         table_rows=valid_table_rows, index_content=index_content, discourse=discourse
     )
-    migration_reports = (
-        _run_one(file_meta=document, discourse=discourse, docs_path=docs_path)
-        for document in document_metadata
-    )
-
-    if any(result for result in migration_reports if result.result is types_.ActionResult.FAIL):
-        raise exceptions.MigrationError(
-            "Error migrating the docs, please check the logs for more detail."
+    migrated_paths: set[Path] = set()
+    for document in document_metadata:
+        report = _run_one(
+            file_meta=document, discourse=discourse, docs_path=docs_path, known_blobs=known_blobs
         )
+        if report.result is types_.ActionResult.FAIL:
+            raise exceptions.MigrationError(
+                "Error migrating the docs, please check the logs for more detail."
+            )
+        migrated_paths.add(typing.cast(Path, report.location))
+    return migrated_paths
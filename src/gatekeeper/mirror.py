@@ -0,0 +1,255 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Local copy of the topics of the documentation category that persists between runs."""
+
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+MIRROR_FILE = "discourse-mirror.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS topics (
+    host TEXT NOT NULL,
+    topic_id INTEGER NOT NULL,
+    slug TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    bumped_at TEXT,
+    can_edit INTEGER NOT NULL,
+    content TEXT,
+    PRIMARY KEY (host, topic_id)
+);
+CREATE TABLE IF NOT EXISTS listings (
+    host TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    bumped_at TEXT NOT NULL,
+    PRIMARY KEY (host, category_id)
+);
+"""
+
+
+class MirroredTopic(typing.NamedTuple):
+    """A topic as it was last read from the server.
+
+    Attrs:
+        topic_id: The identifier of the topic.
+        slug: The URL slug of the topic.
+        post_id: The identifier of the first post.
+        version: The version of the first post, it increases with each revision.
+        updated_at: When the first post was last changed, also by edits that do not create a
+            revision.
+        bumped_at: When the topic was last bumped according to the category listing, None if the
+            topic has not been listed yet.
+        can_edit: Whether the credentials could edit the first post.
+        content: The raw content of the first post, None once the topic has been bumped.
+    """
+
+    topic_id: int
+    slug: str
+    post_id: int
+    version: int
+    updated_at: str
+    bumped_at: str | None
+    can_edit: bool
+    content: str | None
+
+    def matches(self, post_id: int, version: int, updated_at: str) -> bool:
+        """Check whether the content is the content of a revision of the first post.
+
+        Args:
+            post_id: The identifier of the first post on the server.
+            version: The version of the first post on the server.
+            updated_at: When the first post on the server was last changed.
+
+        Returns:
+            Whether there is content and it is of the revision.
+        """
+        return (
+            self.content is not None
+            and self.post_id == post_id
+            and self.version == version
+            and self.updated_at == updated_at
+        )
+
+
+class ListedTopic(typing.NamedTuple):
+    """A topic of the category listing.
+
+    Attrs:
+        topic_id: The identifier of the topic.
+        slug: The URL slug of the topic.
+        bumped_at: When the topic was last bumped.
+    """
+
+    topic_id: int
+    slug: str
+    bumped_at: str
+
+
+class Mirror:
+    """The topics of a category read from a server, stored in an SQLite database.
+
+    The content of a topic is only used if the revision of the first post on the server is the
+    revision the content was read at, the server remains the source of truth. The database can be
+    kept between runs, e.g., using the actions cache, and shared by the clients of a run.
+
+    Attrs:
+        path: The database file.
+        host: The server the topics are read from.
+        category_id: The category the topics are listed in.
+    """
+
+    def __init__(self, path: Path, host: str, category_id: int) -> None:
+        """Construct, creating the database if it does not exist.
+
+        Args:
+            path: The database file.
+            host: The server the topics are read from.
+            category_id: The category the topics are listed in.
+        """
+        self.path = path
+        self.host = host
+        self.category_id = category_id
+        self._lock = threading.Lock()
+        self._refresh_started = False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The connection is shared by the threads of a batch, the lock serializes its use
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.executescript(_SCHEMA)
+
+    def get(self, topic_id: int) -> MirroredTopic | None:
+        """Get a topic.
+
+        Args:
+            topic_id: The identifier of the topic.
+
+        Returns:
+            The topic as it was last read, None if it has not been read.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT topic_id, slug, post_id, version, updated_at, bumped_at, can_edit, content "
+                "FROM topics WHERE host = ? AND topic_id = ?",
+                (self.host, topic_id),
+            ).fetchone()
+        if row is None:
+            return None
+        topic_id, slug, post_id, version, updated_at, bumped_at, can_edit, content = row
+        return MirroredTopic(
+            topic_id=topic_id,
+            slug=slug,
+            post_id=post_id,
+            version=version,
+            updated_at=updated_at,
+            bumped_at=bumped_at,
+            can_edit=bool(can_edit),
+            content=content,
+        )
+
+    def put(self, topic: MirroredTopic) -> None:
+        """Store a topic that was read from the server, the bumped at of the listing is kept.
+
+        Args:
+            topic: The topic.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO topics "
+                "(host, topic_id, slug, post_id, version, updated_at, bumped_at, can_edit, "
+                "content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (host, topic_id) DO UPDATE SET slug = excluded.slug, "
+                "post_id = excluded.post_id, version = excluded.version, "
+                "updated_at = excluded.updated_at, "
+                "bumped_at = coalesce(excluded.bumped_at, topics.bumped_at), "
+                "can_edit = excluded.can_edit, content = excluded.content",
+                (
+                    self.host,
+                    topic.topic_id,
+                    topic.slug,
+                    topic.post_id,
+                    topic.version,
+                    topic.updated_at,
+                    topic.bumped_at,
+                    int(topic.can_edit),
+                    topic.content,
+                ),
+            )
+
+    def discard(self, topic_id: int) -> None:
+        """Remove a topic, e.g., once it has been changed on the server.
+
+        Args:
+            topic_id: The identifier of the topic.
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM topics WHERE host = ? AND topic_id = ?", (self.host, topic_id)
+            )
+
+    def listed_until(self) -> str | None:
+        """Get the most recent bump of the topics of the last listing.
+
+        Returns:
+            When the most recently bumped topic was bumped, None if the category was not listed.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT bumped_at FROM listings WHERE host = ? AND category_id = ?",
+                (self.host, self.category_id),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def start_refresh(self) -> bool:
+        """Claim the refresh of the mirror so that the category is only listed once.
+
+        Returns:
+            Whether the caller is the first to claim the refresh.
+        """
+        with self._lock:
+            started = self._refresh_started
+            self._refresh_started = True
+        return not started
+
+    def refresh(self, topics: typing.Iterable[ListedTopic]) -> int:
+        """Update the topics from the topics bumped since the last listing.
+
+        The content of a topic that was bumped is removed since it has probably been changed.
+
+        Args:
+            topics: The topics bumped since the last listing.
+
+        Returns:
+            The number of topics whose content was removed.
+        """
+        topics = tuple(topics)
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            removed = 0
+            for topic in topics:
+                removed += self._connection.execute(
+                    "UPDATE topics SET content = NULL WHERE host = ? AND topic_id = ? "
+                    "AND content IS NOT NULL AND (bumped_at IS NULL OR bumped_at != ?)",
+                    (self.host, topic.topic_id, topic.bumped_at),
+                ).rowcount
+                self._connection.execute(
+                    "UPDATE topics SET slug = ?, bumped_at = ? WHERE host = ? AND topic_id = ?",
+                    (topic.slug, topic.bumped_at, self.host, topic.topic_id),
+                )
+            if topics:
+                self._connection.execute(
+                    "INSERT INTO listings (host, category_id, bumped_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (host, category_id) DO UPDATE "
+                    "SET bumped_at = max(listings.bumped_at, excluded.bumped_at)",
+                    (self.host, self.category_id, max(topic.bumped_at for topic in topics)),
+                )
+        return removed
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,486 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Export the reconcile actions to a plan file and reuse them when applying it later."""
+
+import dataclasses
+import hashlib
+import itertools
+import json
+import logging
+import typing
+from pathlib import Path
+
+from gatekeeper import interning, types_
+from gatekeeper.clients import Clients
+from gatekeeper.constants import DOCUMENTATION_TAG
+from gatekeeper.exceptions import DiscourseError, InputError
+
+PLAN_VERSION = 2
+
+_ACTION_TYPES: dict[str, type] = {
+    action_type.__name__: action_type for action_type in typing.get_args(types_.AnyAction)
+}
+_FIELD_DECODERS: dict[str, typing.Callable[[typing.Any], typing.Any]] = {
+    "path": tuple,
+    "navlink": lambda value: types_.Navlink(**value),
+    "navlink_change": lambda value: types_.NavlinkChange(
+        old=types_.Navlink(**value["old"]), new=types_.Navlink(**value["new"])
+    ),
+    "content": interning.intern,
+    "content_change": lambda value: types_.ContentChange(
+        base=None if value["base"] is None else interning.intern(value["base"]),
+        server=interning.intern(value["server"]),
+        local=interning.intern(value["local"]),
+    ),
+    "server_revision": lambda value: types_.TopicRevision(**value),
+}
+
+
+class PlanEntry(typing.NamedTuple):
+    """The actions for one path on the navigation table and what they were computed from.
+
+    Attrs:
+        path: The path on the navigation table.
+        local_sha256: The hash of the local file, directory or contents index item, None if the
+            path is only on the server.
+        server_url: The link to the page on the server, None if the path is not a page on the
+            server.
+        server_revision: The revision of the first post of the page on the server, None if there
+            is no page or the page was read from the documentation tag.
+        actions: The actions for the path.
+    """
+
+    path: types_.TablePath
+    local_sha256: str | None
+    server_url: types_.Url | None
+    server_revision: types_.TopicRevision | None
+    actions: tuple[types_.AnyAction, ...]
+
+
+class Plan(typing.NamedTuple):
+    """The actions computed by a reconcile and the state they were computed from.
+
+    Attrs:
+        version: The version of the plan file format.
+        commit_sha: The commit the plan was computed for.
+        discourse_host: The server the plan was computed against.
+        documentation_tag: The commit of the documentation tag the plan was computed with.
+        index_sha256: The hash of the index page on the server, None if there is no index page.
+        entries: The actions by path in the order they are executed.
+    """
+
+    version: int
+    commit_sha: str
+    discourse_host: str
+    documentation_tag: str | None
+    index_sha256: str | None
+    entries: tuple[PlanEntry, ...]
+
+
+def _sha256(value: str) -> str:
+    """Hash a value.
+
+    Args:
+        value: The value to hash.
+
+    Returns:
+        The hex digest of the value.
+    """
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _item_sha256(item_info: types_.PathInfo | types_.IndexContentsListItem) -> str:
+    """Hash everything about a local item the reconcile actions depend on.
+
+    Args:
+        item_info: The local file, directory or contents index item.
+
+    Returns:
+        The hex digest for the item.
+    """
+    if isinstance(item_info, types_.IndexContentsListItem):
+        return _sha256(
+            json.dumps(
+                [
+                    item_info.hierarchy,
+                    item_info.reference_title,
+                    item_info.reference_value,
+                    item_info.hidden,
+                ]
+            )
+        )
+    is_file = item_info.local_path.is_file()
+    return _sha256(
+        json.dumps(
+            [
+                item_info.level,
+                list(item_info.table_path),
+                item_info.navlink_title,
+                item_info.navlink_hidden,
+                is_file,
+                item_info.local_path.read_text(encoding="utf-8") if is_file else None,
+            ]
+        )
+    )
+
+
+def _page_url(table_row: types_.TableRow | None, server_hostname: str) -> types_.Url | None:
+    """Get the link to the page of a navigation table row.
+
+    Args:
+        table_row: The row on the navigation table, if any.
+        server_hostname: The hostname of the discourse server.
+
+    Returns:
+        The link if the row is a page on the server, otherwise None.
+    """
+    if (
+        table_row is None
+        or table_row.is_group
+        or table_row.is_external(server_hostname=server_hostname)
+    ):
+        return None
+    return table_row.navlink.link
+
+
+def _encode(value: typing.Any) -> typing.Any:
+    """Convert a value of an action into a JSON serializable value.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        Dictionaries for named tuples, lists for other tuples and the value otherwise.
+    """
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return {key: _encode(item) for key, item in value._asdict().items()}
+    if isinstance(value, tuple):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _encode_action(action: types_.AnyAction) -> dict[str, typing.Any]:
+    """Convert an action into a JSON serializable value.
+
+    Args:
+        action: The action to convert.
+
+    Returns:
+        The type and fields of the action.
+    """
+    return {"type": type(action).__name__} | {
+        field.name: _encode(getattr(action, field.name)) for field in dataclasses.fields(action)
+    }
+
+
+def _decode_action(value: dict[str, typing.Any]) -> types_.AnyAction:
+    """Convert the output of _encode_action back into an action.
+
+    Args:
+        value: The type and fields of the action.
+
+    Returns:
+        The action.
+    """
+    fields = dict(value)
+    action_type = _ACTION_TYPES[fields.pop("type")]
+    return action_type(
+        **{
+            key: (
+                field_value
+                if field_value is None or key not in _FIELD_DECODERS
+                else _FIELD_DECODERS[key](field_value)
+            )
+            for key, field_value in fields.items()
+        }
+    )
+
+
+def _server_revision(actions: typing.Iterable[types_.AnyAction]) -> types_.TopicRevision | None:
+    """Get the revision of a page on the server recorded by the actions for its path.
+
+    Args:
+        actions: The actions for the path of the page.
+
+    Returns:
+        The revision the reconcile read the page at, None if the page was not read from the server.
+    """
+    for action in actions:
+        revision = getattr(action, "server_revision", None)
+        if revision is not None:
+            return revision
+    return None
+
+
+def create(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    sorted_item_infos: typing.Iterable[types_.PathInfo | types_.IndexContentsListItem],
+    table_rows: typing.Iterable[types_.TableRow],
+    actions: typing.Iterable[types_.AnyAction],
+    index: types_.Index,
+    clients: Clients,
+    commit_sha: str,
+) -> Plan:
+    """Record the actions together with the local and server state they were computed from.
+
+    The revision of each page is the one recorded by its actions when the reconcile read the page,
+    the server is not read again. A page read from the documentation tag rather than the server
+    has no revision, its entry is only fresh when the plan is applied if the page has still not
+    been bumped since the tag was moved.
+
+    Args:
+        sorted_item_infos: The local files, directories and contents index items.
+        table_rows: The rows of the navigation table.
+        actions: The actions computed from the local items and table rows.
+        index: Information about the index of the documentation.
+        clients: The clients to interact with things like discourse and the repository.
+        commit_sha: The commit the actions were computed for.
+
+    Returns:
+        The plan.
+    """
+    item_info_lookup = {item_info.table_path: item_info for item_info in sorted_item_infos}
+    table_row_lookup = {table_row.path: table_row for table_row in table_rows}
+    entries = []
+    for path, grouped_actions in itertools.groupby(actions, key=lambda action: action.path):
+        path_actions = tuple(grouped_actions)
+        item_info = item_info_lookup.get(path)
+        server_url = _page_url(table_row_lookup.get(path), clients.discourse.host)
+        entries.append(
+            PlanEntry(
+                path=path,
+                local_sha256=None if item_info is None else _item_sha256(item_info),
+                server_url=server_url,
+                server_revision=None if server_url is None else _server_revision(path_actions),
+                actions=path_actions,
+            )
+        )
+
+    return Plan(
+        version=PLAN_VERSION,
+        commit_sha=commit_sha,
+        discourse_host=clients.discourse.host,
+        documentation_tag=clients.repository.tag_exists(DOCUMENTATION_TAG),
+        index_sha256=None if index.server is None else _sha256(index.server.content),
+        entries=tuple(entries),
+    )
+
+
+def write(plan: Plan, path: Path) -> None:
+    """Write a plan to a file.
+
+    Args:
+        plan: The plan to write.
+        path: The file to write to.
+    """
+    serialized = {
+        "version": plan.version,
+        "commit_sha": plan.commit_sha,
+        "discourse_host": plan.discourse_host,
+        "documentation_tag": plan.documentation_tag,
+        "index_sha256": plan.index_sha256,
+        "entries": [
+            {
+                "path": list(entry.path),
+                "local_sha256": entry.local_sha256,
+                "server_url": entry.server_url,
+                "server_revision": _encode(entry.server_revision),
+                "actions": [_encode_action(action) for action in entry.actions],
+            }
+            for entry in plan.entries
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(serialized, indent=2), encoding="utf-8")
+
+
+def read(path: Path) -> Plan:
+    """Read a plan from a file.
+
+    Args:
+        path: The file written by write.
+
+    Returns:
+        The plan.
+
+    Raises:
+        InputError: if the file cannot be read, is not a plan or is a plan of another version.
+    """
+    try:
+        serialized = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise InputError(f"Invalid plan file, could not be read, {path=}") from exc
+
+    if not isinstance(serialized, dict) or serialized.get("version") != PLAN_VERSION:
+        raise InputError(f"Invalid plan file, expected version {PLAN_VERSION}, {path=}")
+
+    try:
+        return Plan(
+            version=serialized["version"],
+            commit_sha=serialized["commit_sha"],
+            discourse_host=serialized["discourse_host"],
+            documentation_tag=serialized["documentation_tag"],
+            index_sha256=serialized["index_sha256"],
+            entries=tuple(
+                PlanEntry(
+                    path=tuple(entry["path"]),
+                    local_sha256=entry["local_sha256"],
+                    server_url=entry["server_url"],
+                    server_revision=(
+                        None
+                        if entry["server_revision"] is None
+                        else types_.TopicRevision(**entry["server_revision"])
+                    ),
+                    actions=tuple(_decode_action(action) for action in entry["actions"]),
+                )
+                for entry in serialized["entries"]
+            ),
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InputError(f"Invalid plan file, unexpected content, {path=}") from exc
+
+
+def load(path: Path, clients: Clients, commit_sha: str) -> Plan | None:
+    """Read a plan to apply to a commit.
+
+    Args:
+        path: The file written by write.
+        clients: The clients to interact with things like discourse and the repository.
+        commit_sha: The commit the plan is applied to.
+
+    Returns:
+        The plan, None if it was computed for a commit that is not the commit or one of its
+        ancestors.
+    """
+    plan = read(path=path)
+    if not clients.repository.is_ancestor(plan.commit_sha, commit_sha):
+        logging.warning(
+            "Not applying the plan, it was computed for %s which is not an ancestor of %s",
+            plan.commit_sha,
+            commit_sha,
+        )
+        return None
+    return plan
+
+
+def unchecked_items(
+    plan: Plan, index_contents: typing.Iterable[types_.IndexContentsListItem]
+) -> list[types_.IndexContentsListItem]:
+    """Get the contents index items that have changed since the plan was computed.
+
+    The items of a plan were checked when it was computed, e.g., the external references.
+
+    Args:
+        plan: The plan to apply.
+        index_contents: The current contents index items.
+
+    Returns:
+        The items that are not on the plan.
+    """
+    planned = {entry.local_sha256 for entry in plan.entries}
+    return [item for item in index_contents if _item_sha256(item) not in planned]
+
+
+def _entry_fresh(
+    entry: PlanEntry,
+    item_info: types_.PathInfo | types_.IndexContentsListItem | None,
+    table_row: types_.TableRow | None,
+    clients: Clients,
+) -> bool:
+    """Check whether the actions of an entry can still be applied.
+
+    A page read from the documentation tag is unchanged if the category listing of the run found
+    it has not been bumped since the tag was moved. The revision of a page that is updated is
+    checked by the update, the revision of any other page is retrieved without its content.
+
+    Args:
+        entry: The entry of the plan.
+        item_info: The current local item for the path of the entry, if any.
+        table_row: The current navigation table row for the path of the entry, if any.
+        clients: The clients to interact with things like discourse and the repository.
+
+    Returns:
+        Whether the local item and the page on the server are unchanged since the plan.
+    """
+    local_sha256 = None if item_info is None else _item_sha256(item_info)
+    if entry.local_sha256 != local_sha256 or entry.server_url != _page_url(
+        table_row, clients.discourse.host
+    ):
+        return False
+    if entry.server_url is None:
+        return True
+    if entry.server_revision is None:
+        return (
+            isinstance(item_info, types_.PathInfo)
+            and clients.discourse.sync.unchanged_path(entry.server_url) == item_info.local_path
+        )
+    if any(
+        isinstance(action, types_.UpdatePageAction)
+        and action.server_revision == entry.server_revision
+        for action in entry.actions
+    ):
+        return True
+    try:
+        return entry.server_revision == clients.discourse.retrieve_post_revision(
+            post_id=entry.server_revision.post_id, url=entry.server_url
+        )
+    except DiscourseError:
+        return False
+
+
+def fresh_actions(
+    plan: Plan,
+    sorted_item_infos: typing.Iterable[types_.PathInfo | types_.IndexContentsListItem],
+    table_rows: typing.Iterable[types_.TableRow],
+    index: types_.Index,
+    clients: Clients,
+) -> dict[types_.TablePath, tuple[types_.AnyAction, ...]]:
+    """Get the planned actions that are still valid.
+
+    The whole plan is stale if it was computed against another server, another documentation tag
+    or another index page. Otherwise an entry is stale if the local item or the server page has
+    changed since the plan was created. The pages whose content is the same as the local file are
+    recorded as matching it, as the reconcile would.
+
+    Args:
+        plan: The plan to apply.
+        sorted_item_infos: The current local files, directories and contents index items.
+        table_rows: The current rows of the navigation table.
+        index: Information about the current index of the documentation.
+        clients: The clients to interact with things like discourse and the repository.
+
+    Returns:
+        The planned actions by path for the entries that are not stale.
+    """
+    index_sha256 = None if index.server is None else _sha256(index.server.content)
+    if (
+        plan.discourse_host != clients.discourse.host
+        or plan.index_sha256 != index_sha256
+        or plan.documentation_tag != clients.repository.tag_exists(DOCUMENTATION_TAG)
+    ):
+        logging.info("plan is stale, recomputing all the actions")
+        return {}
+
+    item_info_lookup = {item_info.table_path: item_info for item_info in sorted_item_infos}
+    table_row_lookup = {table_row.path: table_row for table_row in table_rows}
+    fresh = {
+        entry.path: entry.actions
+        for entry in plan.entries
+        if _entry_fresh(
+            entry=entry,
+            item_info=item_info_lookup.get(entry.path),
+            table_row=table_row_lookup.get(entry.path),
+            clients=clients,
+        )
+    }
+    for action in itertools.chain.from_iterable(fresh.values()):
+        if (
+            isinstance(action, types_.NoopPageAction)
+            and action.navlink.link is not None
+            and isinstance(item_info := item_info_lookup.get(action.path), types_.PathInfo)
+        ):
+            clients.discourse.sync.record_match(url=action.navlink.link, path=item_info.local_path)
+    logging.info(
+        "plan has %s fresh and %s stale entries", len(fresh), len(plan.entries) - len(fresh)
+    )
+    return fresh
@@ -0,0 +1,124 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Build commits from the objects of a git repository without touching the working tree.
+
+The commands only read and write objects of the repository, the working tree, the index and the
+branch that is checked out are left as they are.
+"""
+
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+
+from git.repo import Repo
+
+BLOB_MODE = "100644"
+TREE_MODE = "040000"
+# The tree without any entries, known to git without being written
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+def write_blobs(repository: Repo, directory: str) -> dict[str, str | None]:
+    """Write the files of a directory that differ from the index as blobs.
+
+    Args:
+        repository: The local git repository.
+        directory: The directory relative to the root of the repository.
+
+    Returns:
+        The SHA of the blob of the files that were added or modified and None for the files that
+        were removed by path relative to the root of the repository.
+    """
+    output = repository.git.ls_files(
+        "-z", "--modified", "--others", "--exclude-standard", "--", directory
+    )
+    paths = sorted({path for path in output.split("\0") if path})
+    existing = [path for path in paths if (Path(repository.working_dir) / path).is_file()]
+    # A single command writes all the blobs
+    blob_shas = repository.git.hash_object("-w", "--", *existing).split() if existing else []
+    return dict.fromkeys(paths) | dict(zip(existing, blob_shas))
+
+
+def _make_tree(repository: Repo, entries: Mapping[str, str]) -> str:
+    """Write a tree object.
+
+    Args:
+        repository: The local git repository.
+        entries: The mode, type and SHA separated by spaces of each entry by name.
+
+    Returns:
+        The SHA of the tree.
+    """
+    with tempfile.TemporaryFile() as stream:
+        stream.write(
+            "".join(f"{info}\t{name}\0" for name, info in sorted(entries.items())).encode("utf-8")
+        )
+        stream.seek(0)
+        return repository.git.mktree("-z", istream=stream).strip()
+
+
+def write_tree(
+    repository: Repo, tree_sha: str | None, changes: Mapping[str, str | None]
+) -> str | None:
+    """Write a tree with changed files on top of an existing tree.
+
+    Only the trees on the path to a changed file are read and written again.
+
+    Args:
+        repository: The local git repository.
+        tree_sha: The tree to change, None for an empty tree.
+        changes: The SHA of the blob of each added or modified file and None for each removed
+            file by path relative to the tree.
+
+    Returns:
+        The SHA of the new tree, None if the new tree is empty since git does not track empty
+        directories.
+    """
+    entries: dict[str, str] = {}
+    if tree_sha is not None:
+        for line in repository.git.ls_tree("-z", tree_sha).split("\0"):
+            if line:
+                info, name = line.split("\t", 1)
+                entries[name] = info
+
+    nested_changes: dict[str, dict[str, str | None]] = {}
+    for path, blob_sha in changes.items():
+        name, _, nested_path = path.partition("/")
+        if nested_path:
+            nested_changes.setdefault(name, {})[nested_path] = blob_sha
+        elif blob_sha is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = f"{BLOB_MODE} blob {blob_sha}"
+
+    for name, changes_in_tree in nested_changes.items():
+        _, object_type, object_sha = entries.get(name, "- - -").split()
+        subtree_sha = write_tree(
+            repository=repository,
+            tree_sha=object_sha if object_type == "tree" else None,
+            changes=changes_in_tree,
+        )
+        if subtree_sha is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = f"{TREE_MODE} tree {subtree_sha}"
+
+    return _make_tree(repository=repository, entries=entries) if entries else None
+
+
+def diff_trees(repository: Repo, old_tree_sha: str, new_tree_sha: str) -> dict[str, str]:
+    """Compare the files of two trees.
+
+    Args:
+        repository: The local git repository.
+        old_tree_sha: The tree before the changes.
+        new_tree_sha: The tree after the changes.
+
+    Returns:
+        The status of each changed file, A, M or D, by path.
+    """
+    fields = repository.git.diff_tree(
+        "-r", "-z", "--name-status", old_tree_sha, new_tree_sha
+    ).split("\0")
+    return dict(zip(fields[1::2], fields[::2]))
@@ -0,0 +1,133 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Opt-in CPU and memory profiling of the phases of a run."""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+import typing
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# The number of functions and allocation sites included in the summaries
+TOP_COUNT = 25
+_LOG_TOP_COUNT = 5
+
+
+class PhaseProfile(typing.NamedTuple):
+    """The files written for a profiled phase.
+
+    Attrs:
+        stats_path: The cProfile stats, can be loaded with pstats or tools like snakeviz.
+        cpu_summary_path: The functions with the highest cumulative time.
+        memory_summary_path: The peak memory and the allocation sites with the most memory.
+    """
+
+    stats_path: Path
+    cpu_summary_path: Path
+    memory_summary_path: Path
+
+
+def get_phase_profile(name: str, output_dir: Path) -> PhaseProfile:
+    """Get the files written for a profiled phase.
+
+    Args:
+        name: The name of the phase.
+        output_dir: The directory the files are written to.
+
+    Returns:
+        The paths to the files.
+    """
+    return PhaseProfile(
+        stats_path=output_dir / f"{name}.prof",
+        cpu_summary_path=output_dir / f"{name}-cpu.txt",
+        memory_summary_path=output_dir / f"{name}-memory.txt",
+    )
+
+
+def _cpu_summary(profiler: cProfile.Profile, count: int) -> str:
+    """Describe the functions with the highest cumulative time.
+
+    Args:
+        profiler: The profiler that has run.
+        count: The number of functions to include.
+
+    Returns:
+        The pstats report.
+    """
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(count)
+    return stream.getvalue()
+
+
+def _memory_summary(peak: int, snapshot: tracemalloc.Snapshot, count: int) -> str:
+    """Describe the peak memory and the allocation sites holding the most memory.
+
+    Args:
+        peak: The highest number of bytes allocated during the phase.
+        snapshot: The allocations at the end of the phase.
+        count: The number of allocation sites to include.
+
+    Returns:
+        The report.
+    """
+    statistics = snapshot.statistics("lineno")[:count]
+    return "\n".join((f"peak: {peak} bytes", *(str(statistic) for statistic in statistics)))
+
+
+@contextmanager
+def profile(name: str, output_dir: Path | None) -> Iterator[None]:
+    """Profile the CPU time and memory allocations of a phase.
+
+    Only the calling thread is profiled by cProfile, tracemalloc records all threads. Profiling is
+    skipped when there is no output directory.
+
+    Args:
+        name: The name of the phase, used for the file names.
+        output_dir: The directory to write the results to, if any.
+    """
+    if output_dir is None:
+        yield
+        return
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        if not was_tracing:
+            tracemalloc.stop()
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        phase_profile = get_phase_profile(name=name, output_dir=output_dir)
+        profiler.dump_stats(phase_profile.stats_path)
+        phase_profile.cpu_summary_path.write_text(
+            _cpu_summary(profiler=profiler, count=TOP_COUNT), encoding="utf-8"
+        )
+        phase_profile.memory_summary_path.write_text(
+            _memory_summary(peak=peak, snapshot=snapshot, count=TOP_COUNT), encoding="utf-8"
+        )
+        logging.info(
+            "profile of phase %s: %.3fs wall time, %s bytes peak memory, files in %s\n%s",
+            name,
+            wall_time,
+            peak,
+            output_dir,
+            _cpu_summary(profiler=profiler, count=_LOG_TOP_COUNT),
+        )
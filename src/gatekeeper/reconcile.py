@@ -9,7 +9,7 @@ from pathlib import Path
 
 from gatekeeper import exceptions
 from gatekeeper import index as index_module
-from gatekeeper import types_
+from gatekeeper import interning, types_
 from gatekeeper.clients import Clients
 from gatekeeper.constants import DOCUMENTATION_TAG, NAVIGATION_TABLE_START
 from gatekeeper.discourse import Discourse
@@ -37,7 +37,7 @@ def _local_only(item_info: types_.PathInfo | types_.IndexContentsListItem) -> ty
             level=item_info.level,
             path=item_info.table_path,
             navlink_title=item_info.navlink_title,
-            content=item_info.local_path.read_text(),
+            content=interning.intern(item_info.local_path.read_text()),
             navlink_hidden=item_info.navlink_hidden,
         )
     return types_.CreateGroupAction(
@@ -48,15 +48,17 @@ def _local_only(item_info: types_.PathInfo | types_.IndexContentsListItem) -> ty
     )
 
 
-def _get_server_content(table_row: types_.TableRow, discourse: Discourse) -> str:
-    """Retrieve the content from the server.
+def _get_server_content(
+    table_row: types_.TableRow, discourse: Discourse
+) -> tuple[str, types_.TopicRevision]:
+    """Retrieve the content and its revision from the server.
 
     Args:
         table_row: A row from the navigation table.
         discourse: A client to the documentation server.
 
     Returns:
-        The content on the server.
+        The content on the server and the revision it is at.
 
     Raises:
         ServerError: Retrieving the page contents from the server failed.
@@ -68,11 +70,65 @@ def _get_server_content(table_row: types_.TableRow, discourse: Discourse) -> str
         )
 
     try:
-        return discourse.retrieve_topic(url=table_row.navlink.link).strip()
+        content, revision = discourse.retrieve_topic_and_revision(url=table_row.navlink.link)
     except exceptions.DiscourseError as exc:
         raise exceptions.ServerError(
             f"failed to retrieve contents of page, url={table_row.navlink.link}"
         ) from exc
+    return interning.intern(content.strip()), revision
+
+
+def _delete_page(
+    level: types_.Level, path: types_.TablePath, table_row: types_.TableRow, discourse: Discourse
+) -> types_.DeletePageAction:
+    """Create the action to delete the page of a navigation table row.
+
+    Args:
+        level: The number of parents of the item the page is deleted for.
+        path: The unique string identifying the item the page is deleted for.
+        table_row: A row from the navigation table with the link to the page.
+        discourse: A client to the documentation server.
+
+    Returns:
+        The delete action with the content of the page and the revision it was read at.
+    """
+    content, revision = discourse.retrieve_topic_and_revision(
+        url=typing.cast(str, table_row.navlink.link)
+    )
+    return types_.DeletePageAction(
+        level=level,
+        path=path,
+        navlink=table_row.navlink,
+        content=interning.intern(content),
+        server_revision=revision,
+    )
+
+
+def _get_unchanged_server_content(
+    path_info: types_.PathInfo, table_row: types_.TableRow, clients: Clients
+) -> tuple[str, None] | None:
+    """Read the content of a page that has not changed since the tag was moved from the tag.
+
+    Args:
+        path_info: Information about the local documentation file.
+        table_row: A row from the navigation table.
+        clients: The clients to interact with things like discourse and the repository.
+
+    Returns:
+        The content of the file at the tag and no revision, None if the page might have changed.
+    """
+    if (
+        table_row.navlink.link is None
+        or clients.discourse.sync.unchanged_path(table_row.navlink.link) != path_info.local_path
+    ):
+        return None
+    try:
+        content = clients.repository.read_file(
+            tree_ish=DOCUMENTATION_TAG, path=path_info.local_path
+        )
+    except exceptions.RepositoryFileNotFoundError:
+        return None
+    return interning.intern(content.strip()), None
 
 
 def _local_and_server_validation(
@@ -200,11 +256,11 @@ def _local_and_server_dir_local_page_server(
             f"internal error, expecting link on table row, {path_info=!r}, {table_row=!r}"
         )
     return (
-        types_.DeletePageAction(
+        _delete_page(
             level=path_info.level,
             path=path_info.table_path,
-            navlink=table_row.navlink,
-            content=clients.discourse.retrieve_topic(url=table_row.navlink.link),
+            table_row=table_row,
+            discourse=clients.discourse,
         ),
         types_.CreateGroupAction(
             level=path_info.level,
@@ -242,11 +298,11 @@ def _local_and_server_external_ref_local_page_server(
             f"internal error, expecting link on table row, {item_info=!r}, {table_row=!r}"
         )
     return (
-        types_.DeletePageAction(
+        _delete_page(
             level=item_info.hierarchy,
             path=item_info.table_path,
-            navlink=table_row.navlink,
-            content=clients.discourse.retrieve_topic(url=table_row.navlink.link),
+            table_row=table_row,
+            discourse=clients.discourse,
         ),
         types_.CreateExternalRefAction(
             level=item_info.hierarchy,
@@ -292,6 +348,25 @@ def is_same_content(index: types_.Index, actions: typing.Iterable[types_.AnyActi
     )
 
 
+def posts_local_content(actions: typing.Iterable[types_.AnyAction]) -> bool:
+    """Check whether taking the actions leaves the local content of the pages on the server.
+
+    An update merges the changes made on the server since the tag into the local content, the
+    server only ends up with the local content if there were no such changes.
+
+    Args:
+        actions: The actions representing what the reconcile does over all topics.
+
+    Returns:
+        Whether every updated page is given its local content.
+    """
+    return all(
+        action.content_change.server in (action.content_change.base, action.content_change.local)
+        for action in actions
+        if isinstance(action, types_.UpdatePageAction)
+    )
+
+
 def _local_and_server_file_local_page_server(
     path_info: types_.PathInfo,
     table_row: types_.TableRow,
@@ -316,8 +391,14 @@ def _local_and_server_file_local_page_server(
             - If there was a problem retrieving content from GitHub.
             - If the expected tag does not exist on the server.
     """
-    local_content = path_info.local_path.read_text(encoding="utf-8").strip()
-    server_content = _get_server_content(table_row=table_row, discourse=clients.discourse)
+    local_content = interning.intern(path_info.local_path.read_text(encoding="utf-8").strip())
+    server_content, server_revision = _get_unchanged_server_content(
+        path_info=path_info, table_row=table_row, clients=clients
+    ) or _get_server_content(table_row=table_row, discourse=clients.discourse)
+    if server_content == local_content:
+        clients.discourse.sync.record_match(
+            url=typing.cast(str, table_row.navlink.link), path=path_info.local_path
+        )
 
     if (
         server_content == local_content
@@ -330,27 +411,34 @@ def _local_and_server_file_local_page_server(
                 path=path_info.table_path,
                 navlink=table_row.navlink,
                 content=local_content,
+                server_revision=server_revision,
             ),
         )
 
-    try:
-        path = str(path_info.local_path.relative_to(base_path))
-        base_content = clients.repository.get_file_content_from_tag(
-            path=path, tag_name=DOCUMENTATION_TAG
-        ).strip()
-    except exceptions.RepositoryFileNotFoundError:
-        base_content = None
-    except exceptions.RepositoryTagNotFoundError as exc:
-        raise exceptions.ReconcilliationError(
-            f"Tag {DOCUMENTATION_TAG} not defined on the repository, please tag the "
-            "commit with the content matching discourse with the tag "
-            f"{DOCUMENTATION_TAG!r}"
-        ) from exc
-    except exceptions.RepositoryClientError as exc:
-        raise exceptions.ReconcilliationError(
-            f"Unable to retrieve content for path from tag, {path}, "
-            f"tag_name={DOCUMENTATION_TAG}"
-        ) from exc
+    if server_revision is None:
+        # The content on the server was read from the tag
+        base_content: str | None = server_content
+    else:
+        try:
+            path = str(path_info.local_path.relative_to(base_path))
+            base_content = interning.intern(
+                clients.repository.get_file_content_from_tag(
+                    path=path, tag_name=DOCUMENTATION_TAG
+                ).strip()
+            )
+        except exceptions.RepositoryFileNotFoundError:
+            base_content = None
+        except exceptions.RepositoryTagNotFoundError as exc:
+            raise exceptions.ReconcilliationError(
+                f"Tag {DOCUMENTATION_TAG} not defined on the repository, please tag the "
+                "commit with the content matching discourse with the tag "
+                f"{DOCUMENTATION_TAG!r}"
+            ) from exc
+        except exceptions.RepositoryClientError as exc:
+            raise exceptions.ReconcilliationError(
+                f"Unable to retrieve content for path from tag, {path}, "
+                f"tag_name={DOCUMENTATION_TAG}"
+            ) from exc
     return (
         types_.UpdatePageAction(
             level=path_info.level,
@@ -366,6 +454,7 @@ def _local_and_server_file_local_page_server(
             content_change=types_.ContentChange(
                 base=base_content, server=server_content, local=local_content
             ),
+            server_revision=server_revision,
         ),
     )
 
@@ -432,7 +521,7 @@ def _local_and_server_file_local(
                 level=path_info.level,
                 path=path_info.table_path,
                 navlink_title=path_info.navlink_title,
-                content=path_info.local_path.read_text(),
+                content=interning.intern(path_info.local_path.read_text()),
                 navlink_hidden=path_info.navlink_hidden,
             ),
         )
@@ -568,14 +657,13 @@ def _server_only(table_row: types_.TableRow, discourse: Discourse) -> types_.Del
             f"internal error, expecting link on table row, {table_row=!r}"
         )
     try:
-        content = discourse.retrieve_topic(url=table_row.navlink.link)
+        return _delete_page(
+            level=table_row.level, path=table_row.path, table_row=table_row, discourse=discourse
+        )
     except exceptions.DiscourseError as exc:
         raise exceptions.ServerError(
             f"failed to retrieve contents of page, url={table_row.navlink.link}"
         ) from exc
-    return types_.DeletePageAction(
-        level=table_row.level, path=table_row.path, navlink=table_row.navlink, content=content
-    )
 
 
 def _calculate_action(
@@ -620,6 +708,7 @@ def run(
     table_rows: typing.Iterable[types_.TableRow],
     clients: Clients,
     base_path: Path,
+    planned: typing.Mapping[types_.TablePath, tuple[types_.AnyAction, ...]] | None = None,
 ) -> typing.Iterator[types_.AnyAction]:
     """Reconcile differences between the docs directory and documentation server.
 
@@ -641,11 +730,14 @@ def run(
         sorted_path_infos: Information about the local documentation files.
         table_rows: Rows from the navigation table.
         clients: The clients to interact with things like discourse and the repository.
+        planned: Actions computed earlier by path that are still valid, these are used instead of
+            computing the actions for the path again.
 
     Returns:
         The actions required to reconcile differences between the documentation server and local
         files.
     """
+    planned = planned or {}
     path_info_lookup: types_.ItemInfoLookup = {
         path_info.table_path: path_info for path_info in sorted_path_infos
     }
@@ -657,7 +749,13 @@ def run(
     sorted_remaining_table_row_keys = sorted(table_row_lookup.keys() - sorted_path_info_keys)
     keys = itertools.chain(sorted_path_info_keys, sorted_remaining_table_row_keys)
     return itertools.chain.from_iterable(
-        _calculate_action(path_info_lookup.get(key), table_row_lookup.get(key), clients, base_path)
+        (
+            planned[key]
+            if key in planned
+            else _calculate_action(
+                path_info_lookup.get(key), table_row_lookup.get(key), clients, base_path
+            )
+        )
         for key in keys
     )
 
@@ -0,0 +1,74 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Index of the refs of a git repository."""
+
+from typing import NamedTuple
+
+from git.repo import Repo
+
+TAGS_REF_PREFIX = "refs/tags/"
+# The ref name, the object and, for annotated tags, the commit the tag points to
+REF_INDEX_FORMAT = "%(refname)%00%(objectname)%00%(*objectname)"
+
+
+class RefIndex(NamedTuple):
+    """The refs of a repository with the commits they point to.
+
+    Attrs:
+        commit_by_ref: The commit of each ref by its full name, annotated tags are peeled.
+        refs_by_commit: The full names of the refs pointing to each commit in name order.
+    """
+
+    commit_by_ref: dict[str, str]
+    refs_by_commit: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def load(cls, repository: Repo) -> "RefIndex":
+        """Read the refs of a repository using a single git command.
+
+        Args:
+            repository: The local git repository.
+
+        Returns:
+            The index of the refs.
+        """
+        commit_by_ref: dict[str, str] = {}
+        refs_by_commit: dict[str, list[str]] = {}
+        for line in repository.git.for_each_ref(f"--format={REF_INDEX_FORMAT}").splitlines():
+            ref_name, object_sha, peeled_sha = line.split("\0")
+            commit_sha = peeled_sha or object_sha
+            commit_by_ref[ref_name] = commit_sha
+            refs_by_commit.setdefault(commit_sha, []).append(ref_name)
+        return cls(
+            commit_by_ref=commit_by_ref,
+            refs_by_commit={
+                commit_sha: tuple(refs) for commit_sha, refs in refs_by_commit.items()
+            },
+        )
+
+    def tag(self, tag_name: str) -> str | None:
+        """Get the commit of a tag.
+
+        Args:
+            tag_name: The name of the tag.
+
+        Returns:
+            The commit the tag points to, None if there is no such tag.
+        """
+        return self.commit_by_ref.get(f"{TAGS_REF_PREFIX}{tag_name}")
+
+    def tags_at(self, commit_sha: str) -> tuple[str, ...]:
+        """Get the tags pointing to a commit.
+
+        Args:
+            commit_sha: The SHA of the commit.
+
+        Returns:
+            The names of the tags in name order.
+        """
+        return tuple(
+            ref_name.removeprefix(TAGS_REF_PREFIX)
+            for ref_name in self.refs_by_commit.get(commit_sha, ())
+            if ref_name.startswith(TAGS_REF_PREFIX)
+        )
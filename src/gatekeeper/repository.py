@@ -3,27 +3,30 @@
 
 """Module for handling interactions with git repository."""
 
+# The client wraps all the git and GitHub interactions of the action, PyGithub is imported where
+# it is used
+# pylint: disable=too-many-lines,import-outside-toplevel
+
 import base64
+import copy
+import dataclasses
 import logging
 import re
-from collections.abc import Iterable, Iterator, Sequence
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager
 from functools import cached_property
 from itertools import chain
 from pathlib import Path
-from typing import Any, NamedTuple, cast
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
 
 from git import GitCommandError
+from git.cmd import Git
 from git.diff import Diff
 from git.repo import Repo
-from github import Github
-from github.Auth import Token
-from github.GithubException import GithubException, UnknownObjectException
-from github.InputGitTreeElement import InputGitTreeElement
-from github.PullRequest import PullRequest
-from github.Repository import Repository
 
 from gatekeeper import commit as commit_module
+from gatekeeper import deadline, metrics, plumbing
 from gatekeeper.constants import DOCUMENTATION_FOLDER_NAME
 from gatekeeper.docs_directory import has_docs_directory
 from gatekeeper.exceptions import (
@@ -33,8 +36,16 @@ from gatekeeper.exceptions import (
     RepositoryTagNotFoundError,
 )
 from gatekeeper.metadata import get as get_metadata
+from gatekeeper.refs import RefIndex
 from gatekeeper.types_ import Metadata
 
+# PyGithub is imported when first used since most runs finish without calling the GitHub API
+if TYPE_CHECKING:  # pragma: no cover
+    from github import Github
+    from github.InputGitTreeElement import InputGitTreeElement
+    from github.PullRequest import PullRequest
+    from github.Repository import Repository
+
 GITHUB_HOSTNAME = "github.com"
 ORIGIN_NAME = "origin"
 HTTPS_URL_PATTERN = re.compile(rf"^https?:\/\/.*@?{GITHUB_HOSTNAME}\/(.+\/.+?)(.git)?$")
@@ -54,6 +65,10 @@ TAG_MESSAGE = (
 CONFIG_USER_SECTION_NAME = "user"
 CONFIG_USER_NAME = (CONFIG_USER_SECTION_NAME, "name")
 CONFIG_USER_EMAIL = (CONFIG_USER_SECTION_NAME, "email")
+# The number of commits a shallow clone is first deepened by to answer an ancestry check, doubled
+# on each step up to the maximum after which the full history is fetched
+ANCESTRY_INITIAL_DEEPEN = 64
+ANCESTRY_MAX_DEEPEN = 4096
 
 BRANCH_PREFIX = "discourse-gatekeeper"
 DEFAULT_BRANCH_NAME = f"{BRANCH_PREFIX}/migrate"
@@ -101,6 +116,23 @@ class DiffSummary(NamedTuple):
             modified=frozenset(modified_files),
         )
 
+    @classmethod
+    def from_statuses(cls, statuses: Mapping[str, str]) -> "DiffSummary":
+        """Return a DiffSummary class from the status of each changed file.
+
+        Args:
+            statuses: The status of each changed file, A, M or D, by path.
+
+        Returns:
+            DiffSummary class
+        """
+        return DiffSummary(
+            is_dirty=len(statuses) > 0,
+            new=frozenset(path for path, status in statuses.items() if status == "A"),
+            removed=frozenset(path for path, status in statuses.items() if status == "D"),
+            modified=frozenset(path for path, status in statuses.items() if status == "M"),
+        )
+
     def __add__(self, other: Any) -> "DiffSummary":
         """Add two instances of DiffSummary classes.
 
@@ -135,7 +167,9 @@ class DiffSummary(NamedTuple):
         return " // ".join(chain(modified_str, new_str, removed_str))
 
 
-def _commit_file_to_tree_element(commit_file: commit_module.FileAction) -> InputGitTreeElement:
+def _commit_file_to_tree_element(
+    commit_file: commit_module.FileAction,
+) -> "InputGitTreeElement":
     """Convert a file with an action to a tree element.
 
     Args:
@@ -147,6 +181,8 @@ def _commit_file_to_tree_element(commit_file: commit_module.FileAction) -> Input
     Raises:
         NotImplementedError: for unsupported commit file types.
     """
+    from github.InputGitTreeElement import InputGitTreeElement
+
     match type(commit_file):
         case commit_module.FileAddedOrModified:
             commit_file = cast(commit_module.FileAddedOrModified, commit_file)
@@ -163,10 +199,53 @@ def _commit_file_to_tree_element(commit_file: commit_module.FileAction) -> Input
             raise NotImplementedError(f"unsupported file in commit, {commit_file}")
 
 
+def _remote_git(git: Git, command: str, *args: str) -> str:
+    """Run a git command that talks to the remote, killing it once the time of the run is up.
+
+    Args:
+        git: The git command wrapper of the repository.
+        command: The git sub command, e.g., fetch.
+        args: The arguments of the sub command.
+
+    Returns:
+        The output of the command.
+
+    Raises:
+        GitCommandError: if the command failed before the time of the run was up.
+    """
+    operation = f"the git {command}"
+    try:
+        return getattr(git, command)(*args, kill_after_timeout=deadline.kill_after(operation))
+    except GitCommandError:
+        # A command killed at the deadline is reported as the deadline being exceeded
+        deadline.check(operation)
+        raise
+
+
+@dataclasses.dataclass
+class _SharedState:
+    """State shared by the clients for the charms of a repository.
+
+    Attrs:
+        lock: Serializes the git commands that fetch or update the refs of the repository.
+        deferred_tags: The commit requested for each tag while tagging is deferred, None otherwise.
+        ref_index: The refs of the repository, None until loaded or after the refs changed.
+        github_repository: The client for the remote repository, None until first used.
+        create_github_repository: Creates the client for the remote repository on first use.
+    """
+
+    lock: threading.RLock = dataclasses.field(default_factory=threading.RLock)
+    deferred_tags: dict[str, str] | None = None
+    ref_index: RefIndex | None = None
+    github_repository: "Repository | None" = None
+    create_github_repository: "Callable[[], Repository] | None" = None
+
+
 class Client:  # pylint: disable=too-many-public-methods
     """Wrapper for git/git-server related functionalities.
 
     Attrs:
+        migrate_branch: The branch the pull request with the migrated documentation is opened from.
         base_path: The root directory of the repository.
         base_charm_path: The directory of the repository where the charm is.
         docs_path: The directory of the repository where the documentation is.
@@ -178,20 +257,105 @@ class Client:  # pylint: disable=too-many-public-methods
     """
 
     def __init__(
-        self, repository: Repo, github_repository: Repository, charm_dir: str = ""
+        self,
+        repository: Repo,
+        github_repository: "Repository | None",
+        charm_dir: str = "",
+        create_github_repository: "Callable[[], Repository] | None" = None,
     ) -> None:
         """Construct.
 
         Args:
             repository: Client for interacting with local git repository.
-            github_repository: Client for interacting with remote github repository.
+            github_repository: Client for interacting with remote github repository, None to
+                create it using create_github_repository when it is first used.
             charm_dir: Relative directory where charm files are located.
+            create_github_repository: Creates the client for the remote github repository.
         """
         self._git_repo = repository
-        self._github_repo = github_repository
         self._charm_dir = charm_dir
+        self._shared = _SharedState(
+            github_repository=github_repository, create_github_repository=create_github_repository
+        )
+        self.migrate_branch = DEFAULT_BRANCH_NAME
         self._configure_git_user()
 
+    def for_charm_dir(self, charm_dir: str) -> "Client":
+        """Get a client for another charm in the same repository.
+
+        The client shares the local and remote repository clients, the git lock and the deferred
+        tags with this client. The pull request of the migration is opened from a branch for the
+        charm so that the charms do not overwrite or close each other's pull request.
+
+        Args:
+            charm_dir: Relative directory where the charm files are located.
+
+        Returns:
+            The client for the charm.
+        """
+        client = copy.copy(self)
+        client._charm_dir = charm_dir  # pylint: disable=protected-access
+        if slug := re.sub(r"[^\w.-]+", "-", charm_dir).strip("-."):
+            client.migrate_branch = f"{DEFAULT_BRANCH_NAME}-{slug}"
+        return client
+
+    @contextmanager
+    def defer_tagging(self) -> Iterator[dict[str, str]]:
+        """Record the tags requested with tag_commit instead of creating them.
+
+        Allows the charms of a batch to be reconciled against the same tag and the tag to be
+        moved once all of them are done. Applies to all the clients for the repository.
+
+        Yields:
+            The commit requested for each tag, filled until the end of the context.
+        """
+        deferred_tags: dict[str, str] = {}
+        self._shared.deferred_tags = deferred_tags
+        try:
+            yield deferred_tags
+        finally:
+            self._shared.deferred_tags = None
+
+    def _refs(self) -> RefIndex:
+        """Get the refs of the repository, loading them if they changed since they were loaded.
+
+        Returns:
+            The index of the refs.
+        """
+        with self._shared.lock:
+            if self._shared.ref_index is None:
+                self._shared.ref_index = RefIndex.load(self._git_repo)
+            return self._shared.ref_index
+
+    def _refs_changed(self) -> None:
+        """Reload the refs on their next use after the client created, deleted or fetched refs."""
+        self._shared.ref_index = None
+
+    @property
+    def _github_repo(self) -> "Repository":
+        """Return the client for the remote repository, created when it is first used.
+
+        Returns:
+            The client shared by the clients for the charms of the repository.
+        """
+        with self._shared.lock:
+            if self._shared.github_repository is None:
+                # Either the client or the function creating it is always given
+                create_github_repository = cast(
+                    Callable[[], "Repository"], self._shared.create_github_repository
+                )
+                self._shared.github_repository = create_github_repository()
+            return self._shared.github_repository
+
+    @_github_repo.setter
+    def _github_repo(self, github_repository: "Repository") -> None:
+        """Replace the client for the remote repository.
+
+        Args:
+            github_repository: The client shared by the clients for the charms of the repository.
+        """
+        self._shared.github_repository = github_repository
+
     @cached_property
     def base_path(self) -> Path:
         """Return the Path of the repository.
@@ -235,13 +399,10 @@ class Client:  # pylint: disable=too-many-public-methods
         try:
             return self._git_repo.active_branch.name
         except TypeError:
-            tag = next(
-                (tag for tag in self._git_repo.tags if tag.commit == self._git_repo.head.commit),
-                None,
-            )
-            if tag:
-                return tag.name
-            return self.current_commit
+            current_commit = self.current_commit
+            if tags := self._refs().tags_at(current_commit):
+                return tags[0]
+            return current_commit
 
     @property
     def current_commit(self) -> str:
@@ -289,6 +450,79 @@ class Client:  # pylint: disable=too-many-public-methods
             self._git_repo.index.diff(None)
         ) + DiffSummary.from_raw_diff(self._git_repo.head.commit.diff())
 
+    def _has_commit(self, commit_sha: str) -> bool:
+        """Check whether a commit is in the local repository.
+
+        Args:
+            commit_sha: SHA of the commit.
+
+        Returns:
+            Whether the commit is available locally.
+
+        Raises:
+            GitCommandError: if git failed for another reason than the commit being missing.
+        """
+        try:
+            self._git_repo.git.rev_parse("--verify", "--quiet", f"{commit_sha}^{{commit}}")
+        except GitCommandError as exc:
+            if exc.status == 1:
+                return False
+            raise
+        return True
+
+    def _is_ancestor(self, commit_sha: str, branch: str) -> bool:
+        """Check whether a commit is reachable from a branch in the local history.
+
+        Args:
+            commit_sha: SHA of the commit.
+            branch: The name of the local branch.
+
+        Returns:
+            Whether the commit is the branch or one of its ancestors.
+
+        Raises:
+            GitCommandError: if git failed for another reason than the commit not being an
+                ancestor.
+        """
+        try:
+            self._git_repo.git.merge_base("--is-ancestor", commit_sha, branch)
+        except GitCommandError as exc:
+            if exc.status == 1:
+                return False
+            raise
+        return True
+
+    def _deepen_until(self, check: Callable[[], bool], fetch_missing: bool) -> bool:
+        """Fetch more of the history until a check passes or the whole history is fetched.
+
+        A shallow clone is deepened step by step, doubling the number of commits each time, and
+        only fetches the full history once the maximum step is exceeded.
+
+        Args:
+            check: The check that may fail because of missing history.
+            fetch_missing: Whether to fetch once if the check fails for a full clone, e.g., for a
+                commit that was pushed since the clone.
+
+        Returns:
+            Whether the check passed.
+        """
+        deepen = ANCESTRY_INITIAL_DEEPEN
+        while not check():
+            if self._git_repo.git.rev_parse("--is-shallow-repository") == "true":
+                if deepen <= ANCESTRY_MAX_DEEPEN:
+                    _remote_git(self._git_repo.git, "fetch", f"--deepen={deepen}")
+                    deepen *= 2
+                else:
+                    logging.info("fetching the full history of the repository")
+                    _remote_git(self._git_repo.git, "fetch", "--unshallow")
+            elif fetch_missing:
+                _remote_git(self._git_repo.git, "fetch")
+                fetch_missing = False
+            else:
+                return False
+            self._refs_changed()
+        return True
+
     def is_commit_in_branch(self, commit_sha: str, branch: str | None = None) -> bool:
         """Check if commit exists in a given branch.
 
@@ -303,22 +537,47 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
              boolean representing whether the commit exists in the branch
         """
-        star_pattern = re.compile(r"^\* ")
         try:
-            # This effectively means preventing a shallow repository to not behave correctly.
-            # Note that the special depth 2147483647 (or 0x7fffffff, the largest positive number a
-            # signed 32-bit integer can contain) means infinite depth.
-            # Reference: https://git-scm.com/docs/shallow
-            self._git_repo.git.fetch("--depth=2147483647")
-            branches_with_commit = {
-                star_pattern.sub("", _branch).strip()
-                for _branch in self._git_repo.git.branch("--contains", commit_sha).split("\n")
-            }
+            with self._shared.lock:
+                if not self._deepen_until(
+                    check=lambda: self._has_commit(commit_sha), fetch_missing=True
+                ):
+                    raise RepositoryClientError(f"{commit_sha} not found in git repository.")
+                branch_name = branch or self.current_branch
+                if branch_name not in self.branches:
+                    return False
+                return self._deepen_until(
+                    check=lambda: self._is_ancestor(commit_sha, branch_name), fetch_missing=False
+                )
+        except GitCommandError as exc:
+            raise RepositoryClientError(f"unknown error {exc}") from exc
+
+    def is_ancestor(self, ancestor_sha: str, commit_sha: str) -> bool:
+        """Check if a commit is another commit or one of its ancestors.
+
+        Args:
+            ancestor_sha: SHA of the possible ancestor.
+            commit_sha: SHA of the commit.
+
+        Raises:
+            RepositoryClientError: when the commit is not found in the repository
+
+        Returns:
+            Whether the commit is reachable from the other commit, False if it is not found.
+        """
+        try:
+            with self._shared.lock:
+                if not self._deepen_until(
+                    check=lambda: self._has_commit(commit_sha), fetch_missing=True
+                ):
+                    raise RepositoryClientError(f"{commit_sha} not found in git repository.")
+                return self._deepen_until(
+                    check=lambda: self._has_commit(ancestor_sha)
+                    and self._is_ancestor(ancestor_sha, commit_sha),
+                    fetch_missing=False,
+                )
         except GitCommandError as exc:
-            if f"no such commit {commit_sha}" in exc.stderr:
-                raise RepositoryClientError(f"{commit_sha} not found in git repository.") from exc
             raise RepositoryClientError(f"unknown error {exc}") from exc
-        return (branch or self.current_branch) in branches_with_commit
 
     def pull(self, branch_name: str | None = None) -> None:
         """Pull content from remote for the provided branch.
@@ -327,7 +586,10 @@ class Client:  # pylint: disable=too-many-public-methods
             branch_name: branch to be pulled from the remote
         """
         if branch_name is None:
-            self._git_repo.git.pull()
+            try:
+                _remote_git(self._git_repo.git, "pull")
+            finally:
+                self._refs_changed()
         else:
             with self.with_branch(branch_name) as repo:
                 repo.pull()
@@ -348,7 +610,8 @@ class Client:  # pylint: disable=too-many-public-methods
             self._git_repo.git.stash()
 
         try:
-            self._git_repo.git.fetch("--all")
+            _remote_git(self._git_repo.git, "fetch", "--all")
+            self._refs_changed()
             self._git_repo.git.checkout(branch_name, "--")
         finally:
             if is_dirty:
@@ -404,27 +667,40 @@ class Client:  # pylint: disable=too-many-public-methods
             self._git_repo.git.branch(branch_name, base or self.current_branch)
         except GitCommandError as exc:
             raise RepositoryClientError(f"Unexpected error creating new branch. {exc=!r}") from exc
+        finally:
+            self._refs_changed()
 
         return self
 
     def _github_client_push(
-        self, commit_files: Iterable[commit_module.FileAction], commit_msg: str
+        self,
+        commit_files: Iterable[commit_module.FileAction],
+        commit_msg: str,
+        branch_name: str | None = None,
     ) -> None:
         """Push files from a commit to GitHub using PyGithub.
 
         Args:
             commit_files: The files that were added, modified or deleted in a commit.
             commit_msg: The message to use for commits.
+            branch_name: The branch to push to, the current branch by default.
         """
-        branch = self._github_repo.get_branch(self.current_branch)
-        current_tree = self._github_repo.get_git_tree(sha=branch.commit.sha)
+        branch_name = branch_name or self.current_branch
+        with metrics.timed(metrics.GITHUB, "get_branch"):
+            branch = self._github_repo.get_branch(branch_name)
+        with metrics.timed(metrics.GITHUB, "get_git_tree"):
+            current_tree = self._github_repo.get_git_tree(sha=branch.commit.sha)
         tree_elements = [_commit_file_to_tree_element(commit_file) for commit_file in commit_files]
-        tree = self._github_repo.create_git_tree(tree_elements, current_tree)
-        commit = self._github_repo.create_git_commit(
-            message=commit_msg, tree=tree, parents=[branch.commit.commit]
-        )
-        branch_git_ref = self._github_repo.get_git_ref(f"heads/{self.current_branch}")
-        branch_git_ref.edit(sha=commit.sha)
+        with metrics.timed(metrics.GITHUB, "create_git_tree"):
+            tree = self._github_repo.create_git_tree(tree_elements, current_tree)
+        with metrics.timed(metrics.GITHUB, "create_git_commit"):
+            commit = self._github_repo.create_git_commit(
+                message=commit_msg, tree=tree, parents=[branch.commit.commit]
+            )
+        with metrics.timed(metrics.GITHUB, "get_git_ref"):
+            branch_git_ref = self._github_repo.get_git_ref(f"heads/{branch_name}")
+        with metrics.timed(metrics.GITHUB, "edit_git_ref"):
+            branch_git_ref.edit(sha=commit.sha)
 
     def update_branch(
         self,
@@ -448,6 +724,8 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
             Repository client with the updated branch
         """
+        from github.GithubException import GithubException
+
         directory = str(directory) if directory else "."
         push_args = ["-u"]
         if force:
@@ -457,13 +735,13 @@ class Client:  # pylint: disable=too-many-public-methods
         try:
             # Create the branch if it doesn't exist
             if push:
-                self._git_repo.git.push(*push_args)
+                _remote_git(self._git_repo.git, "push", *push_args)
 
             self._git_repo.git.add("-A", directory)
             self._git_repo.git.commit("-m", f"'{commit_msg}'")
             if push:
                 try:
-                    self._git_repo.git.push(*push_args)
+                    _remote_git(self._git_repo.git, "push", *push_args)
                 except GitCommandError as exc:
                     # Try with the PyGithub client, suppress any errors and report the original
                     # problem on failure
@@ -484,6 +762,8 @@ class Client:  # pylint: disable=too-many-public-methods
             raise RepositoryClientError(
                 f"Unexpected error updating branch {self.current_branch}. {exc=!r}"
             ) from exc
+        finally:
+            self._refs_changed()
         return self
 
     def _configure_git_user(self) -> None:
@@ -512,12 +792,11 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
             True if the two pointers coincides, False otherwise.
         """
-        if self.tag_exists(tag):
-            with self.with_branch(tag) as repo:
-                return repo.current_commit == commit
-        return False
+        # Compares the commit of the tag rather than checking it out so that the working tree is
+        # left untouched for the other charms of a batch
+        return self.tag_exists(tag) == commit
 
-    def get_pull_request(self, branch_name: str) -> PullRequest | None:
+    def get_pull_request(self, branch_name: str) -> "PullRequest | None":
         """Return open pull request matching the provided branch name.
 
         Args:
@@ -529,11 +808,12 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
             PullRequest object. If no PR is found, None is returned.
         """
-        open_pull = [
-            pull
-            for pull in self._github_repo.get_pulls(head=branch_name)
-            if pull.head.ref == branch_name
-        ]
+        with metrics.timed(metrics.GITHUB, "get_pulls"):
+            open_pull = [
+                pull
+                for pull in self._github_repo.get_pulls(head=branch_name)
+                if pull.head.ref == branch_name
+            ]
         if len(open_pull) > 1:
             raise RepositoryClientError(
                 f"More than one open pull request with branch {branch_name}"
@@ -543,9 +823,133 @@ class Client:  # pylint: disable=too-many-public-methods
 
         return open_pull[0]
 
-    def create_pull_request(self, base: str) -> PullRequest:
+    def resolve_commit(self, name: str, remote_first: bool = False) -> str:
+        """Get the commit of a branch, tag or commit without checking it out.
+
+        Args:
+            name: The branch, tag or commit.
+            remote_first: Whether the branch on the remote takes precedence over the local branch.
+
+        Returns:
+            The SHA of the commit.
+
+        Raises:
+            RepositoryClientError: if there is no such branch, tag or commit.
+        """
+        branch_refs = [f"refs/heads/{name}", f"refs/remotes/{ORIGIN_NAME}/{name}"]
+        commit_by_ref = self._refs().commit_by_ref
+        for ref in reversed(branch_refs) if remote_first else branch_refs:
+            if ref in commit_by_ref:
+                return commit_by_ref[ref]
+        try:
+            return self._git_repo.git.rev_parse("--verify", "--quiet", f"{name}^{{commit}}")
+        except GitCommandError as exc:
+            raise RepositoryClientError(f"Unable to find commit of {name}. {exc=!r}") from exc
+
+    def _write_docs_tree(self, parent: str) -> tuple[str, str]:
+        """Write the tree of a commit with the changes to the docs in the working tree.
+
+        Args:
+            parent: The commit the changes are applied to.
+
+        Returns:
+            The tree of the commit and the tree with the changes.
+        """
+        git = self._git_repo.git
+        changes = plumbing.write_blobs(
+            repository=self._git_repo, directory=str(self.docs_path.relative_to(self.base_path))
+        )
+        parent_tree = git.rev_parse(f"{parent}^{{tree}}")
+        tree = plumbing.write_tree(
+            repository=self._git_repo, tree_sha=parent_tree, changes=changes
+        )
+        return parent_tree, tree or plumbing.EMPTY_TREE_SHA
+
+    def has_docs_changes(self, base: str) -> bool:
+        """Check whether the changes to the docs in the working tree change a branch or tag.
+
+        Unlike is_dirty with a branch, the working tree is not switched to the branch.
+
+        Args:
+            base: The branch or tag to apply the changes to.
+
+        Returns:
+            Whether applying the changes results in different content.
+        """
+        parent_tree, tree = self._write_docs_tree(self.resolve_commit(base))
+        return tree != parent_tree
+
+    def _commit_docs(self, branch_name: str, parent: str, force: bool = False) -> bool:
+        """Commit the changes to the docs in the working tree on top of a commit and push it.
+
+        The commit is built from the objects of the repository, the working tree, the index and
+        the branch that is checked out are left as they are.
+
+        Args:
+            branch_name: The branch to point to the new commit locally and on the remote.
+            parent: The commit the changes are applied to.
+            force: Whether to overwrite the branch on the remote.
+
+        Raises:
+            RepositoryClientError: if the commit could not be pushed.
+
+        Returns:
+            Whether there were changes to commit.
+        """
+        from github.GithubException import GithubException
+
+        git = self._git_repo.git
+        parent_tree, tree = self._write_docs_tree(parent)
+        if tree == parent_tree:
+            return False
+        statuses = plumbing.diff_trees(
+            repository=self._git_repo, old_tree_sha=parent_tree, new_tree_sha=tree
+        )
+        msg = str(DiffSummary.from_statuses(statuses))
+        logging.info("Updating branch %s with new commit: %s", branch_name, msg)
+        commit_sha = git.commit_tree(tree, "-p", parent, "-m", msg)
+
+        force_args = ["-f"] if force else []
+        try:
+            _remote_git(
+                git, "push", *force_args, ORIGIN_NAME, f"{commit_sha}:refs/heads/{branch_name}"
+            )
+            git.update_ref(f"refs/heads/{branch_name}", commit_sha)
+        except GitCommandError as exc:
+            # Try with the PyGithub client on top of the parent, suppress any errors and report the
+            # original problem on failure
+            try:
+                logging.info("encountered error with push, try to use GitHub API to sign commits")
+                _remote_git(
+                    git, "push", *force_args, ORIGIN_NAME, f"{parent}:refs/heads/{branch_name}"
+                )
+                commit_files = (
+                    (
+                        commit_module.FileDeleted(Path(path))
+                        if status == "D"
+                        else commit_module.FileAddedOrModified(
+                            Path(path), (self.base_path / path).read_text(encoding="utf-8")
+                        )
+                    )
+                    for path, status in statuses.items()
+                )
+                self._github_client_push(
+                    commit_files=commit_files, commit_msg=msg, branch_name=branch_name
+                )
+            except (GitCommandError, GithubException) as nested_exc:
+                raise RepositoryClientError(
+                    f"Unexpected error updating branch {branch_name}. {exc=!r}"
+                ) from nested_exc
+        finally:
+            self._refs_changed()
+        return True
+
+    def create_pull_request(self, base: str) -> "PullRequest":
         """Create pull request for changes in given repository path.
 
+        The migration branch is created from the base with a single commit without switching the
+        working tree to it.
+
         Args:
             base: tag or branch against to which the PR is opened
 
@@ -555,35 +959,32 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
             Pull request object
         """
-        if not self.is_dirty(base):
+        if not self._commit_docs(
+            branch_name=self.migrate_branch, parent=self.resolve_commit(base), force=True
+        ):
             raise InputError("No files seem to be migrated. Please add contents upstream first.")
 
-        with self.create_branch(DEFAULT_BRANCH_NAME, base).with_branch(
-            DEFAULT_BRANCH_NAME
-        ) as repo:
-            msg = str(repo.get_summary(self.docs_path))
-            logging.info("Creating new branch with new commit: %s", msg)
-            repo.update_branch(msg, directory=self.docs_path, force=True)
-            pull_request = _create_github_pull_request(
-                self._github_repo, DEFAULT_BRANCH_NAME, base
-            )
-            logging.info("Opening new PR with community contribution: %s", pull_request.html_url)
-
+        pull_request = _create_github_pull_request(self._github_repo, self.migrate_branch, base)
+        logging.info("Opening new PR with community contribution: %s", pull_request.html_url)
         return pull_request
 
     def update_pull_request(self, branch: str) -> None:
         """Update and push changes to the given branch.
 
+        The changes are committed on top of the branch on the remote without switching the
+        working tree to it.
+
         Args:
             branch: name of the branch to be updated
         """
-        with self.with_branch(branch) as repo:
-            if repo.is_dirty():
-                repo.pull()
-                msg = str(repo.get_summary(self.docs_path))
-                logging.info("Summary: %s", msg)
-                logging.info("Updating PR with new commit: %s", msg)
-                repo.update_branch(msg, directory=self.docs_path)
+        self._commit_docs(
+            branch_name=branch, parent=self.resolve_commit(branch, remote_first=True)
+        )
+
+    def discard_changes(self) -> None:
+        """Remove the changes to the working tree, including new files."""
+        self._git_repo.git.reset("--hard")
+        self._git_repo.git.clean("-fd")
 
     def is_dirty(self, branch_name: str | None = None) -> bool:
         """Check if repository path has any changes including new files.
@@ -600,6 +1001,38 @@ class Client:  # pylint: disable=too-many-public-methods
         with self.with_branch(branch_name) as client:
             return client.is_dirty()
 
+    def get_blob_shas(self, tree_ish: str, directory: Path) -> dict[Path, str]:
+        """Get the SHA of the blob of each file in a directory of a commit without checking it out.
+
+        Args:
+            tree_ish: The tag, branch or commit to read the files of.
+            directory: The directory in the working tree to read the files of.
+
+        Returns:
+            The SHA of the blob by path in the working tree, empty if the directory does not exist
+            for the tree-ish.
+
+        Raises:
+            RepositoryClientError: if the tree-ish does not exist.
+        """
+        try:
+            output = self._git_repo.git.ls_tree(
+                "-r", "-z", "--full-tree", tree_ish, "--", directory.relative_to(self.base_path)
+            )
+        except GitCommandError as exc:
+            raise RepositoryClientError(
+                f"Unable to list the files of {tree_ish}. {exc=!r}"
+            ) from exc
+        blob_shas = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            _, object_type, object_sha = info.split()
+            if object_type == "blob":
+                blob_shas[self.base_path / path] = object_sha
+        return blob_shas
+
     def tag_exists(self, tag_name: str) -> str | None:
         """Check if a given tag exists.
 
@@ -609,35 +1042,87 @@ class Client:  # pylint: disable=too-many-public-methods
         Returns:
             hash of the commit the tag refers to.
         """
-        self._git_repo.git.fetch("--all", "--tags", "--force")
-        tags = [tag.commit for tag in self._git_repo.tags if tag_name == tag.name]
-        if not tags:
-            return None
-        return tags[0].hexsha
+        with self._shared.lock:
+            _remote_git(self._git_repo.git, "fetch", "--all", "--tags", "--force")
+            self._refs_changed()
+            return self._refs().tag(tag_name)
 
-    def tag_commit(self, tag_name: str, commit_sha: str) -> None:
+    def tag_commit(self, tag_name: str, commit_sha: str, message: str | None = None) -> None:
         """Tag a commit, if the tag already exists, it is deleted first.
 
+        The message is not recorded while tagging is deferred.
+
         Args:
             tag_name: The name of the tag.
             commit_sha: The SHA of the commit to tag.
+            message: The message of the annotation, the tag is lightweight if not given.
 
         Raises:
             RepositoryClientError: if there is a problem with communicating with GitHub
         """
-        try:
-            if self.tag_exists(tag_name):
-                logging.info("Removing tag %s", tag_name)
-                self._git_repo.git.tag("-d", tag_name)
-                self._git_repo.git.push("--delete", "origin", tag_name)
+        if self._shared.deferred_tags is not None:
+            logging.info("Deferring tagging commit %s with tag %s", commit_sha, tag_name)
+            self._shared.deferred_tags[tag_name] = commit_sha
+            return
 
-            logging.info("Tagging commit %s with tag %s", commit_sha, tag_name)
-            self._git_repo.git.tag(tag_name, commit_sha)
-            self._git_repo.git.push("origin", tag_name)
+        try:
+            with self._shared.lock:
+                if self.tag_exists(tag_name):
+                    logging.info("Removing tag %s", tag_name)
+                    self._git_repo.git.tag("-d", tag_name)
+                    _remote_git(self._git_repo.git, "push", "--delete", "origin", tag_name)
+
+                logging.info("Tagging commit %s with tag %s", commit_sha, tag_name)
+                if message is None:
+                    self._git_repo.git.tag(tag_name, commit_sha)
+                else:
+                    self._git_repo.git.tag(
+                        "--annotate", "--message", message, tag_name, commit_sha
+                    )
+                _remote_git(self._git_repo.git, "push", "origin", tag_name)
 
         except GitCommandError as exc:
             logging.error("Tagging commit failed because of %s", exc)
             raise RepositoryClientError(f"Tagging commit failed. {exc=!r}") from exc
+        finally:
+            self._refs_changed()
+
+    def tag_message(self, tag_name: str) -> str | None:
+        """Get the message of the annotation of a tag as it was last fetched.
+
+        Args:
+            tag_name: The name of the tag.
+
+        Returns:
+            The message, None if the tag does not exist or is lightweight.
+        """
+        with self._shared.lock:
+            output = self._git_repo.git.for_each_ref(
+                "--format=%(objecttype) %(contents)", f"refs/tags/{tag_name}"
+            )
+        object_type, _, message = output.partition(" ")
+        return message.rstrip() if object_type == "tag" else None
+
+    def read_file(self, tree_ish: str, path: Path) -> str:
+        """Get the content of a file of a commit from the local repository.
+
+        Args:
+            tree_ish: The tag, branch or commit.
+            path: The file.
+
+        Returns:
+            The content of the file.
+
+        Raises:
+            RepositoryFileNotFoundError: if the file does not exist in the commit.
+        """
+        relative_path = path.relative_to(self.base_path).as_posix()
+        try:
+            return self._git_repo.git.show(f"{tree_ish}:{relative_path}")
+        except GitCommandError as exc:
+            raise RepositoryFileNotFoundError(
+                f"Unable to read {relative_path} of {tree_ish}. {exc=!r}"
+            ) from exc
 
     def get_file_content_from_tag(self, path: str, tag_name: str) -> str:
         """Get the content of a file for a specific tag.
@@ -655,9 +1140,12 @@ class Client:  # pylint: disable=too-many-public-methods
                 one file is returned or a non-file is returned
             RepositoryClientError: if there is a problem with communicating with GitHub
         """
+        from github.GithubException import GithubException, UnknownObjectException
+
         # Get the tag
         try:
-            tag_ref = self._github_repo.get_git_ref(f"tags/{tag_name}")
+            with metrics.timed(metrics.GITHUB, "get_git_ref"):
+                tag_ref = self._github_repo.get_git_ref(f"tags/{tag_name}")
             # git has 2 types of tags, lightweight and annotated tags:
             # https://git-scm.com/book/en/v2/Git-Basics-Tagging
             if tag_ref.object.type == "commit":
@@ -665,7 +1153,8 @@ class Client:  # pylint: disable=too-many-public-methods
                 commit_sha = tag_ref.object.sha
             else:
                 # annotated tag, need to retrieve the commit SHA linked to the tag
-                git_tag = self._github_repo.get_git_tag(tag_ref.object.sha)
+                with metrics.timed(metrics.GITHUB, "get_git_tag"):
+                    git_tag = self._github_repo.get_git_tag(tag_ref.object.sha)
                 commit_sha = git_tag.object.sha
         except UnknownObjectException as exc:
             raise RepositoryTagNotFoundError(
@@ -676,7 +1165,8 @@ class Client:  # pylint: disable=too-many-public-methods
 
         # Get the file contents
         try:
-            content_file = self._github_repo.get_contents(path, commit_sha)
+            with metrics.timed(metrics.GITHUB, "get_contents"):
+                content_file = self._github_repo.get_contents(path, commit_sha)
         except UnknownObjectException as exc:
             raise RepositoryFileNotFoundError(
                 f"Could not retrieve the file at {path=} for tag {tag_name}. {exc=!r}"
@@ -698,8 +1188,8 @@ class Client:  # pylint: disable=too-many-public-methods
 
 
 def _create_github_pull_request(
-    github_repo: Repository, branch_name: str, base: str
-) -> PullRequest:
+    github_repo: "Repository", branch_name: str, base: str
+) -> "PullRequest":
     """Create pull request using the provided branch.
 
     Args:
@@ -713,13 +1203,16 @@ def _create_github_pull_request(
     Returns:
         PullRequest object representing the opened pull request.
     """
+    from github.GithubException import GithubException
+
     try:
-        pull_request = github_repo.create_pull(
-            title=ACTIONS_PULL_REQUEST_TITLE,
-            body=ACTIONS_PULL_REQUEST_BODY,
-            base=base,
-            head=branch_name,
-        )
+        with metrics.timed(metrics.GITHUB, "create_pull"):
+            pull_request = github_repo.create_pull(
+                title=ACTIONS_PULL_REQUEST_TITLE,
+                body=ACTIONS_PULL_REQUEST_BODY,
+                base=base,
+                head=branch_name,
+            )
     except GithubException as exc:
         raise RepositoryClientError(f"Unexpected error creating pull request. {exc=!r}") from exc
 
@@ -746,7 +1239,10 @@ def _get_repository_name_from_git_url(remote_url: str) -> str:
 
 
 def create_repository_client(
-    access_token: str | None, base_path: Path, charm_dir: str = ""
+    access_token: str | None,
+    base_path: Path,
+    charm_dir: str = "",
+    github_client: "Github | None" = None,
 ) -> Client:
     """Create a Github instance to handle communication with Github server.
 
@@ -754,6 +1250,8 @@ def create_repository_client(
         access_token: Access token that has permissions to open a pull request.
         base_path: Path where local .git resides in.
         charm_dir: Relative directory where the charm files are located.
+        github_client: The client to reuse for the GitHub API, e.g., to pool the connections
+            across repositories, created using the access token if not given.
 
     Raises:
         InputError: if invalid access token or invalid git remote URL is provided.
@@ -766,10 +1264,30 @@ def create_repository_client(
             f"Invalid 'access_token' input, it must be non-empty, got {access_token=!r}"
         )
 
-    local_repo = Repo(base_path)
+    local_repo = metrics.MeteredRepo(base_path)
     logging.info("executing in git repository in the directory: %s", local_repo.working_dir)
-    github_client = Github(auth=Token(access_token))
     remote_url = local_repo.remote().url
     repository_fullname = _get_repository_name_from_git_url(remote_url=remote_url)
-    remote_repo = github_client.get_repo(repository_fullname)
-    return Client(repository=local_repo, github_repository=remote_repo, charm_dir=charm_dir)
+    token = access_token
+
+    def create_github_repository() -> "Repository":
+        """Create the client for the remote repository.
+
+        PyGithub is only imported and the repository is only requested once GitHub is needed.
+
+        Returns:
+            The client for the remote repository.
+        """
+        from github import Github
+        from github.Auth import Token
+
+        client = github_client if github_client is not None else Github(auth=Token(token))
+        with metrics.timed(metrics.GITHUB, "get_repo"):
+            return client.get_repo(repository_fullname)
+
+    return Client(
+        repository=local_repo,
+        github_repository=None,
+        charm_dir=charm_dir,
+        create_github_repository=create_github_repository,
+    )
@@ -0,0 +1,34 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Retries of the requests to Discourse that stop at the deadline of the run."""
+
+from urllib3 import Retry
+from urllib3.response import BaseHTTPResponse
+
+from gatekeeper import deadline
+
+RETRY_OPERATION = "retrying the Discourse request"
+
+
+class DeadlineRetry(Retry):
+    """Retries of a request that are only made if they end before the deadline of the run.
+
+    The wait before a retry, either the backoff or the time the server asks for, and the retry
+    itself have to fit in the time left, otherwise the request fails with DeadlineExceededError.
+    """
+
+    def sleep(self, response: BaseHTTPResponse | None = None) -> None:
+        """Wait before retrying the request.
+
+        Args:
+            response: The response that is retried, None if the request failed.
+        """
+        retry_after = (
+            self.get_retry_after(response)
+            if self.respect_retry_after_header and response is not None
+            else None
+        )
+        deadline.wait_before_retry(
+            retry_after if retry_after else self.get_backoff_time(), operation=RETRY_OPERATION
+        )
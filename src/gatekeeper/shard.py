@@ -0,0 +1,276 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Split the repositories of a fleet over several runners using leases in a shared directory.
+
+Each runner claims a repository by creating its lease file, which is atomic on local and most
+shared filesystems. A runner processes its own shard first and then steals the repositories of the
+other shards that are not claimed yet. The lease of a repository is renewed while it is being
+processed, a lease that was not renewed within the lease time, or that was held by the same runner
+before it restarted, is abandoned and can be resumed by any runner. The result of a repository is
+recorded in the directory once it has been processed so that it is not processed again.
+
+Use a new lease directory for each run of the fleet.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import typing
+import uuid
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_LEASE_SECONDS = 600.0
+LEASE_SUFFIX = ".lease"
+DONE_SUFFIX = ".done"
+
+
+def shard_of(key: str, shard_count: int) -> int:
+    """Get the shard of a key, the same on every runner.
+
+    Args:
+        key: The key, e.g., the URL of a repository.
+        shard_count: The number of shards.
+
+    Returns:
+        The index of the shard.
+    """
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % shard_count
+
+
+def claim_order(keys: Sequence[str], shard_index: int, shard_count: int) -> list[str]:
+    """Get the order a runner tries to claim the keys in.
+
+    The keys of the shard of the runner come first in their order. The keys of the other shards
+    follow, starting with the next shard, in reverse order so that a runner stealing from a slow
+    runner starts with the keys the slow runner would get to last.
+
+    Args:
+        keys: The keys of all the shards.
+        shard_index: The shard of the runner.
+        shard_count: The number of shards.
+
+    Returns:
+        All the keys in the order to claim them.
+    """
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    for key in keys:
+        shards[shard_of(key, shard_count)].append(key)
+    return shards[shard_index] + [
+        key
+        for offset in range(1, shard_count)
+        for key in reversed(shards[(shard_index + offset) % shard_count])
+    ]
+
+
+class LeaseDirectory:
+    """The leases and results of the repositories of a fleet run shared by the runners.
+
+    Attrs:
+        path: The directory shared by the runners.
+        owner: The identifier of the runner.
+        seconds: The time after which a lease that was not renewed is abandoned.
+    """
+
+    def __init__(self, path: Path, owner: str, seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        """Construct.
+
+        Args:
+            path: The directory shared by the runners.
+            owner: The identifier of the runner, unique across the runners.
+            seconds: The time after which a lease that was not renewed is abandoned.
+        """
+        self.path = path
+        self.owner = owner
+        self.seconds = seconds
+
+    def _file(self, key: str, suffix: str) -> Path:
+        """Get a file for a key.
+
+        Args:
+            key: The key.
+            suffix: The suffix of the file.
+
+        Returns:
+            The file in the directory.
+        """
+        return self.path / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}{suffix}"
+
+    @staticmethod
+    def _read_lease(lease_path: Path) -> tuple[int, str | None]:
+        """Read when a lease was last renewed and its owner.
+
+        Args:
+            lease_path: The lease file.
+
+        Returns:
+            The modification time of the file in nanoseconds and the owner, None if the lease is
+            not complete.
+        """
+        modified = lease_path.stat().st_mtime_ns
+        try:
+            owner = json.loads(lease_path.read_text(encoding="utf-8")).get("owner")
+        except ValueError:
+            # The lease is being written or its owner stopped while writing it
+            owner = None
+        return modified, owner
+
+    def _take_over(self, key: str, lease_path: Path) -> bool:
+        """Remove the existing lease of a key if it was abandoned.
+
+        Args:
+            key: The key.
+            lease_path: The lease file of the key.
+
+        Returns:
+            Whether creating the lease can be tried again.
+        """
+        try:
+            lease = self._read_lease(lease_path)
+        except FileNotFoundError:
+            return True
+        modified, owner = lease
+        if owner != self.owner and time.time() - modified / 1e9 <= self.seconds:
+            return False
+
+        # Renaming is atomic, only one runner moves the lease away
+        stale_path = lease_path.with_suffix(f".stale-{uuid.uuid4().hex}")
+        try:
+            lease_path.rename(stale_path)
+        except FileNotFoundError:
+            return True
+        # Another runner may have taken over the abandoned lease and created its own lease since
+        # it was read, that lease is put back unless a lease was created again in the meantime
+        renamed_lease = self._read_lease(stale_path)
+        if renamed_lease != lease:
+            try:
+                os.link(stale_path, lease_path)
+            except FileExistsError:
+                logging.warning("lease of %s held by %s was replaced", key, renamed_lease[1])
+            stale_path.unlink()
+            return False
+        stale_path.unlink()
+        logging.info("resuming abandoned lease of %s held by %s", key, owner)
+        return True
+
+    def acquire(self, key: str) -> bool:
+        """Claim a key that has not been processed yet.
+
+        Args:
+            key: The key.
+
+        Returns:
+            Whether the runner now holds the lease of the key.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        lease_path = self._file(key, LEASE_SUFFIX)
+        done_path = self._file(key, DONE_SUFFIX)
+        while not done_path.exists():
+            try:
+                descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self._take_over(key=key, lease_path=lease_path):
+                    continue
+                return False
+            with os.fdopen(descriptor, "w", encoding="utf-8") as lease_file:
+                json.dump({"owner": self.owner, "key": key}, lease_file)
+            # Another runner may have completed the key since it was checked
+            if done_path.exists():
+                lease_path.unlink(missing_ok=True)
+                return False
+            return True
+        return False
+
+    def renew(self, key: str) -> None:
+        """Extend the lease of a key held by the runner.
+
+        Args:
+            key: The key.
+        """
+        try:
+            os.utime(self._file(key, LEASE_SUFFIX))
+        except FileNotFoundError:
+            logging.warning("lease of %s was taken over by another runner", key)
+
+    @contextmanager
+    def renewing(self, key: str) -> Iterator[None]:
+        """Keep renewing the lease of a key in the background.
+
+        Args:
+            key: The key.
+        """
+        stopped = threading.Event()
+
+        def renew_until_stopped() -> None:
+            """Renew the lease several times within each lease time."""
+            while not stopped.wait(self.seconds / 3):
+                self.renew(key)
+
+        thread = threading.Thread(target=renew_until_stopped, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def complete(self, key: str, result: dict[str, typing.Any]) -> None:
+        """Record the result of a key and release its lease.
+
+        Args:
+            key: The key.
+            result: The JSON serializable result of processing the key.
+        """
+        done_path = self._file(key, DONE_SUFFIX)
+        temporary_path = done_path.with_suffix(f".tmp-{uuid.uuid4().hex}")
+        temporary_path.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(temporary_path, done_path)
+        self._file(key, LEASE_SUFFIX).unlink(missing_ok=True)
+
+    def results(self) -> list[dict[str, typing.Any]]:
+        """Get the results recorded by all the runners.
+
+        Returns:
+            The results of the completed keys.
+        """
+        return [
+            json.loads(done_path.read_text(encoding="utf-8"))
+            for done_path in sorted(self.path.glob(f"*{DONE_SUFFIX}"))
+        ]
+
+
+class Shard(typing.NamedTuple):
+    """The part of a fleet run processed by a runner.
+
+    Attrs:
+        shard_index: The shard of the runner.
+        shard_count: The number of shards.
+        leases: The leases shared by the runners, without leases the runner only processes its
+            own shard.
+    """
+
+    shard_index: int
+    shard_count: int
+    leases: LeaseDirectory | None
+
+    def order(self, keys: Sequence[str]) -> list[str]:
+        """Get the keys the runner tries to process in order.
+
+        Args:
+            keys: The keys of all the shards.
+
+        Returns:
+            All the keys in the order to claim them if there are leases, otherwise the keys of
+            the shard of the runner.
+        """
+        ordered = claim_order(
+            keys=keys, shard_index=self.shard_index, shard_count=self.shard_count
+        )
+        if self.leases is None:
+            return [key for key in ordered if shard_of(key, self.shard_count) == self.shard_index]
+        return ordered
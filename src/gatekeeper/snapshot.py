@@ -0,0 +1,65 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""The content of the topics read by the reconcile for the migration to reuse."""
+
+import logging
+import threading
+
+
+class ServerSnapshot:
+    """The content of the topics as the reconcile left them on the server.
+
+    The reconcile records the content of each topic it reads. A topic it changes is removed so
+    that it is read again, since the server normalizes the content that is posted. Once frozen,
+    the migration reads the recorded topics from the snapshot instead of the server.
+
+    Attrs:
+        frozen: Whether the snapshot is complete and its topics are read from it.
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self._lock = threading.Lock()
+        self._contents: dict[int, str] = {}
+        self.frozen = False
+
+    def put(self, topic_id: int, content: str) -> None:
+        """Record the content of a topic read from the server, unless frozen.
+
+        Args:
+            topic_id: The identifier of the topic.
+            content: The content of the first post of the topic.
+        """
+        with self._lock:
+            if not self.frozen:
+                self._contents[topic_id] = content
+
+    def discard(self, topic_id: int) -> None:
+        """Remove a topic that was changed on the server.
+
+        Args:
+            topic_id: The identifier of the topic.
+        """
+        with self._lock:
+            self._contents.pop(topic_id, None)
+
+    def get(self, topic_id: int) -> str | None:
+        """Get the content of a topic once the snapshot is frozen.
+
+        Args:
+            topic_id: The identifier of the topic.
+
+        Returns:
+            The content, None if the topic was not recorded or the snapshot is not frozen.
+        """
+        with self._lock:
+            return self._contents.get(topic_id) if self.frozen else None
+
+    def freeze(self) -> None:
+        """Stop recording and start serving the topics."""
+        with self._lock:
+            self.frozen = True
+            logging.info(
+                "Reusing the content of %s topics read by the reconcile", len(self._contents)
+            )
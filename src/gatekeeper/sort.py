@@ -3,14 +3,18 @@
 
 """Sort items for publishing."""
 
+# more_itertools is imported where it is used since many runs finish without sorting the items
+# pylint: disable=import-outside-toplevel
+
 import itertools
 import typing
 from pathlib import Path
 
-from more_itertools import peekable, side_effect
-
 from gatekeeper import index, types_
 
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from more_itertools import peekable
+
 
 class _SortData(typing.NamedTuple):
     """Holds the data structures required for sorting.
@@ -48,6 +52,8 @@ def _create_sort_data(
     Returns:
         The data structures required for sorting.
     """
+    from more_itertools import peekable
+
     # Ensure initial sorting is correct
     alpha_sorted_path_infos = sorted(path_infos, key=lambda path_info: path_info.alphabetical_rank)
     rank_sorted_index_contents = sorted(index_contents, key=lambda item: item.rank)
@@ -86,6 +92,8 @@ def _contents_index_iter(
     Yields:
         PathInfo in sorted order first by the contents index items and then by alphabetical rank.
     """
+    from more_itertools import side_effect
+
     for item in sort_data.items:
         next_item = sort_data.items.peek(None)
 
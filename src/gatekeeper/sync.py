@@ -0,0 +1,212 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Track the topics whose content on the server is the content of the documentation tag.
+
+Editing the first post of a topic bumps the topic unless the topic has replies, so the content of
+a topic without replies that has not been bumped since the server was last found to match the tag
+can be read from git rather than from the server.
+"""
+
+import json
+import logging
+import threading
+import typing
+from pathlib import Path, PurePosixPath
+from urllib import parse
+
+SYNC_STATE_VERSION = 1
+
+
+class SyncState(typing.NamedTuple):
+    """When the server last matched the documentation tag, recorded in the tag annotation.
+
+    Attrs:
+        synced_at: The most recent bump of the topics of the category before the server was read,
+            according to the clock of the server.
+        topics: The path in the repository of the file that has the content of each topic, for
+            the topics that can only be changed by bumping them.
+    """
+
+    synced_at: str
+    topics: typing.Mapping[int, str]
+
+    def to_message(self) -> str:
+        """Convert the state into the message of the tag annotation.
+
+        Returns:
+            The message.
+        """
+        return json.dumps(
+            {
+                "version": SYNC_STATE_VERSION,
+                "synced_at": self.synced_at,
+                "topics": {str(topic_id): path for topic_id, path in sorted(self.topics.items())},
+            },
+            indent=1,
+        )
+
+    @classmethod
+    def from_message(cls, message: str | None) -> "SyncState | None":
+        """Read the state from the message of a tag annotation.
+
+        Args:
+            message: The message, None for a tag without annotation.
+
+        Returns:
+            The state, None if the message does not record a state of this version.
+        """
+        if not message:
+            return None
+        try:
+            value = json.loads(message)
+            if value["version"] != SYNC_STATE_VERSION:
+                return None
+            return cls(
+                synced_at=str(value["synced_at"]),
+                topics={int(topic_id): str(path) for topic_id, path in value["topics"].items()},
+            )
+        except (ValueError, TypeError, KeyError, AttributeError) as exc:
+            logging.info("Ignoring the tag annotation, it is not a sync state: %s", exc)
+            return None
+
+
+def topic_id(url: str) -> int | None:
+    """Get the identifier of a topic from its link without requesting it.
+
+    Args:
+        url: The link to the topic, its last component is the identifier of the topic.
+
+    Returns:
+        The identifier, None if the link does not end with one.
+    """
+    last_component = parse.urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return int(last_component) if last_component.isdigit() else None
+
+
+class SyncTracker:
+    """The topics of a run whose content matches the content of a file of the repository.
+
+    Shared by the charms of a batch, the state is only produced if every charm succeeded.
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self._lock = threading.Lock()
+        self._synced_at: str | None = None
+        self._failed = False
+        # Topics without replies in the category, they are bumped by any edit
+        self._eligible: set[int] = set()
+        self._matched: dict[int, Path] = {}
+        self._used: SyncState | None = None
+        self._unchanged: dict[int, Path] = {}
+
+    def start(self, synced_at: str | None) -> None:
+        """Record the most recent bump before the server is read, the first call is kept.
+
+        Args:
+            synced_at: The most recent bump of the topics of the category, None if unknown.
+        """
+        with self._lock:
+            if self._synced_at is None:
+                self._synced_at = synced_at
+                self._failed = self._failed or synced_at is None
+
+    def fail(self) -> None:
+        """Record that the server might not match the repository once the run is done."""
+        with self._lock:
+            self._failed = True
+
+    def record_topic(self, topic_id_: int, eligible: bool) -> None:
+        """Record a topic read from the server.
+
+        Args:
+            topic_id_: The identifier of the topic.
+            eligible: Whether the topic is in the category and has no replies.
+        """
+        with self._lock:
+            if eligible:
+                self._eligible.add(topic_id_)
+            else:
+                self._eligible.discard(topic_id_)
+
+    def record_match(self, url: str, path: Path) -> None:
+        """Record that the content of a topic is the content of a file.
+
+        Args:
+            url: The link to the topic.
+            path: The file.
+        """
+        if (id_ := topic_id(url)) is None:
+            return
+        with self._lock:
+            self._matched[id_] = path
+
+    def is_using(self, state: SyncState) -> bool:
+        """Check whether the unchanged topics have been worked out from a state.
+
+        Args:
+            state: The state read from the tag.
+
+        Returns:
+            Whether use was called with the state.
+        """
+        with self._lock:
+            return self._used == state
+
+    def use(self, state: SyncState, bumped: typing.Collection[int], base_path: Path) -> None:
+        """Work out the topics that have not changed since the state was recorded.
+
+        Args:
+            state: The state read from the tag.
+            bumped: The topics bumped since the state was recorded.
+            base_path: The root of the repository the paths of the state are relative to.
+        """
+        unchanged = {
+            id_: base_path / path for id_, path in state.topics.items() if id_ not in bumped
+        }
+        logging.info(
+            "%s of %s topics have not changed since %s",
+            len(unchanged),
+            len(state.topics),
+            state.synced_at,
+        )
+        with self._lock:
+            self._used = state
+            self._unchanged = unchanged
+            self._eligible.update(unchanged)
+
+    def unchanged_path(self, url: str) -> Path | None:
+        """Get the file of the tag that has the content of a topic that has not changed.
+
+        Args:
+            url: The link to the topic.
+
+        Returns:
+            The file, None if the topic might have changed.
+        """
+        if (id_ := topic_id(url)) is None:
+            return None
+        with self._lock:
+            return self._unchanged.get(id_)
+
+    def state(self, base_path: Path) -> SyncState | None:
+        """Get the state to record once the server matches the repository.
+
+        Args:
+            base_path: The root of the repository.
+
+        Returns:
+            The state, None if the server might not match the repository.
+        """
+        with self._lock:
+            if self._failed or self._synced_at is None:
+                return None
+            return SyncState(
+                synced_at=self._synced_at,
+                topics={
+                    id_: str(PurePosixPath(path.relative_to(base_path)))
+                    for id_, path in self._matched.items()
+                    if id_ in self._eligible and path.is_relative_to(base_path)
+                },
+            )
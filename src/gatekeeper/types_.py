@@ -46,6 +46,15 @@ class UserInputs(typing.NamedTuple):
         commit_sha: The SHA of the commit the action is running on.
         base_branch: The main branch against which the syncs act on.
         charm_dir: Directory the charm is located in.
+        export_plan: File to write the computed reconcile actions to, if any.
+        apply_plan: File with reconcile actions written by an earlier run to reuse the entries of
+            that are still valid, if any.
+        charm_dirs: Directories of the charms to process in one batch, charm_dir is ignored if
+            there are any.
+        batch_workers: The maximum number of charms of a batch reconciled at the same time.
+        journal_file: File to record the completed reconcile actions in so that a run that stopped
+            resumes where it stopped, if any.
+        cache_dir: Directory kept between runs to store a mirror of the topics in, if any.
     """
 
     discourse: UserInputsDiscourse
@@ -55,6 +64,12 @@ class UserInputs(typing.NamedTuple):
     commit_sha: str
     base_branch: str
     charm_dir: str
+    export_plan: str = ""
+    apply_plan: str = ""
+    charm_dirs: tuple[str, ...] = ()
+    batch_workers: int = 4
+    journal_file: str = ""
+    cache_dir: str = ""
 
 
 class Metadata(typing.NamedTuple):
@@ -271,6 +286,18 @@ class CreateIndexAction:
     content: Content
 
 
+class TopicRevision(typing.NamedTuple):
+    """The revision of the first post of a topic on the server.
+
+    Attrs:
+        post_id: The identifier of the first post.
+        version: The version of the first post, it increases with every edit.
+    """
+
+    post_id: int
+    version: int
+
+
 @dataclasses.dataclass
 class _NoopActionBase:
     """Represents an item with no required changes.
@@ -297,9 +324,12 @@ class NoopPageAction(_NoopActionBase):
 
     Attrs:
         content: The documentation content of the page.
+        server_revision: The revision of the page on the server the content was read at, if
+            known.
     """
 
     content: Content
+    server_revision: TopicRevision | None = None
 
 
 @dataclasses.dataclass
@@ -387,9 +417,12 @@ class UpdatePageAction(_UpdateActionBase):
 
     Attrs:
         content_change: The change to the documentation content.
+        server_revision: The revision of the page on the server the content change was computed
+            from, if known.
     """
 
     content_change: ContentChange
+    server_revision: TopicRevision | None = None
 
     def __str__(self) -> str:
         """Return a formatted representation of the dataclass.
@@ -451,9 +484,12 @@ class DeletePageAction(_DeleteActionBase):
 
     Attrs:
         content: The documentation content.
+        server_revision: The revision of the page on the server the content was read at, if
+            known.
     """
 
     content: Content
+    server_revision: TopicRevision | None = None
 
 
 @dataclasses.dataclass
@@ -624,11 +660,14 @@ class ReconcileOutputs(typing.NamedTuple):
         index_url: url with the root documentation topic on Discourse
         topics: List of urls with actions
         documentation_tag: commit sha to which the tag was created
+        in_sync: whether the content on Discourse matches the content of the tag the reconcile
+            moved
     """
 
     index_url: Url
     topics: dict[Url, ActionResult]
     documentation_tag: str | None
+    in_sync: bool = False
 
 
 class MigrateOutputs(typing.NamedTuple):
@@ -0,0 +1,136 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Command line entry point for the benchmark suite.
+
+Example:
+    python -m tests.benchmark --pages 200 --depth 3 --latency 0.05 --output results.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from http import HTTPStatus
+from pathlib import Path
+
+from .charm_docs import DocsSpec
+from .discourse_server import ErrorBurst, RateLimit, RawFormat, ServerConfig
+from .run import compare, run_benchmark, write_results
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Args:
+        argv: The command line arguments.
+
+    Returns:
+        The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50, help="number of documentation pages")
+    parser.add_argument("--depth", type=int, default=2, help="maximum directory nesting")
+    parser.add_argument("--external-links", type=int, default=5, help="number of external refs")
+    parser.add_argument("--page-lines", type=int, default=50, help="number of lines per page")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds of latency per Discourse request"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        help="number of Discourse requests served per --rate-limit-period before 429 responses",
+    )
+    parser.add_argument(
+        "--rate-limit-period", type=float, default=10.0, help="seconds of the rate limit window"
+    )
+    parser.add_argument(
+        "--error-every", type=int, help="size of each group of requests with an error burst"
+    )
+    parser.add_argument(
+        "--error-length", type=int, default=1, help="number of failing requests in each group"
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=503, help="HTTP status of the failing requests"
+    )
+    parser.add_argument(
+        "--no-slug-redirects",
+        action="store_true",
+        help="respond with not found instead of redirecting links with an outdated slug",
+    )
+    parser.add_argument(
+        "--raw-format",
+        choices=[raw_format.value for raw_format in RawFormat],
+        default=RawFormat.V2_6.value,
+        help="Discourse version whose /raw/{topic_id} format is returned",
+    )
+    parser.add_argument("--charm-dir", default="", help="directory of the charm in the repo")
+    parser.add_argument("--output", type=Path, help="file to write the JSON results to")
+    parser.add_argument("--baseline", type=Path, help="JSON results to check for regressions")
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="fraction the wall time may grow by compared to the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and report the results.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv.
+
+    Returns:
+        The exit code, 1 if there were regressions compared to the baseline.
+    """
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    spec = DocsSpec(
+        pages=args.pages,
+        depth=args.depth,
+        external_links=args.external_links,
+        page_lines=args.page_lines,
+    )
+    server_config = ServerConfig(
+        latency=args.latency,
+        rate_limit=(
+            None
+            if args.rate_limit is None
+            else RateLimit(max_requests=args.rate_limit, period=args.rate_limit_period)
+        ),
+        error_burst=(
+            None
+            if args.error_every is None
+            else ErrorBurst(
+                every=args.error_every,
+                length=args.error_length,
+                status=HTTPStatus(args.error_status),
+            )
+        ),
+        redirect_slugs=not args.no_slug_redirects,
+        raw_format=RawFormat(args.raw_format),
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmark(
+            spec=spec,
+            work_dir=Path(work_dir),
+            server_config=server_config,
+            charm_dir=args.charm_dir,
+        )
+    print(write_results(results=results, output=args.output))
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results=results, baseline=baseline, time_tolerance=args.time_tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
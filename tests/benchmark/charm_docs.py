@@ -0,0 +1,156 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Generate synthetic charm documentation."""
+
+import typing
+from pathlib import Path
+
+from gatekeeper import constants, metadata
+
+_WORDS = (
+    "charm",
+    "juju",
+    "relation",
+    "config",
+    "action",
+    "unit",
+    "model",
+    "deploy",
+    "integrate",
+    "upgrade",
+    "storage",
+    "secret",
+)
+
+
+class DocsSpec(typing.NamedTuple):
+    """The shape of the generated documentation.
+
+    Attrs:
+        pages: The number of documentation pages.
+        depth: The maximum number of nested directories a page is within.
+        external_links: The number of external references on the contents index.
+        page_lines: The number of lines of each page.
+    """
+
+    pages: int
+    depth: int
+    external_links: int
+    page_lines: int
+
+
+def page_relative_path(number: int, spec: DocsSpec) -> Path:
+    """Get the path of a page relative to the docs directory.
+
+    Pages are spread over 10 page wide groups, each page is nested between 0 and depth
+    directories within its group.
+
+    Args:
+        number: The number of the page.
+        spec: The shape of the documentation.
+
+    Returns:
+        The path to the page.
+    """
+    nesting = number % (spec.depth + 1)
+    directories = [f"group-{number % max(1, spec.pages // 10)}"] if nesting else []
+    directories.extend(f"level-{level}" for level in range(1, nesting))
+    return Path(*directories, f"page-{number}{constants.DOC_FILE_EXTENSION}")
+
+
+def page_content(number: int, lines: int, revision: int = 0) -> str:
+    """Generate the content of a page.
+
+    Args:
+        number: The number of the page.
+        lines: The number of lines of the page.
+        revision: Changes the first line of the content.
+
+    Returns:
+        The content of the page.
+    """
+    body = (
+        " ".join(_WORDS[(number + line + word) % len(_WORDS)] for word in range(12))
+        for line in range(1, lines)
+    )
+    return "\n".join((f"# Page {number} revision {revision}", *body))
+
+
+def _contents_lines(directory: Path, docs_path: Path, hierarchy: int) -> typing.Iterator[str]:
+    """Generate the contents index lines for a directory.
+
+    Args:
+        directory: The directory to generate the lines for.
+        docs_path: The docs directory.
+        hierarchy: The number of parent directories within the docs directory.
+
+    Yields:
+        The contents index lines for all the files and directories within the directory.
+    """
+    for path in sorted(directory.iterdir()):
+        if path.name == constants.DOCUMENTATION_INDEX_FILENAME:
+            continue
+        title = path.stem.replace("-", " ").title()
+        yield f"{'  ' * hierarchy}1. [{title}]({path.relative_to(docs_path)})"
+        if path.is_dir():
+            yield from _contents_lines(
+                directory=path, docs_path=docs_path, hierarchy=hierarchy + 1
+            )
+
+
+def write_charm(
+    charm_path: Path, name: str, spec: DocsSpec, external_host: str, docs_url: str | None = None
+) -> None:
+    """Write the metadata and documentation of a charm.
+
+    Args:
+        charm_path: The directory of the charm.
+        name: The name of the charm.
+        spec: The shape of the documentation.
+        external_host: The host the external references point to.
+        docs_url: The link to the index topic, if any.
+    """
+    metadata_lines = [f"{metadata.METADATA_NAME_KEY}: {name}"]
+    if docs_url is not None:
+        metadata_lines.append(f"{metadata.METADATA_DOCS_KEY}: {docs_url}")
+    (charm_path / metadata.METADATA_FILENAME).write_text(
+        "\n".join(metadata_lines), encoding="utf-8"
+    )
+
+    docs_path = charm_path / constants.DOCUMENTATION_FOLDER_NAME
+    for number in range(spec.pages):
+        page_path = docs_path / page_relative_path(number=number, spec=spec)
+        page_path.parent.mkdir(parents=True, exist_ok=True)
+        page_path.write_text(page_content(number, spec.page_lines), encoding="utf-8")
+    docs_path.mkdir(parents=True, exist_ok=True)
+
+    contents = list(_contents_lines(directory=docs_path, docs_path=docs_path, hierarchy=0))
+    contents.extend(
+        f"1. [External {number}]({external_host}/external/{number})"
+        for number in range(spec.external_links)
+    )
+    (docs_path / constants.DOCUMENTATION_INDEX_FILENAME).write_text(
+        "\n".join((f"Documentation for the {name} charm.", "", "# Contents", "", *contents)),
+        encoding="utf-8",
+    )
+
+
+def edit_pages(docs_path: Path, spec: DocsSpec, count: int, revision: int) -> list[Path]:
+    """Change the content of some of the pages.
+
+    Args:
+        docs_path: The docs directory.
+        spec: The shape of the documentation.
+        count: The number of pages to change.
+        revision: The revision to write into the changed pages.
+
+    Returns:
+        The paths to the changed pages relative to the docs directory.
+    """
+    changed = [page_relative_path(number=number, spec=spec) for number in range(count)]
+    for number, path in enumerate(changed):
+        (docs_path / path).write_text(
+            page_content(number, spec.page_lines, revision=revision), encoding="utf-8"
+        )
+    return changed
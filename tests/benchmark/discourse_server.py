@@ -0,0 +1,794 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Local stand-in for the subset of the Discourse API used by the Discourse client."""
+
+import collections
+import dataclasses
+import datetime
+import enum
+import json
+import math
+import re
+import threading
+import time
+import typing
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_TOPIC_JSON_PATTERN = re.compile(r"^/t/([^/]+)/(\d+)\.json$")
+_TOPIC_PATTERN = re.compile(r"^/t/([^/]+)/(\d+)/?$")
+_TOPIC_ID_PATTERN = re.compile(r"^/t/(\d+)/?$")
+_RAW_PATTERN = re.compile(r"^/raw/(\d+)/?$")
+_POST_PATTERN = re.compile(r"^/posts/(\d+)/?$")
+_POST_JSON_PATTERN = re.compile(r"^/posts/(\d+)\.json$")
+_CATEGORY_PATTERN = re.compile(r"^/c/(\d+)\.json$")
+# The number of topics on each page of the category listing, as on Discourse
+_LISTING_PAGE_SIZE = 30
+# The bumps are numbered from this time so that the listing is the same for every run
+_BUMP_EPOCH = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+_EXTERNAL_PREFIX = "/external/"
+# Matches the separator handled by gatekeeper.discourse._parse_raw_content
+_POST_SPLIT_LINE = "\n\n-------------------------\n\n"
+
+
+class RawFormat(str, enum.Enum):
+    """The format of the content returned by the /raw/{topic_id} endpoint.
+
+    Attrs:
+        V2_6: The content of the first post as is, returned by Discourse 2.6.
+        V2_8: The content of all the posts, each prefixed with a metadata line and followed by a
+            separator line, returned by Discourse 2.8.
+    """
+
+    V2_6 = "2.6"
+    V2_8 = "2.8"
+
+
+class RateLimit(typing.NamedTuple):
+    """Limit on the number of requests within a sliding window.
+
+    Attrs:
+        max_requests: The number of requests that are served within the window.
+        period: The length of the window in seconds.
+    """
+
+    max_requests: int
+    period: float
+
+
+class ErrorBurst(typing.NamedTuple):
+    """Server errors returned for a run of consecutive requests.
+
+    Requests are numbered as they are served, out of every group of every requests the last
+    length requests fail.
+
+    Attrs:
+        every: The number of requests in each group.
+        length: The number of failing requests at the end of each group.
+        status: The HTTP status of the failing responses.
+    """
+
+    every: int
+    length: int
+    status: HTTPStatus = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class ServerConfig(typing.NamedTuple):
+    """How the server behaves.
+
+    Attrs:
+        latency: The number of seconds to wait before responding to each request.
+        rate_limit: Respond with 429 once the limit is reached, if any.
+        error_burst: Respond with server errors for runs of requests, if any.
+        redirect_slugs: Whether topic links with an outdated slug are redirected to the current
+            slug, otherwise they are not found.
+        raw_format: The format of the content returned by the /raw/{topic_id} endpoint.
+    """
+
+    latency: float = 0.0
+    rate_limit: RateLimit | None = None
+    error_burst: ErrorBurst | None = None
+    redirect_slugs: bool = True
+    raw_format: RawFormat = RawFormat.V2_6
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """Convert to a JSON serializable dictionary.
+
+        Returns:
+            The configuration.
+        """
+        return {
+            "latency": self.latency,
+            "rate_limit": None if self.rate_limit is None else self.rate_limit._asdict(),
+            "error_burst": (
+                None
+                if self.error_burst is None
+                else self.error_burst._asdict() | {"status": int(self.error_burst.status)}
+            ),
+            "redirect_slugs": self.redirect_slugs,
+            "raw_format": self.raw_format.value,
+        }
+
+
+class Rejection(typing.NamedTuple):
+    """An injected failure response.
+
+    Attrs:
+        status: The HTTP status of the response.
+        wait_seconds: The number of seconds the client should wait before retrying.
+    """
+
+    status: HTTPStatus
+    wait_seconds: int = 0
+
+
+@dataclasses.dataclass
+class Topic:  # pylint: disable=too-many-instance-attributes
+    """A topic stored by the server.
+
+    Attrs:
+        id_: The identifier of the topic.
+        slug: The URL slug of the topic.
+        previous_slugs: The slugs the topic had before it was renamed.
+        title: The title of the topic.
+        post_id: The identifier of the first post of the topic.
+        content: The raw content of the first post of the topic.
+        version: The number of revisions of the first post.
+        category_id: The identifier of the category of the topic.
+        bumped_at: When the topic was created or its first post was last edited.
+        pinned: Whether the topic is listed before the other topics of its category.
+        deleted: Whether the topic has been deleted.
+    """
+
+    id_: int
+    slug: str
+    title: str
+    post_id: int
+    content: str
+    version: int = 1
+    category_id: int = 0
+    bumped_at: str = ""
+    pinned: bool = False
+    deleted: bool = False
+    previous_slugs: list[str] = dataclasses.field(default_factory=list)
+
+
+def slugify(title: str) -> str:
+    """Generate the URL slug for a title the same way Discourse does for ASCII titles.
+
+    Args:
+        title: The title of the topic.
+
+    Returns:
+        The slug for the title.
+    """
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "topic"
+
+
+class DiscourseServer:  # pylint: disable=too-many-instance-attributes
+    """HTTP server implementing the topic API calls made by the Discourse client.
+
+    Attrs:
+        port: The port the server listens on.
+        host: The protocol, hostname and port to configure the Discourse client with.
+        external_host: A host serving external references that is not the Discourse host.
+        request_counts: The number of requests received per endpoint.
+        rejection_counts: The number of injected failure responses per HTTP status.
+        topics: All the topics that have not been deleted.
+        config: How the server behaves.
+    """
+
+    def __init__(self, config: ServerConfig = ServerConfig()) -> None:
+        """Construct.
+
+        Args:
+            config: How the server behaves.
+        """
+        self.config = config
+        self._lock = threading.Lock()
+        self._topics: dict[int, Topic] = {}
+        self._next_id = 1
+        self._bump_count = 0
+        self._request_counts: collections.Counter[str] = collections.Counter()
+        self._rejection_counts: collections.Counter[int] = collections.Counter()
+        self._served_count = 0
+        self._window: collections.deque[float] = collections.deque()
+        self._http_server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._http_server.daemon_threads = True
+        setattr(self._http_server, "discourse", self)
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "DiscourseServer":
+        """Start serving requests in a background thread.
+
+        Returns:
+            The running server.
+        """
+        self._thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_args: typing.Any) -> None:
+        """Stop serving requests."""
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def port(self) -> int:
+        """The port the server listens on."""
+        return self._http_server.server_address[1]
+
+    @property
+    def host(self) -> str:
+        """The protocol, hostname and port to configure the Discourse client with."""
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def external_host(self) -> str:
+        """A host serving external references that is not the Discourse host."""
+        return f"http://localhost:{self.port}"
+
+    @property
+    def request_counts(self) -> dict[str, int]:
+        """The number of requests received per endpoint."""
+        with self._lock:
+            return dict(self._request_counts)
+
+    @property
+    def rejection_counts(self) -> dict[int, int]:
+        """The number of injected failure responses per HTTP status."""
+        with self._lock:
+            return dict(self._rejection_counts)
+
+    def reset_request_counts(self) -> None:
+        """Reset the number of requests received per endpoint and the injected failures."""
+        with self._lock:
+            self._request_counts.clear()
+            self._rejection_counts.clear()
+
+    def record_request(self, endpoint: str) -> None:
+        """Count a request against an endpoint.
+
+        Args:
+            endpoint: The name of the endpoint.
+        """
+        with self._lock:
+            self._request_counts[endpoint] += 1
+
+    def reject(self) -> Rejection | None:
+        """Decide whether to respond to a request with an injected failure.
+
+        The rate limit is checked first, requests that are rate limited do not count towards the
+        window or the error bursts.
+
+        Returns:
+            The failure to respond with or None if the request should be served.
+        """
+        with self._lock:
+            if (rate_limit := self.config.rate_limit) is not None:
+                now = time.monotonic()
+                while self._window and now - self._window[0] >= rate_limit.period:
+                    self._window.popleft()
+                if len(self._window) >= rate_limit.max_requests:
+                    remaining = rate_limit.period - (now - self._window[0])
+                    self._rejection_counts[HTTPStatus.TOO_MANY_REQUESTS] += 1
+                    return Rejection(
+                        status=HTTPStatus.TOO_MANY_REQUESTS, wait_seconds=math.ceil(remaining)
+                    )
+                self._window.append(now)
+
+            served_count = self._served_count
+            self._served_count += 1
+            if (error_burst := self.config.error_burst) is not None and (
+                served_count % error_burst.every >= error_burst.every - error_burst.length
+            ):
+                self._rejection_counts[error_burst.status] += 1
+                return Rejection(status=error_burst.status)
+
+        return None
+
+    def topic_url(self, topic: Topic) -> str:
+        """Get the absolute URL of a topic.
+
+        Args:
+            topic: The topic to get the URL for.
+
+        Returns:
+            The URL of the topic.
+        """
+        return f"{self.host}/t/{topic.slug}/{topic.id_}"
+
+    def _bump(self) -> str:
+        """Get the time of a bump, later than the time of every earlier bump.
+
+        The lock has to be held by the caller.
+
+        Returns:
+            The time in the format of the listings of Discourse.
+        """
+        self._bump_count += 1
+        bumped_at = _BUMP_EPOCH + datetime.timedelta(seconds=self._bump_count)
+        return bumped_at.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def create_topic(self, title: str, content: str, category_id: int = 0) -> Topic:
+        """Store a new topic.
+
+        Args:
+            title: The title of the topic.
+            content: The content of the first post.
+            category_id: The identifier of the category of the topic.
+
+        Returns:
+            The created topic.
+        """
+        with self._lock:
+            topic_id = self._next_id
+            self._next_id += 1
+            topic = Topic(
+                id_=topic_id,
+                slug=slugify(title),
+                title=title,
+                post_id=topic_id + 10_000,
+                content=content,
+                category_id=category_id,
+                bumped_at=self._bump(),
+            )
+            self._topics[topic_id] = topic
+        return topic
+
+    def get_topic(self, topic_id: int) -> Topic | None:
+        """Get a topic by its identifier.
+
+        Args:
+            topic_id: The identifier of the topic.
+
+        Returns:
+            The topic or None if there is no such topic.
+        """
+        with self._lock:
+            return self._topics.get(topic_id)
+
+    def get_topic_by_post(self, post_id: int) -> Topic | None:
+        """Get a topic by the identifier of its first post.
+
+        Args:
+            post_id: The identifier of the first post.
+
+        Returns:
+            The topic or None if there is no such topic.
+        """
+        with self._lock:
+            return next(
+                (topic for topic in self._topics.values() if topic.post_id == post_id), None
+            )
+
+    def get_topic_by_url(self, url: str) -> Topic | None:
+        """Get a topic by its URL.
+
+        Args:
+            url: The URL to the topic.
+
+        Returns:
+            The topic or None if there is no such topic.
+        """
+        match = _TOPIC_PATTERN.match(urlparse(url).path)
+        if match is None:
+            return None
+        return self.get_topic(int(match.group(2)))
+
+    def edit_topic(self, topic: Topic, content: str) -> None:
+        """Change the content of the first post of a topic.
+
+        Args:
+            topic: The topic to change.
+            content: The new content of the first post.
+        """
+        with self._lock:
+            topic.content = content
+            topic.version += 1
+            topic.bumped_at = self._bump()
+
+    def rename_topic(self, topic: Topic, title: str) -> None:
+        """Change the title of a topic which changes its slug.
+
+        Args:
+            topic: The topic to rename.
+            title: The new title of the topic.
+        """
+        with self._lock:
+            topic.previous_slugs.append(topic.slug)
+            topic.title = title
+            topic.slug = slugify(title)
+
+    def list_category(self, category_id: int, page: int) -> list[Topic]:
+        """Get a page of the topics of a category, the pinned and most recently bumped first.
+
+        Args:
+            category_id: The identifier of the category.
+            page: The number of the page, starting from 0.
+
+        Returns:
+            The topics on the page, empty after the last page.
+        """
+        with self._lock:
+            topics = sorted(
+                (
+                    topic
+                    for topic in self._topics.values()
+                    if topic.category_id == category_id and not topic.deleted
+                ),
+                key=lambda topic: (topic.pinned, topic.bumped_at),
+                reverse=True,
+            )
+        return topics[page * _LISTING_PAGE_SIZE : (page + 1) * _LISTING_PAGE_SIZE]
+
+    def raw_content(self, topic: Topic) -> str:
+        """Get the response of the /raw/{topic_id} endpoint for a topic.
+
+        Args:
+            topic: The topic to get the content for.
+
+        Returns:
+            The content in the configured format.
+        """
+        if self.config.raw_format == RawFormat.V2_6:
+            return topic.content
+        return f"benchmark | 2025-01-01 00:00:00 UTC | #1\n\n{topic.content}{_POST_SPLIT_LINE}"
+
+    @property
+    def topics(self) -> list[Topic]:
+        """All the topics that have not been deleted."""
+        with self._lock:
+            return [topic for topic in self._topics.values() if not topic.deleted]
+
+
+# The do_<method> names are required by BaseHTTPRequestHandler
+# pylint: disable=invalid-name
+class _Handler(BaseHTTPRequestHandler):
+    """Handle requests to the Discourse stand-in.
+
+    Attrs:
+        protocol_version: The HTTP version of the responses.
+        discourse: The server state.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def discourse(self) -> DiscourseServer:
+        """The server state."""
+        return typing.cast(DiscourseServer, getattr(self.server, "discourse"))
+
+    def log_message(self, format: str, *args: typing.Any) -> None:  # noqa: A002
+        """Silence the default request logging.
+
+        Args:
+            format: The message format.
+            args: The message arguments.
+        """
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes = b"",
+        content_type: str = "application/json; charset=utf-8",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Send a response.
+
+        Args:
+            status: The HTTP status of the response.
+            body: The body of the response.
+            content_type: The content type of the body.
+            headers: Any additional headers.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, value: typing.Any, status: HTTPStatus = HTTPStatus.OK) -> None:
+        """Send a JSON response.
+
+        Args:
+            value: The value to serialize into the body.
+            status: The HTTP status of the response.
+        """
+        self._send(status, json.dumps(value).encode("utf-8"))
+
+    def _send_not_found(self) -> None:
+        """Send a not found response."""
+        self._send_json(
+            {"errors": ["The requested URL or resource could not be found."]}, HTTPStatus.NOT_FOUND
+        )
+
+    def _read_form(self) -> dict[str, list[str]]:
+        """Read the form encoded request body.
+
+        Returns:
+            The decoded form values.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        return parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+
+    def _live_topic(self, topic_id: int) -> Topic | None:
+        """Get a topic that has not been deleted.
+
+        Args:
+            topic_id: The identifier of the topic.
+
+        Returns:
+            The topic or None if it does not exist or has been deleted.
+        """
+        topic = self.discourse.get_topic(topic_id)
+        if topic is None or topic.deleted:
+            return None
+        return topic
+
+    def _send_rejection(self, rejection: Rejection) -> None:
+        """Send an injected failure response the way Discourse formats them.
+
+        Args:
+            rejection: The failure to respond with.
+        """
+        if rejection.status != HTTPStatus.TOO_MANY_REQUESTS:
+            self._send(rejection.status, b"<html>Service Unavailable</html>", "text/html")
+            return
+        body = {
+            "errors": ["You've performed this action too many times. Please wait."],
+            "error_type": "rate_limit",
+            "extras": {"wait_seconds": rejection.wait_seconds},
+        }
+        self._send(
+            rejection.status,
+            json.dumps(body).encode("utf-8"),
+            headers={
+                "Retry-After": str(rejection.wait_seconds),
+                "Discourse-Rate-Limit-Error-Code": "ip_10_secs_limit",
+            },
+        )
+
+    def _handle(self, endpoint: str, handler: typing.Callable[[], None]) -> None:
+        """Record and delay a request before handling it or responding with a failure.
+
+        External references are never rejected since they are not served by Discourse.
+
+        Args:
+            endpoint: The name of the endpoint.
+            handler: Produces the response.
+        """
+        self.discourse.record_request(endpoint)
+        if self.discourse.config.latency:
+            time.sleep(self.discourse.config.latency)
+        if endpoint != "external" and (rejection := self.discourse.reject()) is not None:
+            self._send_rejection(rejection)
+            return
+        handler()
+
+    def _redirect_slug(self, topic: Topic | None, slug: str, suffix: str = "") -> bool:
+        """Handle a link to a topic with an outdated slug.
+
+        Args:
+            topic: The topic the link points to.
+            slug: The slug in the link.
+            suffix: Appended to the path of the redirect location.
+
+        Returns:
+            Whether a response has been sent.
+        """
+        if topic is None:
+            self._send_not_found()
+            return True
+        if slug == topic.slug:
+            return False
+        if not self.discourse.config.redirect_slugs or slug not in topic.previous_slugs:
+            self._send_not_found()
+            return True
+        self._send(
+            HTTPStatus.MOVED_PERMANENTLY,
+            content_type="text/html",
+            headers={"Location": f"{self.discourse.topic_url(topic)}{suffix}"},
+        )
+        return True
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        """Handle HEAD requests."""
+        path = urlparse(self.path).path
+        if path.startswith(_EXTERNAL_PREFIX):
+            self._handle("external", lambda: self._send(HTTPStatus.OK, content_type="text/html"))
+            return
+        if (match := _TOPIC_PATTERN.match(path)) is not None:
+            self._handle(
+                "head_topic", lambda: self._head_topic(match.group(1), int(match.group(2)))
+            )
+            return
+        self._handle("unknown", self._send_not_found)
+
+    def _head_topic(self, slug: str, topic_id: int) -> None:
+        """Respond to a HEAD request for a topic.
+
+        Args:
+            slug: The slug in the link.
+            topic_id: The identifier of the topic.
+        """
+        if self._redirect_slug(self._live_topic(topic_id), slug):
+            return
+        self._send(HTTPStatus.OK, content_type="text/html")
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Handle GET requests."""
+        path = urlparse(self.path).path
+        if path.startswith(_EXTERNAL_PREFIX):
+            self._handle("external", lambda: self._send(HTTPStatus.OK, content_type="text/html"))
+            return
+        if (match := _TOPIC_JSON_PATTERN.match(path)) is not None:
+            self._handle("get_topic", lambda: self._get_topic(match.group(1), int(match.group(2))))
+            return
+        if (raw_match := _RAW_PATTERN.match(path)) is not None:
+            self._handle("get_raw", lambda: self._get_raw(int(raw_match.group(1))))
+            return
+        if (post_match := _POST_JSON_PATTERN.match(path)) is not None:
+            self._handle("get_post", lambda: self._get_post(int(post_match.group(1))))
+            return
+        if (category_match := _CATEGORY_PATTERN.match(path)) is not None:
+            self._handle(
+                "list_category", lambda: self._list_category(int(category_match.group(1)))
+            )
+            return
+        self._handle("unknown", self._send_not_found)
+
+    def _get_topic(self, slug: str, topic_id: int) -> None:
+        """Respond with the JSON representation of a topic.
+
+        Args:
+            slug: The slug in the link.
+            topic_id: The identifier of the topic.
+        """
+        topic = self._live_topic(topic_id)
+        if self._redirect_slug(topic, slug, suffix=".json"):
+            return
+        topic = typing.cast(Topic, topic)
+        first_post = {
+            "id": topic.post_id,
+            "post_number": 1,
+            "version": topic.version,
+            "can_edit": True,
+            "user_deleted": False,
+        }
+        self._send_json(
+            {
+                "id": topic.id_,
+                "slug": topic.slug,
+                "category_id": topic.category_id,
+                "highest_post_number": 1,
+                "post_stream": {"posts": [first_post]},
+            }
+        )
+
+    def _get_post(self, post_id: int) -> None:
+        """Respond with the JSON representation of the first post of a topic.
+
+        Args:
+            post_id: The identifier of the post.
+        """
+        topic = self.discourse.get_topic_by_post(post_id)
+        if topic is None or topic.deleted:
+            self._send_not_found()
+            return
+        self._send_json(
+            {
+                "id": topic.post_id,
+                "post_number": 1,
+                "version": topic.version,
+                "topic_id": topic.id_,
+                "topic_slug": topic.slug,
+                "user_deleted": False,
+            }
+        )
+
+    def _list_category(self, category_id: int) -> None:
+        """Respond with a page of the listing of a category.
+
+        Args:
+            category_id: The identifier of the category.
+        """
+        page = parse_qs(urlparse(self.path).query).get("page", ["0"])[0]
+        topics = self.discourse.list_category(category_id, int(page) if page.isdigit() else 0)
+        self._send_json(
+            {
+                "topic_list": {
+                    "topics": [
+                        {
+                            "id": topic.id_,
+                            "slug": topic.slug,
+                            "bumped_at": topic.bumped_at,
+                            "pinned": topic.pinned,
+                        }
+                        for topic in topics
+                    ]
+                }
+            }
+        )
+
+    def _get_raw(self, topic_id: int) -> None:
+        """Respond with the raw content of the first post of a topic.
+
+        Args:
+            topic_id: The identifier of the topic.
+        """
+        if (topic := self._live_topic(topic_id)) is None:
+            self._send_not_found()
+            return
+        self._send(
+            HTTPStatus.OK,
+            self.discourse.raw_content(topic).encode("utf-8"),
+            content_type="text/plain; charset=utf-8",
+        )
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Handle POST requests."""
+        if urlparse(self.path).path.rstrip("/") == "/posts":
+            self._handle("create_post", self._create_post)
+            return
+        self._handle("unknown", self._send_not_found)
+
+    def _create_post(self) -> None:
+        """Create a topic from the form encoded request body."""
+        form = self._read_form()
+        category = form.get("category", [""])[0]
+        topic = self.discourse.create_topic(
+            title=form.get("title", [""])[0],
+            content=form.get("raw", [""])[0],
+            category_id=int(category) if category.isdigit() else 0,
+        )
+        self._send_json(
+            {"id": topic.post_id, "topic_id": topic.id_, "topic_slug": topic.slug},
+        )
+
+    def do_PUT(self) -> None:  # noqa: N802
+        """Handle PUT requests."""
+        if (match := _POST_PATTERN.match(urlparse(self.path).path)) is not None:
+            self._handle("update_post", lambda: self._update_post(int(match.group(1))))
+            return
+        self._handle("unknown", self._send_not_found)
+
+    def _update_post(self, post_id: int) -> None:
+        """Update the first post of a topic from the form encoded request body.
+
+        Args:
+            post_id: The identifier of the post.
+        """
+        form = self._read_form()
+        topic = self.discourse.get_topic_by_post(post_id)
+        if topic is None or topic.deleted:
+            self._send_not_found()
+            return
+        self.discourse.edit_topic(topic, form.get("post[raw]", [""])[0])
+        self._send_json({"post": {"id": topic.post_id, "version": topic.version}})
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        """Handle DELETE requests."""
+        if (match := _TOPIC_ID_PATTERN.match(urlparse(self.path).path)) is not None:
+            self._handle("delete_topic", lambda: self._delete_topic(int(match.group(1))))
+            return
+        self._handle("unknown", self._send_not_found)
+
+    def _delete_topic(self, topic_id: int) -> None:
+        """Delete a topic.
+
+        Args:
+            topic_id: The identifier of the topic.
+        """
+        if (topic := self._live_topic(topic_id)) is None:
+            self._send_not_found()
+            return
+        topic.deleted = True
+        self._send(HTTPStatus.OK, b"", content_type="text/html")
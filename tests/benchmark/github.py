@@ -0,0 +1,138 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Stand-in for the GitHub repository API backed by the local upstream git repository."""
+
+import base64
+import collections
+import typing
+from types import SimpleNamespace
+
+from git import GitCommandError
+from git.repo import Repo
+from github.GithubException import UnknownObjectException
+
+
+class PullRequest:  # pylint: disable=too-few-public-methods
+    """The subset of a GitHub pull request used by the repository client.
+
+    Attrs:
+        html_url: The link to the pull request.
+        head: The head reference of the pull request.
+        base: The base reference of the pull request.
+        state: Whether the pull request is open or closed.
+    """
+
+    def __init__(self, number: int, head: str, base: str) -> None:
+        """Construct.
+
+        Args:
+            number: The number of the pull request.
+            head: The name of the branch with the changes.
+            base: The name of the branch the changes are proposed to.
+        """
+        self.html_url = f"https://github.com/benchmark/charm/pull/{number}"
+        self.head = SimpleNamespace(ref=head)
+        self.base = SimpleNamespace(ref=base)
+        self.state = "open"
+
+    def edit(self, state: str) -> None:
+        """Change the state of the pull request.
+
+        Args:
+            state: The new state.
+        """
+        self.state = state
+
+
+class GithubRepository:
+    """The subset of the GitHub repository API used by the repository client.
+
+    Content is served from the upstream git repository that the local clone pushes to so that the
+    responses match what GitHub would return for the pushed refs.
+
+    Attrs:
+        call_counts: The number of calls per API method.
+        pull_requests: The pull requests that have been created.
+    """
+
+    def __init__(self, upstream: Repo) -> None:
+        """Construct.
+
+        Args:
+            upstream: The repository the local clone pushes to.
+        """
+        self._upstream = upstream
+        self.call_counts: collections.Counter[str] = collections.Counter()
+        self.pull_requests: list[PullRequest] = []
+
+    def get_git_ref(self, ref: str) -> typing.Any:
+        """Resolve a reference.
+
+        Args:
+            ref: The reference without the refs/ prefix.
+
+        Returns:
+            The object the reference points to.
+
+        Raises:
+            UnknownObjectException: if the reference does not exist.
+        """
+        self.call_counts["get_git_ref"] += 1
+        try:
+            sha = self._upstream.git.rev_parse("--verify", f"refs/{ref}^{{commit}}")
+        except GitCommandError as exc:
+            raise UnknownObjectException(404, {"message": "Not Found"}, {}) from exc
+        return SimpleNamespace(object=SimpleNamespace(type="commit", sha=sha))
+
+    def get_contents(self, path: str, ref: str) -> typing.Any:
+        """Retrieve the content of a file at a commit.
+
+        Args:
+            path: The path to the file relative to the repository root.
+            ref: The commit to retrieve the file for.
+
+        Returns:
+            The file with base64 encoded content.
+
+        Raises:
+            UnknownObjectException: if the file does not exist.
+        """
+        self.call_counts["get_contents"] += 1
+        try:
+            content = self._upstream.git.show(f"{ref}:{path}", strip_newline_in_stdout=False)
+        except GitCommandError as exc:
+            raise UnknownObjectException(404, {"message": "Not Found"}, {}) from exc
+        return SimpleNamespace(content=base64.b64encode(content.encode("utf-8")).decode("ascii"))
+
+    def get_pulls(self, head: str) -> list[PullRequest]:
+        """List the open pull requests for a branch.
+
+        Args:
+            head: The name of the branch with the changes.
+
+        Returns:
+            The open pull requests.
+        """
+        self.call_counts["get_pulls"] += 1
+        return [
+            pull for pull in self.pull_requests if pull.head.ref == head and pull.state == "open"
+        ]
+
+    def create_pull(self, title: str, body: str, base: str, head: str) -> PullRequest:
+        """Open a pull request.
+
+        Args:
+            title: The title of the pull request.
+            body: The description of the pull request.
+            base: The name of the branch the changes are proposed to.
+            head: The name of the branch with the changes.
+
+        Returns:
+            The new pull request.
+        """
+        del title, body
+        self.call_counts["create_pull"] += 1
+        pull_request = PullRequest(number=len(self.pull_requests) + 1, head=head, base=base)
+        self.pull_requests.append(pull_request)
+        return pull_request
@@ -0,0 +1,421 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Run the gatekeeper end to end against synthetic charm documentation and a local Discourse."""
+
+import collections
+import contextlib
+import json
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+from git.cmd import Git
+from git.repo import Repo
+
+from gatekeeper import Clients, constants, pre_flight_checks, run_migrate, run_reconcile
+from gatekeeper.discourse import Discourse
+from gatekeeper.repository import Client
+from gatekeeper.sync import SyncTracker
+from gatekeeper.types_ import UserInputs, UserInputsDiscourse
+
+from .charm_docs import DocsSpec, edit_pages, page_content, write_charm
+from .discourse_server import DiscourseServer, ServerConfig
+from .github import GithubRepository
+
+RESULTS_VERSION = 1
+CHARM_NAME = "benchmark-charm"
+# Checked out in the upstream repository so that the default branch can be pushed to
+_UPSTREAM_WORKTREE_BRANCH = "upstream-worktree"
+
+
+class PhaseResult(typing.NamedTuple):
+    """Measurements for one phase of the benchmark.
+
+    Attrs:
+        name: The name of the phase.
+        wall_time: The number of seconds the phase took.
+        requests: The number of Discourse requests per endpoint.
+        rejections: The number of injected Discourse failure responses per HTTP status.
+        github_calls: The number of GitHub API calls per method.
+        git_commands: The number of git subprocesses per git command.
+        peak_memory: The highest number of bytes allocated by Python during the phase.
+    """
+
+    name: str
+    wall_time: float
+    requests: dict[str, int]
+    rejections: dict[str, int]
+    github_calls: dict[str, int]
+    git_commands: dict[str, int]
+    peak_memory: int
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """Convert to a JSON serializable dictionary.
+
+        Returns:
+            The measurements including totals.
+        """
+        return self._asdict() | {  # pylint: disable=no-member
+            "requests_total": sum(self.requests.values()),
+            "github_calls_total": sum(self.github_calls.values()),
+            "git_commands_total": sum(self.git_commands.values()),
+        }
+
+
+class _Environment(typing.NamedTuple):
+    """Everything the phases of the benchmark run against.
+
+    Attrs:
+        server: The local Discourse server.
+        github: The GitHub API stand-in.
+        clients: The clients used by the gatekeeper.
+        charm_path: The directory of the charm in the local repository.
+    """
+
+    server: DiscourseServer
+    github: GithubRepository
+    clients: Clients
+    charm_path: Path
+
+
+@contextlib.contextmanager
+def count_git_commands() -> typing.Iterator[collections.Counter[str]]:
+    """Count the git subprocesses started through GitPython.
+
+    Yields:
+        The number of subprocesses per git command, updated as commands are executed.
+    """
+    counts: collections.Counter[str] = collections.Counter()
+    original_execute = Git.execute
+
+    def counting_execute(self: Git, command: typing.Any, *args: typing.Any, **kwargs: typing.Any):
+        """Count the command and execute it.
+
+        Args:
+            command: The command line to execute.
+            args: Positional arguments for execute.
+            kwargs: Keyword arguments for execute.
+
+        Returns:
+            The output of execute.
+        """
+        arguments = [command] if isinstance(command, str) else list(command)[1:]
+        counts[next((arg for arg in arguments if not arg.startswith("-")), "git")] += 1
+        return original_execute(self, command, *args, **kwargs)
+
+    setattr(Git, "execute", counting_execute)
+    try:
+        yield counts
+    finally:
+        setattr(Git, "execute", original_execute)
+
+
+def _measure(
+    name: str, environment: _Environment, func: typing.Callable[[], typing.Any]
+) -> tuple[PhaseResult, typing.Any]:
+    """Measure a phase of the benchmark.
+
+    Args:
+        name: The name of the phase.
+        environment: What the phase runs against.
+        func: Executes the phase.
+
+    Returns:
+        The measurements and the output of the phase.
+    """
+    environment.server.reset_request_counts()
+    environment.github.call_counts.clear()
+    # Each phase is a separate run of the action
+    environment.clients.discourse.sync = SyncTracker()
+    tracemalloc.reset_peak()
+    with count_git_commands() as git_commands:
+        start = time.perf_counter()
+        output = func()
+        wall_time = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    return (
+        PhaseResult(
+            name=name,
+            wall_time=round(wall_time, 4),
+            requests=environment.server.request_counts,
+            rejections={
+                str(status): count for status, count in environment.server.rejection_counts.items()
+            },
+            github_calls=dict(environment.github.call_counts),
+            git_commands=dict(git_commands),
+            peak_memory=peak_memory,
+        ),
+        output,
+    )
+
+
+def _create_environment(
+    work_dir: Path, server: DiscourseServer, spec: DocsSpec, charm_dir: str
+) -> _Environment:
+    """Create the upstream and local repositories and the clients.
+
+    Args:
+        work_dir: The directory to create the repositories in.
+        server: The local Discourse server.
+        spec: The shape of the documentation.
+        charm_dir: The directory of the charm within the repository.
+
+    Returns:
+        Everything the phases of the benchmark run against.
+    """
+    upstream_path = work_dir / "upstream"
+    upstream_path.mkdir(parents=True)
+    upstream = Repo.init(upstream_path)
+    with upstream.config_writer() as writer:
+        writer.set_value("user", "name", "upstream_user")
+        writer.set_value("user", "email", "upstream_email")
+    upstream.git.checkout("-b", constants.DEFAULT_BRANCH)
+    (upstream_path / ".gitkeep").touch()
+    upstream.git.add(".")
+    upstream.git.commit("-m", "initial commit")
+    upstream.git.tag(constants.DOCUMENTATION_TAG)
+    upstream.git.checkout("-b", _UPSTREAM_WORKTREE_BRANCH)
+
+    local = Repo.clone_from(url=upstream.working_dir, to_path=work_dir / "local")
+    github = GithubRepository(upstream=upstream)
+    # The stand-in only implements the parts of the GitHub API used by the client
+    repository = Client(
+        repository=local, github_repository=github, charm_dir=charm_dir  # type: ignore[arg-type]
+    )
+    discourse = Discourse(
+        host=server.host, api_username="benchmark", api_key="benchmark", category_id=1
+    )
+
+    charm_path = repository.base_charm_path
+    charm_path.mkdir(parents=True, exist_ok=True)
+    write_charm(
+        charm_path=charm_path, name=CHARM_NAME, spec=spec, external_host=server.external_host
+    )
+    repository.switch(constants.DEFAULT_BRANCH).update_branch("add docs", directory=None)
+
+    return _Environment(
+        server=server,
+        github=github,
+        clients=Clients(discourse=discourse, repository=repository),
+        charm_path=charm_path,
+    )
+
+
+def _user_inputs(environment: _Environment, charm_dir: str) -> UserInputs:
+    """Get the inputs for running against the current commit.
+
+    Args:
+        environment: What the phases run against.
+        charm_dir: The directory of the charm within the repository.
+
+    Returns:
+        The inputs for the gatekeeper.
+    """
+    return UserInputs(
+        discourse=UserInputsDiscourse(
+            hostname=environment.server.host,
+            category_id="1",
+            api_username="benchmark",
+            api_key="benchmark",
+        ),
+        dry_run=False,
+        delete_pages=True,
+        github_access_token="benchmark",
+        commit_sha=environment.clients.repository.current_commit,
+        base_branch=constants.DEFAULT_BRANCH,
+        charm_dir=charm_dir,
+    )
+
+
+def _commit(environment: _Environment, message: str) -> None:
+    """Commit and push all changes to the default branch.
+
+    Args:
+        environment: What the phases run against.
+        message: The commit message.
+    """
+    environment.clients.repository.switch(constants.DEFAULT_BRANCH).update_branch(
+        message, directory=None
+    )
+
+
+def run_benchmark(  # pylint: disable=too-many-locals
+    spec: DocsSpec,
+    work_dir: Path,
+    server_config: ServerConfig = ServerConfig(),
+    charm_dir: str = "",
+) -> dict[str, typing.Any]:
+    """Run all the phases of the benchmark.
+
+    The phases are:
+        1. checks: the pre flight checks with the documentation tag on the initial commit.
+        2. reconcile-create: the reconcile creating all the topics and the index.
+        3. reconcile-noop: the reconcile where the server matches the repository.
+        4. reconcile-warm: the reconcile after a change outside of the documentation, the pages
+            that have not been bumped since the previous reconcile are read from the
+            documentation tag.
+        5. reconcile-update: the reconcile after a tenth of the pages has changed.
+        6. migrate: the migration after a tenth of the topics has changed on the server.
+
+    Args:
+        spec: The shape of the documentation.
+        work_dir: The directory to create the repositories in.
+        server_config: How the local Discourse server behaves.
+        charm_dir: The directory of the charm within the repository.
+
+    Returns:
+        The machine readable results of the benchmark.
+    """
+    changed_count = max(1, spec.pages // 10)
+    phases: list[PhaseResult] = []
+    tracing_memory = tracemalloc.is_tracing()
+    if not tracing_memory:
+        tracemalloc.start()
+    try:
+        with DiscourseServer(config=server_config) as server:
+            environment = _create_environment(
+                work_dir=work_dir, server=server, spec=spec, charm_dir=charm_dir
+            )
+            clients = environment.clients
+
+            result, _ = _measure(
+                "checks",
+                environment,
+                lambda: pre_flight_checks(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+
+            result, reconcile_outputs = _measure(
+                "reconcile-create",
+                environment,
+                lambda: run_reconcile(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+
+            write_charm(
+                charm_path=environment.charm_path,
+                name=CHARM_NAME,
+                spec=spec,
+                external_host=server.external_host,
+                docs_url=reconcile_outputs.index_url,
+            )
+            _commit(environment, "add docs link")
+            result, _ = _measure(
+                "reconcile-noop",
+                environment,
+                lambda: run_reconcile(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+
+            # The reconcile is skipped for the commit of the documentation tag
+            (environment.charm_path / "README.md").write_text("benchmark charm\n", "utf-8")
+            _commit(environment, "update readme")
+            result, _ = _measure(
+                "reconcile-warm",
+                environment,
+                lambda: run_reconcile(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+
+            edit_pages(
+                docs_path=clients.repository.docs_path, spec=spec, count=changed_count, revision=1
+            )
+            _commit(environment, "update docs")
+            result, _ = _measure(
+                "reconcile-update",
+                environment,
+                lambda: run_reconcile(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+
+            index_url = reconcile_outputs.index_url
+            page_topics = [
+                topic for topic in server.topics if not index_url.endswith(f"/{topic.id_}")
+            ]
+            for number, topic in enumerate(page_topics[:changed_count]):
+                server.edit_topic(topic, page_content(number, spec.page_lines, revision=2))
+            result, _ = _measure(
+                "migrate",
+                environment,
+                lambda: run_migrate(
+                    clients=clients, user_inputs=_user_inputs(environment, charm_dir)
+                ),
+            )
+            phases.append(result)
+    finally:
+        if not tracing_memory:
+            tracemalloc.stop()
+
+    return {
+        "version": RESULTS_VERSION,
+        "spec": spec._asdict(),
+        "server": server_config.to_dict(),
+        "total_wall_time": round(sum(phase.wall_time for phase in phases), 4),
+        "phases": [phase.to_dict() for phase in phases],
+    }
+
+
+def compare(
+    results: dict[str, typing.Any], baseline: dict[str, typing.Any], time_tolerance: float
+) -> list[str]:
+    """Find regressions compared to the results of an earlier run.
+
+    The request, GitHub call and git command counts are deterministic for the same spec so any
+    increase is reported. Wall time is only reported when it grows by more than the tolerance.
+
+    Args:
+        results: The results of the current run.
+        baseline: The results of the earlier run.
+        time_tolerance: The fraction wall time may grow by before it is reported.
+
+    Returns:
+        A description of each regression.
+    """
+    for key in ("spec", "server"):
+        if results[key] != baseline[key]:
+            return [f"{key} differs from the baseline, {results[key]=}, {baseline[key]=}"]
+
+    baseline_phases = {phase["name"]: phase for phase in baseline["phases"]}
+    regressions = []
+    for phase in results["phases"]:
+        if (baseline_phase := baseline_phases.get(phase["name"])) is None:
+            continue
+        for key in ("requests_total", "github_calls_total", "git_commands_total"):
+            if phase[key] > baseline_phase[key]:
+                regressions.append(
+                    f"{phase['name']}: {key} increased from {baseline_phase[key]} to {phase[key]}"
+                )
+        if phase["wall_time"] > baseline_phase["wall_time"] * (1 + time_tolerance):
+            regressions.append(
+                f"{phase['name']}: wall_time increased from {baseline_phase['wall_time']}s to "
+                f"{phase['wall_time']}s"
+            )
+    return regressions
+
+
+def write_results(results: dict[str, typing.Any], output: Path | None) -> str:
+    """Serialize the results.
+
+    Args:
+        results: The results of the benchmark.
+        output: The file to write the results to, if any.
+
+    Returns:
+        The serialized results.
+    """
+    serialized = json.dumps(results, indent=2, sort_keys=True)
+    if output is not None:
+        output.write_text(f"{serialized}\n", encoding="utf-8")
+    return serialized
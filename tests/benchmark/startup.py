@@ -0,0 +1,302 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Measure how quickly the action starts and reaches its first decision.
+
+Each measurement runs in a fresh interpreter so that nothing is imported beforehand. The time to
+import the entry point and the time until the reconcile decides to exit early are measured for a
+repository without a docs directory and for a repository where the commit is the same as the
+documentation tag. The heavy dependencies that were imported by then are reported as well.
+
+Example:
+    python -m tests.benchmark.startup --repeat 5 --import-budget 0.5 --decision-budget 1.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from git.repo import Repo
+
+from gatekeeper import constants
+
+RESULTS_VERSION = 1
+# The dependencies that are only needed once the action talks to Discourse or GitHub or reads
+# the documentation
+HEAVY_MODULES = ("github", "pydiscourse", "requests", "yaml", "more_itertools")
+_REMOTE_URL = "https://github.com/canonical/startup-benchmark.git"
+_REPOSITORY_ROOT = Path(__file__).parents[2]
+# Run in the fresh interpreter with the repository as the working directory
+_CHILD_SCRIPT = """
+import json
+import sys
+import time
+from pathlib import Path
+
+start = time.perf_counter()
+import main
+from gatekeeper import run_reconcile
+from gatekeeper.clients import get_clients
+from gatekeeper.types_ import UserInputs, UserInputsDiscourse
+imported = time.perf_counter()
+
+user_inputs = UserInputs(
+    discourse=UserInputsDiscourse(
+        hostname="discourse.invalid", category_id="1", api_username="startup", api_key="startup"
+    ),
+    dry_run=False,
+    delete_pages=False,
+    github_access_token="startup",
+    commit_sha=sys.argv[1],
+    base_branch=sys.argv[2],
+    charm_dir="",
+)
+outputs = run_reconcile(clients=get_clients(user_inputs, Path.cwd()), user_inputs=user_inputs)
+decided = time.perf_counter()
+
+print(
+    json.dumps(
+        {
+            "import_time": imported - start,
+            "decision_time": decided - start,
+            "early_exit": outputs is None,
+            "modules": sorted(set(sys.argv[3:]) & set(sys.modules)),
+        }
+    )
+)
+"""
+
+
+class Scenario(typing.NamedTuple):
+    """Measurements of the startup for one kind of early exit.
+
+    Attrs:
+        name: The name of the scenario.
+        import_time: The median number of seconds to import the entry point.
+        decision_time: The median number of seconds until the reconcile returned.
+        process_time: The median number of seconds the interpreter ran for.
+        early_exit: Whether the reconcile exited early.
+        heavy_modules: The heavy dependencies imported by the time the reconcile returned.
+    """
+
+    name: str
+    import_time: float
+    decision_time: float
+    process_time: float
+    early_exit: bool
+    heavy_modules: tuple[str, ...]
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """Convert to a JSON serializable dictionary.
+
+        Returns:
+            The measurements.
+        """
+        return self._asdict() | {  # pylint: disable=no-member
+            "heavy_modules": list(self.heavy_modules)
+        }
+
+
+def _create_repository(path: Path, with_docs: bool) -> tuple[Path, str]:
+    """Create a clone of an upstream with the documentation tag on its only commit.
+
+    The remote of the clone has a GitHub URL that git rewrites to the upstream so that fetching
+    does not need the network.
+
+    Args:
+        path: The directory to create the upstream and the clone in.
+        with_docs: Whether the repository has a docs directory.
+
+    Returns:
+        The directory of the clone and its commit.
+    """
+    upstream_path = path / "upstream"
+    upstream_path.mkdir(parents=True)
+    upstream = Repo.init(upstream_path)
+    with upstream.config_writer() as writer:
+        writer.set_value("user", "name", "startup_user")
+        writer.set_value("user", "email", "startup_email")
+    upstream.git.checkout("-b", constants.DEFAULT_BRANCH)
+    (upstream_path / "metadata.yaml").write_text(
+        "name: startup\ndocs: https://discourse.invalid/t/startup/1\n", encoding="utf-8"
+    )
+    if with_docs:
+        (upstream_path / constants.DOCUMENTATION_FOLDER_NAME).mkdir()
+        (upstream_path / constants.DOCUMENTATION_FOLDER_NAME / "index.md").write_text(
+            "# Startup\n", encoding="utf-8"
+        )
+    upstream.git.add(".")
+    upstream.git.commit("-m", "initial commit")
+    upstream.git.tag(constants.DOCUMENTATION_TAG)
+
+    local = Repo.clone_from(url=upstream.working_dir, to_path=path / "local")
+    local.git.remote("set-url", "origin", _REMOTE_URL)
+    with local.config_writer() as writer:
+        writer.set_value(f'url "{upstream.working_dir}"', "insteadOf", _REMOTE_URL)
+    return Path(local.working_dir), local.head.commit.hexsha
+
+
+def _measure(name: str, path: Path, commit: str, repeat: int) -> Scenario:
+    """Run the entry point in fresh interpreters until the first decision.
+
+    Args:
+        name: The name of the scenario.
+        path: The directory of the repository.
+        commit: The commit the action runs on.
+        repeat: The number of interpreters to run, the medians are reported.
+
+    Returns:
+        The measurements.
+
+    Raises:
+        RuntimeError: if the interpreter failed.
+    """
+    environment = os.environ | {
+        "PYTHONPATH": os.pathsep.join((str(_REPOSITORY_ROOT), str(_REPOSITORY_ROOT / "src")))
+    }
+    runs = []
+    process_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(  # nosec
+            [
+                sys.executable,
+                "-c",
+                _CHILD_SCRIPT,
+                commit,
+                constants.DEFAULT_BRANCH,
+                *HEAVY_MODULES,
+            ],
+            cwd=path,
+            env=environment,
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+        process_times.append(time.perf_counter() - start)
+        if process.returncode:
+            raise RuntimeError(f"Startup of {name} failed, {process.stderr=}")
+        runs.append(json.loads(process.stdout.splitlines()[-1]))
+
+    return Scenario(
+        name=name,
+        import_time=round(statistics.median(run["import_time"] for run in runs), 4),
+        decision_time=round(statistics.median(run["decision_time"] for run in runs), 4),
+        process_time=round(statistics.median(process_times), 4),
+        early_exit=all(run["early_exit"] for run in runs),
+        heavy_modules=tuple(sorted({module for run in runs for module in run["modules"]})),
+    )
+
+
+def run_startup(work_dir: Path, repeat: int = 3) -> dict[str, typing.Any]:
+    """Measure the startup for each early exit of the reconcile.
+
+    The scenarios are:
+        1. no-docs: the repository does not have a docs directory.
+        2. same-commit: the action runs on the commit of the documentation tag.
+
+    Args:
+        work_dir: The directory to create the repositories in.
+        repeat: The number of interpreters to run per scenario.
+
+    Returns:
+        The measurements of each scenario.
+    """
+    scenarios = []
+    for name, with_docs in (("no-docs", False), ("same-commit", True)):
+        path, commit = _create_repository(path=work_dir / name, with_docs=with_docs)
+        scenarios.append(_measure(name=name, path=path, commit=commit, repeat=repeat))
+    return {
+        "version": RESULTS_VERSION,
+        "repeat": repeat,
+        "scenarios": [scenario.to_dict() for scenario in scenarios],
+    }
+
+
+def check_budget(
+    results: dict[str, typing.Any], import_budget: float, decision_budget: float
+) -> list[str]:
+    """Find the scenarios that are over the startup budget.
+
+    Args:
+        results: The results of run_startup.
+        import_budget: The number of seconds importing the entry point may take.
+        decision_budget: The number of seconds until the first decision may take.
+
+    Returns:
+        A description of each violation of the budget.
+    """
+    violations = []
+    for scenario in results["scenarios"]:
+        name = scenario["name"]
+        if not scenario["early_exit"]:
+            violations.append(f"{name}: the reconcile did not exit early")
+        if scenario["heavy_modules"]:
+            violations.append(f"{name}: imported {', '.join(scenario['heavy_modules'])}")
+        if scenario["import_time"] > import_budget:
+            violations.append(
+                f"{name}: import_time {scenario['import_time']}s is over {import_budget}s"
+            )
+        if scenario["decision_time"] > decision_budget:
+            violations.append(
+                f"{name}: decision_time {scenario['decision_time']}s is over {decision_budget}s"
+            )
+    return violations
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Args:
+        argv: The command line arguments.
+
+    Returns:
+        The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="interpreters run per scenario")
+    parser.add_argument(
+        "--import-budget", type=float, default=0.5, help="seconds to import the entry point"
+    )
+    parser.add_argument(
+        "--decision-budget", type=float, default=1.0, help="seconds until the first decision"
+    )
+    parser.add_argument("--output", type=Path, help="file to write the JSON results to")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Measure the startup and check it against the budget.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv.
+
+    Returns:
+        The exit code, 1 if the startup is over the budget.
+    """
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_startup(work_dir=Path(work_dir), repeat=args.repeat)
+    serialized = json.dumps(results, indent=2, sort_keys=True)
+    if args.output is not None:
+        args.output.write_text(f"{serialized}\n", encoding="utf-8")
+    print(serialized)
+
+    violations = check_budget(
+        results=results, import_budget=args.import_budget, decision_budget=args.decision_budget
+    )
+    for violation in violations:
+        print(f"over budget: {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Tests for the local Discourse stand-in."""
+
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from gatekeeper.discourse import Discourse
+from gatekeeper.exceptions import DiscourseError
+
+from .discourse_server import DiscourseServer, ErrorBurst, RateLimit, RawFormat, ServerConfig
+
+
+def _discourse(server: DiscourseServer) -> Discourse:
+    """Create a Discourse client for the server.
+
+    Args:
+        server: The server to connect to.
+
+    Returns:
+        The client.
+    """
+    return Discourse(host=server.host, api_username="user", api_key="key", category_id=1)
+
+
+@pytest.mark.parametrize(
+    "raw_format",
+    [pytest.param(RawFormat.V2_6, id="2.6"), pytest.param(RawFormat.V2_8, id="2.8")],
+)
+def test_raw_format(raw_format: RawFormat):
+    """
+    arrange: given a server returning raw content in a format with a topic
+    act: when the topic is retrieved using the client
+    assert: then the original content is returned.
+    """
+    content = "line 1\nline 2"
+    with DiscourseServer(config=ServerConfig(raw_format=raw_format)) as server:
+        discourse = _discourse(server)
+        url = discourse.create_topic(title="title 1", content=content)
+
+        returned_content = discourse.retrieve_topic(url=url)
+
+    assert returned_content == content
+
+
+def test_slug_redirect():
+    """
+    arrange: given a server with a topic that has been renamed
+    act: when the topic is retrieved and updated using the link with the outdated slug
+    assert: then the redirect is followed and the link with the current slug is returned.
+    """
+    with DiscourseServer() as server:
+        discourse = _discourse(server)
+        url = discourse.create_topic(title="title 1", content="content 1")
+        topic = server.topics[0]
+        server.rename_topic(topic, "title 2")
+
+        returned_content = discourse.retrieve_topic(url=url)
+        returned_url = discourse.update_topic(url=url, content="content 2")
+
+    assert returned_content == "content 1"
+    assert returned_url == f"{server.host}/t/title-2/{topic.id_}"
+    assert topic.content == "content 2"
+
+
+def test_category_listing():
+    """
+    arrange: given a server with topics in the category of the client and another category
+    act: when the latest bump is read, a topic is edited and the topics bumped since are listed
+    assert: then only the edited topic of the category of the client is listed.
+    """
+    with DiscourseServer() as server:
+        discourse = _discourse(server)
+        discourse.create_topic(title="title 1", content="content 1")
+        url = discourse.create_topic(title="title 2", content="content 1")
+        server.create_topic(title="title 3", content="content 1", category_id=2)
+
+        synced_at = discourse.latest_bump()
+        discourse.update_topic(url=url, content="content 2")
+        returned_topics = discourse.bumped_topics(since=synced_at)
+
+    assert synced_at is not None
+    assert (topic := server.get_topic_by_url(url)) is not None
+    assert returned_topics == frozenset({topic.id_})
+    assert server.request_counts["list_category"] == 2
+
+
+def test_slug_redirect_disabled():
+    """
+    arrange: given a server that does not redirect outdated slugs with a renamed topic
+    act: when the topic is retrieved using the link with the outdated slug
+    assert: then DiscourseError is raised.
+    """
+    with DiscourseServer(config=ServerConfig(redirect_slugs=False)) as server:
+        discourse = _discourse(server)
+        url = discourse.create_topic(title="title 1", content="content 1")
+        server.rename_topic(server.topics[0], "title 2")
+
+        with pytest.raises(DiscourseError):
+            discourse.retrieve_topic(url=url)
+
+
+def test_rate_limit():
+    """
+    arrange: given a server that serves 1 request per window
+    act: when 2 requests are made in quick succession
+    assert: then the second request is rejected with the Discourse rate limit response.
+    """
+    config = ServerConfig(rate_limit=RateLimit(max_requests=1, period=60))
+    with DiscourseServer(config=config) as server:
+        first = requests.get(f"{server.host}/raw/1", timeout=10)
+        second = requests.get(f"{server.host}/raw/1", timeout=10)
+
+    assert first.status_code == HTTPStatus.NOT_FOUND
+    assert second.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert second.json()["extras"]["wait_seconds"] == 60
+    assert second.headers["Retry-After"] == "60"
+    assert second.headers["Discourse-Rate-Limit-Error-Code"]
+    assert server.request_counts == {"get_raw": 2}
+    assert server.rejection_counts == {HTTPStatus.TOO_MANY_REQUESTS: 1}
+
+
+def test_rate_limit_client_retries():
+    """
+    arrange: given a server that serves 1 request per short window
+    act: when a topic is created and retrieved using the client
+    assert: then the rate limited requests are retried and the content is returned.
+    """
+    config = ServerConfig(rate_limit=RateLimit(max_requests=1, period=0.01))
+    with DiscourseServer(config=config) as server:
+        discourse = _discourse(server)
+        url = discourse.create_topic(title="title 1", content="content 1")
+
+        returned_content = discourse.retrieve_topic(url=url)
+
+    assert returned_content == "content 1"
+
+
+def test_error_burst():
+    """
+    arrange: given a server where the last 2 of every 3 requests fail
+    act: when 4 requests are made followed by creating a topic using the client
+    assert: then the requests fail in the expected pattern and the failure is not retried by
+        pydiscourse.
+    """
+    config = ServerConfig(error_burst=ErrorBurst(every=3, length=2))
+    with DiscourseServer(config=config) as server:
+        statuses = [requests.get(f"{server.host}/raw/1", timeout=10).status_code for _ in range(4)]
+        server.reset_request_counts()
+
+        with pytest.raises(DiscourseError):
+            _discourse(server).create_topic(title="title 1", content="content 1")
+
+    assert statuses == [404, 503, 503, 404]
+    assert server.rejection_counts == {HTTPStatus.SERVICE_UNAVAILABLE: 1}
+    assert not server.topics
@@ -0,0 +1,54 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Smoke tests for the benchmark suite."""
+
+import copy
+import json
+from pathlib import Path
+
+from .charm_docs import DocsSpec
+from .run import compare, run_benchmark, write_results
+
+
+def test_run_benchmark(tmp_path: Path):
+    """
+    arrange: given a small documentation spec
+    act: when run_benchmark is called and the results are compared to themselves and to a
+        baseline with fewer requests
+    assert: then all phases are reported with their measurements, no regressions are found
+        against the same results and the request increase is found against the baseline.
+    """
+    spec = DocsSpec(pages=3, depth=1, external_links=1, page_lines=3)
+
+    results = run_benchmark(spec=spec, work_dir=tmp_path)
+
+    phases = {phase["name"]: phase for phase in results["phases"]}
+    assert list(phases) == [
+        "checks",
+        "reconcile-create",
+        "reconcile-noop",
+        "reconcile-warm",
+        "reconcile-update",
+        "migrate",
+    ]
+    # 3 pages and the index page
+    assert phases["reconcile-create"]["requests"]["create_post"] == 4
+    assert phases["reconcile-create"]["requests"]["external"] == 1
+    assert phases["reconcile-update"]["requests"]["update_post"] == 1
+    # The pages that have not been bumped are read from the documentation tag
+    assert phases["reconcile-warm"]["requests"]["get_raw"] < (
+        phases["reconcile-noop"]["requests"]["get_raw"]
+    )
+    assert phases["migrate"]["github_calls"]["create_pull"] == 1
+    assert all(phase["git_commands_total"] > 0 for phase in results["phases"])
+    assert all(phase["peak_memory"] > 0 for phase in results["phases"])
+    assert not compare(results=results, baseline=results, time_tolerance=0)
+    baseline = copy.deepcopy(results)
+    baseline["phases"][1]["requests_total"] -= 1
+    regressions = compare(results=results, baseline=baseline, time_tolerance=0)
+    assert len(regressions) == 1
+    assert "reconcile-create: requests_total" in regressions[0]
+    output = tmp_path / "results.json"
+    write_results(results=results, output=output)
+    assert json.loads(output.read_text(encoding="utf-8")) == results
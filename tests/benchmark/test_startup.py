@@ -0,0 +1,31 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Smoke tests for the startup benchmark."""
+
+from pathlib import Path
+
+from .startup import check_budget, run_startup
+
+
+def test_run_startup(tmp_path: Path):
+    """
+    arrange: given the repositories for each early exit of the reconcile
+    act: when run_startup is called and the results are checked against a generous and an
+        impossible budget
+    assert: then the reconcile exits early without importing any heavy dependency, the generous
+        budget is met and the impossible budget is reported for each scenario.
+    """
+    results = run_startup(work_dir=tmp_path, repeat=1)
+
+    scenarios = {scenario["name"]: scenario for scenario in results["scenarios"]}
+    assert list(scenarios) == ["no-docs", "same-commit"]
+    assert all(scenario["early_exit"] for scenario in scenarios.values())
+    assert all(not scenario["heavy_modules"] for scenario in scenarios.values())
+    assert all(
+        0 < scenario["import_time"] <= scenario["decision_time"] <= scenario["process_time"]
+        for scenario in scenarios.values()
+    )
+    assert not check_budget(results=results, import_budget=60, decision_budget=60)
+    violations = check_budget(results=results, import_budget=0, decision_budget=0)
+    assert len(violations) == 4
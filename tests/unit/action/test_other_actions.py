@@ -8,11 +8,12 @@
 
 import logging
 import types
+from pathlib import Path
 from unittest import mock
 
 import pytest
 
-from gatekeeper import action, discourse, exceptions
+from gatekeeper import action, deadline, discourse, exceptions, journal
 from gatekeeper import types_ as src_types
 
 from ... import factories
@@ -716,7 +717,7 @@ def test__run_index_update_error(caplog: pytest.LogCaptureFixture):
             f"dry run: {False}",
             f"report: {returned_report}",
             new_content,
-            f"content change:\n- {old_content}?         ^\n+ {new_content}?         ^\n",
+            f"content change:\n@@ -1 +1 @@\n-{old_content}+{new_content}",
         ),
         caplog.text,
     )
@@ -752,7 +753,7 @@ def test__run_index_update(caplog: pytest.LogCaptureFixture):
             f"dry run: {False}",
             f"report: {returned_report}",
             new_content,
-            f"content change:\n- {old_content}?         ^\n+ {new_content}?         ^\n",
+            f"content change:\n@@ -1 +1 @@\n-{old_content}+{new_content}",
         ),
         caplog.text,
     )
@@ -846,3 +847,97 @@ def test_run_all(
 
 # Need this after the function as locals from parametrize also go to function
 # pylint: enable=too-many-locals
+
+
+def test_run_all_journal(tmp_path: Path):
+    """
+    arrange: given a journal with a page created by an earlier run that stopped before the index
+        was updated and actions to create that page and another page
+    act: when run_all is called with the actions and the journal
+    assert: then only the other page is created, the index includes both pages and the journal is
+        cleared.
+    """
+    index = src_types.Index(
+        server=None, local=src_types.IndexFile(title="title 1", content=None), name="name 1"
+    )
+    first_action = factories.CreatePageActionFactory()
+    second_action = factories.CreatePageActionFactory()
+    journal_path = tmp_path / "journal.jsonl"
+    earlier_journal = journal.Journal(
+        path=journal_path, name="name 1", discourse_host="host 1", base="commit 1"
+    )
+    earlier_journal.record(
+        action=first_action,
+        report=(
+            first_report := src_types.ActionReport(
+                table_row=src_types.TableRow(
+                    level=first_action.level,
+                    path=first_action.path,
+                    navlink=src_types.Navlink(
+                        title=first_action.navlink_title, link="url 1", hidden=False
+                    ),
+                ),
+                location="url 1",
+                result=src_types.ActionResult.SUCCESS,
+                reason=None,
+            )
+        ),
+    )
+    mocked_discourse = mock.MagicMock(spec=discourse.Discourse)
+    mocked_discourse.create_topic.side_effect = ["url 2", "index url"]
+
+    _, returned_reports = action.run_all(
+        actions=(first_action, second_action),
+        index=index,
+        discourse=mocked_discourse,
+        dry_run=False,
+        delete_pages=True,
+        journal=journal.Journal(
+            path=journal_path, name="name 1", discourse_host="host 1", base="commit 1"
+        ),
+    )
+
+    assert returned_reports[0] == first_report
+    assert returned_reports[1].location == "url 2"
+    assert mocked_discourse.create_topic.call_count == 2
+    index_content = mocked_discourse.create_topic.call_args.kwargs["content"]
+    assert "url 1" in index_content
+    assert "url 2" in index_content
+    assert not journal_path.exists()
+
+
+def test_run_all_deadline(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given actions to create two pages, a journal and a run whose time is up after the
+        first page is created
+    act: when run_all is called with the actions and the journal
+    assert: then DeadlineExceededError is raised before the second page is created and the first
+        page is recorded in the journal.
+    """
+    index = src_types.Index(
+        server=None, local=src_types.IndexFile(title="title 1", content=None), name="name 1"
+    )
+    first_action = factories.CreatePageActionFactory()
+    second_action = factories.CreatePageActionFactory()
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.check.side_effect = [None, exceptions.DeadlineExceededError("time is up")]
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+    mocked_discourse = mock.MagicMock(spec=discourse.Discourse)
+    mocked_discourse.create_topic.return_value = "url 1"
+    run_journal = journal.Journal(
+        path=tmp_path / "journal.jsonl", name="name 1", discourse_host="host 1", base="commit 1"
+    )
+
+    with pytest.raises(exceptions.DeadlineExceededError):
+        action.run_all(
+            actions=(first_action, second_action),
+            index=index,
+            discourse=mocked_discourse,
+            dry_run=False,
+            delete_pages=True,
+            journal=run_journal,
+        )
+
+    mocked_discourse.create_topic.assert_called_once()
+    assert run_journal.completed(first_action) is not None
+    assert run_journal.completed(second_action) is None
@@ -12,7 +12,7 @@ from unittest import mock
 
 import pytest
 
-from gatekeeper import action, discourse, exceptions
+from gatekeeper import action, discourse, exceptions, logs
 from gatekeeper import types_ as src_types
 
 from ... import factories
@@ -119,7 +119,7 @@ def test__update_file_dry_run(caplog: pytest.LogCaptureFixture):
             f"dry run: {dry_run}",
             server_content,
             local_content,
-            f"content change:\n- {server_content}?         ^\n+ {local_content}?         ^\n",
+            f"content change:\n@@ -1 +1 @@\n-{server_content}+{local_content}",
         ),
         caplog.text,
     )
@@ -133,6 +133,33 @@ def test__update_file_dry_run(caplog: pytest.LogCaptureFixture):
     assert returned_report.reason == action.DRY_RUN_REASON
 
 
+def test__update_file_dry_run_compact_log(
+    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: given the compact log mode and update action for a file and mocked discourse
+    act: when action is passed to _update with dry_run True
+    assert: then the summary of the action is logged without the content or the diff.
+    """
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(logs, "_CONFIG", logs.LogConfig(mode=logs.LogMode.COMPACT))
+    mocked_discourse = mock.MagicMock(spec=discourse.Discourse)
+    update_action = factories.UpdatePageActionFactory(
+        content_change=src_types.ContentChange(
+            server=(server_content := "server content 1\n"),
+            local=(local_content := "local content 1\n"),
+            base=server_content,
+        ),
+    )
+
+    action._update(action=update_action, discourse=mocked_discourse, dry_run=True)
+
+    assert f"action: {logs.summarize(update_action)}" in caplog.text
+    assert server_content not in caplog.text
+    assert local_content not in caplog.text
+    assert "content change" not in caplog.text
+
+
 def test__update_file_navlink_title_change(caplog: pytest.LogCaptureFixture):
     """
     arrange: given update action for a file where only the navlink title has changed and mocked
@@ -260,13 +287,13 @@ def test__update_file_navlink_content_change_discourse_error(caplog: pytest.LogC
             f"dry run: {dry_run}",
             server_content,
             local_content,
-            f"content change:\n- {server_content}\n?         ^\n+ {local_content}\n?         ^\n",
+            f"content change:\n@@ -1 +1 @@\n-{server_content}\n+{local_content}\n",
         ),
         caplog.text,
     )
     assert update_action.content_change is not None
     mocked_discourse.update_topic.assert_called_once_with(
-        url=link, content=update_action.content_change.local
+        url=link, content=update_action.content_change.local, expected_revision=None
     )
     assert returned_report.table_row is not None
     assert returned_report.table_row.level == level
@@ -282,7 +309,7 @@ def test__update_file_navlink_content_change_discourse_error(caplog: pytest.LogC
     [
         pytest.param(
             factories.ContentChangeFactory(base="x", server="y", local="z"),
-            ("content change:\n- x\n+ z\n",),
+            ("content change:\n@@ -1 +1 @@\n-x\n+z\n",),
             ("merge", "conflict"),
             id="merge conflict",
         ),
@@ -389,7 +416,7 @@ def test__update_file_navlink_content_change_post_check_conflict(caplog: pytest.
             repr(base_content),
             repr(server_content_2),
             repr(local_content),
-            "content change:\n  line 1\n  line 2\n- line 3\n+ line 3a\n?       +\n",
+            "content change:\n@@ -1,3 +1,3 @@\n line 1\n line 2\n-line 3\n+line 3a\n",
         ),
         caplog.text,
     )
@@ -436,14 +463,14 @@ def test__update_file_navlink_content_change(caplog: pytest.LogCaptureFixture):
             repr(base_content),
             repr(server_content),
             repr(local_content),
-            "content change:\n  line 1\n  line 2\n- line 3\n+ line 3a\n?       +\n",
+            "content change:\n@@ -1,3 +1,3 @@\n line 1\n line 2\n-line 3\n+line 3a\n",
         ),
         caplog.text,
     )
     assert update_action.content_change is not None
     mocked_discourse.retrieve_topic.assert_called_once_with(url=link)
     mocked_discourse.update_topic.assert_called_once_with(
-        url=link, content="line 1a\nline 2\nline 3a\n"
+        url=link, content="line 1a\nline 2\nline 3a\n", expected_revision=None
     )
     assert returned_report.table_row is not None
     assert returned_report.table_row.level == level
@@ -452,3 +479,60 @@ def test__update_file_navlink_content_change(caplog: pytest.LogCaptureFixture):
     assert returned_report.location == url
     assert returned_report.result == src_types.ActionResult.SUCCESS
     assert returned_report.reason is None
+
+
+def test__update_file_navlink_content_change_server_revision():
+    """
+    arrange: given update action for a file with the revision of the server content and mocked
+        discourse
+    act: when action is passed to _update with dry_run False
+    assert: then the content is not retrieved again and the topic is updated on the condition that
+        it is still at the revision.
+    """
+    mocked_discourse = mock.MagicMock(spec=discourse.Discourse)
+    update_action = factories.UpdatePageActionFactory(
+        navlink_change=factories.NavlinkChangeFactory(
+            old=factories.NavlinkFactory(link=(link := "link 1")),
+            new=factories.NavlinkFactory(link=link),
+        ),
+        content_change=src_types.ContentChange(
+            server="line 1a\nline 2\nline 3\n",
+            local="line 1\nline 2\nline 3a\n",
+            base="line 1\nline 2\nline 3\n",
+        ),
+        server_revision=(revision := src_types.TopicRevision(post_id=11, version=3)),
+    )
+
+    returned_report = action._update(
+        action=update_action, discourse=mocked_discourse, dry_run=False
+    )
+
+    mocked_discourse.retrieve_topic.assert_not_called()
+    mocked_discourse.update_topic.assert_called_once_with(
+        url=link, content="line 1a\nline 2\nline 3a\n", expected_revision=revision
+    )
+    assert returned_report.result == src_types.ActionResult.SUCCESS
+
+
+def test__update_file_navlink_content_change_server_revision_changed():
+    """
+    arrange: given update action for a file with the revision of the server content and mocked
+        discourse that reports the topic changed since
+    act: when action is passed to _update with dry_run False
+    assert: then ActionError is raised.
+    """
+    mocked_discourse = mock.MagicMock(spec=discourse.Discourse)
+    mocked_discourse.update_topic.side_effect = exceptions.DiscourseTopicChangedError("changed")
+    update_action = factories.UpdatePageActionFactory(
+        navlink_change=factories.NavlinkChangeFactory(
+            old=factories.NavlinkFactory(link=(link := "link 1")),
+            new=factories.NavlinkFactory(link=link),
+        ),
+        content_change=src_types.ContentChange(server="x", local="z", base="x"),
+        server_revision=src_types.TopicRevision(post_id=11, version=3),
+    )
+
+    with pytest.raises(exceptions.ActionError) as exc_info:
+        action._update(action=update_action, discourse=mocked_discourse, dry_run=False)
+
+    assert_substrings_in_string((link, "has changed", "conflict check"), str(exc_info.value))
@@ -11,6 +11,7 @@ import requests
 
 from gatekeeper import Clients, constants, repository
 from gatekeeper.discourse import Discourse
+from gatekeeper.sync import SyncTracker
 
 from . import helpers
 
@@ -73,4 +74,14 @@ def mocked_clients(repository_client: repository.Client, host: str):
     """Create index file."""
     mocked_discourse = mock.MagicMock(spec=Discourse)
     mocked_discourse.host = host
+    mocked_discourse.sync = SyncTracker()
+    # No sync state is recorded unless a test lists the category
+    mocked_discourse.latest_bump.return_value = None
+    # The clients of the threads of a batch behave like the client of the batch
+    mocked_discourse.for_thread.return_value = mocked_discourse
+    # The content comes from retrieve_topic so that tests can set it in one place
+    mocked_discourse.retrieve_topic_and_revision.side_effect = lambda url: (
+        mocked_discourse.retrieve_topic(url=url),
+        helpers.MOCKED_TOPIC_REVISION,
+    )
     return Clients(discourse=mocked_discourse, repository=repository_client)
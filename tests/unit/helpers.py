@@ -6,9 +6,12 @@
 import typing
 from pathlib import Path
 
-from gatekeeper import metadata
+from gatekeeper import metadata, types_
 from gatekeeper.discourse import _URL_PATH_PREFIX
 
+# The revision returned for every topic by the discourse of the mocked clients
+MOCKED_TOPIC_REVISION = types_.TopicRevision(post_id=1, version=1)
+
 
 def create_metadata_yaml(content: str, path: Path) -> None:
     """Create the metadata file.
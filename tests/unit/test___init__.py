@@ -2,7 +2,9 @@
 # See LICENSE file for licensing details.
 # pylint: disable=too-many-lines
 """Unit tests for execution."""
+
 import logging
+import sqlite3
 from pathlib import Path
 from unittest import mock
 
@@ -16,16 +18,19 @@ from gatekeeper import (  # GETTING_STARTED,
     constants,
     discourse,
     exceptions,
+    metrics,
     pre_flight_checks,
     run_migrate,
     run_reconcile,
     types_,
 )
-from gatekeeper.clients import get_clients
+from gatekeeper.clients import get_clients, open_clients
 from gatekeeper.constants import DEFAULT_BRANCH, DOCUMENTATION_FOLDER_NAME
+from gatekeeper.journal import Journal
 from gatekeeper.metadata import METADATA_DOCS_KEY, METADATA_NAME_KEY
 from gatekeeper.repository import DEFAULT_BRANCH_NAME
 from gatekeeper.repository import Client as RepositoryClient
+from gatekeeper.sync import SyncState, SyncTracker
 
 from .. import factories
 from ..conftest import BASE_REMOTE_BRANCH
@@ -60,6 +65,27 @@ def test_setup_clients(get_repo_mock, git_repo_with_remote, charm_dir):
     assert clients.discourse._api_key == user_inputs.discourse.api_key
 
 
+@mock.patch("github.Github.get_repo")
+def test_open_clients(get_repo_mock, git_repo_with_remote, tmp_path: Path):
+    """
+    arrange: given a local path and user_inputs with a cache directory
+    act: when the clients are opened and then no longer used
+    assert: then the Discourse client has a mirror that is closed afterwards.
+    """
+    get_repo_mock.return_value = git_repo_with_remote
+    user_inputs = factories.UserInputsFactory(cache_dir=str(tmp_path))
+
+    with open_clients(
+        user_inputs=user_inputs, base_path=Path(git_repo_with_remote.working_dir)
+    ) as clients:
+        mirror = clients.discourse.mirror
+        assert mirror is not None
+        assert mirror.get(1) is None
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        mirror.get(1)
+
+
 @mock.patch(
     "gatekeeper.repository.Client.metadata",
     types_.Metadata(name="name 1", docs=None),
@@ -169,6 +195,197 @@ def test__run_reconcile_local_empty_server(mocked_clients):
         page_url: types_.ActionResult.SUCCESS,
         index_url: types_.ActionResult.SUCCESS,
     }
+    assert returned_page_interactions.in_sync
+
+
+def test__run_reconcile_journaled_delete(mocked_clients, tmp_path: Path):
+    """
+    arrange: given a page on the index that is no longer in the docs folder and that an earlier
+        run that stopped before updating the index deleted, as recorded in the journal
+    act: when run_reconcile is called with the journal
+    assert: then the deleted page is not read again and the index is updated without it.
+    """
+    repository_path = mocked_clients.repository.base_path
+    create_metadata_yaml(
+        content=f"{METADATA_NAME_KEY}: name 1\n{METADATA_DOCS_KEY}: https://discourse/t/docs/1",
+        path=repository_path,
+    )
+    index_content = "index content"
+    deleted_url = "https://discourse/t/deleted/2"
+
+    def retrieve_topic(url: str) -> str:
+        """Get the index page, the other page is deleted.
+
+        Args:
+            url: The link to the topic.
+
+        Returns:
+            The content of the index page.
+
+        Raises:
+            DiscourseError: for the deleted page.
+        """
+        if url == deleted_url:
+            raise exceptions.DiscourseError("topic deleted")
+        return (
+            f"{index_content}{constants.NAVIGATION_TABLE_START}\n"
+            f"| 1 | deleted | [Deleted]({deleted_url}) |"
+        )
+
+    mocked_clients.discourse.retrieve_topic.side_effect = retrieve_topic
+    journal_path = tmp_path / "journal.jsonl"
+    Journal(
+        path=journal_path,
+        name="name 1",
+        discourse_host=mocked_clients.discourse.host,
+        base=mocked_clients.repository.tag_exists(DOCUMENTATION_TAG),
+    ).record(
+        action=factories.DeletePageActionFactory(),
+        report=types_.ActionReport(
+            table_row=None,
+            location=deleted_url,
+            result=types_.ActionResult.SUCCESS,
+            reason=None,
+        ),
+    )
+
+    with mocked_clients.repository.with_branch(DEFAULT_BRANCH) as repo:
+        (docs_folder := repo.base_path / "docs").mkdir()
+        (docs_folder / "index.md").write_text(index_content)
+        repo.update_branch("new commit", directory=None)
+        user_inputs = factories.UserInputsFactory(
+            dry_run=False,
+            delete_pages=True,
+            commit_sha=repo.current_commit,
+            journal_file=str(journal_path),
+        )
+
+        returned_outputs = run_reconcile(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert returned_outputs is not None
+    mocked_clients.discourse.retrieve_topic.assert_called_once_with(
+        url="https://discourse/t/docs/1"
+    )
+    mocked_clients.discourse.delete_topic.assert_not_called()
+    mocked_clients.discourse.update_topic.assert_called_once()
+    assert "deleted" not in mocked_clients.discourse.update_topic.call_args.kwargs["content"]
+    assert not journal_path.exists()
+
+
+@mock.patch(
+    "gatekeeper.repository.Client.metadata",
+    types_.Metadata(name="name 1", docs=None),
+)
+def test__run_reconcile_metrics(mocked_clients):
+    """
+    arrange: given docs folder with a file, mocked discourse and a reset metrics collector
+    act: when _run_reconcile is called
+    assert: then each phase of the reconcile is recorded.
+    """
+    mocked_clients.discourse.create_topic.side_effect = ["url 1", "url 2"]
+    with mocked_clients.repository.with_branch(DEFAULT_BRANCH) as repo:
+        (docs_folder := repo.base_path / "docs").mkdir()
+        (docs_folder / "index.md").write_text("index content\n")
+        (docs_folder / "page.md").write_text("page content")
+        repo.update_branch("new commit", directory=repo.docs_path)
+        user_inputs = factories.UserInputsFactory(
+            dry_run=False, delete_pages=True, commit_sha=repo.current_commit
+        )
+        metrics.get_collector().reset()
+
+        run_reconcile(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert metrics.get_collector().snapshot()[metrics.PHASE].keys() == {
+        metrics.PHASE_INDEX_FETCH,
+        metrics.PHASE_TABLE_PARSE,
+        metrics.PHASE_RECONCILE,
+        metrics.PHASE_CONFLICTS,
+        metrics.PHASE_APPLY,
+    }
+
+
+@mock.patch(
+    "gatekeeper.repository.Client.metadata",
+    types_.Metadata(name="name 1", docs=None),
+)
+def test__run_reconcile_export_apply_plan(mocked_clients, tmp_path: Path):
+    """
+    arrange: given docs folder with a file, mocked discourse and a plan exported by a dry run that
+        has been edited
+    act: when _run_reconcile is called applying the plan
+    assert: then the page is created using the planned action.
+    """
+    mocked_clients.discourse.create_topic.side_effect = ["url 1", "url 2"]
+    plan_path = tmp_path / "plan.json"
+    with mocked_clients.repository.with_branch(DEFAULT_BRANCH) as repo:
+        (docs_folder := repo.base_path / "docs").mkdir()
+        (docs_folder / "index.md").write_text("index content\n")
+        (docs_folder / "page.md").write_text("page content")
+        repo.update_branch("new commit", directory=repo.docs_path)
+        run_reconcile(
+            clients=mocked_clients,
+            user_inputs=factories.UserInputsFactory(
+                dry_run=True, commit_sha=repo.current_commit, export_plan=str(plan_path)
+            ),
+        )
+        plan_path.write_text(
+            plan_path.read_text(encoding="utf-8").replace('"page content"', '"planned content"'),
+            encoding="utf-8",
+        )
+
+        run_reconcile(
+            clients=mocked_clients,
+            user_inputs=factories.UserInputsFactory(
+                dry_run=False, commit_sha=repo.current_commit, apply_plan=str(plan_path)
+            ),
+        )
+
+    mocked_clients.discourse.create_topic.assert_any_call(
+        title="name 1 docs: planned content", content="planned content"
+    )
+
+
+@mock.patch(
+    "gatekeeper.repository.Client.metadata",
+    types_.Metadata(name="name 1", docs=None),
+)
+def test__run_reconcile_apply_plan_other_commit(mocked_clients, tmp_path: Path):
+    """
+    arrange: given docs folder with a file, mocked discourse and a plan exported by a dry run that
+        has been edited to be for a commit that is not an ancestor of the current commit
+    act: when _run_reconcile is called applying the plan
+    assert: then the page is created using the content of the file.
+    """
+    mocked_clients.discourse.create_topic.side_effect = ["url 1", "url 2"]
+    plan_path = tmp_path / "plan.json"
+    with mocked_clients.repository.with_branch(DEFAULT_BRANCH) as repo:
+        (docs_folder := repo.base_path / "docs").mkdir()
+        (docs_folder / "index.md").write_text("index content\n")
+        (docs_folder / "page.md").write_text("page content")
+        repo.update_branch("new commit", directory=repo.docs_path)
+        run_reconcile(
+            clients=mocked_clients,
+            user_inputs=factories.UserInputsFactory(
+                dry_run=True, commit_sha=repo.current_commit, export_plan=str(plan_path)
+            ),
+        )
+        plan_path.write_text(
+            plan_path.read_text(encoding="utf-8")
+            .replace('"page content"', '"planned content"')
+            .replace(repo.current_commit, "1" + repo.current_commit[:-1]),
+            encoding="utf-8",
+        )
+
+        run_reconcile(
+            clients=mocked_clients,
+            user_inputs=factories.UserInputsFactory(
+                dry_run=False, commit_sha=repo.current_commit, apply_plan=str(plan_path)
+            ),
+        )
+
+    mocked_clients.discourse.create_topic.assert_any_call(
+        title="name 1 docs: page content", content="page content"
+    )
 
 
 @mock.patch("gatekeeper.repository.Client.get_file_content_from_tag")
@@ -281,6 +498,66 @@ def test_run_reconcile_same_content_local_and_server(
         )
 
 
+def test_run_reconcile_sync_state(mocked_clients):
+    """
+    arrange: given a docs directory with a page aligned with the server
+    act: when run_reconcile is called and called again for a new commit with nothing bumped since
+    assert: then the sync state with the page is recorded in the tag annotation and the page is
+        not retrieved from the server the second time.
+    """
+    repository = mocked_clients.repository
+    create_metadata_yaml(
+        content=f"{METADATA_NAME_KEY}: name 1\n{METADATA_DOCS_KEY}: https://discourse/t/docs/10",
+        path=repository.base_path,
+    )
+    index_content = "Content header."
+    index_page = (
+        f"{index_content}{constants.NAVIGATION_TABLE_START}\n"
+        "| 1 | page-1 | [Page 1](/t/page-1/1) |"
+    )
+    page_content = "# Page 1\npage content"
+    mocked_clients.discourse.retrieve_topic.side_effect = lambda url: (
+        index_page if url.endswith("/10") else page_content
+    )
+    mocked_clients.discourse.latest_bump.return_value = (synced_at := "2025-01-01T00:00:00.000Z")
+    mocked_clients.discourse.bumped_topics.return_value = frozenset()
+    # The mocked client does not read the topics, the page has no replies
+    mocked_clients.discourse.sync.record_topic(1, eligible=True)
+    (docs_folder := repository.base_path / "docs").mkdir()
+    (docs_folder / "index.md").write_text(index_content)
+    (docs_folder / "page-1.md").write_text(page_content)
+    repository.switch(DEFAULT_BRANCH).update_branch("First document version", directory=None)
+    repository.tag_commit(DOCUMENTATION_TAG, repository.current_commit)
+    (repository.base_path / "placeholder.md").touch()
+    repository.switch(DEFAULT_BRANCH).update_branch("Placeholder", directory=None)
+
+    run_reconcile(
+        clients=mocked_clients,
+        user_inputs=factories.UserInputsFactory(commit_sha=repository.current_commit),
+    )
+
+    assert repository.tag_exists(DOCUMENTATION_TAG) == repository.current_commit
+    expected_state = SyncState(synced_at=synced_at, topics={1: "docs/page-1.md"})
+    assert SyncState.from_message(repository.tag_message(DOCUMENTATION_TAG)) == expected_state
+
+    mocked_clients.discourse.sync = SyncTracker()
+    mocked_clients.discourse.retrieve_topic.reset_mock()
+    (repository.base_path / "placeholder.md").write_text("placeholder")
+    repository.switch(DEFAULT_BRANCH).update_branch("Placeholder change", directory=None)
+
+    run_reconcile(
+        clients=mocked_clients,
+        user_inputs=factories.UserInputsFactory(commit_sha=repository.current_commit),
+    )
+
+    mocked_clients.discourse.bumped_topics.assert_called_once_with(since=synced_at)
+    mocked_clients.discourse.retrieve_topic.assert_called_once_with(
+        url="https://discourse/t/docs/10"
+    )
+    assert repository.tag_exists(DOCUMENTATION_TAG) == repository.current_commit
+    assert SyncState.from_message(repository.tag_message(DOCUMENTATION_TAG)) == expected_state
+
+
 @mock.patch(
     "gatekeeper.repository.Client.metadata",
     types_.Metadata(name="name 1", docs=None),
@@ -489,6 +766,7 @@ def test__run_reconcile_local_empty_server_dry_run(mocked_clients):
     mocked_clients.discourse.create_topic.assert_not_called()
     assert returned_page_interactions is not None
     assert not returned_page_interactions.topics
+    assert not returned_page_interactions.in_sync
 
 
 @mock.patch(
@@ -1183,6 +1461,44 @@ def test_run_migrate_same_content_local_and_server_open_pr(
     assert edit_call_args[0] == {"state": "closed"}
 
 
+def test_run_migrate_in_sync(monkeypatch: pytest.MonkeyPatch, mocked_clients):
+    """
+    arrange: given a path with a metadata.yaml that has docs key, an open PR and the outputs of a
+        reconcile that left the server matching the tag
+    act: when run_migrate is called with the outputs of the reconcile
+    assert: then the docs are not downloaded and the PR is closed.
+    """
+    create_metadata_yaml(
+        content=f"{METADATA_NAME_KEY}: name 1\n{METADATA_DOCS_KEY}: https://discourse/t/docs",
+        path=mocked_clients.repository.base_path,
+    )
+    mocked_clients.repository.tag_commit(
+        DOCUMENTATION_TAG, mocked_clients.repository.current_commit
+    )
+    pull_request = mock.MagicMock(html_url="test_url")
+    monkeypatch.setattr(
+        mocked_clients.repository, "get_pull_request", mock.MagicMock(return_value=pull_request)
+    )
+    reconcile_outputs = types_.ReconcileOutputs(
+        index_url="https://discourse/t/docs",
+        topics={},
+        documentation_tag=mocked_clients.repository.current_commit,
+        in_sync=True,
+    )
+
+    returned_migration_reports = run_migrate(
+        clients=mocked_clients,
+        user_inputs=factories.UserInputsFactory(),
+        reconcile_outputs=reconcile_outputs,
+    )
+
+    mocked_clients.discourse.retrieve_topic.assert_not_called()
+    pull_request.edit.assert_called_once_with(state="closed")
+    assert returned_migration_reports == types_.MigrateOutputs(
+        action=types_.PullRequestAction.CLOSED, pull_request_url="test_url"
+    )
+
+
 def test_run_migrate_same_content_local_and_server_tag_not_moved(caplog, mocked_clients):
     """
     arrange: given a path with a metadata.yaml that has docs key and docs directory aligned
@@ -0,0 +1,233 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for batch."""
+
+# Need access to protected functions for testing
+# pylint: disable=protected-access
+
+from unittest import mock
+
+import pytest
+
+from gatekeeper import batch, types_
+from gatekeeper.clients import Clients
+from gatekeeper.constants import DEFAULT_BRANCH, DOCUMENTATION_TAG
+from gatekeeper.exceptions import InputError, TaggingNotAllowedError
+
+from .. import factories
+
+CHARM_DIRS = ("charm-1", "charm-2")
+
+
+def _create_docs(clients: Clients) -> str:
+    """Commit a docs directory with a page for each of the charms on the default branch.
+
+    Args:
+        clients: The clients for the repository.
+
+    Returns:
+        The commit with the docs directories.
+    """
+    repo = clients.repository.switch(DEFAULT_BRANCH)
+    for charm_dir in CHARM_DIRS:
+        (docs_folder := repo.base_path / charm_dir / "docs").mkdir(parents=True)
+        (docs_folder / "index.md").write_text(f"index {charm_dir}\n", encoding="utf-8")
+        (docs_folder / "page.md").write_text(f"page {charm_dir}", encoding="utf-8")
+    repo.update_branch("new commit", directory=None)
+    return repo.current_commit
+
+
+@mock.patch(
+    "gatekeeper.repository.Client.metadata",
+    types_.Metadata(name="name 1", docs=None),
+)
+def test_run(mocked_clients: Clients):
+    """
+    arrange: given a repository with docs for 2 charms and mocked discourse
+    act: when run is called for the charms
+    assert: then the pages of each charm are created with a Discourse client for the charm, the
+        outputs are returned per charm, the documentation tag is moved to the commit and the
+        snapshot of the server is removed from the Discourse client.
+    """
+    mocked_clients.discourse.create_topic.side_effect = lambda title, content: f"url {content}"
+    commit_sha = _create_docs(mocked_clients)
+    user_inputs = factories.UserInputsFactory(
+        dry_run=False, commit_sha=commit_sha, charm_dirs=CHARM_DIRS, batch_workers=2
+    )
+
+    returned_outputs = batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert tuple(outputs.charm_dir for outputs in returned_outputs) == CHARM_DIRS
+    for outputs in returned_outputs:
+        assert outputs.error is None
+        assert outputs.migrate is None
+        assert outputs.reconcile is not None
+        assert outputs.reconcile.topics[f"url page {outputs.charm_dir}"] == (
+            types_.ActionResult.SUCCESS
+        )
+        assert outputs.reconcile.in_sync
+    # One client per reconcile and per migration
+    assert mocked_clients.discourse.for_thread.call_count == 2 * len(CHARM_DIRS)
+    assert mocked_clients.repository.tag_exists(DOCUMENTATION_TAG) == commit_sha
+    assert not mocked_clients.repository.is_dirty()
+    assert mocked_clients.discourse.snapshot is None
+
+
+def test_run_checks_fail(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients):
+    """
+    arrange: given the checks of the repository fail
+    act: when run is called
+    assert: then TaggingNotAllowedError is raised.
+    """
+    monkeypatch.setattr(batch, "pre_flight_checks", mock.MagicMock(return_value=False))
+    user_inputs = factories.UserInputsFactory(charm_dirs=CHARM_DIRS)
+
+    with pytest.raises(TaggingNotAllowedError):
+        batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+
+def test_run_reconcile_error(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients):
+    """
+    arrange: given the reconcile of the second charm fails and the reconcile of the first charm
+        requests a tag
+    act: when run is called
+    assert: then the error is reported for the second charm, only the first charm is migrated, as
+        out of sync with the tag, and the tag is not created.
+    """
+    previous_tag_commit = mocked_clients.repository.tag_exists(DOCUMENTATION_TAG)
+    reconcile_outputs = types_.ReconcileOutputs(
+        index_url="url 1", topics={}, documentation_tag=None, in_sync=True
+    )
+
+    def run_reconcile(clients: Clients, user_inputs: types_.UserInputs):
+        """Reconcile a charm.
+
+        Args:
+            clients: The clients for the charm.
+            user_inputs: The inputs of the batch.
+
+        Returns:
+            The reconcile outputs.
+
+        Raises:
+            InputError: for the second charm.
+        """
+        if clients.repository.docs_path.parent.name == CHARM_DIRS[1]:
+            raise InputError("failed")
+        clients.repository.tag_commit(DOCUMENTATION_TAG, user_inputs.commit_sha)
+        return reconcile_outputs
+
+    monkeypatch.setattr(batch, "run_reconcile", run_reconcile)
+    mocked_run_migrate = mock.MagicMock(return_value=None)
+    monkeypatch.setattr(batch, "run_migrate", mocked_run_migrate)
+    user_inputs = factories.UserInputsFactory(
+        commit_sha=mocked_clients.repository.current_commit, charm_dirs=CHARM_DIRS
+    )
+
+    returned_outputs = batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+    expected_reconcile_outputs = reconcile_outputs._replace(in_sync=False)
+    assert returned_outputs == (
+        batch.CharmOutputs(
+            charm_dir=CHARM_DIRS[0], reconcile=expected_reconcile_outputs, migrate=None, error=None
+        ),
+        batch.CharmOutputs(charm_dir=CHARM_DIRS[1], reconcile=None, migrate=None, error="failed"),
+    )
+    mocked_run_migrate.assert_called_once()
+    assert mocked_run_migrate.call_args.kwargs["reconcile_outputs"] == expected_reconcile_outputs
+    assert mocked_clients.repository.tag_exists(DOCUMENTATION_TAG) == previous_tag_commit
+
+
+def test_run_tag_error(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients):
+    """
+    arrange: given the reconciles request a tag and creating the tag fails
+    act: when run is called
+    assert: then the error is reported for all the charms and none is migrated.
+    """
+    monkeypatch.setattr(
+        batch,
+        "run_reconcile",
+        lambda clients, user_inputs: clients.repository.tag_commit("tag 1", "invalid commit"),
+    )
+    mocked_run_migrate = mock.MagicMock()
+    monkeypatch.setattr(batch, "run_migrate", mocked_run_migrate)
+    user_inputs = factories.UserInputsFactory(charm_dirs=CHARM_DIRS)
+
+    returned_outputs = batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert all(
+        outputs.error and "tagging commit failed" in outputs.error.lower()
+        for outputs in returned_outputs
+    )
+    mocked_run_migrate.assert_not_called()
+
+
+def test_run_migrate_error(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients):
+    """
+    arrange: given the migration of the first charm fails after changing the working tree
+    act: when run is called
+    assert: then the error is reported for the first charm, the second charm is migrated from a
+        clean working tree.
+    """
+    monkeypatch.setattr(batch, "run_reconcile", mock.MagicMock(return_value=None))
+    migrate_outputs = types_.MigrateOutputs(
+        action=types_.PullRequestAction.OPENED, pull_request_url="url 1"
+    )
+    dirty_states = []
+
+    def run_migrate(
+        clients: Clients,
+        user_inputs: types_.UserInputs,
+        reconcile_outputs: types_.ReconcileOutputs | None,
+    ):
+        """Migrate a charm.
+
+        Args:
+            clients: The clients for the charm.
+            user_inputs: The inputs of the batch.
+            reconcile_outputs: The outputs of the reconcile of the charm.
+
+        Returns:
+            The migrate outputs.
+
+        Raises:
+            InputError: for the first charm.
+        """
+        assert user_inputs.charm_dirs == CHARM_DIRS
+        assert reconcile_outputs is None
+        dirty_states.append(clients.repository.is_dirty())
+        if clients.repository.docs_path.parent.name == CHARM_DIRS[0]:
+            (clients.repository.base_path / "new.md").write_text("new", encoding="utf-8")
+            raise InputError("failed")
+        return migrate_outputs
+
+    monkeypatch.setattr(batch, "run_migrate", run_migrate)
+    user_inputs = factories.UserInputsFactory(charm_dirs=CHARM_DIRS)
+
+    returned_outputs = batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert returned_outputs == (
+        batch.CharmOutputs(charm_dir=CHARM_DIRS[0], reconcile=None, migrate=None, error="failed"),
+        batch.CharmOutputs(
+            charm_dir=CHARM_DIRS[1], reconcile=None, migrate=migrate_outputs, error=None
+        ),
+    )
+    assert dirty_states == [False, False]
+
+
+def test_run_unexpected_error(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients):
+    """
+    arrange: given the migration fails with an unexpected error
+    act: when run is called
+    assert: then the error is raised and the snapshot of the server is removed from the Discourse
+        client.
+    """
+    monkeypatch.setattr(batch, "run_reconcile", mock.MagicMock(return_value=None))
+    monkeypatch.setattr(batch, "run_migrate", mock.MagicMock(side_effect=RuntimeError("failed")))
+    user_inputs = factories.UserInputsFactory(charm_dirs=CHARM_DIRS)
+
+    with pytest.raises(RuntimeError):
+        batch.run(clients=mocked_clients, user_inputs=user_inputs)
+
+    assert mocked_clients.discourse.snapshot is None
@@ -0,0 +1,177 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for cassette."""
+
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+from git.repo import Repo
+from requests.adapters import HTTPAdapter
+
+from gatekeeper import cassette, repository
+from gatekeeper.exceptions import RepositoryClientError
+
+SECRET = "secret-key"
+URL = f"http://discourse/t/slug/1.json?api_key={SECRET}&print=true"
+
+
+@pytest.fixture(name="server_send")
+def fixture_server_send(monkeypatch: pytest.MonkeyPatch) -> mock.MagicMock:
+    """Replace sending the requests with a server that returns the body it was sent."""
+
+    def send(
+        _adapter: HTTPAdapter, request: requests.PreparedRequest, **_kwargs
+    ) -> requests.Response:
+        """Return the body of the request.
+
+        Args:
+            request: The request.
+
+        Returns:
+            The response.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = requests.structures.CaseInsensitiveDict(
+            {"Set-Cookie": "session", "Content-Length": "2", "X-Key": f"key {SECRET}"}
+        )
+        # The response is built by the server, the protected attribute holds the body
+        response._content = request.body or b"\xff{}"  # pylint: disable=protected-access
+        response.request = request
+        return response
+
+    mocked_send = mock.MagicMock(side_effect=send)
+    # A mock is not bound to the adapter it is called on, a function is
+    monkeypatch.setattr(
+        HTTPAdapter,
+        "send",
+        lambda *args, **kwargs: mocked_send(*args, **kwargs),  # pylint: disable=unnecessary-lambda
+    )
+    return mocked_send
+
+
+def test_record(server_send: mock.MagicMock, tmp_path: Path):
+    """
+    arrange: given a server
+    act: when requests are sent while recording
+    assert: then the responses of the server are returned and the requests are recorded without
+        the secrets, with their responses, and the transport is restored afterwards.
+    """
+    path = tmp_path / "cassette.jsonl"
+
+    with cassette.record(path=path, secrets=(SECRET, "")):
+        get_response = requests.get(URL, headers={"Api-Key": SECRET}, timeout=1)
+        post_response = requests.post("http://discourse/posts.json", data=b"content", timeout=1)
+
+    assert get_response.content == b"\xff{}"
+    assert post_response.content == b"content"
+    assert server_send.call_count == 2
+    assert SECRET not in path.read_text(encoding="utf-8")
+    interactions = cassette.read(path)
+    assert len(interactions) == 2
+    get_interaction, post_interaction = interactions[0], interactions[1]
+    assert get_interaction.url == (
+        f"http://discourse/t/slug/1.json?api_key={cassette.REDACTED}&print=true"
+    )
+    assert get_interaction.request_headers["Api-Key"] == cassette.REDACTED
+    assert get_interaction.status == 200
+    assert get_interaction.response_headers == {
+        "Set-Cookie": cassette.REDACTED,
+        "X-Key": f"key {cassette.REDACTED}",
+    }
+    assert post_interaction.method == "POST"
+    assert post_interaction.request_body == "content"
+    assert post_interaction.response_body == "content"
+    assert post_interaction.started >= get_interaction.started
+
+    requests.get(URL, timeout=1)
+
+    assert server_send.call_count == 3
+    assert len(cassette.read(path)) == 2
+
+
+def test_replay(server_send: mock.MagicMock, tmp_path: Path):
+    """
+    arrange: given a cassette recorded with two requests and a request that failed
+    act: when the requests are sent while replaying with the latency scaled
+    assert: then the recorded responses and errors are returned after the scaled recorded time
+        without sending the requests and a request sent more times than recorded fails.
+    """
+    path = tmp_path / "cassette.jsonl"
+    with cassette.record(path=path, secrets=(SECRET,)):
+        requests.get(URL, timeout=1)
+        requests.post("http://discourse/posts.json", data=b"content", timeout=1)
+        server_send.side_effect = requests.ReadTimeout("timed out")
+        with pytest.raises(requests.ReadTimeout):
+            requests.get("http://discourse/raw/1", timeout=1)
+    server_send.reset_mock()
+    interactions = cassette.read(path)
+    assert interactions[2].error == "ReadTimeout"
+
+    with (
+        mock.patch.object(cassette.time, "sleep") as mocked_sleep,
+        cassette.replay(path=path, latency_scale=0.5, secrets=("other-key",)),
+    ):
+        get_response = requests.get(URL.replace(SECRET, "other-key"), timeout=1)
+        post_response = requests.post("http://discourse/posts.json", data=b"content", timeout=1)
+        with pytest.raises(requests.ReadTimeout):
+            requests.get("http://discourse/raw/1", timeout=1)
+        with pytest.raises(requests.ConnectionError):
+            requests.post("http://discourse/posts.json", data=b"content", timeout=1)
+
+    server_send.assert_not_called()
+    assert get_response.status_code == 200
+    assert get_response.content == b"\xff{}"
+    assert get_response.headers["Set-Cookie"] == cassette.REDACTED
+    assert post_response.text == "content"
+    assert mocked_sleep.call_args_list == [
+        mock.call(interaction.elapsed * 0.5) for interaction in interactions
+    ]
+
+
+def test_replay_git_push(
+    monkeypatch: pytest.MonkeyPatch,
+    repository_client: repository.Client,
+    upstream_git_repo: Repo,
+    tmp_path: Path,
+):
+    """
+    arrange: given an empty cassette and a repository with other git configuration in the
+        environment
+    act: when a commit is tagged while replaying and after the replay
+    assert: then pushing the tag fails while replaying without changing the remote repository,
+        the environment is restored afterwards and pushing another tag succeeds.
+    """
+    path = tmp_path / "cassette.jsonl"
+    path.touch()
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    monkeypatch.setenv("GIT_CONFIG_KEY_0", "core.quotePath")
+    monkeypatch.setenv("GIT_CONFIG_VALUE_0", "false")
+    commit_sha = repository_client.current_commit
+
+    with cassette.replay(path=path, latency_scale=0):
+        with pytest.raises(RepositoryClientError):
+            repository_client.tag_commit(tag_name="tag-1", commit_sha=commit_sha)
+
+    assert "tag-1" not in upstream_git_repo.tags
+    assert os.environ["GIT_CONFIG_COUNT"] == "1"
+    assert "GIT_CONFIG_KEY_1" not in os.environ
+    repository_client.tag_commit(tag_name="tag-2", commit_sha=commit_sha)
+    assert "tag-2" in upstream_git_repo.tags
+
+
+def test_read_invalid_lines(tmp_path: Path):
+    """
+    arrange: given a cassette with a line of another version and a line cut short
+    act: when the cassette is read
+    assert: then no interactions are returned.
+    """
+    path = tmp_path / "cassette.jsonl"
+    path.write_text('{"version": 2}\n{"version": 1, "url"', encoding="utf-8")
+
+    assert not cassette.read(path)
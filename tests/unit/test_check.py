@@ -5,10 +5,12 @@
 
 import logging
 from typing import NamedTuple, cast
+from unittest import mock
 
 import pytest
+import requests
 
-from gatekeeper import check, types_
+from gatekeeper import check, deadline, types_
 
 from .. import factories
 from .helpers import assert_substrings_in_string
@@ -519,3 +521,23 @@ def test_external_refs(
             ),
             caplog.text,
         )
+
+
+def test_external_refs_timeout(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a run with 5 seconds left and an external reference that does not respond
+    act: when external_refs is called with the list item
+    assert: then the request times out after the time left and a problem is yielded.
+    """
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.timeout.return_value = 5
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+    mocked_head = mock.MagicMock(side_effect=requests.ReadTimeout("read timed out"))
+    monkeypatch.setattr(requests, "head", mocked_head)
+    list_item = factories.IndexContentsListItemFactory(reference_value="https://canonical.com")
+
+    returned_problems = tuple(check.external_refs(index_contents=(list_item,)))
+
+    assert mocked_head.call_args.kwargs["timeout"] == 5
+    assert len(returned_problems) == 1
+    assert_substrings_in_string(("timed out", "exception"), returned_problems[0].description)
@@ -3,9 +3,13 @@
 
 """Unit tests for content."""
 
+import hashlib
+import time
+from unittest import mock
+
 import pytest
 
-from gatekeeper import content, exceptions
+from gatekeeper import content, deadline, exceptions
 
 from .helpers import assert_substrings_in_string
 
@@ -105,6 +109,25 @@ def test_merge_conflict():
     )
 
 
+def test_merge_deadline(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given content for base, theirs and ours and a run whose time is up once the merge
+        fails
+    act: when merge is called with the content
+    assert: then the merge is killed after the time left and DeadlineExceededError is raised
+        rather than ContentError.
+    """
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.kill_after.return_value = 30
+    run_deadline.check.side_effect = exceptions.DeadlineExceededError("time is up")
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+
+    with pytest.raises(exceptions.DeadlineExceededError):
+        content.merge(base="a", theirs="b", ours="c")
+
+    run_deadline.kill_after.assert_called_once_with(operation="the merge")
+
+
 def _test_diff_parameters():
     """Generate parameters for the test_diff test.
 
@@ -112,10 +135,54 @@ def _test_diff_parameters():
         The tests.
     """
     return [
-        pytest.param("a", "a", "  a", id="single line same"),
-        pytest.param("a", "x", "- a+ x", id="single line different"),
-        pytest.param("a\nb", "a\nb", "  a\n  b", id="multiple line same"),
-        pytest.param("a\nb", "x\ny", "- a\n- b+ x\n+ y", id="multiple line different"),
+        pytest.param("a\n", "a\n", "", id="single line same"),
+        pytest.param("a\n", "x\n", "@@ -1 +1 @@\n-a\n+x\n", id="single line different"),
+        pytest.param("a\nb\n", "a\nb\n", "", id="multiple line same"),
+        pytest.param(
+            "a\nb\n", "x\ny\n", "@@ -1,2 +1,2 @@\n-a\n-b\n+x\n+y\n", id="multiple line different"
+        ),
+        pytest.param("", "a\nb\n", "@@ -0,0 +1,2 @@\n+a\n+b\n", id="first empty"),
+        pytest.param("a\nb\n", "", "@@ -1,2 +0,0 @@\n-a\n-b\n", id="second empty"),
+        pytest.param(
+            "a\nb\nc\n",
+            "a\nx\nc\n",
+            "@@ -1,3 +1,3 @@\n a\n-b\n+x\n c\n",
+            id="middle line different",
+        ),
+        pytest.param(
+            "a\nb\nc\n", "a\nc\n", "@@ -1,3 +1,2 @@\n a\n-b\n c\n", id="middle line removed"
+        ),
+        pytest.param(
+            "a\nb\nc\n",
+            "a\nb\nx\nc\n",
+            "@@ -1,3 +1,4 @@\n a\n b\n+x\n c\n",
+            id="middle line added",
+        ),
+        pytest.param(
+            "a\nb\nc\nd\n",
+            "b\nx\nc\ny\n",
+            "@@ -1,4 +1,4 @@\n-a\n b\n+x\n c\n-d\n+y\n",
+            id="multiple changes",
+        ),
+        pytest.param(
+            "a\nb",
+            "a\nb\n",
+            f"@@ -1,2 +1,2 @@\n a\n-b\n{content.DIFF_NO_NEWLINE_NOTE}\n+b\n",
+            id="newline added at end",
+        ),
+        pytest.param(
+            "a\nb",
+            "a\nc",
+            f"@@ -1,2 +1,2 @@\n a\n-b\n{content.DIFF_NO_NEWLINE_NOTE}\n"
+            f"+c\n{content.DIFF_NO_NEWLINE_NOTE}\n",
+            id="last line different without newline",
+        ),
+        pytest.param(
+            "a\r\nb\r\n",
+            "a\nb\r\n",
+            "@@ -1,2 +1,2 @@\n-a\\r\n+a\n b\\r\n",
+            id="line ending changed",
+        ),
     ]
 
 
@@ -132,3 +199,93 @@ def test_diff(first: str, second: str, expected_diff: str):
     returned_diff = content.diff(first=first, second=second)
 
     assert returned_diff == expected_diff
+
+
+def test_diff_context():
+    """
+    arrange: given two strings with changes far apart
+    act: when diff is called with the strings and a context
+    assert: then each change is in its own hunk with the context lines around it.
+    """
+    first = "\n".join(f"line {index}" for index in range(20))
+    second = first.replace("line 2\n", "line 2a\n").replace("line 15\n", "line 15a\n")
+
+    returned_diff = content.diff(first=first, second=second, context=1)
+
+    assert returned_diff == (
+        "@@ -2,3 +2,3 @@\n line 1\n-line 2\n+line 2a\n line 3\n"
+        "@@ -15,3 +15,3 @@\n line 14\n-line 15\n+line 15a\n line 16\n"
+    )
+
+
+def test_diff_max_lines():
+    """
+    arrange: given two strings with many changes
+    act: when diff is called with the strings and max_lines
+    assert: then the diff is cut off after max_lines with a note of the lines left out.
+    """
+    first = "".join(f"line {index}\n" for index in range(10))
+    second = "".join(f"line {index}a\n" for index in range(10))
+
+    returned_diff = content.diff(first=first, second=second, max_lines=3)
+
+    assert returned_diff == "@@ -1,10 +1,10 @@\n-line 0\n-line 1\n... 18 more lines not shown\n"
+
+
+def test_diff_too_many_edits(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given two strings with more changed lines than the edit limit
+    act: when diff is called with the strings
+    assert: then a summary with the number of lines and the hashes is returned.
+    """
+    monkeypatch.setattr(content, "DIFF_MAX_EDITS", 3)
+    first = "a\nb\nc"
+    second = "x\ny\nz\nw"
+
+    returned_diff = content.diff(first=first, second=second)
+
+    assert_substrings_in_string(
+        (
+            "3 lines",
+            hashlib.sha256(first.encode("utf-8")).hexdigest()[:12],
+            "4 lines",
+            hashlib.sha256(second.encode("utf-8")).hexdigest()[:12],
+            "too many differences",
+        ),
+        returned_diff,
+    )
+
+
+def test_diff_too_large_page(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given two strings with more lines than the page limit
+    act: when diff is called with the strings
+    assert: then a summary is returned.
+    """
+    monkeypatch.setattr(content, "DIFF_MAX_PAGE_LINES", 2)
+
+    returned_diff = content.diff(first="a\nb\nc", second="a\nb\nx")
+
+    assert_substrings_in_string(("3 lines", "too many differences"), returned_diff)
+
+
+def test_diff_large_page():
+    """
+    arrange: given a page with 5,000 lines and the page with 200 lines changed
+    act: when diff is called with the pages
+    assert: then the changes are shown, capped at the maximum number of lines, in well under a
+        second.
+    """
+    first_lines = [f"line {index}" for index in range(5000)]
+    second_lines = [
+        f"{line} changed" if index % 25 == 0 else line for index, line in enumerate(first_lines)
+    ]
+
+    start = time.perf_counter()
+    returned_diff = content.diff(first="\n".join(first_lines), second="\n".join(second_lines))
+    duration = time.perf_counter() - start
+
+    assert duration < 0.5
+    assert returned_diff.startswith("@@ -1,4 +1,4 @@\n-line 0\n+line 0 changed\n line 1\n")
+    assert len(returned_diff.splitlines()) == content.DIFF_MAX_LINES + 1
+    assert returned_diff.splitlines()[-1].endswith("more lines not shown")
@@ -0,0 +1,146 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for deadline."""
+
+from unittest import mock
+
+import pytest
+
+from gatekeeper import deadline
+from gatekeeper.exceptions import DeadlineExceededError
+
+
+@pytest.fixture(name="monotonic")
+def fixture_monotonic(monkeypatch: pytest.MonkeyPatch) -> mock.MagicMock:
+    """Control the clock of the deadline, starting at 100 seconds."""
+    mocked_monotonic = mock.MagicMock(return_value=100.0)
+    monkeypatch.setattr(deadline.time, "monotonic", mocked_monotonic)
+    return mocked_monotonic
+
+
+def test_unlimited(monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline without a budget
+    act: when a lot of time has passed
+    assert: then there is no time left to report, operations can start and the timeouts are not
+        shortened.
+    """
+    run_deadline = deadline.Deadline()
+    monotonic.return_value = 1_000_000.0
+
+    assert run_deadline.remaining() is None
+    run_deadline.check("operation 1")
+    assert run_deadline.timeout(limit=60, operation="operation 1") == 60
+    assert run_deadline.kill_after("operation 1") is None
+
+
+@pytest.mark.parametrize(
+    "elapsed, limit, expected_timeout",
+    [
+        pytest.param(0, 60, 60, id="limit smaller than remaining"),
+        pytest.param(250, 60, 50, id="remaining smaller than limit"),
+        pytest.param(299.5, 60, 0.5, id="almost used up"),
+    ],
+)
+def test_timeout(elapsed: float, limit: float, expected_timeout: float, monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline with a budget of 300 seconds
+    act: when timeout is called after some of the budget is used
+    assert: then the smaller of the limit and the time left is returned.
+    """
+    run_deadline = deadline.Deadline(budget=300)
+    monotonic.return_value = 100.0 + elapsed
+
+    returned_timeout = run_deadline.timeout(limit=limit, operation="operation 1")
+
+    assert returned_timeout == pytest.approx(expected_timeout)
+
+
+@pytest.mark.parametrize(
+    "elapsed",
+    [pytest.param(300, id="at deadline"), pytest.param(400, id="past deadline")],
+)
+def test_used_up(elapsed: float, monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline with a budget of 300 seconds
+    act: when check and timeout are called once the budget is used up
+    assert: then DeadlineExceededError is raised naming the operation, also for a subprocess.
+    """
+    run_deadline = deadline.Deadline(budget=300)
+    monotonic.return_value = 100.0 + elapsed
+
+    assert run_deadline.remaining() == 0
+    with pytest.raises(DeadlineExceededError) as exc_info:
+        run_deadline.check("operation 1")
+    assert "300 seconds" in str(exc_info.value)
+    assert "operation 1" in str(exc_info.value)
+    with pytest.raises(DeadlineExceededError):
+        run_deadline.timeout(limit=60, operation="operation 2")
+    with pytest.raises(DeadlineExceededError):
+        run_deadline.kill_after("operation 3")
+
+
+def test_kill_after(monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline with a budget of 300 seconds
+    act: when kill_after is called after some of the budget is used
+    assert: then the time left is returned.
+    """
+    run_deadline = deadline.Deadline(budget=300)
+    monotonic.return_value = 350.0
+
+    assert run_deadline.kill_after("operation 1") == pytest.approx(50)
+
+
+def test_configure(monkeypatch: pytest.MonkeyPatch, monotonic: mock.MagicMock):
+    """
+    arrange: given the deadline of the process
+    act: when a budget is configured and the functions of the module are called
+    assert: then the deadline of the process is used.
+    """
+    monkeypatch.setattr(deadline, "_DEADLINE", deadline.Deadline())
+
+    deadline.configure(budget=300)
+    monotonic.return_value = 350.0
+
+    assert deadline.get_deadline().budget == 300
+    assert deadline.timeout(limit=60, operation="operation 1") == 50
+    assert deadline.kill_after("operation 1") == 50
+    monotonic.return_value = 400.0
+    with pytest.raises(DeadlineExceededError):
+        deadline.check("operation 1")
+
+
+def test_check_duration(monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline with a budget of 300 seconds of which 250 are used
+    act: when check is called for operations that take up to 40 and 60 seconds
+    assert: then only the operation that ends before the deadline can start.
+    """
+    run_deadline = deadline.Deadline(budget=300)
+    monotonic.return_value = 350.0
+
+    run_deadline.check("operation 1", duration=40)
+    with pytest.raises(DeadlineExceededError):
+        run_deadline.check("operation 2", duration=60)
+
+
+def test_wait_before_retry(monkeypatch: pytest.MonkeyPatch, monotonic: mock.MagicMock):
+    """
+    arrange: given a deadline with 50 seconds left
+    act: when waiting before retries of requests with a timeout of 30 seconds
+    assert: then the wait is only made if the wait and the retry end before the deadline.
+    """
+    monkeypatch.setattr(deadline, "_DEADLINE", deadline.Deadline(budget=300))
+    monotonic.return_value = 350.0
+    mocked_sleep = mock.MagicMock()
+    monkeypatch.setattr(deadline.time, "sleep", mocked_sleep)
+
+    with deadline.retried_with(timeout=30):
+        deadline.wait_before_retry(10, operation="operation 1")
+        with pytest.raises(DeadlineExceededError):
+            deadline.wait_before_retry(30, operation="operation 2")
+
+    mocked_sleep.assert_called_once_with(10)
+    deadline.wait_before_retry(30, operation="operation 3")
@@ -4,18 +4,31 @@
 """Unit tests for discourse."""
 
 # Need access to protected functions for testing
-# pylint: disable=protected-access
+# pylint: disable=protected-access,too-many-lines
 
+import socket
+import sqlite3
 import textwrap
+import time
+from pathlib import Path
 from unittest import mock
 
 import pydiscourse
+import pydiscourse.client
 import pydiscourse.exceptions
 import pytest
 import requests
 
+from gatekeeper import deadline
+from gatekeeper import discourse as discourse_module
+from gatekeeper import mirror, snapshot, types_
 from gatekeeper.discourse import _URL_PATH_PREFIX, Discourse, create_discourse
-from gatekeeper.exceptions import DiscourseError, InputError
+from gatekeeper.exceptions import (
+    DeadlineExceededError,
+    DiscourseError,
+    DiscourseTopicChangedError,
+    InputError,
+)
 
 from . import helpers
 
@@ -530,6 +543,117 @@ def test_update_topic(
     assert returned_url == topic_url
 
 
+@pytest.mark.parametrize(
+    "post, expected_error",
+    [
+        pytest.param({"id": 11, "version": 3, "user_deleted": False}, None, id="post"),
+        pytest.param({"id": 11, "version": 3, "user_deleted": True}, "deleted", id="deleted"),
+        pytest.param(None, "retrieving the post", id="error"),
+    ],
+)
+def test_retrieve_post_revision(
+    monkeypatch: pytest.MonkeyPatch,
+    post: dict | None,
+    expected_error: str | None,
+    discourse: Discourse,
+    topic_url: str,
+):
+    """
+    arrange: given a mocked discourse client that returns a post, a deleted post or an error
+    act: when retrieve_post_revision is called
+    assert: then the revision of the post is returned without retrieving the topic or
+        DiscourseError is raised.
+    """
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.post_by_id.return_value = post
+    if post is None:
+        mocked_client.post_by_id.side_effect = pydiscourse.exceptions.DiscourseError
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+
+    if expected_error is not None:
+        with pytest.raises(DiscourseError) as exc_info:
+            discourse.retrieve_post_revision(post_id=11, url=topic_url)
+        assert expected_error in str(exc_info.value)
+        return
+    returned_revision = discourse.retrieve_post_revision(post_id=11, url=topic_url)
+
+    assert returned_revision == types_.TopicRevision(post_id=11, version=3)
+    mocked_client.post_by_id.assert_called_once_with(post_id=11)
+    mocked_client.topic.assert_not_called()
+
+
+def test_update_topic_expected_revision(
+    monkeypatch: pytest.MonkeyPatch, discourse: Discourse, topic_url: str
+):
+    """
+    arrange: given a mocked discourse client that returns a topic at a revision
+    act: when update_topic is called with the revision of the topic
+    assert: then the first post of the revision is updated without retrieving the topic and the
+        link to the topic is returned without a request.
+    """
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.post_by_id.return_value = {
+        "id": 11,
+        "version": 3,
+        "topic_id": 1,
+        "topic_slug": "slug",
+        "user_deleted": False,
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+
+    returned_url = discourse.update_topic(
+        url=topic_url,
+        content="content 1",
+        expected_revision=types_.TopicRevision(post_id=11, version=3),
+    )
+
+    mocked_client.topic.assert_not_called()
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    discourse._get_requests_session.return_value.head.assert_not_called()  # type: ignore
+    mocked_client.post_by_id.assert_called_once_with(post_id=11)
+    mocked_client.update_post.assert_called_once_with(
+        post_id=11, content="content 1", edit_reason="Charm documentation updated"
+    )
+    assert returned_url == topic_url
+
+
+@pytest.mark.parametrize(
+    "expected_revision",
+    [
+        pytest.param(types_.TopicRevision(post_id=11, version=2), id="version changed"),
+        pytest.param(types_.TopicRevision(post_id=12, version=3), id="post changed"),
+    ],
+)
+def test_update_topic_expected_revision_changed(
+    monkeypatch: pytest.MonkeyPatch,
+    expected_revision: types_.TopicRevision,
+    discourse: Discourse,
+    topic_url: str,
+):
+    """
+    arrange: given a mocked discourse client that returns a topic at a revision
+    act: when update_topic is called with a different revision
+    assert: then DiscourseTopicChangedError is raised and the first post is not updated.
+    """
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.post_by_id.return_value = {
+        "id": 11,
+        "version": 3,
+        "topic_id": 1,
+        "topic_slug": "slug",
+        "user_deleted": False,
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+
+    with pytest.raises(DiscourseTopicChangedError) as exc_info:
+        discourse.update_topic(
+            url=topic_url, content="content 1", expected_revision=expected_revision
+        )
+
+    assert topic_url in str(exc_info.value)
+    mocked_client.update_post.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "client_function, function_, kwargs, expected_error_msg_contents",
     [
@@ -595,22 +719,19 @@ def test_function_discourse_error(
     [
         pytest.param("test content", "test content", id="version 2.6.0 response"),
         pytest.param(
-            textwrap.dedent(
-                """\
+            textwrap.dedent("""\
         test-username | timestamp | # 23
 
         test content
 
         -------------------------
 
-        """
-            ),
+        """),
             "test content",
             id="version 2.8.14 response",
         ),
         pytest.param(
-            textwrap.dedent(
-                """\
+            textwrap.dedent("""\
         test-username | timestamp | # 23
 
         test content
@@ -623,8 +744,7 @@ def test_function_discourse_error(
 
         -------------------------
 
-        """
-            ),
+        """),
             "test content",
             id="version 2.8.14 response with post replies",
         ),
@@ -753,6 +873,473 @@ def test_retrieve_topic(
     assert returned_content == content
 
 
+def test_retrieve_topic_snapshot(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    host: str,
+    topic_url: str,
+):
+    """
+    arrange: given a snapshot and mocked discourse client and requests that return three topics
+    act: when the topics are retrieved, one of them is updated and one of them is deleted and the
+        topics are retrieved again once the snapshot is frozen
+    assert: then only the topic that was not changed is read from the snapshot, without
+        requesting it.
+    """
+    discourse = discourse_mocked_get_requests_session
+    discourse.snapshot = snapshot.ServerSnapshot()
+    monkeypatch.setattr(
+        discourse, "check_topic_read_permission", mock.MagicMock(return_value=True)
+    )
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.topic.return_value = {
+        "post_stream": {"posts": [{"post_number": 1, "user_deleted": False, "id": 1}]}
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_session = discourse._get_requests_session.return_value  # type: ignore
+    mocked_session.head.side_effect = lambda url, **_kwargs: mock.MagicMock(url=url)
+    mocked_get = mocked_session.get
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 1"
+    ).encode(encoding="utf-8")
+    urls = (topic_url, f"{host}/t/slug-2/2", f"{host}/t/slug-3/3")
+    for url in urls:
+        discourse.retrieve_topic(url=url)
+    discourse.update_topic(url=urls[1], content="content 2")
+    discourse.delete_topic(url=urls[2])
+    mocked_get.reset_mock()
+    mocked_session.head.reset_mock()
+
+    discourse.snapshot.freeze()
+
+    assert discourse.retrieve_topic(url=urls[0]) == "content 1"
+    mocked_get.assert_not_called()
+    mocked_session.head.assert_not_called()
+    discourse.retrieve_topic(url=urls[1])
+    discourse.retrieve_topic(url=urls[2])
+    assert mocked_get.call_count == 2
+
+
+def test_retrieve_topic_and_revision(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+):
+    """
+    arrange: given mocked discourse client and requests that return a topic at a revision
+    act: when retrieve_topic_and_revision is called
+    assert: then the content and the revision of the first post are returned.
+    """
+    discourse = discourse_mocked_get_requests_session
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.topic.return_value = {
+        "post_stream": {
+            "posts": [{"post_number": 1, "user_deleted": False, "id": 11, "version": 3}]
+        }
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    content = "content 1"
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_get = discourse._get_requests_session.return_value.get  # type: ignore
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(content=content).encode(
+        encoding="utf-8"
+    )
+
+    returned_content, returned_revision = discourse.retrieve_topic_and_revision(url=topic_url)
+
+    assert returned_content == content
+    assert returned_revision == types_.TopicRevision(post_id=11, version=3)
+    mocked_client.topic.assert_called_once()
+
+
+def test_retrieve_topic_and_revision_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+):
+    """
+    arrange: given a run with 30 seconds left and mocked discourse client and requests
+    act: when retrieve_topic_and_revision is called and then called again once the time is up
+    assert: then the timeouts of the requests are the time left and no request is made once the
+        time is up.
+    """
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.timeout.return_value = 30
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+    discourse = discourse_mocked_get_requests_session
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.topic.return_value = {
+        "post_stream": {
+            "posts": [{"post_number": 1, "user_deleted": False, "id": 11, "version": 3}]
+        }
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_session = discourse._get_requests_session.return_value  # type: ignore
+    mocked_session.head.side_effect = lambda url, **_kwargs: mock.MagicMock(url=url)
+    mocked_get = mocked_session.get
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 1"
+    ).encode(encoding="utf-8")
+
+    discourse.retrieve_topic_and_revision(url=topic_url)
+
+    assert mocked_client.timeout == 30
+    assert mocked_get.call_args.kwargs["timeout"] == 30
+    assert {call.kwargs["limit"] for call in run_deadline.timeout.call_args_list} == {10 * 60, 60}
+
+    run_deadline.timeout.side_effect = DeadlineExceededError("used up")
+    mocked_client.topic.reset_mock()
+
+    with pytest.raises(DeadlineExceededError):
+        discourse.retrieve_topic_and_revision(url=topic_url)
+    mocked_client.topic.assert_not_called()
+
+
+def test_raw_requests_no_api_client(discourse_mocked_get_requests_session: Discourse):
+    """
+    arrange: given a discourse client and mocked requests
+    act: when a topic URL is checked
+    assert: then the API client is not created.
+    """
+    discourse = discourse_mocked_get_requests_session
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_session = discourse._get_requests_session.return_value  # type: ignore
+    mocked_session.head.side_effect = lambda url, **_kwargs: mock.MagicMock(url=url)
+
+    discourse.topic_url_valid(url=f"{discourse.host}/t/slug/1")
+
+    assert "_client" not in vars(discourse)
+
+
+def test_retries_deadline(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a server that accepts connections without ever responding, requests that time
+        out after 1 second and a run with 3 seconds left
+    act: when a topic URL is checked
+    assert: then the request is retried while the retry fits in the time left and
+        DeadlineExceededError is raised before the time is up.
+    """
+    monkeypatch.setattr(discourse_module, "_RAW_TIMEOUT", 1)
+    monkeypatch.setattr(deadline, "_DEADLINE", deadline.Deadline(budget=3))
+
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        host = f"http://127.0.0.1:{server.getsockname()[1]}"
+        discourse = Discourse(host=host, api_username="", api_key="", category_id=0)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            discourse.topic_url_valid(url=f"{host}/t/slug/1")
+        duration = time.monotonic() - start
+        server.setblocking(False)
+        attempts = 0
+        while True:
+            try:
+                server.accept()[0].close()
+            except BlockingIOError:
+                break
+            attempts += 1
+
+    assert duration < 3
+    assert attempts == 2
+
+
+def test_rate_limited_deadline(monkeypatch: pytest.MonkeyPatch, discourse: Discourse):
+    """
+    arrange: given a server that asks to wait 100 seconds before retrying and a run with 30
+        seconds left
+    act: when a topic is created
+    assert: then DeadlineExceededError is raised without waiting or retrying.
+    """
+    monkeypatch.setattr(deadline, "_DEADLINE", deadline.Deadline(budget=30))
+    response = mock.MagicMock(spec=requests.Response)
+    response.ok = False
+    response.status_code = 429
+    response.reason = "Too Many Requests"
+    response.headers = {"Content-Type": "application/json"}
+    response.json.return_value = {"extras": {"wait_seconds": 100}}
+    mocked_request = mock.MagicMock(return_value=response)
+    monkeypatch.setattr(pydiscourse.client.requests, "request", mocked_request)
+    mocked_sleep = mock.MagicMock()
+    monkeypatch.setattr(deadline.time, "sleep", mocked_sleep)
+
+    with pytest.raises(DeadlineExceededError):
+        discourse.create_topic(title="title 1", content="content 1")
+
+    mocked_request.assert_called_once()
+    mocked_sleep.assert_not_called()
+
+
+def _mirror_first_post(version: int) -> dict:
+    """Create the first post of a topic including the fields stored in the mirror.
+
+    Args:
+        version: The version of the post.
+
+    Returns:
+        The first post.
+    """
+    return {
+        "post_number": 1,
+        "user_deleted": False,
+        "id": 11,
+        "version": version,
+        "topic_id": 1,
+        "topic_slug": "slug",
+        "updated_at": f"2025-01-0{version}T00:00:00.000Z",
+        "can_edit": True,
+    }
+
+
+def test_retrieve_topic_and_revision_mirror(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+    tmp_path: Path,
+):
+    """
+    arrange: given a mirror and mocked discourse client and requests that return a topic
+    act: when the topic is retrieved, retrieved again, retrieved after it was edited on the server
+        and retrieved after it was updated by the client
+    assert: then the content is only downloaded if the first post is not at the revision of the
+        content in the mirror.
+    """
+    discourse = discourse_mocked_get_requests_session
+    discourse.mirror = mirror.Mirror(path=tmp_path / "mirror", host="host", category_id=0)
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.category_topics.return_value = {"topic_list": {"topics": []}}
+    mocked_client.topic.return_value = {"post_stream": {"posts": [_mirror_first_post(1)]}}
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_session = discourse._get_requests_session.return_value  # type: ignore
+    mocked_session.head.side_effect = lambda url, **_kwargs: mock.MagicMock(url=url)
+    mocked_get = mocked_session.get
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 1"
+    ).encode(encoding="utf-8")
+
+    assert discourse.retrieve_topic_and_revision(url=topic_url)[0] == "content 1"
+    assert discourse.retrieve_topic(url=topic_url) == "content 1"
+    assert mocked_get.call_count == 1
+    mocked_client.category_topics.assert_called_once()
+
+    mocked_client.topic.return_value = {"post_stream": {"posts": [_mirror_first_post(2)]}}
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 2"
+    ).encode(encoding="utf-8")
+
+    assert discourse.retrieve_topic(url=topic_url) == "content 2"
+    assert mocked_get.call_count == 2
+
+    discourse.update_topic(url=topic_url, content="content 3")
+
+    assert discourse.mirror.get(1) is None
+
+
+def test_retrieve_topic_mirror_refresh(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+    tmp_path: Path,
+):
+    """
+    arrange: given a mirror with the topic that was listed before and a category listing with the
+        topic bumped since, a pinned topic and topics bumped before the last listing
+    act: when the topic is retrieved
+    assert: then the listing is read until the topics bumped before the last listing and the topic
+        is downloaded again.
+    """
+    discourse = discourse_mocked_get_requests_session
+    discourse.mirror = mirror.Mirror(path=tmp_path / "mirror", host="host", category_id=0)
+    first_post = _mirror_first_post(1)
+    discourse.mirror.put(
+        mirror.MirroredTopic(
+            topic_id=1,
+            slug="slug",
+            post_id=11,
+            version=1,
+            updated_at=first_post["updated_at"],
+            bumped_at=None,
+            can_edit=True,
+            content="content 1",
+        )
+    )
+    discourse.mirror.refresh(
+        (mirror.ListedTopic(topic_id=1, slug="slug", bumped_at="2025-01-01T00:00:00.000Z"),)
+    )
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.category_topics.side_effect = [
+        {
+            "topic_list": {
+                "topics": [
+                    {
+                        "id": 2,
+                        "slug": "pinned",
+                        "bumped_at": "2024-01-01T00:00:00Z",
+                        "pinned": True,
+                    },
+                    {"id": 1, "slug": "slug", "bumped_at": "2025-02-01T00:00:00.000Z"},
+                ]
+            }
+        },
+        {
+            "topic_list": {
+                "topics": [
+                    {"id": 3, "slug": "slug-3", "bumped_at": "2025-01-01T00:00:00.000Z"},
+                ]
+            }
+        },
+    ]
+    mocked_client.topic.return_value = {"post_stream": {"posts": [first_post]}}
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_get = discourse._get_requests_session.return_value.get  # type: ignore
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 2"
+    ).encode(encoding="utf-8")
+
+    assert discourse.retrieve_topic(url=topic_url) == "content 2"
+    assert mocked_client.category_topics.call_count == 2
+    assert discourse.mirror.listed_until() == "2025-02-01T00:00:00.000Z"
+
+
+def test_retrieve_topic_mirror_error(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+):
+    """
+    arrange: given a mirror that fails to read and mocked discourse client and requests
+    act: when the topic is retrieved
+    assert: then the content is downloaded and the mirror is no longer used.
+    """
+    discourse = discourse_mocked_get_requests_session
+    mocked_mirror = mock.MagicMock(spec=mirror.Mirror)
+    mocked_mirror.refresh.side_effect = sqlite3.OperationalError("disk I/O error")
+    discourse.mirror = mocked_mirror
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.topic.return_value = {"post_stream": {"posts": [_mirror_first_post(1)]}}
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    # mypy complains that _get_requests_session has no attribute ..., it is actually mocked
+    mocked_session = discourse._get_requests_session.return_value  # type: ignore
+    mocked_session.head.side_effect = lambda url, **_kwargs: mock.MagicMock(url=url)
+    mocked_get = mocked_session.get
+    mocked_get.return_value.content = helpers.mock_discourse_raw_topic_api(
+        content="content 1"
+    ).encode(encoding="utf-8")
+
+    assert discourse.retrieve_topic(url=topic_url) == "content 1"
+    assert discourse.mirror is None
+
+
+@pytest.mark.parametrize(
+    "topic_fields, expected_unchanged",
+    [
+        pytest.param({"highest_post_number": 1, "category_id": 0}, True, id="no replies"),
+        pytest.param({"highest_post_number": 2, "category_id": 0}, False, id="replies"),
+        pytest.param({"highest_post_number": 1, "category_id": 1}, False, id="other category"),
+    ],
+)
+def test_retrieve_topic_and_revision_sync(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse_mocked_get_requests_session: Discourse,
+    topic_url: str,
+    topic_fields: dict,
+    expected_unchanged: bool,
+):
+    """
+    arrange: given mocked discourse client and requests that return a topic
+    act: when the topic is retrieved, its content is recorded to match a file and the state of
+        the sync is taken
+    assert: then the topic is only in the state if it has no replies and is in the category.
+    """
+    discourse = discourse_mocked_get_requests_session
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.topic.return_value = {
+        **topic_fields,
+        "post_stream": {"posts": [_mirror_first_post(1)]},
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+    discourse.sync.start("2025-01-01T00:00:00.000Z")
+
+    discourse.retrieve_topic_and_revision(url=topic_url)
+    discourse.sync.record_match(url=topic_url, path=Path("/repo/docs/file.md"))
+
+    state = discourse.sync.state(base_path=Path("/repo"))
+    assert state is not None
+    assert state.topics == ({1: "docs/file.md"} if expected_unchanged else {})
+
+
+def test_latest_bump(monkeypatch: pytest.MonkeyPatch, discourse: Discourse):
+    """
+    arrange: given a category listing with a pinned topic before the most recently bumped topic
+    act: when latest_bump is called
+    assert: then the most recent bump of the first page is returned.
+    """
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.category_topics.return_value = {
+        "topic_list": {
+            "topics": [
+                {"id": 2, "slug": "pinned", "bumped_at": "2024-01-01T00:00:00Z", "pinned": True},
+                {"id": 1, "slug": "slug", "bumped_at": "2025-02-01T00:00:00.000Z"},
+            ]
+        }
+    }
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+
+    assert discourse.latest_bump() == "2025-02-01T00:00:00.000Z"
+    mocked_client.category_topics.assert_called_once_with(category_id=0, page=0)
+
+
+@pytest.mark.parametrize(
+    "pages, expected_bumped",
+    [
+        pytest.param(
+            [
+                [{"id": 1, "slug": "slug", "bumped_at": "2025-02-01T00:00:00.000Z"}],
+                [
+                    {"id": 2, "slug": "slug-2", "bumped_at": "2025-01-02T00:00:00.000Z"},
+                    {"id": 3, "slug": "slug-3", "bumped_at": "2025-01-01T00:00:00.000Z"},
+                ],
+            ],
+            frozenset((1, 2)),
+            id="listed until since",
+        ),
+        pytest.param(
+            [[{"id": 1, "slug": "slug", "bumped_at": "2025-02-01T00:00:00.000Z"}], []],
+            frozenset((1,)),
+            id="end of category",
+        ),
+        pytest.param(
+            [[{"id": 1, "slug": "slug", "bumped_at": "2025-02-01T00:00:00.000Z"}]] * 10,
+            None,
+            id="too many bumped",
+        ),
+    ],
+)
+def test_bumped_topics(
+    monkeypatch: pytest.MonkeyPatch,
+    discourse: Discourse,
+    pages: list[list[dict]],
+    expected_bumped: frozenset[int] | None,
+):
+    """
+    arrange: given a category listing
+    act: when bumped_topics is called
+    assert: then the topics bumped after the time are returned, None if not all of them were
+        listed.
+    """
+    mocked_client = mock.MagicMock(spec=pydiscourse.DiscourseClient)
+    mocked_client.category_topics.side_effect = [
+        {"topic_list": {"topics": topics}} for topics in pages
+    ]
+    monkeypatch.setattr(discourse, "_client", mocked_client)
+
+    returned_bumped = discourse.bumped_topics(since="2025-01-01T00:00:00.000Z")
+
+    assert returned_bumped == expected_bumped
+
+
 def test_absolute_url(topic_url: str, host: str, discourse: Discourse):
     """
     arrange: given a mocked discourse client
@@ -878,3 +1465,43 @@ def test_create_discourse(kwargs: dict):
 
     assert isinstance(discourse, Discourse)
     assert discourse.host == f"https://{kwargs['hostname']}"
+
+
+def test_throttle(discourse_mocked_get_requests_session: Discourse, topic_url: str):
+    """
+    arrange: given a discourse client with a throttle
+    act: when a request is made to the server
+    assert: then the throttle is called before the request.
+    """
+    discourse = discourse_mocked_get_requests_session
+    discourse.throttle = mock.MagicMock()
+
+    discourse.topic_url_valid(url=topic_url)
+
+    discourse.throttle.assert_called_once_with()
+
+
+def test_for_thread(discourse: Discourse):
+    """
+    arrange: given a discourse client with a throttle, mirror and snapshot
+    act: when for_thread is called
+    assert: then a client for the same server is returned that shares the connection pool, the
+        throttle, the mirror, the snapshot and the sync tracker but not the API client or the
+        session.
+    """
+    discourse.throttle = mock.MagicMock()
+    discourse.mirror = mock.MagicMock(spec=mirror.Mirror)
+    discourse.snapshot = snapshot.ServerSnapshot()
+
+    thread_discourse = discourse.for_thread()
+
+    assert thread_discourse is not discourse
+    assert thread_discourse.host == discourse.host
+    assert thread_discourse._category_id == discourse._category_id
+    assert thread_discourse.throttle is discourse.throttle
+    assert thread_discourse.mirror is discourse.mirror
+    assert thread_discourse.snapshot is discourse.snapshot
+    assert thread_discourse.sync is discourse.sync
+    assert thread_discourse._get_requests_adapter() is discourse._get_requests_adapter()
+    assert thread_discourse._get_requests_session() is not discourse._get_requests_session()
+    assert thread_discourse._client is not discourse._client
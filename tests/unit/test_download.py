@@ -56,3 +56,49 @@ def test_recreate_docs(
         "  1. [file-navlink](page-path-1/page-file-1.md)"
     )
     assert path_file.read_text(encoding="utf-8") == navlink_page
+
+
+@pytest.mark.usefixtures("patch_create_repository_client")
+def test_recreate_docs_incremental(mocked_clients):
+    """
+    arrange: given a documentation tag with an index, an unchanged page, a changed page and a
+        page in a directory that are no longer on the server, and mocked discourse
+    act: when recreate_docs is called
+    assert: then only the changed page is written, the removed page and its directory are removed
+        and the changes are reported.
+    """
+    repository_path = mocked_clients.repository.base_path
+    docs_path = repository_path / constants.DOCUMENTATION_FOLDER_NAME
+    create_metadata_yaml(
+        content=f"{METADATA_NAME_KEY}: name 1\n{METADATA_DOCS_KEY}: docsUrl",
+        path=repository_path,
+    )
+    index_content = "Content header.\n"
+    index_page = (
+        f"{index_content}{constants.NAVIGATION_TABLE_START}\n"
+        "| 1 | page-1 | [page 1](/page-1) |\n"
+        "| 1 | page-2 | [page 2](/page-2) |"
+    )
+    docs_path.mkdir()
+    (docs_path / "index.md").write_text(
+        f"{index_content}\n# Contents\n\n1. [page 1](page-1.md)\n1. [page 2](page-2.md)",
+        encoding="utf-8",
+    )
+    (unchanged_file := docs_path / "page-1.md").write_text("page 1", encoding="utf-8")
+    (changed_file := docs_path / "page-2.md").write_text("page 2", encoding="utf-8")
+    (removed_file := docs_path / "removed" / "page-3.md").parent.mkdir()
+    removed_file.write_text("page 3", encoding="utf-8")
+    mocked_clients.repository.update_branch("docs", directory=None)
+    mocked_clients.repository.tag_commit(
+        DOCUMENTATION_TAG, mocked_clients.repository.current_commit
+    )
+    unchanged_mtime = unchanged_file.stat().st_mtime_ns
+    mocked_clients.discourse.retrieve_topic.side_effect = [index_page, "page 1", "page 2 changed"]
+
+    returned_changes = recreate_docs(mocked_clients, DOCUMENTATION_TAG)
+
+    assert returned_changes
+    assert unchanged_file.stat().st_mtime_ns == unchanged_mtime
+    assert changed_file.read_text(encoding="utf-8") == "page 2 changed"
+    assert not removed_file.parent.exists()
+    assert (docs_path / "index.md").is_file()
@@ -0,0 +1,582 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for fleet."""
+
+# Need access to protected functions for testing
+# pylint: disable=protected-access
+
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from git.repo import Repo
+
+from gatekeeper import batch, fleet, metrics, shard, types_
+from gatekeeper.clients import Clients
+from gatekeeper.exceptions import InputError, TaggingNotAllowedError
+
+CREDENTIALS = fleet.Credentials(
+    discourse_api_username="user 1", discourse_api_key="key 1", github_token="token 1"
+)
+
+
+def _entry(**kwargs) -> fleet.RepositoryEntry:
+    """Create a repository of the manifest.
+
+    Args:
+        kwargs: The values to change from the defaults.
+
+    Returns:
+        The repository.
+    """
+    return fleet.RepositoryEntry(
+        url="https://github.com/canonical/repo-1",
+        base_branch="main",
+        charm_dir="",
+        charm_dirs=(),
+        discourse_host="discourse.example.com",
+        discourse_category_id="41",
+        dry_run=False,
+        delete_topics=True,
+    )._replace(**kwargs)
+
+
+def test_load_manifest(tmp_path: Path):
+    """
+    arrange: given a manifest with top level defaults and 2 repositories overriding some of them
+    act: when load_manifest is called
+    assert: then the repositories are returned with the defaults applied.
+    """
+    manifest_path = tmp_path / "manifest.yaml"
+    manifest_path.write_text(
+        """
+discourse_host: discourse.example.com
+discourse_category_id: 41
+dry_run: true
+repositories:
+  - url: https://github.com/canonical/repo-1
+  - url: https://github.com/canonical/repo-2
+    base_branch: develop
+    charm_dirs: [charm-1, charm-2]
+    dry_run: false
+    delete_topics: false
+""",
+        encoding="utf-8",
+    )
+
+    returned_entries = fleet.load_manifest(manifest_path)
+
+    assert returned_entries == (
+        _entry(dry_run=True),
+        _entry(
+            url="https://github.com/canonical/repo-2",
+            base_branch="develop",
+            charm_dirs=("charm-1", "charm-2"),
+            delete_topics=False,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "content, expected_message",
+    [
+        pytest.param(None, "could not be read", id="missing"),
+        pytest.param("[", "could not be read", id="not yaml"),
+        pytest.param("repositories: 1", "expected a repositories list", id="not list"),
+        pytest.param("repositories: [{}]", "must have a url", id="missing url"),
+        pytest.param(
+            "repositories: [{url: u, charm_dirs: c}]", "charm_dirs must be a list", id="charm_dirs"
+        ),
+        pytest.param(
+            "repositories: [{url: u, base_branch: [b]}]", "must be a string", id="not string"
+        ),
+        pytest.param("repositories: [{url: u, dry_run: 1}]", "must be a boolean", id="not bool"),
+    ],
+)
+def test_load_manifest_invalid(content: str | None, expected_message: str, tmp_path: Path):
+    """
+    arrange: given a manifest with invalid content
+    act: when load_manifest is called
+    assert: then InputError is raised.
+    """
+    manifest_path = tmp_path / "manifest.yaml"
+    if content is not None:
+        manifest_path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(InputError) as exc_info:
+        fleet.load_manifest(manifest_path)
+
+    assert expected_message in str(exc_info.value)
+
+
+def test_get_credentials(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given the credentials in the environment and then without the GitHub token
+    act: when get_credentials is called
+    assert: then the credentials are returned and then InputError is raised.
+    """
+    monkeypatch.setenv(fleet.DISCOURSE_API_USERNAME_ENV_NAME, CREDENTIALS.discourse_api_username)
+    monkeypatch.setenv(fleet.DISCOURSE_API_KEY_ENV_NAME, CREDENTIALS.discourse_api_key)
+    monkeypatch.setenv(fleet.GITHUB_TOKEN_ENV_NAME, CREDENTIALS.github_token)
+
+    assert fleet.get_credentials() == CREDENTIALS
+
+    monkeypatch.delenv(fleet.GITHUB_TOKEN_ENV_NAME)
+    with pytest.raises(InputError):
+        fleet.get_credentials()
+
+
+def test_rate_budget(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a budget of 2 requests per minute
+    act: when acquire is called 3 times
+    assert: then the third call waits until a request is refilled.
+    """
+    now = [100.0]
+    monkeypatch.setattr(fleet.time, "monotonic", lambda: now[0])
+
+    def sleep(seconds: float) -> None:
+        """Advance the clock.
+
+        Args:
+            seconds: The time to advance the clock by.
+        """
+        now[0] += seconds
+
+    mocked_sleep = mock.MagicMock(side_effect=sleep)
+    monkeypatch.setattr(fleet.time, "sleep", mocked_sleep)
+    rate_budget = fleet.RateBudget(requests_per_minute=2)
+
+    rate_budget.acquire()
+    rate_budget.acquire()
+    mocked_sleep.assert_not_called()
+    rate_budget.acquire()
+
+    mocked_sleep.assert_called_once_with(pytest.approx(30))
+
+
+def test_sync_repository(upstream_git_repo: Repo, default_branch: str, tmp_path: Path):
+    """
+    arrange: given a repository synced into the cache that has local changes and a new commit
+        and tag upstream
+    act: when sync_repository is called again
+    assert: then the head of the base branch is checked out without the local changes and the new
+        tag is fetched.
+    """
+    upstream_git_repo.git.checkout(default_branch)
+    entry = _entry(url=upstream_git_repo.working_dir, base_branch=default_branch)
+    cache_dir = tmp_path / "cache"
+    path = fleet.sync_repository(entry=entry, cache_dir=cache_dir, github_token="token 1")
+    (path / "local.txt").write_text("local", encoding="utf-8")
+    (path / ".gitkeep").write_text("changed", encoding="utf-8")
+    (Path(upstream_git_repo.working_dir) / "new.txt").write_text("new", encoding="utf-8")
+    upstream_git_repo.git.add(".")
+    upstream_git_repo.git.commit("-m", "new commit")
+    upstream_git_repo.git.tag("tag-1")
+
+    returned_path = fleet.sync_repository(entry=entry, cache_dir=cache_dir, github_token="token 1")
+
+    assert returned_path == path
+    assert path.parent == cache_dir
+    repo = Repo(path)
+    assert repo.active_branch.name == default_branch
+    assert repo.head.commit.hexsha == upstream_git_repo.head.commit.hexsha
+    assert not repo.is_dirty(untracked_files=True)
+    assert "tag-1" in [tag.name for tag in repo.tags]
+    assert "extraheader" not in (path / ".git" / "config").read_text(encoding="utf-8")
+
+
+def test_configure_github_auth(tmp_path: Path):
+    """
+    arrange: given a repository
+    act: when _configure_github_auth is called for a GitHub URL
+    assert: then the token is configured as a header rather than in the URL.
+    """
+    repo = metrics.MeteredRepo.init(tmp_path)
+
+    fleet._configure_github_auth(
+        repo=repo, url="https://github.com/canonical/repo-1", token="token 1"
+    )
+
+    header = repo.git.config("--get", "http.https://github.com/.extraheader")
+    assert header.startswith("AUTHORIZATION: basic ")
+    assert "token 1" not in header
+
+
+@pytest.mark.parametrize(
+    "url, expected_name",
+    [
+        pytest.param("https://github.com/canonical/repo-1.git", "github.com_canonical_repo-1"),
+        pytest.param("/tmp/upstream", "tmp_upstream", id="path"),
+    ],
+)
+def test_cache_name(url: str, expected_name: str):
+    """
+    arrange: given the URL of a repository
+    act: when _cache_name is called
+    assert: then a name without path separators is returned.
+    """
+    assert fleet._cache_name(url) == expected_name
+
+
+def test_get_discourse(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a worker with a rate budget for the host of a repository
+    act: when _get_discourse is called twice, once for another host and _get_github is called
+        twice
+    assert: then the same clients are returned and only the Discourse client of the host with the
+        budget uses it.
+    """
+    monkeypatch.setattr(fleet, "_RATE_BUDGETS", {})
+    monkeypatch.setattr(fleet, "_DISCOURSE_CLIENTS", {})
+    monkeypatch.setattr(fleet, "_GITHUB_CLIENTS", {})
+    rate_budget = fleet.RateBudget(requests_per_minute=10)
+    fleet._init_worker({"discourse.example.com": rate_budget})
+    entry = _entry(discourse_host="Discourse.example.com")
+
+    discourse = fleet._get_discourse(entry, CREDENTIALS)
+
+    assert fleet._get_discourse(entry, CREDENTIALS) is discourse
+    assert discourse.throttle == rate_budget.acquire  # pylint: disable=comparison-with-callable
+    assert (
+        fleet._get_discourse(_entry(discourse_host="other.example.com"), CREDENTIALS).throttle
+        is None
+    )
+    assert fleet._get_github("token 1") is fleet._get_github("token 1")
+
+
+@pytest.fixture(name="patched_repository")
+def fixture_patched_repository(monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients) -> None:
+    """Patch the sync and the clients of fleet to use the mocked clients."""
+    monkeypatch.setattr(
+        fleet, "sync_repository", lambda entry, cache_dir, github_token: cache_dir / "repo"
+    )
+    monkeypatch.setattr(
+        fleet, "create_repository_client", lambda **_kwargs: mocked_clients.repository
+    )
+    monkeypatch.setattr(
+        fleet, "_get_discourse", lambda entry, credentials: mocked_clients.discourse
+    )
+    monkeypatch.setattr(fleet, "_get_github", lambda token: None)
+
+
+@pytest.mark.usefixtures("patched_repository")
+def test_run_repository(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a repository with a charm
+    act: when _run_repository is called
+    assert: then the outputs of the reconcile and migration are returned.
+    """
+    monkeypatch.setattr(fleet, "pre_flight_checks", mock.MagicMock(return_value=True))
+    monkeypatch.setattr(
+        fleet,
+        "run_reconcile",
+        mock.MagicMock(
+            return_value=types_.ReconcileOutputs(
+                index_url="url 1", topics={}, documentation_tag=None
+            )
+        ),
+    )
+    mocked_run_migrate = mock.MagicMock(return_value=None)
+    monkeypatch.setattr(fleet, "run_migrate", mocked_run_migrate)
+
+    returned_outputs = fleet._run_repository(
+        entry=_entry(dry_run=True), cache_dir=tmp_path, credentials=CREDENTIALS
+    )
+
+    assert returned_outputs == {"index_url": "url 1", "topics": {}}
+    user_inputs = mocked_run_migrate.call_args.kwargs["user_inputs"]
+    assert user_inputs.dry_run
+    assert user_inputs.discourse.api_key == CREDENTIALS.discourse_api_key
+
+
+@pytest.mark.usefixtures("patched_repository")
+def test_run_repository_checks_fail(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given the checks of a repository fail
+    act: when _run_repository is called
+    assert: then TaggingNotAllowedError is raised.
+    """
+    monkeypatch.setattr(fleet, "pre_flight_checks", mock.MagicMock(return_value=False))
+
+    with pytest.raises(TaggingNotAllowedError):
+        fleet._run_repository(entry=_entry(), cache_dir=tmp_path, credentials=CREDENTIALS)
+
+
+@pytest.mark.usefixtures("patched_repository")
+def test_run_repository_sync_tracker(
+    monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients, tmp_path: Path
+):
+    """
+    arrange: given two repositories using the same Discourse client where the first one fails
+    act: when _run_repository is called for each repository
+    assert: then the second repository records its own sync state.
+    """
+    monkeypatch.setattr(fleet, "pre_flight_checks", mock.MagicMock(return_value=True))
+    monkeypatch.setattr(fleet, "run_migrate", mock.MagicMock(return_value=None))
+    trackers = []
+
+    def run_reconcile(clients: Clients, **_kwargs) -> types_.ReconcileOutputs:
+        """Reconcile a repository, the first one fails.
+
+        Args:
+            clients: The clients of the repository.
+            _kwargs: The other arguments of the reconcile.
+
+        Returns:
+            The outputs.
+
+        Raises:
+            InputError: for the first repository.
+        """
+        trackers.append(clients.discourse.sync)
+        clients.discourse.sync.start(f"2025-01-0{len(trackers)}T00:00:00Z")
+        if len(trackers) == 1:
+            clients.discourse.sync.fail()
+            raise InputError("failed")
+        return types_.ReconcileOutputs(index_url="url 1", topics={}, documentation_tag=None)
+
+    monkeypatch.setattr(fleet, "run_reconcile", run_reconcile)
+
+    with pytest.raises(InputError):
+        fleet._run_repository(entry=_entry(), cache_dir=tmp_path, credentials=CREDENTIALS)
+    fleet._run_repository(
+        entry=_entry(url="https://github.com/canonical/repo-2"),
+        cache_dir=tmp_path,
+        credentials=CREDENTIALS,
+    )
+
+    assert mocked_clients.discourse.sync is trackers[1]
+    assert trackers[0] is not trackers[1]
+    state = trackers[1].state(base_path=tmp_path)
+    assert state is not None
+    assert state.synced_at == "2025-01-02T00:00:00Z"
+
+
+@pytest.mark.usefixtures("patched_repository")
+@pytest.mark.parametrize("error", [None, "failed"])
+def test_run_repository_batch(error: str | None, monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a repository with several charms
+    act: when _run_repository is called
+    assert: then the outputs are returned by charm or InputError is raised if a charm failed.
+    """
+    charm_outputs = batch.CharmOutputs(
+        charm_dir="charm-1", reconcile=None, migrate=None, error=error
+    )
+    monkeypatch.setattr(fleet.batch, "run", mock.MagicMock(return_value=(charm_outputs,)))
+    entry = _entry(charm_dirs=("charm-1",))
+
+    if error:
+        with pytest.raises(InputError):
+            fleet._run_repository(entry=entry, cache_dir=tmp_path, credentials=CREDENTIALS)
+        return
+    returned_outputs = fleet._run_repository(
+        entry=entry, cache_dir=tmp_path, credentials=CREDENTIALS
+    )
+
+    assert returned_outputs == {"charms": {"charm-1": {}}}
+
+
+@pytest.mark.parametrize(
+    "fail, expected_error",
+    [
+        pytest.param(False, None, id="success"),
+        pytest.param(True, "InputError: failed", id="error"),
+    ],
+)
+def test_process_repository(
+    fail: bool, expected_error: str | None, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """
+    arrange: given processing a repository succeeds or fails
+    act: when _process_repository is called
+    assert: then the report has the outputs or the error and the metrics of the repository only.
+    """
+    metrics.get_collector().record(metrics.GIT, "earlier", 1)
+
+    def run_repository(**_kwargs):
+        """Process a repository.
+
+        Args:
+            _kwargs: The arguments of the processing.
+
+        Returns:
+            The outputs.
+
+        Raises:
+            InputError: if the processing fails.
+        """
+        metrics.get_collector().record(metrics.GIT, "fetch", 1)
+        if fail:
+            raise InputError("failed")
+        return {"index_url": "url 1"}
+
+    monkeypatch.setattr(fleet, "_run_repository", run_repository)
+
+    returned_report = fleet._process_repository(
+        entry=_entry(), cache_dir=tmp_path, credentials=CREDENTIALS
+    )
+
+    assert returned_report.error == expected_error
+    assert returned_report.outputs == ({} if fail else {"index_url": "url 1"})
+    assert list(returned_report.metrics[metrics.GIT]) == ["fetch"]
+
+
+def test_main(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a manifest with a repository that does not exist and the credentials
+    act: when main is called with a report file
+    assert: then 1 is returned and the failure is in the report.
+    """
+    monkeypatch.setenv(fleet.DISCOURSE_API_USERNAME_ENV_NAME, CREDENTIALS.discourse_api_username)
+    monkeypatch.setenv(fleet.DISCOURSE_API_KEY_ENV_NAME, CREDENTIALS.discourse_api_key)
+    monkeypatch.setenv(fleet.GITHUB_TOKEN_ENV_NAME, CREDENTIALS.github_token)
+    missing_url = str(tmp_path / "missing")
+    (manifest_path := tmp_path / "manifest.yaml").write_text(
+        "discourse_host: discourse.example.com\n" f"repositories: [{{url: {missing_url}}}]\n",
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "report.json"
+
+    returned_code = fleet.main(
+        [
+            str(manifest_path),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--workers",
+            "1",
+            "--report",
+            str(report_path),
+        ]
+    )
+
+    assert returned_code == 1
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["failed"] == [missing_url]
+    assert report["repositories"][0]["error"]
+
+
+def test_main_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given an empty manifest and the credentials
+    act: when main is called without a report file
+    assert: then 0 is returned.
+    """
+    monkeypatch.setenv(fleet.DISCOURSE_API_USERNAME_ENV_NAME, CREDENTIALS.discourse_api_username)
+    monkeypatch.setenv(fleet.DISCOURSE_API_KEY_ENV_NAME, CREDENTIALS.discourse_api_key)
+    monkeypatch.setenv(fleet.GITHUB_TOKEN_ENV_NAME, CREDENTIALS.github_token)
+    (manifest_path := tmp_path / "manifest.yaml").write_text("repositories: []", encoding="utf-8")
+
+    assert fleet.main([str(manifest_path), "--cache-dir", str(tmp_path / "cache")]) == 0
+
+
+def test_write_report(tmp_path: Path):
+    """
+    arrange: given the reports of a successful and a failed repository
+    act: when write_report is called
+    assert: then the reports, the failed repositories and the total time are written.
+    """
+    reports = (
+        fleet.RepositoryReport(url="url 1", seconds=1.5, error=None, outputs={}, metrics={}),
+        fleet.RepositoryReport(url="url 2", seconds=2, error="failed", outputs={}, metrics={}),
+    )
+    report_path = tmp_path / "dir" / "report.json"
+
+    fleet.write_report(reports=reports, path=report_path)
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["failed"] == ["url 2"]
+    assert report["seconds"] == 3.5
+    assert [repository["url"] for repository in report["repositories"]] == ["url 1", "url 2"]
+
+
+def test_run_sharded(tmp_path: Path):
+    """
+    arrange: given repositories that do not exist and a lease directory shared by 2 runners
+    act: when run is called for the first runner and then for the second runner
+    assert: then the first runner processes all the repositories, stealing from the shard of the
+        second runner, and the second runner has nothing left to process.
+    """
+    entries = [_entry(url=str(tmp_path / f"missing-{index}")) for index in range(4)]
+    lease_dir = tmp_path / "leases"
+
+    first_reports = fleet.run(
+        entries=entries,
+        cache_dir=tmp_path / "cache",
+        credentials=CREDENTIALS,
+        workers=2,
+        runner_shard=shard.Shard(
+            shard_index=0,
+            shard_count=2,
+            leases=shard.LeaseDirectory(path=lease_dir, owner="runner 1"),
+        ),
+    )
+    second_reports = fleet.run(
+        entries=entries,
+        cache_dir=tmp_path / "cache",
+        credentials=CREDENTIALS,
+        workers=2,
+        runner_shard=shard.Shard(
+            shard_index=1,
+            shard_count=2,
+            leases=shard.LeaseDirectory(path=lease_dir, owner="runner 2"),
+        ),
+    )
+
+    assert sorted(report.url for report in first_reports) == sorted(entry.url for entry in entries)
+    assert all(report.error for report in first_reports)
+    assert not second_reports
+    assert len(shard.LeaseDirectory(path=lease_dir, owner="runner 3").results()) == 4
+
+
+def test_main_sharded(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a manifest with a repository that does not exist and a lease directory
+    act: when main is called for a shard with a report file and with an invalid shard index
+    assert: then the report has the results of all the runners and the invalid shard index exits.
+    """
+    monkeypatch.setenv(fleet.DISCOURSE_API_USERNAME_ENV_NAME, CREDENTIALS.discourse_api_username)
+    monkeypatch.setenv(fleet.DISCOURSE_API_KEY_ENV_NAME, CREDENTIALS.discourse_api_key)
+    monkeypatch.setenv(fleet.GITHUB_TOKEN_ENV_NAME, CREDENTIALS.github_token)
+    missing_url = str(tmp_path / "missing")
+    (manifest_path := tmp_path / "manifest.yaml").write_text(
+        f"repositories: [{{url: {missing_url}}}]\n", encoding="utf-8"
+    )
+    report_path = tmp_path / "report.json"
+    arguments = [str(manifest_path), "--cache-dir", str(tmp_path / "cache"), "--shard-count", "2"]
+
+    returned_code = fleet.main(
+        [*arguments, "--lease-dir", str(tmp_path / "leases"), "--report", str(report_path)]
+    )
+
+    assert returned_code == 1
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["failed"] == [missing_url]
+    with pytest.raises(SystemExit):
+        fleet.main([*arguments, "--shard-index", "2"])
+
+
+def test_process_leased(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a repository claimed by another runner and a repository that is not claimed
+    act: when _process_leased is called for both
+    assert: then only the repository that is not claimed is processed and its report is recorded.
+    """
+    report = fleet.RepositoryReport(url="url 2", seconds=1, error=None, outputs={}, metrics={})
+    monkeypatch.setattr(fleet, "_process_repository", mock.MagicMock(return_value=report))
+    shard.LeaseDirectory(path=tmp_path, owner="runner 1").acquire("url 1")
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 2")
+
+    claimed_report = fleet._process_leased(
+        entry=_entry(url="url 1"), cache_dir=tmp_path, credentials=CREDENTIALS, leases=leases
+    )
+    returned_report = fleet._process_leased(
+        entry=_entry(url="url 2"), cache_dir=tmp_path, credentials=CREDENTIALS, leases=leases
+    )
+
+    assert claimed_report is None
+    assert returned_report == report
+    assert leases.results() == [json.loads(json.dumps(report._asdict()))]
@@ -12,7 +12,7 @@ from unittest import mock
 import pytest
 
 from gatekeeper import constants, discourse, index, types_
-from gatekeeper.exceptions import DiscourseError, ServerError
+from gatekeeper.exceptions import DiscourseError, InputError, ServerError
 
 from .helpers import assert_substrings_in_string
 
@@ -276,3 +276,40 @@ def test_get_content_for_server(content: str | None, expected_content: str):
     returned_content = index.get_content_for_server(index_file=index_file)
 
     assert returned_content == expected_content
+
+
+def test_get_content_for_server_invalid_contents():
+    """
+    arrange: given the index file content with an invalid item in the contents section
+    act: when get_content_for_server and _get_contents_parsed_items are called with the index file
+    assert: then the server content is returned and the contents items raise InputError.
+    """
+    index_file = types_.IndexFile(
+        title="title 1", content="content 1\n# contents\n- [title 1](value 1)\nmalformed"
+    )
+
+    returned_content = index.get_content_for_server(index_file=index_file)
+
+    assert returned_content == "content 1"
+    parsed_items = index._get_contents_parsed_items(index_file=index_file)
+    assert next(parsed_items).reference_value == "value 1"
+    with pytest.raises(InputError) as exc_info:
+        next(parsed_items)
+    assert_substrings_in_string(("invalid", "malformed"), str(exc_info.value).lower())
+
+
+def test__parse_index_file_memoized():
+    """
+    arrange: given the index file content
+    act: when the server content and the contents items are retrieved for the index file
+    assert: then the index file content is only parsed once.
+    """
+    index._parse_index_file.cache_clear()
+    index_file = types_.IndexFile(title="title 1", content="content 1\n# contents\n- [t](v)")
+
+    index.get_content_for_server(index_file=index_file)
+    tuple(index._get_contents_parsed_items(index_file=index_file))
+
+    cache_info = index._parse_index_file.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
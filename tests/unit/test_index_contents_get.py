@@ -9,6 +9,7 @@ from pathlib import Path
 import pytest
 
 from gatekeeper import index, types_
+from gatekeeper.exceptions import InputError
 
 from .. import factories
 
@@ -121,3 +122,27 @@ def test_get_contents(
     returned_items = tuple(index.get_contents(index_file=index_file, docs_path=tmp_path))
 
     assert returned_items == expected_items
+
+
+def test_get_contents_files_changed(tmp_path: Path):
+    """
+    arrange: given an index file with a reference to a directory
+    act: when get_contents is called, the directory is replaced by a file and get_contents is
+        called again with the same index file
+    assert: then the second call raises InputError for the nested item that no longer exists
+        rather than returning the result of the first call.
+    """
+    (reference_path := tmp_path / "dir_1").mkdir()
+    (reference_path / "file_1.md").touch()
+    index_file = types_.IndexFile(
+        title="title 1", content="# Contents\n- [title 1](dir_1)\n  - [title 2](dir_1/file_1.md)\n"
+    )
+    first_items = index.get_contents(index_file=index_file, docs_path=tmp_path)
+    (reference_path / "file_1.md").unlink()
+    reference_path.rmdir()
+    tmp_path.joinpath("dir_1").touch()
+
+    with pytest.raises(InputError):
+        index.get_contents(index_file=index_file, docs_path=tmp_path)
+
+    assert [item.reference_value for item in first_items] == ["dir_1", "dir_1/file_1.md"]
@@ -0,0 +1,63 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for interning."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from gatekeeper import interning
+
+
+def test_content_interner_intern():
+    """
+    arrange: given an interner
+    act: when equal contents that are separate copies and a different content are interned
+    assert: then the first copy is returned for the equal contents and the stats count the unique
+        contents once.
+    """
+    interner = interning.ContentInterner()
+    first = "".join(("content ", "1"))
+    second = "".join(("content ", "1"))
+
+    assert interner.intern(first) is first
+    assert interner.intern(second) is first
+    assert interner.intern("content 22") == "content 22"
+    assert interner.stats() == interning.InternerStats(unique=2, size=19, interned=3)
+
+
+def test_content_interner_intern_threads():
+    """
+    arrange: given an interner
+    act: when the same contents are interned from several threads
+    assert: then every thread gets the same copy of each content.
+    """
+    interner = interning.ContentInterner()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(lambda number: interner.intern(f"content {number % 3}"), range(300))
+        )
+
+    assert len({id(result) for result in results}) == 3
+    assert interner.stats().interned == 300
+
+
+def test_scope():
+    """
+    arrange: given a scope
+    act: when intern is called with separate copies of the same content in the scope, in another
+        thread and after the scope
+    assert: then the copies are interned by the interner of the scope only in the scope.
+    """
+    first = "".join(("content ", "1"))
+
+    with interning.scope() as interner:
+        assert interning.intern(first) is first
+        assert interning.intern("".join(("content ", "1"))) is first
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_thread = executor.submit(interning.intern, "".join(("content ", "1"))).result()
+
+    assert other_thread is not first
+    assert interner.stats() == interning.InternerStats(unique=1, size=len(first), interned=2)
+    second = "".join(("content ", "1"))
+    assert interning.intern(second) is second
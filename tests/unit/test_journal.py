@@ -0,0 +1,254 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for journal."""
+
+from pathlib import Path
+
+import pytest
+
+from gatekeeper import journal
+from gatekeeper import types_ as src_types
+
+from .. import factories
+
+
+def _report(location: str, result: src_types.ActionResult) -> src_types.ActionReport:
+    """Create a report for a page.
+
+    Args:
+        location: The URL of the page.
+        result: The result of the action.
+
+    Returns:
+        The report.
+    """
+    return src_types.ActionReport(
+        table_row=src_types.TableRow(
+            level=1,
+            path=("path 1",),
+            navlink=src_types.Navlink(title="title 1", link=location, hidden=False),
+        ),
+        location=location,
+        result=result,
+        reason=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        pytest.param(factories.CreatePageActionFactory(), id="create page"),
+        pytest.param(factories.UpdatePageActionFactory(), id="update page"),
+        pytest.param(factories.DeletePageActionFactory(), id="delete page"),
+    ],
+)
+def test_record_completed(action: src_types.AnyAction, tmp_path: Path):
+    """
+    arrange: given a journal with a successful action recorded
+    act: when the journal is read again and completed is called with the action
+    assert: then the recorded report is returned.
+    """
+    path = tmp_path / "dir" / "journal.jsonl"
+    journal.Journal(path=path, name="name 1", discourse_host="host 1", base="commit 1").record(
+        action=action, report=(report := _report("url 1", src_types.ActionResult.SUCCESS))
+    )
+
+    returned_report = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    ).completed(action)
+
+    assert returned_report == report
+
+
+@pytest.mark.parametrize(
+    "action, result",
+    [
+        pytest.param(
+            factories.CreatePageActionFactory(), src_types.ActionResult.FAIL, id="failed"
+        ),
+        pytest.param(
+            factories.CreatePageActionFactory(), src_types.ActionResult.SKIP, id="skipped"
+        ),
+        pytest.param(
+            factories.CreateGroupActionFactory(),
+            src_types.ActionResult.SUCCESS,
+            id="no server change",
+        ),
+    ],
+)
+def test_record_ignored(
+    action: src_types.AnyAction, result: src_types.ActionResult, tmp_path: Path
+):
+    """
+    arrange: given an action that did not succeed or that does not change the server
+    act: when the action is recorded
+    assert: then nothing is written and the action is not completed.
+    """
+    path = tmp_path / "journal.jsonl"
+    action_journal = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    )
+
+    action_journal.record(action=action, report=_report("url 1", result))
+
+    assert not path.exists()
+    assert action_journal.completed(action) is None
+
+
+def test_completed_other_action(tmp_path: Path):
+    """
+    arrange: given a journal with a create action recorded
+    act: when completed is called with the action for another charm, another server, with other
+        content and for the same page with the server content changed
+    assert: then only the action with the changed server content is completed.
+    """
+    path = tmp_path / "journal.jsonl"
+    create_action = factories.CreatePageActionFactory(content="content 1")
+    update_action = factories.UpdatePageActionFactory(
+        content_change=src_types.ContentChange(base="base 1", server="server 1", local="local 1")
+    )
+    action_journal = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    )
+    report = _report("url 1", src_types.ActionResult.SUCCESS)
+    action_journal.record(action=create_action, report=report)
+    action_journal.record(action=update_action, report=report)
+
+    assert (
+        journal.Journal(
+            path=path, name="name 2", discourse_host="host 1", base="commit 1"
+        ).completed(create_action)
+        is None
+    )
+    assert (
+        journal.Journal(
+            path=path, name="name 1", discourse_host="host 2", base="commit 1"
+        ).completed(create_action)
+        is None
+    )
+    assert action_journal.completed(factories.CreatePageActionFactory(content="content 2")) is None
+    updated_action = factories.UpdatePageActionFactory(
+        level=update_action.level,
+        path=update_action.path,
+        navlink_change=update_action.navlink_change,
+        content_change=src_types.ContentChange(base="base 1", server="local 1", local="local 1"),
+    )
+    assert action_journal.completed(updated_action) == report
+
+
+def test_read_torn_line(tmp_path: Path):
+    """
+    arrange: given a journal file with an entry and a line that was partially written
+    act: when the journal is read
+    assert: then the entry is completed and the partial line is skipped.
+    """
+    path = tmp_path / "journal.jsonl"
+    action = factories.CreatePageActionFactory()
+    journal.Journal(path=path, name="name 1", discourse_host="host 1", base="commit 1").record(
+        action=action, report=(report := _report("url 1", src_types.ActionResult.SUCCESS))
+    )
+    with path.open("a", encoding="utf-8") as journal_file:
+        journal_file.write('{"version": 1, "na')
+
+    returned_report = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    ).completed(action)
+
+    assert returned_report == report
+
+
+def test_clear(tmp_path: Path):
+    """
+    arrange: given a journal file with entries of two charms
+    act: when the journal of one of the charms is cleared
+    assert: then only the entries of the other charm are kept and the file is removed once the
+        other charm is cleared too.
+    """
+    path = tmp_path / "journal.jsonl"
+    first_action = factories.CreatePageActionFactory()
+    second_action = factories.CreatePageActionFactory()
+    report = _report("url 1", src_types.ActionResult.SUCCESS)
+    first_journal = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    )
+    first_journal.record(action=first_action, report=report)
+    second_journal = journal.Journal(
+        path=path, name="name 2", discourse_host="host 1", base="commit 1"
+    )
+    second_journal.record(action=second_action, report=report)
+
+    first_journal.clear()
+
+    assert first_journal.completed(first_action) is None
+    assert (
+        journal.Journal(
+            path=path, name="name 1", discourse_host="host 1", base="commit 1"
+        ).completed(first_action)
+        is None
+    )
+    assert (
+        journal.Journal(
+            path=path, name="name 2", discourse_host="host 1", base="commit 1"
+        ).completed(second_action)
+        == report
+    )
+
+    second_journal.clear()
+
+    assert not path.exists()
+
+
+def test_expired(tmp_path: Path):
+    """
+    arrange: given a journal with an action recorded against a commit of the documentation tag
+    act: when the journal is read for another commit of the tag and cleared
+    assert: then the action is not completed and the entry is removed.
+    """
+    path = tmp_path / "journal.jsonl"
+    action = factories.CreatePageActionFactory()
+    journal.Journal(path=path, name="name 1", discourse_host="host 1", base="commit 1").record(
+        action=action, report=_report("url 1", src_types.ActionResult.SUCCESS)
+    )
+
+    later_journal = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 2"
+    )
+
+    assert later_journal.completed(action) is None
+    later_journal.clear()
+    assert not path.exists()
+
+
+def test_is_deleted(tmp_path: Path):
+    """
+    arrange: given a journal with a page deleted and a page created
+    act: when the journal is read again and is_deleted is called
+    assert: then only the deleted page is deleted, whether its link is relative or absolute.
+    """
+    path = tmp_path / "journal.jsonl"
+    earlier_journal = journal.Journal(path=path, name="name 1", discourse_host="host 1", base=None)
+    earlier_journal.record(
+        action=factories.DeletePageActionFactory(),
+        report=src_types.ActionReport(
+            table_row=None,
+            location="http://discourse/t/slug-1/1",
+            result=src_types.ActionResult.SUCCESS,
+            reason=None,
+        ),
+    )
+    earlier_journal.record(
+        action=factories.CreatePageActionFactory(),
+        report=_report("http://discourse/t/slug-2/2", src_types.ActionResult.SUCCESS),
+    )
+
+    returned_journal = journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base=None
+    )
+
+    assert returned_journal.is_deleted("/t/slug-1/1")
+    assert returned_journal.is_deleted("http://discourse/t/slug-1/1")
+    assert not returned_journal.is_deleted("/t/slug-2/2")
+    assert not journal.Journal(
+        path=path, name="name 1", discourse_host="host 1", base="commit 1"
+    ).is_deleted("/t/slug-1/1")
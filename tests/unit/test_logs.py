@@ -0,0 +1,153 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for logs."""
+
+# Need access to protected functions for testing
+# pylint: disable=protected-access
+
+import json
+import logging
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from gatekeeper import content, logs
+from gatekeeper import types_ as src_types
+
+from .. import factories
+
+
+@pytest.fixture(name="log_config", autouse=True)
+def fixture_log_config(monkeypatch: pytest.MonkeyPatch) -> logs.LogConfig:
+    """Use a separate logging configuration for each test."""
+    config = logs.LogConfig()
+    monkeypatch.setattr(logs, "_CONFIG", config)
+    return config
+
+
+def _hash(value: str) -> str:
+    """Get the hash of a content as it is logged.
+
+    Args:
+        value: The content.
+
+    Returns:
+        The start of the sha256 of the content.
+    """
+    return content.short_sha256(value)
+
+
+def test_summarize():
+    """
+    arrange: given actions with a content, a content change, an index url and without content
+    act: when summarize is called with each action
+    assert: then the type, path or url and content hashes are described without the content.
+    """
+    create_action = factories.CreatePageActionFactory(path=("path 1",), content="content 1")
+    update_action = factories.UpdatePageActionFactory(
+        path=("path 2",),
+        content_change=src_types.ContentChange(base=None, server="content 2", local="content 3"),
+    )
+    index_action = src_types.UpdateIndexAction(
+        url="url 1",
+        content_change=src_types.IndexContentChange(old="content 4", new="content 5"),
+    )
+    group_action = factories.CreateGroupActionFactory(path=("path 3",))
+
+    assert (
+        logs.summarize(create_action)
+        == f"CreatePageAction(path=('path 1',), content={_hash('content 1')})"
+    )
+    assert logs.summarize(update_action) == (
+        "UpdatePageAction(path=('path 2',), content_change=(base:none, "
+        f"server:{_hash('content 2')}, local:{_hash('content 3')}))"
+    )
+    assert logs.summarize(index_action) == (
+        f"UpdateIndexAction(url=url 1, content_change=(old:{_hash('content 4')}, "
+        f"new:{_hash('content 5')}))"
+    )
+    assert logs.summarize(group_action) == "CreateGroupAction(path=('path 3',))"
+
+
+def test_payload_full():
+    """
+    arrange: given the full log mode
+    act: when payload is called with an action
+    assert: then the action itself is returned.
+    """
+    create_action = factories.CreatePageActionFactory()
+
+    assert logs.payload(create_action) is create_action
+
+
+def test_payload_compact(tmp_path: Path):
+    """
+    arrange: given the compact log mode with a payload file
+    act: when payload is called with two actions
+    assert: then a summary of each action is returned and the full actions are written to the
+        payload file.
+    """
+    payload_file = tmp_path / "payload.jsonl"
+    payload_file.write_text("previous run\n", encoding="utf-8")
+    logs.configure(mode=logs.LogMode.COMPACT, payload_file=payload_file)
+    first_action = factories.CreatePageActionFactory(content="content 1")
+    second_action = factories.DeletePageActionFactory(content="content 2")
+
+    first_payload = logs.payload(first_action)
+    second_payload = logs.payload(second_action)
+
+    assert str(first_payload) == logs.summarize(first_action)
+    assert str(second_payload) == logs.summarize(second_action)
+    lines = [json.loads(line) for line in payload_file.read_text(encoding="utf-8").splitlines()]
+    assert lines == [
+        {"summary": logs.summarize(first_action), "payload": str(first_action)},
+        {"summary": logs.summarize(second_action), "payload": str(second_action)},
+    ]
+
+
+def test_payload_compact_summary_lazy(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given the compact log mode without a payload file
+    act: when payload is called with an action and logged at a disabled level
+    assert: then the summary is not computed.
+    """
+    logs.configure(mode=logs.LogMode.COMPACT)
+    mock_summarize = mock.MagicMock(spec=logs.summarize)
+    monkeypatch.setattr(logs, "summarize", mock_summarize)
+
+    logging.debug("action: %s", logs.payload(factories.CreatePageActionFactory()))
+
+    mock_summarize.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "mode, level, expected_logged",
+    [
+        pytest.param(logs.LogMode.FULL, logging.INFO, True, id="full"),
+        pytest.param(logs.LogMode.COMPACT, logging.INFO, False, id="compact info"),
+        pytest.param(logs.LogMode.COMPACT, logging.DEBUG, True, id="compact debug"),
+    ],
+)
+def test_content_change(
+    mode: logs.LogMode,
+    level: int,
+    expected_logged: bool,
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    arrange: given a log mode and a log level
+    act: when content_change is called
+    assert: then the diff is only computed and logged if the level of the mode is enabled.
+    """
+    caplog.set_level(level)
+    logs.configure(mode=mode)
+    mock_diff = mock.MagicMock(return_value="diff 1")
+    monkeypatch.setattr(logs.content, "diff", mock_diff)
+
+    logs.content_change("content 1", "content 2")
+
+    assert ("content change:\ndiff 1" in caplog.text) == expected_logged
+    assert mock_diff.called == expected_logged
@@ -0,0 +1,108 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for metrics."""
+
+from pathlib import Path
+
+import pytest
+
+from gatekeeper import metrics
+
+
+def test_collector_timed():
+    """
+    arrange: given a collector
+    act: when calls are timed including one that raises
+    assert: then the snapshot contains the number of calls and the time per category and name.
+    """
+    collector = metrics.Collector()
+
+    with collector.timed(category="category 1", name="name 1"):
+        pass
+    with pytest.raises(ValueError), collector.timed(category="category 1", name="name 1"):
+        raise ValueError("failed")
+    collector.record(category="category 2", name="name 2", seconds=1.5)
+    snapshot = collector.snapshot()
+
+    assert snapshot["version"] == metrics.METRICS_VERSION
+    assert snapshot["category 1"]["name 1"]["calls"] == 2
+    assert snapshot["category 1"]["name 1"]["seconds"] >= 0
+    assert snapshot["category 2"] == {"name 2": {"calls": 1, "seconds": 1.5}}
+
+
+def test_collector_reset():
+    """
+    arrange: given a collector with a recorded call
+    act: when reset is called
+    assert: then the snapshot contains no measurements.
+    """
+    collector = metrics.Collector()
+    collector.record(category="category 1", name="name 1", seconds=1)
+
+    collector.reset()
+
+    assert collector.snapshot() == {"version": metrics.METRICS_VERSION}
+
+
+def test_timed_decorator():
+    """
+    arrange: given a function decorated with timed
+    act: when the function is called twice
+    assert: then the collector of the process records both calls.
+    """
+    collector = metrics.get_collector()
+    collector.reset()
+
+    @metrics.timed(category="category 1", name="name 1")
+    def func() -> int:
+        """Return a value.
+
+        Returns:
+            A value.
+        """
+        return 1
+
+    returned_values = (func(), func())
+
+    assert returned_values == (1, 1)
+    assert collector.snapshot()["category 1"]["name 1"]["calls"] == 2
+
+
+@pytest.mark.parametrize(
+    "command, expected_name",
+    [
+        pytest.param(["git"], "git", id="no sub command"),
+        pytest.param(["git", "fetch", "--all"], "fetch", id="sub command"),
+        pytest.param(["git", "--no-pager", "show", "HEAD"], "show", id="option"),
+        pytest.param(["git", "-c", "user.name=x", "commit"], "commit", id="config option"),
+        pytest.param("git rev-parse HEAD", "rev-parse", id="string"),
+    ],
+)
+def test_git_command_name(command: str | list[str], expected_name: str):
+    """
+    arrange: given a git command line
+    act: when git_command_name is called with the command line
+    assert: then the expected sub command is returned.
+    """
+    returned_name = metrics.git_command_name(command)
+
+    assert returned_name == expected_name
+
+
+def test_metered_repo(tmp_path: Path):
+    """
+    arrange: given a repository created using MeteredRepo
+    act: when git commands are run
+    assert: then the git subprocesses are recorded by sub command.
+    """
+    collector = metrics.get_collector()
+    repo = metrics.MeteredRepo.init(tmp_path)
+    collector.reset()
+
+    repo.git.status()
+    repo.git.execute(command=["git", "status"])
+    repo.git.rev_parse("--git-dir")
+
+    assert collector.snapshot()[metrics.GIT].keys() == {"status", "rev-parse"}
+    assert collector.snapshot()[metrics.GIT]["status"]["calls"] == 2
@@ -13,7 +13,7 @@ from unittest import mock
 
 import pytest
 
-from gatekeeper import discourse, exceptions, migration, types_
+from gatekeeper import discourse, exceptions, migration, sync, types_
 
 from ... import factories
 from ..helpers import assert_substrings_in_string
@@ -843,6 +843,45 @@ def test__migrate_document(tmp_path: Path):
     assert returned_report.result == types_.ActionResult.SUCCESS
 
 
+@pytest.mark.parametrize(
+    "bumped, expected_content",
+    [
+        pytest.param(frozenset(), "content 1", id="unchanged"),
+        pytest.param(frozenset((1,)), "content 2", id="bumped"),
+    ],
+)
+def test__migrate_document_unchanged(
+    bumped: frozenset[int], expected_content: str, tmp_path: Path, mocked_clients
+):
+    """
+    arrange: given a document checked out and a sync state with its page
+    act: when _migrate_document is called with the page bumped since the state or not
+    assert: then the page is only retrieved if it was bumped.
+    """
+    mocked_discourse = mocked_clients.discourse
+    mocked_discourse.retrieve_topic.return_value = "content 2"
+    table_row = types_.TableRow(
+        level=1, path=("path 1",), navlink=factories.NavlinkFactory(link=(link := "/t/slug/1"))
+    )
+    document_meta = types_.DocumentMeta(path=Path("file.md"), table_row=table_row, link=link)
+    (full_path := tmp_path / "docs" / "file.md").parent.mkdir()
+    full_path.write_text("content 1", encoding="utf-8")
+    mocked_discourse.sync.use(
+        state=sync.SyncState(synced_at="2025-01-01T00:00:00.000Z", topics={1: "docs/file.md"}),
+        bumped=bumped,
+        base_path=tmp_path,
+    )
+
+    returned_report = migration._migrate_document(
+        document_meta=document_meta, discourse=mocked_discourse, docs_path=tmp_path / "docs"
+    )
+
+    assert returned_report.result == types_.ActionResult.SUCCESS
+    assert returned_report.location == full_path
+    assert full_path.read_text(encoding="utf-8") == expected_content
+    assert mocked_discourse.retrieve_topic.called == bool(bumped)
+
+
 def test__migrate_index(tmp_path: Path):
     """
     arrange: given valid index document metadata
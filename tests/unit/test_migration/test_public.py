@@ -114,3 +114,13 @@ def test_run(
     assert (tmp_path / "index.md").read_text() == expected_index_content
     for path in expected_files:
         assert (tmp_path / path).is_file()
+
+
+def test_blob_sha():
+    """
+    arrange: given content
+    act: when blob_sha is called
+    assert: then the SHA git gives to a file with the content is returned.
+    """
+    # Computed with: printf 'content 1\n' | git hash-object --stdin
+    assert migration.blob_sha(b"content 1\n") == "a0054e492840f572e48a3cb791d2e083afaf08f6"
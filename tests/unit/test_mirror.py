@@ -0,0 +1,168 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for mirror."""
+
+from pathlib import Path
+
+import pytest
+
+from gatekeeper import mirror
+
+
+def _topic(
+    topic_id: int = 1, version: int = 1, content: str | None = "content 1"
+) -> mirror.MirroredTopic:
+    """Create a topic as it is read from the server.
+
+    Args:
+        topic_id: The identifier of the topic.
+        version: The version of the first post.
+        content: The content of the first post.
+
+    Returns:
+        The topic.
+    """
+    return mirror.MirroredTopic(
+        topic_id=topic_id,
+        slug=f"slug-{topic_id}",
+        post_id=topic_id * 10,
+        version=version,
+        updated_at=f"2025-01-0{version}T00:00:00.000Z",
+        bumped_at=None,
+        can_edit=True,
+        content=content,
+    )
+
+
+@pytest.fixture(name="topic_mirror")
+def fixture_topic_mirror(tmp_path: Path) -> mirror.Mirror:
+    """Get a mirror in a new database."""
+    return mirror.Mirror(
+        path=tmp_path / "cache" / mirror.MIRROR_FILE, host="host 1", category_id=1
+    )
+
+
+def test_put_get(topic_mirror: mirror.Mirror):
+    """
+    arrange: given a mirror with a topic stored and then stored again at a later version
+    act: when the mirror is opened again and get is called
+    assert: then the topic at the later version is returned only for the host of the mirror.
+    """
+    topic_mirror.put(_topic(version=1))
+    topic_mirror.put(topic := _topic(version=2, content="content 2"))
+    topic_mirror.close()
+
+    reopened_mirror = mirror.Mirror(path=topic_mirror.path, host="host 1", category_id=1)
+    other_host_mirror = mirror.Mirror(path=topic_mirror.path, host="host 2", category_id=1)
+
+    assert reopened_mirror.get(1) == topic
+    assert reopened_mirror.get(2) is None
+    assert other_host_mirror.get(1) is None
+
+
+@pytest.mark.parametrize(
+    "topic, post_id, version, updated_at, expected_matches",
+    [
+        pytest.param(_topic(), 10, 1, "2025-01-01T00:00:00.000Z", True, id="same revision"),
+        pytest.param(_topic(), 11, 1, "2025-01-01T00:00:00.000Z", False, id="other post"),
+        pytest.param(_topic(), 10, 2, "2025-01-01T00:00:00.000Z", False, id="other version"),
+        pytest.param(_topic(), 10, 1, "2025-01-01T00:01:00.000Z", False, id="edited in grace"),
+        pytest.param(
+            _topic(content=None), 10, 1, "2025-01-01T00:00:00.000Z", False, id="no content"
+        ),
+    ],
+)
+def test_matches(
+    topic: mirror.MirroredTopic,
+    post_id: int,
+    version: int,
+    updated_at: str,
+    expected_matches: bool,
+):
+    """
+    arrange: given a mirrored topic
+    act: when matches is called with the revision of the first post on the server
+    assert: then the content is only used if it is of the same revision.
+    """
+    assert topic.matches(post_id=post_id, version=version, updated_at=updated_at) == (
+        expected_matches
+    )
+
+
+def test_discard(topic_mirror: mirror.Mirror):
+    """
+    arrange: given a mirror with two topics
+    act: when discard is called with one of the topics
+    assert: then only the other topic is kept.
+    """
+    topic_mirror.put(_topic(topic_id=1))
+    topic_mirror.put(second_topic := _topic(topic_id=2))
+
+    topic_mirror.discard(1)
+
+    assert topic_mirror.get(1) is None
+    assert topic_mirror.get(2) == second_topic
+
+
+def test_refresh(topic_mirror: mirror.Mirror):
+    """
+    arrange: given a mirror with three topics, one of them listed before
+    act: when refresh is called with the bumped topics including the listed topic, first not
+        bumped again and then bumped again
+    assert: then the content of the bumped topics is removed, the slug and bumped at are updated
+        and the most recent bump is recorded.
+    """
+    topic_mirror.put(_topic(topic_id=1))
+    topic_mirror.put(_topic(topic_id=2))
+    topic_mirror.put(_topic(topic_id=3))
+    assert topic_mirror.listed_until() is None
+
+    removed = topic_mirror.refresh(
+        (
+            mirror.ListedTopic(topic_id=2, slug="slug-new", bumped_at="2025-02-02T00:00:00.000Z"),
+            mirror.ListedTopic(topic_id=1, slug="slug-1", bumped_at="2025-02-01T00:00:00.000Z"),
+            mirror.ListedTopic(topic_id=4, slug="slug-4", bumped_at="2025-01-01T00:00:00.000Z"),
+        )
+    )
+
+    assert removed == 2
+    assert topic_mirror.listed_until() == "2025-02-02T00:00:00.000Z"
+    first_topic = topic_mirror.get(1)
+    assert first_topic is not None
+    assert first_topic.content is None
+    assert first_topic.bumped_at == "2025-02-01T00:00:00.000Z"
+    second_topic = topic_mirror.get(2)
+    assert second_topic is not None
+    assert second_topic.slug == "slug-new"
+    assert topic_mirror.get(3) == _topic(topic_id=3)
+    assert topic_mirror.get(4) is None
+
+    topic_mirror.put(_topic(topic_id=1, version=2))
+
+    removed = topic_mirror.refresh(
+        (mirror.ListedTopic(topic_id=1, slug="slug-1", bumped_at="2025-02-01T00:00:00.000Z"),)
+    )
+
+    assert removed == 0
+    first_topic = topic_mirror.get(1)
+    assert first_topic is not None
+    assert first_topic.content == "content 1"
+    assert topic_mirror.listed_until() == "2025-02-02T00:00:00.000Z"
+
+    removed = topic_mirror.refresh(
+        (mirror.ListedTopic(topic_id=1, slug="slug-1", bumped_at="2025-03-01T00:00:00.000Z"),)
+    )
+
+    assert removed == 1
+    assert topic_mirror.listed_until() == "2025-03-01T00:00:00.000Z"
+
+
+def test_start_refresh(topic_mirror: mirror.Mirror):
+    """
+    arrange: given a mirror
+    act: when start_refresh is called twice
+    assert: then only the first call claims the refresh.
+    """
+    assert topic_mirror.start_refresh()
+    assert not topic_mirror.start_refresh()
@@ -0,0 +1,525 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for plan."""
+
+# Need access to protected functions for testing
+# pylint: disable=protected-access
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from gatekeeper import plan, types_
+from gatekeeper.clients import Clients
+from gatekeeper.exceptions import DiscourseError, InputError
+from gatekeeper.sync import SyncState
+
+from .. import factories
+
+
+def _index(server_content: str | None = None) -> types_.Index:
+    """Create an index.
+
+    Args:
+        server_content: The content of the index page on the server, if any.
+
+    Returns:
+        The index.
+    """
+    return types_.Index(
+        server=(
+            None
+            if server_content is None
+            else types_.Page(url="index url", content=server_content)
+        ),
+        local=types_.IndexFile(title="title 1", content=None),
+        name="name 1",
+    )
+
+
+def _page_row(host: str, path: types_.TablePath, topic_id: int = 1) -> types_.TableRow:
+    """Create a navigation table row for a page on the server.
+
+    Args:
+        host: The host of the server.
+        path: The path of the row.
+        topic_id: The identifier of the topic of the page.
+
+    Returns:
+        The row.
+    """
+    return types_.TableRow(
+        level=1,
+        path=path,
+        navlink=types_.Navlink(title="title 1", link=f"{host}/t/slug/{topic_id}", hidden=False),
+    )
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        pytest.param(factories.CreatePageActionFactory(), id="create page"),
+        pytest.param(factories.CreateGroupActionFactory(), id="create group"),
+        pytest.param(factories.CreateExternalRefActionFactory(), id="create external ref"),
+        pytest.param(factories.NoopPageActionFactory(), id="noop page"),
+        pytest.param(factories.NoopGroupActionFactory(), id="noop group"),
+        pytest.param(
+            factories.NoopExternalRefActionFactory(
+                navlink=factories.NavlinkFactory(link="http://link")
+            ),
+            id="noop external ref",
+        ),
+        pytest.param(factories.UpdatePageActionFactory(), id="update page"),
+        pytest.param(
+            factories.UpdatePageActionFactory(content_change=None), id="update page no content"
+        ),
+        pytest.param(
+            factories.UpdatePageActionFactory(
+                server_revision=types_.TopicRevision(post_id=1, version=2)
+            ),
+            id="update page server revision",
+        ),
+        pytest.param(factories.UpdateGroupActionFactory(), id="update group"),
+        pytest.param(
+            factories.UpdateExternalRefActionFactory(
+                navlink_change=factories.NavlinkChangeFactory(
+                    old=factories.NavlinkFactory(link="http://link 1"),
+                    new=factories.NavlinkFactory(link="http://link 2"),
+                )
+            ),
+            id="update external ref",
+        ),
+        pytest.param(factories.DeletePageActionFactory(), id="delete page"),
+        pytest.param(factories.DeleteGroupActionFactory(), id="delete group"),
+        pytest.param(
+            factories.DeleteExternalRefActionFactory(
+                navlink=factories.NavlinkFactory(link="http://link")
+            ),
+            id="delete external ref",
+        ),
+    ],
+)
+def test_write_read(action: types_.AnyAction, tmp_path: Path):
+    """
+    arrange: given a plan with an action
+    act: when the plan is written and read
+    assert: then the same plan is returned.
+    """
+    written_plan = plan.Plan(
+        version=plan.PLAN_VERSION,
+        commit_sha="commit 1",
+        discourse_host="host 1",
+        documentation_tag=None,
+        index_sha256="hash 1",
+        entries=(
+            plan.PlanEntry(
+                path=action.path,
+                local_sha256="hash 2",
+                server_url=None,
+                server_revision=None,
+                actions=(action,),
+            ),
+            plan.PlanEntry(
+                path=("page",),
+                local_sha256=None,
+                server_url="url 1",
+                server_revision=types_.TopicRevision(post_id=1, version=2),
+                actions=(),
+            ),
+        ),
+    )
+    plan_path = tmp_path / "dir" / "plan.json"
+
+    plan.write(plan=written_plan, path=plan_path)
+    returned_plan = plan.read(path=plan_path)
+
+    assert returned_plan == written_plan
+
+
+@pytest.mark.parametrize(
+    "content, expected_message",
+    [
+        pytest.param(None, "could not be read", id="missing"),
+        pytest.param("not json", "could not be read", id="not json"),
+        pytest.param("[]", "expected version", id="not object"),
+        pytest.param('{"version": 0}', "expected version", id="other version"),
+        pytest.param(
+            f'{{"version": {plan.PLAN_VERSION}}}', "unexpected content", id="missing keys"
+        ),
+        pytest.param(
+            (
+                f'{{"version": {plan.PLAN_VERSION}, "commit_sha": "", "discourse_host": "", '
+                '"documentation_tag": null, "index_sha256": null, "entries": [{"path": [], '
+                '"local_sha256": null, "server_url": null, "server_revision": null, "actions": '
+                '[{"type": "CreatePageAction", "unknown": 1}]}]}'
+            ),
+            "unexpected content",
+            id="invalid action",
+        ),
+    ],
+)
+def test_read_invalid(content: str | None, expected_message: str, tmp_path: Path):
+    """
+    arrange: given a plan file with invalid content
+    act: when read is called
+    assert: then InputError is raised.
+    """
+    plan_path = tmp_path / "plan.json"
+    if content is not None:
+        plan_path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(InputError) as exc_info:
+        plan.read(path=plan_path)
+
+    assert expected_message in str(exc_info.value)
+
+
+def test_create(mocked_clients: Clients, tmp_path: Path):
+    """
+    arrange: given a local file, directory and deleted page, table rows for the pages and actions
+        for all of them, the actions of the pages with the revision the page was read at
+    act: when create is called
+    assert: then an entry is returned per path with the hashes and the recorded revision of the
+        page without retrieving it from the server again.
+    """
+    host = mocked_clients.discourse.host
+    (file_path := tmp_path / "file.md").write_text("content 1", encoding="utf-8")
+    (dir_path := tmp_path / "dir").mkdir()
+    file_info = factories.PathInfoFactory(local_path=file_path, table_path=("file",))
+    dir_info = factories.PathInfoFactory(local_path=dir_path, table_path=("dir",))
+    page_action = factories.UpdatePageActionFactory(
+        path=file_info.table_path, server_revision=types_.TopicRevision(post_id=1, version=5)
+    )
+    group_action = factories.CreateGroupActionFactory(path=dir_info.table_path)
+    delete_action = factories.DeletePageActionFactory(
+        path=("deleted",), server_revision=types_.TopicRevision(post_id=2, version=3)
+    )
+
+    returned_plan = plan.create(
+        sorted_item_infos=(file_info, dir_info),
+        table_rows=(
+            table_row := _page_row(host, file_info.table_path),
+            deleted_row := _page_row(host, delete_action.path, topic_id=2),
+        ),
+        actions=(page_action, group_action, delete_action),
+        index=_index(server_content="index 1"),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+
+    assert returned_plan.commit_sha == "commit 1"
+    assert returned_plan.discourse_host == host
+    assert returned_plan.index_sha256 == plan._sha256("index 1")
+    assert returned_plan.entries == (
+        plan.PlanEntry(
+            path=file_info.table_path,
+            local_sha256=plan._item_sha256(file_info),
+            server_url=table_row.navlink.link,
+            server_revision=page_action.server_revision,
+            actions=(page_action,),
+        ),
+        plan.PlanEntry(
+            path=dir_info.table_path,
+            local_sha256=plan._item_sha256(dir_info),
+            server_url=None,
+            server_revision=None,
+            actions=(group_action,),
+        ),
+        plan.PlanEntry(
+            path=delete_action.path,
+            local_sha256=None,
+            server_url=deleted_row.navlink.link,
+            server_revision=delete_action.server_revision,
+            actions=(delete_action,),
+        ),
+    )
+    mocked_clients.discourse.retrieve_post_revision.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "unchanged, expected_fresh",
+    [
+        pytest.param(True, True, id="not bumped"),
+        pytest.param(False, False, id="bumped"),
+    ],
+)
+def test_create_unknown_server_revision(
+    unchanged: bool, expected_fresh: bool, mocked_clients: Clients, tmp_path: Path
+):
+    """
+    arrange: given a local file, a table row for the file and a noop action for the file whose
+        content was read from the documentation tag
+    act: when create is called and fresh_actions is called with the plan after the page has been
+        bumped or not since the tag was moved
+    assert: then the entry has no revision and is fresh only if the page has not been bumped,
+        without retrieving the page from the server, and the fresh page is recorded as matching.
+    """
+    host = mocked_clients.discourse.host
+    (file_path := tmp_path / "file.md").write_text("content 1", encoding="utf-8")
+    file_info = factories.PathInfoFactory(local_path=file_path, table_path=("file",))
+    table_rows = (table_row := _page_row(host, file_info.table_path),)
+    page_action = factories.NoopPageActionFactory(
+        path=file_info.table_path, navlink=table_row.navlink
+    )
+
+    returned_plan = plan.create(
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        actions=(page_action,),
+        index=_index(server_content="index 1"),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+    mocked_clients.discourse.sync.use(
+        state=SyncState(synced_at="1", topics={1: "file.md"} if unchanged else {}),
+        bumped=(),
+        base_path=tmp_path,
+    )
+    mocked_clients.discourse.sync.start("2")
+    returned_actions = plan.fresh_actions(
+        plan=returned_plan,
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        index=_index(server_content="index 1"),
+        clients=mocked_clients,
+    )
+
+    assert returned_plan.entries[0].server_revision is None
+    assert bool(returned_actions) == expected_fresh
+    mocked_clients.discourse.retrieve_post_revision.assert_not_called()
+    state = mocked_clients.discourse.sync.state(base_path=tmp_path)
+    assert state is not None
+    assert state.topics == ({1: "file.md"} if unchanged else {})
+
+
+def test_item_sha256_contents_index_item():
+    """
+    arrange: given 2 contents index items that differ only in the reference value
+    act: when _item_sha256 is called for both
+    assert: then the hashes differ.
+    """
+    item_1 = types_.IndexContentsListItem(
+        hierarchy=1, reference_title="title 1", reference_value="value 1", rank=1, hidden=False
+    )
+    item_2 = item_1._replace(reference_value="value 2")
+
+    assert plan._item_sha256(item_1) != plan._item_sha256(item_2)
+
+
+# Pylint diesn't understand how the walrus operator works
+# pylint: disable=undefined-variable,unused-variable
+@pytest.mark.parametrize(
+    "content, revision, discourse_error, expected_fresh",
+    [
+        pytest.param("content 1", 5, False, True, id="unchanged"),
+        pytest.param("content 2", 5, False, False, id="local changed"),
+        pytest.param("content 1", 6, False, False, id="server changed"),
+        pytest.param("content 1", 5, True, False, id="server error"),
+    ],
+)
+# pylint: enable=undefined-variable,unused-variable
+# The arguments are needed due to parametrisation and use of fixtures
+def test_fresh_actions_entry(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    content: str,
+    revision: int,
+    discourse_error: bool,
+    expected_fresh: bool,
+    mocked_clients: Clients,
+    tmp_path: Path,
+):
+    """
+    arrange: given a plan created for a local file and a page on the server that is not updated
+    act: when fresh_actions is called after the file or page have changed
+    assert: then the actions are returned only if neither has changed, the revision is retrieved
+        by the first post of the page.
+    """
+    host = mocked_clients.discourse.host
+    (file_path := tmp_path / "file.md").write_text("content 1", encoding="utf-8")
+    file_info = factories.PathInfoFactory(local_path=file_path, table_path=("file",))
+    table_rows = (table_row := _page_row(host, file_info.table_path),)
+    action = factories.NoopPageActionFactory(
+        path=file_info.table_path,
+        navlink=table_row.navlink,
+        server_revision=types_.TopicRevision(post_id=11, version=5),
+    )
+    created_plan = plan.create(
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        actions=(action,),
+        index=_index(),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+    file_path.write_text(content, encoding="utf-8")
+    mocked_clients.discourse.retrieve_post_revision.return_value = types_.TopicRevision(
+        post_id=11, version=revision
+    )
+    if discourse_error:
+        mocked_clients.discourse.retrieve_post_revision.side_effect = DiscourseError("failed")
+
+    returned_actions = plan.fresh_actions(
+        plan=created_plan,
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        index=_index(),
+        clients=mocked_clients,
+    )
+
+    assert returned_actions == ({file_info.table_path: (action,)} if expected_fresh else {})
+    if content == "content 1":
+        mocked_clients.discourse.retrieve_post_revision.assert_called_once_with(
+            post_id=11, url=table_row.navlink.link
+        )
+
+
+def test_fresh_actions_entry_update(mocked_clients: Clients, tmp_path: Path):
+    """
+    arrange: given a plan created for a local file and a page on the server that is updated
+    act: when fresh_actions is called
+    assert: then the actions are returned without retrieving the revision since the update checks
+        it.
+    """
+    host = mocked_clients.discourse.host
+    (file_path := tmp_path / "file.md").write_text("content 1", encoding="utf-8")
+    file_info = factories.PathInfoFactory(local_path=file_path, table_path=("file",))
+    table_rows = (_page_row(host, file_info.table_path),)
+    action = factories.UpdatePageActionFactory(
+        path=file_info.table_path, server_revision=types_.TopicRevision(post_id=11, version=5)
+    )
+    created_plan = plan.create(
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        actions=(action,),
+        index=_index(),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+
+    returned_actions = plan.fresh_actions(
+        plan=created_plan,
+        sorted_item_infos=(file_info,),
+        table_rows=table_rows,
+        index=_index(),
+        clients=mocked_clients,
+    )
+
+    assert returned_actions == {file_info.table_path: (action,)}
+    mocked_clients.discourse.retrieve_post_revision.assert_not_called()
+
+
+def test_fresh_actions_entry_row_changed(mocked_clients: Clients):
+    """
+    arrange: given a plan created for a path that was not on the navigation table
+    act: when fresh_actions is called after a page was added for the path
+    assert: then no actions are returned.
+    """
+    action = factories.DeletePageActionFactory()
+    created_plan = plan.create(
+        sorted_item_infos=(),
+        table_rows=(),
+        actions=(action,),
+        index=_index(),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+
+    returned_actions = plan.fresh_actions(
+        plan=created_plan,
+        sorted_item_infos=(),
+        table_rows=(_page_row(mocked_clients.discourse.host, action.path),),
+        index=_index(),
+        clients=mocked_clients,
+    )
+
+    assert not returned_actions
+
+
+@pytest.mark.parametrize(
+    "changes, index_content",
+    [
+        pytest.param({"discourse_host": "other host"}, None, id="host"),
+        pytest.param({"documentation_tag": "other commit"}, None, id="documentation tag"),
+        pytest.param({}, "index 2", id="index"),
+    ],
+)
+def test_fresh_actions_stale_plan(
+    changes: dict[str, str], index_content: str | None, mocked_clients: Clients
+):
+    """
+    arrange: given a plan for a group
+    act: when fresh_actions is called with another host, documentation tag or index page
+    assert: then no actions are returned.
+    """
+    action = factories.DeleteGroupActionFactory()
+    created_plan = plan.create(
+        sorted_item_infos=(),
+        table_rows=(),
+        actions=(action,),
+        index=_index(),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )._replace(**changes)
+
+    returned_actions = plan.fresh_actions(
+        plan=created_plan,
+        sorted_item_infos=(),
+        table_rows=(),
+        index=_index(server_content=index_content),
+        clients=mocked_clients,
+    )
+
+    assert not returned_actions
+
+
+@pytest.mark.parametrize("is_ancestor", [True, False])
+def test_load(
+    is_ancestor: bool, monkeypatch: pytest.MonkeyPatch, mocked_clients: Clients, tmp_path: Path
+):
+    """
+    arrange: given a plan file computed for a commit that is an ancestor of the current commit
+        or not
+    act: when load is called
+    assert: then the plan is returned only for an ancestor.
+    """
+    written_plan = plan.Plan(
+        version=plan.PLAN_VERSION,
+        commit_sha="commit 1",
+        discourse_host="host 1",
+        documentation_tag=None,
+        index_sha256=None,
+        entries=(),
+    )
+    plan.write(plan=written_plan, path=(plan_path := tmp_path / "plan.json"))
+    mocked_is_ancestor = mock.MagicMock(return_value=is_ancestor)
+    monkeypatch.setattr(mocked_clients.repository, "is_ancestor", mocked_is_ancestor)
+
+    returned_plan = plan.load(path=plan_path, clients=mocked_clients, commit_sha="commit 2")
+
+    assert returned_plan == (written_plan if is_ancestor else None)
+    mocked_is_ancestor.assert_called_once_with("commit 1", "commit 2")
+
+
+def test_unchecked_items(mocked_clients: Clients):
+    """
+    arrange: given a plan created for a contents index item
+    act: when unchecked_items is called with the item and a changed item
+    assert: then only the changed item is returned.
+    """
+    item = types_.IndexContentsListItem(
+        hierarchy=1, reference_title="title 1", reference_value="value 1", rank=1, hidden=False
+    )
+    changed_item = item._replace(reference_value="value 2")
+    created_plan = plan.create(
+        sorted_item_infos=(item,),
+        table_rows=(),
+        actions=(factories.CreateExternalRefActionFactory(path=item.table_path),),
+        index=_index(),
+        clients=mocked_clients,
+        commit_sha="commit 1",
+    )
+
+    returned_items = plan.unchecked_items(plan=created_plan, index_contents=(item, changed_item))
+
+    assert returned_items == [changed_item]
@@ -0,0 +1,73 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for profiling."""
+
+import logging
+import pstats
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from gatekeeper import profiling
+
+
+def _work() -> list[str]:
+    """Do some work to profile.
+
+    Returns:
+        Some allocated values.
+    """
+    return [str(value) for value in range(1000)]
+
+
+def test_profile_disabled(tmp_path: Path):
+    """
+    arrange: given no output directory
+    act: when a phase is profiled
+    assert: then no files are written and memory is not traced.
+    """
+    with profiling.profile(name="phase", output_dir=None):
+        _work()
+
+    assert not list(tmp_path.iterdir())
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    """
+    arrange: given an output directory that does not exist
+    act: when a phase is profiled
+    assert: then the stats and summaries are written, a summary is logged and memory tracing is
+        stopped.
+    """
+    caplog.set_level(logging.INFO)
+    output_dir = tmp_path / "profiles"
+
+    with profiling.profile(name="phase", output_dir=output_dir):
+        _work()
+
+    phase_profile = profiling.get_phase_profile(name="phase", output_dir=output_dir)
+    assert "_work" in str(pstats.Stats(str(phase_profile.stats_path)).stats)
+    assert "_work" in phase_profile.cpu_summary_path.read_text(encoding="utf-8")
+    assert phase_profile.memory_summary_path.read_text(encoding="utf-8").startswith("peak: ")
+    assert "profile of phase phase" in caplog.text
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_already_tracing(tmp_path: Path):
+    """
+    arrange: given memory is already being traced
+    act: when a phase that raises is profiled
+    assert: then the profile is written and memory is still traced.
+    """
+    tracemalloc.start()
+    try:
+        with pytest.raises(ValueError), profiling.profile(name="phase", output_dir=tmp_path):
+            raise ValueError("failed")
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert profiling.get_phase_profile(name="phase", output_dir=tmp_path).stats_path.exists()
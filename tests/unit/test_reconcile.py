@@ -13,10 +13,10 @@ from unittest import mock
 
 import pytest
 
-from gatekeeper import constants, exceptions, reconcile, types_
+from gatekeeper import constants, exceptions, interning, reconcile, sync, types_
 
 from .. import factories
-from .helpers import assert_substrings_in_string
+from .helpers import MOCKED_TOPIC_REVISION, assert_substrings_in_string
 
 
 @pytest.mark.parametrize(
@@ -210,6 +210,7 @@ def test__local_and_server_file_same(local_content: str, server_content: str, mo
     # mypy has difficulty with determining which action is returned
     assert returned_action.navlink == navlink  # type: ignore
     assert returned_action.content == local_content.strip()  # type: ignore
+    assert returned_action.server_revision == MOCKED_TOPIC_REVISION  # type: ignore
     mocked_clients.discourse.retrieve_topic.assert_called_once_with(url=navlink_link)
 
 
@@ -381,11 +382,112 @@ def test__local_and_server_file_content_change(mock_get_file, mocked_clients):
     assert returned_action.content_change.local == local_content  # type: ignore
     assert returned_action.content_change.base == base_content  # type: ignore
     mocked_clients.discourse.retrieve_topic.assert_called_once_with(url=navlink_link)
+    assert returned_action.server_revision == MOCKED_TOPIC_REVISION  # type: ignore
     mock_get_file.assert_called_once_with(
         path=str(relative_path), tag_name=constants.DOCUMENTATION_TAG
     )
 
 
+@mock.patch("gatekeeper.repository.Client.get_file_content_from_tag")
+def test__local_and_server_file_content_change_shared_content(mock_get_file, mocked_clients):
+    """
+    arrange: given path info with a file, discourse client that returns different content and
+        repository that returns the same content as in the file for the tag
+    act: when _local_and_server is called with the path info and table row
+    assert: then the update action references a single copy of the local and base content.
+    """
+    tmp_path = mocked_clients.repository.base_path
+
+    (path := tmp_path / "file1.md").write_text("content 1", encoding="utf-8")
+    path_info = factories.PathInfoFactory(local_path=path)
+    mocked_clients.discourse.retrieve_topic.return_value = "content 2"
+    mock_get_file.return_value = "".join(("content ", "1"))
+    navlink = factories.NavlinkFactory(title=path_info.navlink_title, link="link 1")
+    table_row = factories.TableRowFactory(
+        level=path_info.level, path=path_info.table_path, navlink=navlink
+    )
+
+    with interning.scope():
+        (returned_action,) = reconcile._local_and_server(
+            item_info=path_info,
+            table_row=table_row,
+            clients=mocked_clients,
+            base_path=tmp_path,
+        )
+
+    assert isinstance(returned_action, types_.UpdatePageAction)
+    assert returned_action.content_change.base == "content 1"
+    assert returned_action.content_change.base is returned_action.content_change.local
+
+
+@pytest.mark.parametrize(
+    "local_content, bumped, expected_server_content",
+    [
+        pytest.param("content 1", frozenset(), "content 1", id="same"),
+        pytest.param("content 2", frozenset(), "content 1", id="local change"),
+        pytest.param("content 1", frozenset((1,)), "content 3", id="bumped"),
+    ],
+)
+@mock.patch("gatekeeper.repository.Client.get_file_content_from_tag")
+def test__local_and_server_file_unchanged(
+    mock_get_file,
+    local_content: str,
+    bumped: frozenset[int],
+    expected_server_content: str,
+    mocked_clients,
+):
+    """
+    arrange: given a file at the documentation tag and a sync state with the page of the file,
+        the file changed locally or not and the page bumped since the state or not
+    act: when _local_and_server is called with the path info and table row
+    assert: then the content on the server is only retrieved if the page was bumped and the page
+        is recorded to match if its content is the local content.
+    """
+    tmp_path = mocked_clients.repository.base_path
+    (path := tmp_path / "file1.md").write_text("content 1\n", encoding="utf-8")
+    mocked_clients.repository._git_repo.git.add(".")
+    mocked_clients.repository._git_repo.git.commit("-m", "add file")
+    mocked_clients.repository.tag_commit(
+        constants.DOCUMENTATION_TAG, mocked_clients.repository.current_commit
+    )
+    path.write_text(local_content, encoding="utf-8")
+    mock_get_file.return_value = "content 1"
+    mocked_clients.discourse.retrieve_topic.return_value = "content 3"
+    tracker = mocked_clients.discourse.sync
+    tracker.use(
+        state=sync.SyncState(synced_at="2025-01-01T00:00:00.000Z", topics={1: "file1.md"}),
+        bumped=bumped,
+        base_path=tmp_path,
+    )
+    tracker.start("2025-02-01T00:00:00.000Z")
+    path_info = factories.PathInfoFactory(local_path=path)
+    navlink = factories.NavlinkFactory(title=path_info.navlink_title, link="/t/slug/1")
+    table_row = factories.TableRowFactory(
+        level=path_info.level, path=path_info.table_path, navlink=navlink
+    )
+
+    (returned_action,) = reconcile._local_and_server(
+        item_info=path_info,
+        table_row=table_row,
+        clients=mocked_clients,
+        base_path=tmp_path,
+    )
+
+    if local_content == expected_server_content:
+        assert isinstance(returned_action, types_.NoopPageAction)
+    else:
+        assert isinstance(returned_action, types_.UpdatePageAction)
+        assert returned_action.content_change is not None
+        assert returned_action.content_change.server == expected_server_content
+        assert returned_action.content_change.base == "content 1"
+        assert (returned_action.server_revision is None) == (not bumped)
+    assert mocked_clients.discourse.retrieve_topic.called == bool(bumped)
+    assert mock_get_file.called == bool(bumped)
+    state = tracker.state(base_path=tmp_path)
+    assert state is not None
+    assert state.topics == ({1: "file1.md"} if local_content == expected_server_content else {})
+
+
 @mock.patch("gatekeeper.repository.Client.get_file_content_from_tag")
 def test__local_and_server_file_content_change_base_content_ws(mock_get_file, mocked_clients):
     """
@@ -763,6 +865,7 @@ def test__local_and_server_file_to_directory(mocked_clients):
     # mypy has difficulty with determining which action is returned
     assert returned_actions[0].navlink == navlink  # type: ignore
     assert returned_actions[0].content == content  # type: ignore
+    assert returned_actions[0].server_revision == MOCKED_TOPIC_REVISION  # type: ignore
     assert isinstance(returned_actions[1], types_.CreateGroupAction)
     assert returned_actions[1].level == path_info.level
     assert returned_actions[1].path == path_info.table_path
@@ -893,6 +996,7 @@ def test__server_only_file(mocked_clients):
     assert returned_action.path == table_row.path
     assert returned_action.navlink == table_row.navlink
     assert returned_action.content == content
+    assert returned_action.server_revision == MOCKED_TOPIC_REVISION
     mock_discourse.retrieve_topic.assert_called_once_with(url=navlink.link)
 
 
@@ -1407,3 +1511,64 @@ def test__is_same_content_index(index: types_.Index, expected_value: bool):
     actions = [types_.NoopGroupAction(1, tuple("path"), types_.Navlink("title", None, True))]
 
     assert reconcile.is_same_content(index, actions) == expected_value
+
+
+@pytest.mark.parametrize(
+    "content_change, expected_value",
+    [
+        pytest.param(types_.ContentChange("base", "base", "local"), True, id="server unchanged"),
+        pytest.param(types_.ContentChange("base", "local", "local"), True, id="server is local"),
+        pytest.param(
+            types_.ContentChange("base", "server", "local"), False, id="server changes merged"
+        ),
+        pytest.param(types_.ContentChange(None, "server", "local"), False, id="base missing"),
+    ],
+)
+def test_posts_local_content(content_change: types_.ContentChange, expected_value: bool):
+    """
+    arrange: given a create action and an update action with a content change
+    act: when posts_local_content is called
+    assert: then the server is only left with the local content if there was no change made on
+        the server to merge.
+    """
+    actions = [
+        factories.CreatePageActionFactory(),
+        factories.UpdatePageActionFactory(content_change=content_change),
+    ]
+
+    assert reconcile.posts_local_content(actions) == expected_value
+
+
+def test_run_planned(tmp_path: Path, mocked_clients):
+    """
+    arrange: given path infos and planned actions for one of the paths
+    act: when run is called with the path infos and planned actions
+    assert: then the planned actions are returned for the planned path and the actions for the
+        other path are calculated.
+    """
+    first_path_info = path_info_mkdir(
+        factories.PathInfoFactory(table_path=("path 1",)), base_dir=tmp_path
+    )
+    second_path_info = path_info_mkdir(
+        factories.PathInfoFactory(table_path=("path 2",)), base_dir=tmp_path
+    )
+    planned_action = types_.NoopGroupAction(
+        level=first_path_info.level,
+        path=first_path_info.table_path,
+        navlink=factories.NavlinkFactory(title=first_path_info.navlink_title, link=None),
+    )
+
+    returned_actions = list(
+        reconcile.run(
+            sorted_path_infos=(first_path_info, second_path_info),
+            table_rows=(),
+            clients=mocked_clients,
+            base_path=tmp_path,
+            planned={first_path_info.table_path: (planned_action,)},
+        )
+    )
+
+    assert returned_actions[0] is planned_action
+    assert len(returned_actions) == 2
+    assert isinstance(returned_actions[1], types_.CreateGroupAction)
+    assert returned_actions[1].path == second_path_info.table_path
@@ -11,6 +11,7 @@ import secrets
 from pathlib import Path
 from unittest import mock
 
+import github
 import pytest
 from git import Git
 from git.exc import GitCommandError
@@ -21,9 +22,10 @@ from github.GithubException import GithubException, UnknownObjectException
 from github.PullRequest import PullRequest
 from github.Repository import Repository
 
-from gatekeeper import commit, repository
+from gatekeeper import commit, deadline, repository
 from gatekeeper.constants import DEFAULT_BRANCH, DOCUMENTATION_FOLDER_NAME, DOCUMENTATION_TAG
 from gatekeeper.exceptions import (
+    DeadlineExceededError,
     InputError,
     RepositoryClientError,
     RepositoryFileNotFoundError,
@@ -116,17 +118,18 @@ def test_current_branch_switch_main(repository_client, upstream_git_repo):
     assert repository_client._git_repo.head.ref.commit.hexsha == _hash
 
 
-def test_current_branch_switch_to_tag(repository_client):
+def test_current_branch_switch_to_tag(repository_client, upstream_git_repo):
     """
     arrange: given a repository in a detached state
-    act: we first tag the commit and then switch to the tag
+    act: we first tag the commit using the client and then switch to the tag
     assert: current_branch should provide first the commit hash and then the tag name
     """
     repository_client._git_repo.git.tag("-d", DOCUMENTATION_TAG)
+    upstream_git_repo.git.tag("-d", DOCUMENTATION_TAG)
 
     _hash = repository_client.current_branch
 
-    repository_client._git_repo.git.tag("my-tag")
+    repository_client.tag_commit("my-tag", _hash)
 
     assert repository_client.current_branch != _hash
     assert repository_client.current_branch == "my-tag"
@@ -157,6 +160,23 @@ def test_commit_in_branch_check(repository_client, docs_path):
     )
 
 
+def test_is_ancestor(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a repository with a commit on top of the initial commit
+    act: when is_ancestor is called for the commits in both orders and for an unknown commit
+    assert: then only the initial commit and the commit itself are ancestors of the commit.
+    """
+    initial_commit = repository_client.current_commit
+    (docs_path / "placeholder.md").touch()
+    repository_client.update_branch("commit of placeholder", directory=None)
+    commit = repository_client.current_commit
+
+    assert repository_client.is_ancestor(initial_commit, commit)
+    assert repository_client.is_ancestor(commit, commit)
+    assert not repository_client.is_ancestor(commit, initial_commit)
+    assert not repository_client.is_ancestor("1" + initial_commit[:-1], commit)
+
+
 def test_commit_in_branch_non_existing_hash(repository_client):
     """
     arrange: given a repository
@@ -181,7 +201,7 @@ def test_commit_in_branch_unknown_error(
     """
     err_str = "mocked error"
     mock_git_repository = mock.MagicMock(spec=Repo)
-    mock_git_repository.git.branch.side_effect = [GitCommandError(err_str)]
+    mock_git_repository.git.rev_parse.side_effect = [GitCommandError(err_str)]
     monkeypatch.setattr(repository_client, "_git_repo", mock_git_repository)
 
     with pytest.raises(RepositoryClientError) as exc:
@@ -190,6 +210,167 @@ def test_commit_in_branch_unknown_error(
     assert_substrings_in_string(("unknown error", err_str), str(exc.value).lower())
 
 
+def test_commit_in_branch_ancestry_error(
+    monkeypatch: pytest.MonkeyPatch, repository_client: Client
+):
+    """
+    arrange: given Client with a local git repository that fails the ancestry check
+    act: when is_commit_in_branch is called
+    assert: RepositoryClientError is raised.
+    """
+    repository_client.switch(DEFAULT_BRANCH)
+    monkeypatch.setattr(
+        Git,
+        "merge_base",
+        mock.MagicMock(side_effect=GitCommandError("merge-base", 128)),
+        raising=False,
+    )
+
+    with pytest.raises(RepositoryClientError) as exc:
+        repository_client.is_commit_in_branch(repository_client.current_commit)
+
+    assert "unknown error" in str(exc.value).lower()
+
+
+def test_commit_in_branch_not_local_branch(repository_client: Client):
+    """
+    arrange: given a repository
+    act: when is_commit_in_branch is called for a branch that is not a local branch
+    assert: False is returned.
+    """
+    assert not repository_client.is_commit_in_branch(
+        repository_client.current_commit, "missing-branch"
+    )
+
+
+def _shallow_client(
+    upstream_git_repo: Repo, mock_github_repo: Repository, tmp_path: Path, commits: int
+) -> tuple[Client, list[str]]:
+    """Create a client for a clone with only the last commit of a longer upstream history.
+
+    Args:
+        upstream_git_repo: The upstream repository.
+        mock_github_repo: The GitHub repository.
+        tmp_path: The directory to clone into.
+        commits: The number of commits to add upstream.
+
+    Returns:
+        The client for the clone and the upstream commits, oldest first.
+    """
+    upstream_git_repo.git.checkout(DEFAULT_BRANCH)
+    commit_shas = []
+    for index in range(commits):
+        upstream_git_repo.git.commit("--allow-empty", "-m", f"commit {index}")
+        commit_shas.append(upstream_git_repo.head.commit.hexsha)
+    clone = Repo.clone_from(
+        f"file://{upstream_git_repo.working_dir}",
+        tmp_path / "shallow",
+        depth=1,
+        branch=DEFAULT_BRANCH,
+    )
+    return Client(repository=clone, github_repository=mock_github_repo), commit_shas
+
+
+def test_commit_in_branch_shallow(
+    monkeypatch: pytest.MonkeyPatch,
+    upstream_git_repo: Repo,
+    mock_github_repo: Repository,
+    tmp_path: Path,
+):
+    """
+    arrange: given a shallow clone with only the last of 12 commits
+    act: when is_commit_in_branch is called for the third to last and then for the first commit
+    assert: then the clone is only deepened enough for the third to last commit and fully fetched
+        for the first commit, both are in the branch.
+    """
+    monkeypatch.setattr(repository, "ANCESTRY_INITIAL_DEEPEN", 2)
+    monkeypatch.setattr(repository, "ANCESTRY_MAX_DEEPEN", 4)
+    client, commit_shas = _shallow_client(
+        upstream_git_repo, mock_github_repo, tmp_path, commits=12
+    )
+
+    assert client.is_commit_in_branch(commit_shas[-3], DEFAULT_BRANCH)
+    assert client._git_repo.git.rev_parse("--is-shallow-repository") == "true"
+    assert client.is_commit_in_branch(commit_shas[0], DEFAULT_BRANCH)
+    assert client._git_repo.git.rev_parse("--is-shallow-repository") == "false"
+
+
+def test_commit_in_branch_shallow_not_ancestor(
+    upstream_git_repo: Repo, mock_github_repo: Repository, tmp_path: Path
+):
+    """
+    arrange: given a shallow clone with a local branch on an older commit
+    act: when is_commit_in_branch is called for the last commit and the local branch
+    assert: then the full history is fetched and False is returned.
+    """
+    client, commit_shas = _shallow_client(upstream_git_repo, mock_github_repo, tmp_path, commits=3)
+    client._git_repo.git.fetch("--deepen=2")
+    client.create_branch("old", commit_shas[0])
+
+    assert not client.is_commit_in_branch(commit_shas[-1], "old")
+    assert client._git_repo.git.rev_parse("--is-shallow-repository") == "false"
+
+
+def test_commit_in_branch_shallow_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    upstream_git_repo: Repo,
+    mock_github_repo: Repository,
+    tmp_path: Path,
+):
+    """
+    arrange: given a shallow clone with only the last of 3 commits and a run without time left
+    act: when is_commit_in_branch is called for the first commit
+    assert: then DeadlineExceededError is raised without deepening the clone.
+    """
+    client, commit_shas = _shallow_client(upstream_git_repo, mock_github_repo, tmp_path, commits=3)
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.kill_after.side_effect = DeadlineExceededError("time is up")
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+
+    with pytest.raises(DeadlineExceededError):
+        client.is_commit_in_branch(commit_shas[0], DEFAULT_BRANCH)
+
+    run_deadline.kill_after.assert_called_once_with(operation="the git fetch")
+    assert client._git_repo.git.rev_parse("--is-shallow-repository") == "true"
+
+
+@pytest.mark.parametrize(
+    "time_up, expected_error",
+    [
+        pytest.param(False, GitCommandError, id="failed"),
+        pytest.param(True, DeadlineExceededError, id="killed at deadline"),
+    ],
+)
+def test_tag_exists_fetch_error(
+    monkeypatch: pytest.MonkeyPatch,
+    repository_client: Client,
+    time_up: bool,
+    expected_error: type[Exception],
+):
+    """
+    arrange: given Client with a mocked local git repository whose fetch fails and a run with or
+        without time left
+    act: when tag_exists is called
+    assert: then the fetch is killed after the time left and the failure is reported as the
+        deadline being exceeded only when the time is up.
+    """
+    mock_git_repository = mock.MagicMock(spec=Repo)
+    mock_git_repository.git.fetch.side_effect = GitCommandError("fetch")
+    monkeypatch.setattr(repository_client, "_git_repo", mock_git_repository)
+    run_deadline = mock.MagicMock(spec=deadline.Deadline)
+    run_deadline.kill_after.return_value = 30
+    if time_up:
+        run_deadline.check.side_effect = DeadlineExceededError("time is up")
+    monkeypatch.setattr(deadline, "_DEADLINE", run_deadline)
+
+    with pytest.raises(expected_error):
+        repository_client.tag_exists(DOCUMENTATION_TAG)
+
+    mock_git_repository.git.fetch.assert_called_once_with(
+        "--all", "--tags", "--force", kill_after_timeout=30
+    )
+
+
 def test_create_branch_error(monkeypatch: pytest.MonkeyPatch, repository_client: Client):
     """
     arrange: given Client with a mocked local git repository that raises an exception
@@ -365,6 +546,46 @@ def test_tag_commit_tag_not_exists(repository_client: Client, upstream_git_repo)
     assert any(DOCUMENTATION_TAG == tag.name for tag in upstream_git_repo.tags)
 
 
+def test_tag_commit_message(repository_client: Client, upstream_git_repo):
+    """
+    arrange: given a lightweight tag
+    act: when tag_commit is called with a message and then without a message
+    assert: then the message of the annotated tag is returned until the tag is moved without a
+        message, also on the remote.
+    """
+    repository_client.tag_commit(DOCUMENTATION_TAG, repository_client.current_commit)
+    assert repository_client.tag_message(DOCUMENTATION_TAG) is None
+
+    repository_client.tag_commit(
+        DOCUMENTATION_TAG, repository_client.current_commit, message=(message := "line 1\nline 2")
+    )
+
+    assert repository_client.tag_message(DOCUMENTATION_TAG) == message
+    assert repository_client.tag_exists(DOCUMENTATION_TAG) == repository_client.current_commit
+    assert upstream_git_repo.tags[DOCUMENTATION_TAG].tag.message.strip() == message
+    repository_client.tag_commit(DOCUMENTATION_TAG, repository_client.current_commit)
+    assert repository_client.tag_message(DOCUMENTATION_TAG) is None
+    assert repository_client.tag_message("other tag") is None
+
+
+def test_read_file(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a file committed and tagged and then changed in the working tree
+    act: when read_file is called with the tag for the file and for a file that does not exist
+    assert: then the committed content is returned and RepositoryFileNotFoundError is raised for
+        the missing file.
+    """
+    (path := docs_path / "file.md").write_text("content 1\n", encoding="utf-8")
+    repository_client._git_repo.git.add(".")
+    repository_client._git_repo.git.commit("-m", "add file")
+    repository_client.tag_commit(DOCUMENTATION_TAG, repository_client.current_commit)
+    path.write_text("content 2", encoding="utf-8")
+
+    assert repository_client.read_file(tree_ish=DOCUMENTATION_TAG, path=path) == "content 1"
+    with pytest.raises(RepositoryFileNotFoundError):
+        repository_client.read_file(tree_ish=DOCUMENTATION_TAG, path=docs_path / "missing.md")
+
+
 def test_tag_commit_tag_update(repository_client: Client, upstream_git_repo, docs_path: Path):
     """
     arrange: given tag name and commit sha and tag DOCUMENTATION_TAG exists locally or remotely
@@ -427,6 +648,91 @@ def test_tag_other_commit(repository_client: Client, docs_path: Path):
     assert new_hash == repository_client.current_commit
 
 
+def test_tag_commit_deferred(repository_client: Client, upstream_git_repo):
+    """
+    arrange: given a client for a charm of the repository
+    act: when tag_commit is called on the charm client while tagging is deferred and after
+    assert: then the tag is recorded but not created within the context and created after.
+    """
+    repository_client._git_repo.git.tag("-d", DOCUMENTATION_TAG)
+    upstream_git_repo.git.tag("-d", DOCUMENTATION_TAG)
+    charm_client = repository_client.for_charm_dir("charm")
+    commit_sha = repository_client.current_commit
+
+    with repository_client.defer_tagging() as deferred_tags:
+        charm_client.tag_commit(DOCUMENTATION_TAG, commit_sha)
+
+        assert repository_client.tag_exists(DOCUMENTATION_TAG) is None
+
+    assert deferred_tags == {DOCUMENTATION_TAG: commit_sha}
+    charm_client.tag_commit(DOCUMENTATION_TAG, commit_sha)
+    assert repository_client.tag_exists(DOCUMENTATION_TAG) == commit_sha
+
+
+@pytest.mark.parametrize(
+    "charm_dir, expected_migrate_branch",
+    [
+        pytest.param("", repository.DEFAULT_BRANCH_NAME, id="root"),
+        pytest.param(".", repository.DEFAULT_BRANCH_NAME, id="dot"),
+        pytest.param("charm", f"{repository.DEFAULT_BRANCH_NAME}-charm", id="directory"),
+        pytest.param(
+            "charms/charm 1/", f"{repository.DEFAULT_BRANCH_NAME}-charms-charm-1", id="nested"
+        ),
+    ],
+)
+def test_for_charm_dir(repository_client: Client, charm_dir: str, expected_migrate_branch: str):
+    """
+    arrange: given a repository client
+    act: when for_charm_dir is called
+    assert: then a client for the charm that shares the repository and the state is returned.
+    """
+    returned_client = repository_client.for_charm_dir(charm_dir)
+
+    assert returned_client.base_path == repository_client.base_path
+    assert returned_client.docs_path == repository_client.base_path / charm_dir / "docs"
+    assert returned_client.migrate_branch == expected_migrate_branch
+    assert returned_client._git_repo is repository_client._git_repo
+    assert returned_client._shared is repository_client._shared
+    assert repository_client.migrate_branch == repository.DEFAULT_BRANCH_NAME
+
+
+@pytest.mark.parametrize(
+    "use_tag_commit, expected_same",
+    [pytest.param(True, True, id="same"), pytest.param(False, False, id="different")],
+)
+def test_is_same_commit(repository_client: Client, use_tag_commit: bool, expected_same: bool):
+    """
+    arrange: given a repository with the documentation tag on a commit
+    act: when is_same_commit is called with the tag and the commit or another commit
+    assert: then whether the commits match is returned and the working tree is not checked out.
+    """
+    tag_commit = repository_client.tag_exists(DOCUMENTATION_TAG)
+    assert tag_commit
+    current_branch = repository_client.current_branch
+
+    returned_same = repository_client.is_same_commit(
+        DOCUMENTATION_TAG, tag_commit if use_tag_commit else "0" * 40
+    )
+
+    assert returned_same == expected_same
+    assert repository_client.current_branch == current_branch
+
+
+def test_discard_changes(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a repository with a new and a modified file
+    act: when discard_changes is called
+    assert: then the repository is not dirty.
+    """
+    (docs_path / "new.md").write_text("new", encoding="utf-8")
+    (repository_client.base_path / ".gitkeep").write_text("modified", encoding="utf-8")
+    assert repository_client.is_dirty()
+
+    repository_client.discard_changes()
+
+    assert not repository_client.is_dirty()
+
+
 def test_get_file_content_from_tag_tag_github_error(
     monkeypatch: pytest.MonkeyPatch, repository_client: Client
 ):
@@ -704,7 +1010,7 @@ def test_create_repository_client(
     test_token = secrets.token_hex(16)
     mock_github_client = mock.MagicMock(spec=Github)
     mock_github_client.get_repo.returns = mock_github_repo
-    monkeypatch.setattr(repository, "Github", mock_github_client)
+    monkeypatch.setattr(github, "Github", mock_github_client)
 
     returned_client = repository.create_repository_client(
         access_token=test_token, base_path=repository_path
@@ -730,7 +1036,7 @@ def test_create_repository_client_with_charm_dir(
     test_token = secrets.token_hex(16)
     mock_github_client = mock.MagicMock(spec=Github)
     mock_github_client.get_repo.returns = mock_github_repo
-    monkeypatch.setattr(repository, "Github", mock_github_client)
+    monkeypatch.setattr(github, "Github", mock_github_client)
 
     returned_client = repository.create_repository_client(
         access_token=test_token, base_path=repository_path, charm_dir="charm"
@@ -1292,3 +1598,232 @@ def test_create_pull_request_function(
     assert (
         upstream_repository_path / DOCUMENTATION_FOLDER_NAME / filler_file
     ).read_text() == filler_text
+
+
+def test_create_repository_client_github_client(
+    git_repo_with_remote: Repo, repository_path: Path, mock_github: Github
+):
+    """
+    arrange: given valid repository path and a github client to reuse
+    act: when create_repository_client is called with the github client and the GitHub
+        repository is used by the client and a client for another charm
+    assert: then the github client is used to get the repository once it is first used.
+    """
+    _ = git_repo_with_remote
+
+    returned_client = repository.create_repository_client(
+        access_token="token 1", base_path=repository_path, github_client=mock_github
+    )
+
+    assert isinstance(returned_client, repository.Client)
+    mock_github.get_repo.assert_not_called()
+    assert returned_client.for_charm_dir("charm")._github_repo is returned_client._github_repo
+    mock_github.get_repo.assert_called_once_with("canonical/non-existing-repo")
+
+
+def test_ref_index(repository_client: repository.Client, upstream_git_repo: Repo):
+    """
+    arrange: given a lightweight and an annotated tag on the same commit created upstream
+    act: when tag_exists is called for both, then tags are created without the client
+    assert: then both tags resolve to the commit and the refs are only loaded again after the
+        client fetches them.
+    """
+    commit_sha = upstream_git_repo.head.commit.hexsha
+    upstream_git_repo.git.tag("light-tag")
+    upstream_git_repo.git.tag("-a", "annotated-tag", "-m", "message 1")
+
+    assert repository_client.tag_exists("annotated-tag") == commit_sha
+    assert repository_client.tag_exists("light-tag") == commit_sha
+    ref_index = repository_client._refs()
+    assert ref_index.tags_at(commit_sha) == ("annotated-tag", DOCUMENTATION_TAG, "light-tag")
+
+    repository_client._git_repo.git.tag("local-tag")
+
+    assert repository_client._refs() is ref_index
+    assert repository_client._refs().tag("local-tag") is None
+    assert repository_client.tag_exists("local-tag") == repository_client.current_commit
+
+
+def test_get_blob_shas(repository_client: Client, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a commit with a file in the docs directory and a submodule listed
+    act: when get_blob_shas is called for the docs directory and for a missing tag
+    assert: then the blob of the file is returned and RepositoryClientError is raised.
+    """
+    docs_path = repository_client.docs_path
+    docs_path.mkdir()
+    (docs_path / "index.md").write_text("content 1\n", encoding="utf-8")
+    repository_client.update_branch("docs", directory=None, push=False)
+
+    assert repository_client.get_blob_shas("HEAD", docs_path) == {
+        docs_path / "index.md": "a0054e492840f572e48a3cb791d2e083afaf08f6"
+    }
+    with pytest.raises(RepositoryClientError):
+        repository_client.get_blob_shas("missing-tag", docs_path)
+
+    monkeypatch.setattr(
+        Git,
+        "ls_tree",
+        mock.MagicMock(return_value=f"160000 commit {'1' * 40}\tdocs/submodule\0"),
+        raising=False,
+    )
+    assert not repository_client.get_blob_shas("HEAD", docs_path)
+
+
+def test_create_branch_existing(repository_client: Client, upstream_git_repo: Repo):
+    """
+    arrange: given a branch that was created and pushed
+    act: when create_branch is called again for the branch and the branch is force pushed
+    assert: then the branch is created again from the base and overwritten upstream.
+    """
+    branch_name = "test-create-branch"
+    repository_client.create_branch(branch_name=branch_name).switch(branch_name)
+    (repository_client.base_path / "test.txt").write_text("content 1", encoding="utf-8")
+    repository_client.update_branch(commit_msg="commit-1", directory=None)
+    repository_client.switch(DEFAULT_BRANCH)
+
+    repository_client.create_branch(branch_name=branch_name, base=DEFAULT_BRANCH)
+    repository_client.switch(branch_name)
+    (repository_client.base_path / "test-2.txt").write_text("content 2", encoding="utf-8")
+    repository_client.update_branch(commit_msg="commit-2", directory=None, force=True)
+
+    branch_commit = upstream_git_repo.commit(branch_name)
+    assert branch_commit.parents == (upstream_git_repo.commit(DEFAULT_BRANCH),)
+
+
+def test_switch_branch_pop_conflict(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a docs file changed in the working tree and in a branch
+    act: when switch is called for the branch
+    assert: then the changes in the working tree are kept.
+    """
+    repository_client.switch(DEFAULT_BRANCH)
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+    repository_client.update_branch("commit-1", directory=None, push=False)
+    repository_client.create_branch("other").switch("other")
+    (docs_path / "index.md").write_text("content 2", encoding="utf-8")
+    repository_client.update_branch("commit-2", directory=None, push=False)
+    repository_client.switch(DEFAULT_BRANCH)
+    (docs_path / "index.md").write_text("content 3", encoding="utf-8")
+
+    repository_client.switch("other")
+
+    assert repository_client.current_branch == "other"
+    assert (docs_path / "index.md").read_text(encoding="utf-8") == "content 3"
+
+
+def test_is_dirty_branch(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a new docs file in the working tree
+    act: when is_dirty is called for the default branch
+    assert: then the working tree is dirty.
+    """
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+
+    assert repository_client.is_dirty(DEFAULT_BRANCH)
+
+
+def test_resolve_commit(repository_client: Client):
+    """
+    arrange: given a local branch ahead of its branch upstream
+    act: when resolve_commit is called for the branch, a commit and a missing branch
+    assert: then the local or the upstream commit is returned depending on remote_first, the
+        commit is returned for the commit and RepositoryClientError is raised for the missing
+        branch.
+    """
+    upstream_commit = repository_client.switch(DEFAULT_BRANCH).current_commit
+    (repository_client.base_path / "test.txt").write_text("content 1", encoding="utf-8")
+    repository_client.update_branch("commit-1", directory=None, push=False)
+    local_commit = repository_client.current_commit
+
+    assert repository_client.resolve_commit(DEFAULT_BRANCH) == local_commit
+    assert repository_client.resolve_commit(DEFAULT_BRANCH, remote_first=True) == upstream_commit
+    assert repository_client.resolve_commit(upstream_commit[:12]) == upstream_commit
+    with pytest.raises(RepositoryClientError):
+        repository_client.resolve_commit("missing-branch")
+
+
+def test_has_docs_changes(repository_client: Client, docs_path: Path):
+    """
+    arrange: given a docs file committed on a branch and the same change in the working tree
+    act: when has_docs_changes is called for the default branch and for the branch
+    assert: then there are only changes compared to the default branch and the working tree is
+        not switched.
+    """
+    repository_client.switch(DEFAULT_BRANCH).create_branch("other").switch("other")
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+    repository_client.update_branch("commit-1", directory=None, push=False)
+    repository_client.switch(DEFAULT_BRANCH)
+    docs_path.mkdir()
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+
+    assert repository_client.has_docs_changes(DEFAULT_BRANCH)
+    assert not repository_client.has_docs_changes("other")
+    assert repository_client.current_branch == DEFAULT_BRANCH
+
+
+def test_update_pull_request(repository_client: Client, upstream_git_repo: Repo, docs_path: Path):
+    """
+    arrange: given a migration branch upstream and a changed and a removed docs file in the
+        working tree
+    act: when update_pull_request is called twice
+    assert: then a single commit with the changes is pushed on top of the branch and the working
+        tree is not switched.
+    """
+    branch_name = repository.DEFAULT_BRANCH_NAME
+    repository_client.switch(DEFAULT_BRANCH)
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+    (docs_path / "removed.md").write_text("content 2", encoding="utf-8")
+    repository_client.update_branch("commit-1", directory=None)
+    upstream_git_repo.git.branch(branch_name, DEFAULT_BRANCH)
+    repository_client._git_repo.git.fetch()
+    repository_client._refs_changed()
+    (docs_path / "index.md").write_text("content 3", encoding="utf-8")
+    (docs_path / "removed.md").unlink()
+    (docs_path / "nested").mkdir()
+    (docs_path / "nested" / "new.md").write_text("content 4", encoding="utf-8")
+    current_commit = repository_client.current_commit
+
+    repository_client.update_pull_request(branch_name)
+    repository_client.update_pull_request(branch_name)
+
+    branch_commit = upstream_git_repo.commit(branch_name)
+    assert branch_commit.parents == (upstream_git_repo.commit(DEFAULT_BRANCH),)
+    assert branch_commit.message.strip() == (
+        "modified: docs/index.md // new: docs/nested/new.md // removed: docs/removed.md"
+    )
+    assert (branch_commit.tree / "docs/nested/new.md").data_stream.read() == b"content 4"
+    assert repository_client.current_commit == current_commit
+    assert repository_client.current_branch == DEFAULT_BRANCH
+
+
+@pytest.mark.parametrize("api_fails", [False, True])
+def test_create_pull_request_github_api(
+    monkeypatch: pytest.MonkeyPatch,
+    api_fails: bool,
+    repository_client: Client,
+    mock_github_repo,
+    docs_path: Path,
+):
+    """
+    arrange: given a new docs file in the working tree and pushing the commit fails
+    act: when create_pull_request is called
+    assert: then the commit is pushed with the GitHub API or RepositoryClientError is raised if
+        the GitHub API fails.
+    """
+    (docs_path / "index.md").write_text("content 1", encoding="utf-8")
+    push_errors = [GitCommandError("mocked error"), GithubException(500)]
+    monkeypatch.setattr(
+        Git, "push", mock.MagicMock(side_effect=[push_errors[0], None]), raising=False
+    )
+    if api_fails:
+        mock_github_repo.get_branch.side_effect = push_errors[1]
+
+    if api_fails:
+        with pytest.raises(RepositoryClientError):
+            repository_client.create_pull_request(DEFAULT_BRANCH)
+        return
+    repository_client.create_pull_request(DEFAULT_BRANCH)
+
+    mock_github_repo.get_branch.assert_called_once_with(repository.DEFAULT_BRANCH_NAME)
+    mock_github_repo.get_git_ref.return_value.edit.assert_called_once()
@@ -0,0 +1,321 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for shard."""
+
+# Need access to protected functions for testing
+# pylint: disable=protected-access
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from gatekeeper import shard
+
+KEYS = tuple(f"https://github.com/canonical/repo-{index}" for index in range(20))
+
+
+def _acquire_all(path: Path, owner: str) -> list[str]:
+    """Try to claim all the keys as a runner.
+
+    Args:
+        path: The lease directory.
+        owner: The identifier of the runner.
+
+    Returns:
+        The claimed keys.
+    """
+    leases = shard.LeaseDirectory(path=path, owner=owner)
+    return [key for key in KEYS if leases.acquire(key)]
+
+
+def _make_stale(leases: shard.LeaseDirectory, key: str) -> None:
+    """Make the lease of a key look abandoned.
+
+    Args:
+        leases: The lease directory.
+        key: The key.
+    """
+    stale_time = time.time() - leases.seconds - 1
+    os.utime(leases._file(key, shard.LEASE_SUFFIX), (stale_time, stale_time))
+
+
+def test_shard_of():
+    """
+    arrange: given keys
+    act: when shard_of is called for 3 shards
+    assert: then every shard is used and the shard of a key is always the same.
+    """
+    shards = [shard.shard_of(key, 3) for key in KEYS]
+
+    assert set(shards) == {0, 1, 2}
+    assert shards == [shard.shard_of(key, 3) for key in KEYS]
+
+
+def test_claim_order():
+    """
+    arrange: given keys
+    act: when claim_order is called for each of 3 shards
+    assert: then each order has all the keys, starting with the keys of the shard in their order
+        followed by the keys of the other shards in reverse order.
+    """
+    for shard_index in range(3):
+        returned_order = shard.claim_order(keys=KEYS, shard_index=shard_index, shard_count=3)
+
+        own_keys = [key for key in KEYS if shard.shard_of(key, 3) == shard_index]
+        next_keys = [key for key in KEYS if shard.shard_of(key, 3) == (shard_index + 1) % 3]
+        assert sorted(returned_order) == sorted(KEYS)
+        assert returned_order[: len(own_keys)] == own_keys
+        assert returned_order[len(own_keys) : len(own_keys) + len(next_keys)] == next_keys[::-1]
+
+
+def test_shard_order_without_leases(tmp_path: Path):
+    """
+    arrange: given a shard with and without leases
+    act: when order is called
+    assert: then only the keys of the shard are returned without leases.
+    """
+    own_keys = [key for key in KEYS if shard.shard_of(key, 2) == 1]
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+
+    assert shard.Shard(shard_index=1, shard_count=2, leases=None).order(KEYS) == own_keys
+    assert len(shard.Shard(shard_index=1, shard_count=2, leases=leases).order(KEYS)) == len(KEYS)
+
+
+def test_acquire(tmp_path: Path):
+    """
+    arrange: given a lease held by a runner
+    act: when another runner tries to acquire it before and after it was abandoned
+    assert: then it is only acquired once it was abandoned.
+    """
+    first_leases = shard.LeaseDirectory(path=tmp_path / "leases", owner="runner 1")
+    second_leases = shard.LeaseDirectory(path=tmp_path / "leases", owner="runner 2")
+
+    assert first_leases.acquire(KEYS[0])
+    assert not second_leases.acquire(KEYS[0])
+    _make_stale(first_leases, KEYS[0])
+    assert second_leases.acquire(KEYS[0])
+    assert not first_leases.acquire(KEYS[0])
+
+
+def test_acquire_restarted_runner(tmp_path: Path):
+    """
+    arrange: given a lease held by a runner that stopped
+    act: when the runner is restarted with the same identifier and acquires the lease
+    assert: then the lease is resumed straight away.
+    """
+    shard.LeaseDirectory(path=tmp_path, owner="runner 1").acquire(KEYS[0])
+
+    assert shard.LeaseDirectory(path=tmp_path, owner="runner 1").acquire(KEYS[0])
+
+
+@pytest.mark.parametrize("stale, expected_acquired", [(False, False), (True, True)])
+def test_acquire_partial_lease(stale: bool, expected_acquired: bool, tmp_path: Path):
+    """
+    arrange: given a lease file that is not complete
+    act: when acquire is called
+    assert: then the lease is only acquired once it was abandoned.
+    """
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    leases._file(KEYS[0], shard.LEASE_SUFFIX).write_text("{", encoding="utf-8")
+    if stale:
+        _make_stale(leases, KEYS[0])
+
+    assert leases.acquire(KEYS[0]) == expected_acquired
+
+
+def test_acquire_completed(tmp_path: Path):
+    """
+    arrange: given a key that was completed by another runner
+    act: when acquire is called
+    assert: then the lease is not acquired.
+    """
+    first_leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    first_leases.acquire(KEYS[0])
+    first_leases.complete(KEYS[0], {"url": KEYS[0]})
+
+    assert not shard.LeaseDirectory(path=tmp_path, owner="runner 2").acquire(KEYS[0])
+    assert not first_leases._file(KEYS[0], shard.LEASE_SUFFIX).exists()
+
+
+def test_acquire_completed_meanwhile(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given another runner completes a key while the lease file is created
+    act: when acquire is called
+    assert: then the lease is not acquired and the lease file is removed.
+    """
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    original_open = os.open
+
+    def open_and_complete(path, flags, mode):
+        """Create the lease file after another runner completed the key.
+
+        Args:
+            path: The file to open.
+            flags: The flags to open the file with.
+            mode: The permissions of the file.
+
+        Returns:
+            The file descriptor.
+        """
+        leases._file(KEYS[0], shard.DONE_SUFFIX).write_text("{}", encoding="utf-8")
+        return original_open(path, flags, mode)
+
+    monkeypatch.setattr(shard.os, "open", open_and_complete)
+
+    assert not leases.acquire(KEYS[0])
+    assert not leases._file(KEYS[0], shard.LEASE_SUFFIX).exists()
+
+
+def test_take_over_removed(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a lease that is removed, or taken over by another runner while taking it over
+    act: when _take_over is called
+    assert: then creating the lease is tried again.
+    """
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    lease_path = leases._file(KEYS[0], shard.LEASE_SUFFIX)
+
+    assert leases._take_over(key=KEYS[0], lease_path=lease_path)
+
+    lease_path.write_text(json.dumps({"owner": "runner 1"}), encoding="utf-8")
+    monkeypatch.setattr(Path, "rename", mock.MagicMock(side_effect=FileNotFoundError))
+    assert leases._take_over(key=KEYS[0], lease_path=lease_path)
+
+
+def test_take_over_taken_over_meanwhile(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given an abandoned lease that another runner takes over and acquires after the
+        runner read it
+    act: when acquire is called
+    assert: then the lease is not acquired and the lease of the other runner is kept.
+    """
+    first_leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    second_leases = shard.LeaseDirectory(path=tmp_path, owner="runner 2")
+    third_leases = shard.LeaseDirectory(path=tmp_path, owner="runner 3")
+    first_leases.acquire(KEYS[0])
+    _make_stale(first_leases, KEYS[0])
+    original_read_lease = shard.LeaseDirectory._read_lease
+
+    def read_lease_and_take_over(lease_path: Path) -> tuple[int, str | None]:
+        """Read the lease before the other runner takes it over.
+
+        Args:
+            lease_path: The lease file.
+
+        Returns:
+            The lease as read before it was taken over.
+        """
+        lease = original_read_lease(lease_path)
+        monkeypatch.setattr(second_leases, "_read_lease", original_read_lease)
+        assert third_leases.acquire(KEYS[0])
+        return lease
+
+    monkeypatch.setattr(second_leases, "_read_lease", read_lease_and_take_over)
+
+    assert not second_leases.acquire(KEYS[0])
+    lease_path = first_leases._file(KEYS[0], shard.LEASE_SUFFIX)
+    assert json.loads(lease_path.read_text(encoding="utf-8"))["owner"] == "runner 3"
+    assert [path.name for path in tmp_path.iterdir()] == [lease_path.name]
+    assert not first_leases.acquire(KEYS[0])
+
+
+def test_take_over_replaced(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a lease of another runner that is renamed while a lease is created again
+    act: when _take_over is called
+    assert: then the lease is not taken over and the new lease is kept.
+    """
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    lease_path = leases._file(KEYS[0], shard.LEASE_SUFFIX)
+    lease_path.write_text(json.dumps({"owner": "runner 2"}), encoding="utf-8")
+    _make_stale(leases, KEYS[0])
+    original_rename = Path.rename
+
+    def rename_and_replace(path: Path, target: Path) -> Path:
+        """Rename a fresh lease of another runner and create a lease again.
+
+        Args:
+            path: The file to rename.
+            target: The new name of the file.
+
+        Returns:
+            The renamed file.
+        """
+        path.write_text(json.dumps({"owner": "runner 3"}), encoding="utf-8")
+        renamed = original_rename(path, target)
+        path.write_text(json.dumps({"owner": "runner 4"}), encoding="utf-8")
+        return renamed
+
+    monkeypatch.setattr(Path, "rename", rename_and_replace)
+
+    assert not leases._take_over(key=KEYS[0], lease_path=lease_path)
+    assert json.loads(lease_path.read_text(encoding="utf-8"))["owner"] == "runner 4"
+    assert [path.name for path in tmp_path.iterdir()] == [lease_path.name]
+
+
+def test_renew(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    """
+    arrange: given an abandoned lease and a lease that was removed
+    act: when renew is called for both
+    assert: then the first lease is no longer abandoned and a warning is logged for the second.
+    """
+    first_leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1")
+    first_leases.acquire(KEYS[0])
+    _make_stale(first_leases, KEYS[0])
+
+    first_leases.renew(KEYS[0])
+    first_leases.renew(KEYS[1])
+
+    assert not shard.LeaseDirectory(path=tmp_path, owner="runner 2").acquire(KEYS[0])
+    assert "taken over" in caplog.text
+
+
+def test_renewing(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a lease with a short lease time
+    act: when the lease is held using renewing for longer than the lease time
+    assert: then the lease is renewed.
+    """
+    leases = shard.LeaseDirectory(path=tmp_path, owner="runner 1", seconds=0.03)
+    mocked_renew = mock.MagicMock()
+    monkeypatch.setattr(leases, "renew", mocked_renew)
+
+    with leases.renewing(KEYS[0]):
+        time.sleep(0.1)
+
+    mocked_renew.assert_called_with(KEYS[0])
+
+
+def test_results(tmp_path: Path):
+    """
+    arrange: given 2 runners that completed a key each
+    act: when results is called
+    assert: then the results of both keys are returned.
+    """
+    shard.LeaseDirectory(path=tmp_path, owner="runner 1").complete(KEYS[0], {"url": KEYS[0]})
+    shard.LeaseDirectory(path=tmp_path, owner="runner 2").complete(KEYS[1], {"url": KEYS[1]})
+
+    returned_results = shard.LeaseDirectory(path=tmp_path, owner="runner 3").results()
+
+    assert sorted(result["url"] for result in returned_results) == sorted(KEYS[:2])
+
+
+def test_acquire_processes(tmp_path: Path):
+    """
+    arrange: given 4 runners in separate processes sharing a lease directory
+    act: when each runner tries to acquire all the keys at the same time
+    assert: then each key is acquired by exactly one runner.
+    """
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(_acquire_all, tmp_path, f"runner {index}") for index in range(4)
+        ]
+        acquired = [key for future in futures for key in future.result()]
+
+    assert sorted(acquired) == sorted(KEYS)
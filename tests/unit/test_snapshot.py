@@ -0,0 +1,28 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for snapshot."""
+
+from gatekeeper import snapshot
+
+
+def test_snapshot():
+    """
+    arrange: given a snapshot with two topics recorded and one of them discarded
+    act: when get is called before and after the snapshot is frozen and a topic is put once frozen
+    assert: then only the topic that was kept is returned and only once frozen.
+    """
+    server_snapshot = snapshot.ServerSnapshot()
+    server_snapshot.put(1, "content 1")
+    server_snapshot.put(2, "content 2")
+    server_snapshot.discard(2)
+
+    assert server_snapshot.get(1) is None
+
+    server_snapshot.freeze()
+    server_snapshot.put(3, "content 3")
+
+    assert server_snapshot.frozen
+    assert server_snapshot.get(1) == "content 1"
+    assert server_snapshot.get(2) is None
+    assert server_snapshot.get(3) is None
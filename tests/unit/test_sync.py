@@ -0,0 +1,143 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for sync."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from gatekeeper import sync
+
+
+def test_state_message():
+    """
+    arrange: given a sync state
+    act: when it is converted into a message and read back
+    assert: then the same state is returned.
+    """
+    state = sync.SyncState(
+        synced_at="2025-01-01T00:00:00.000Z", topics={2: "docs/file-2.md", 1: "docs/file-1.md"}
+    )
+
+    assert sync.SyncState.from_message(state.to_message()) == state
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        pytest.param(None, id="lightweight tag"),
+        pytest.param("", id="empty"),
+        pytest.param("moved by hand", id="not json"),
+        pytest.param(json.dumps(["2025-01-01T00:00:00.000Z"]), id="not an object"),
+        pytest.param(
+            json.dumps({"version": 2, "synced_at": "2025-01-01T00:00:00.000Z", "topics": {}}),
+            id="other version",
+        ),
+        pytest.param(json.dumps({"version": 1, "topics": {}}), id="synced at missing"),
+        pytest.param(
+            json.dumps(
+                {"version": 1, "synced_at": "2025-01-01T00:00:00.000Z", "topics": {"a": ""}}
+            ),
+            id="invalid topic",
+        ),
+    ],
+)
+def test_state_from_message_invalid(message: str | None):
+    """
+    arrange: given a tag message that does not record a sync state
+    act: when the state is read from the message
+    assert: then None is returned.
+    """
+    assert sync.SyncState.from_message(message) is None
+
+
+@pytest.mark.parametrize(
+    "url, expected_topic_id",
+    [
+        pytest.param("https://discourse/t/slug/12", 12, id="absolute"),
+        pytest.param("/t/slug/12/", 12, id="relative with trailing slash"),
+        pytest.param("https://discourse/t/slug", None, id="no identifier"),
+    ],
+)
+def test_topic_id(url: str, expected_topic_id: int | None):
+    """
+    arrange: given a link to a topic
+    act: when topic_id is called
+    assert: then the identifier at the end of the link is returned.
+    """
+    assert sync.topic_id(url) == expected_topic_id
+
+
+def test_tracker_state(tmp_path: Path):
+    """
+    arrange: given a tracker started twice with topics matching files, one of them with replies
+        and one of them only read before
+    act: when the state is taken
+    assert: then the first start is kept and only the topics read without replies are included.
+    """
+    tracker = sync.SyncTracker()
+    tracker.start("2025-01-01T00:00:00.000Z")
+    tracker.start("2025-02-01T00:00:00.000Z")
+    tracker.record_topic(1, eligible=True)
+    tracker.record_topic(2, eligible=False)
+    tracker.record_topic(3, eligible=True)
+    tracker.record_match(url="/t/slug-1/1", path=tmp_path / "docs" / "file-1.md")
+    tracker.record_match(url="/t/slug-2/2", path=tmp_path / "docs" / "file-2.md")
+    tracker.record_match(url="/t/slug-4/4", path=tmp_path / "docs" / "file-4.md")
+
+    state = tracker.state(base_path=tmp_path)
+
+    assert state == sync.SyncState(
+        synced_at="2025-01-01T00:00:00.000Z", topics={1: "docs/file-1.md"}
+    )
+
+
+@pytest.mark.parametrize(
+    "synced_at, failed",
+    [
+        pytest.param("2025-01-01T00:00:00.000Z", True, id="failed"),
+        pytest.param(None, False, id="listing failed"),
+    ],
+)
+def test_tracker_state_none(synced_at: str | None, failed: bool, tmp_path: Path):
+    """
+    arrange: given a tracker with a matching topic that failed or could not list the category
+    act: when the state is taken
+    assert: then no state is returned.
+    """
+    tracker = sync.SyncTracker()
+    tracker.start(synced_at)
+    tracker.record_topic(1, eligible=True)
+    tracker.record_match(url="/t/slug-1/1", path=tmp_path / "file-1.md")
+    if failed:
+        tracker.fail()
+
+    assert tracker.state(base_path=tmp_path) is None
+
+
+def test_tracker_use(tmp_path: Path):
+    """
+    arrange: given a sync state with two topics
+    act: when the tracker uses the state with one of them bumped since
+    assert: then only the other topic is unchanged, it is kept in the next state once it matches
+        again.
+    """
+    state = sync.SyncState(
+        synced_at="2025-01-01T00:00:00.000Z", topics={1: "docs/file-1.md", 2: "docs/file-2.md"}
+    )
+    tracker = sync.SyncTracker()
+    assert not tracker.is_using(state)
+
+    tracker.use(state=state, bumped=frozenset((2, 3)), base_path=tmp_path)
+
+    assert tracker.is_using(state)
+    assert tracker.unchanged_path("/t/slug-1/1") == tmp_path / "docs" / "file-1.md"
+    assert tracker.unchanged_path("/t/slug-2/2") is None
+    assert tracker.unchanged_path("/t/slug-5/5") is None
+    tracker.start("2025-02-01T00:00:00.000Z")
+    tracker.record_match(url="/t/slug-1/1", path=tmp_path / "docs" / "file-1.md")
+    assert tracker.state(base_path=tmp_path) == sync.SyncState(
+        synced_at="2025-02-01T00:00:00.000Z", topics={1: "docs/file-1.md"}
+    )